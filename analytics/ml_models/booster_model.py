@@ -0,0 +1,93 @@
+"""
+Booster de LightGBM con la interfaz de estimador de sklearn.
+
+El entrenamiento fuera de memoria construye el Dataset de LightGBM por
+lotes y entrena con lgb.train, que devuelve un Booster sin la interfaz de
+LGBMClassifier/LGBMRegressor. Este envoltorio permite usarlo como paso
+'model' de un Pipeline (predict, predict_proba, feature_importances_) y
+continuar el boosting desde el modelo anterior (init_model).
+"""
+
+from typing import Dict, Optional
+
+import numpy as np
+from sklearn.base import BaseEstimator
+
+
+def lightgbm_objective(task_type: str, n_classes: Optional[int] = None) -> Dict:
+    """Parámetros de objetivo de LightGBM para la tarea."""
+    if task_type == 'regression':
+        return {'objective': 'regression'}
+    if n_classes is not None and n_classes > 2:
+        return {'objective': 'multiclass', 'num_class': n_classes}
+    return {'objective': 'binary'}
+
+
+class LightGBMBoosterModel(BaseEstimator):
+    """Estimador sobre un lgb.Booster entrenado con la API nativa."""
+
+    def __init__(self, params: Optional[Dict] = None, num_boost_round: int = 100):
+        """
+        Args:
+            params: Parámetros de lgb.train (incluye 'objective' y 'num_class')
+            num_boost_round: Rondas de boosting en fit
+        """
+        self.params = params
+        self.num_boost_round = num_boost_round
+
+    @classmethod
+    def from_booster(cls, booster, params: Dict) -> 'LightGBMBoosterModel':
+        """Envolver un Booster ya entrenado."""
+        model = cls(params=dict(params), num_boost_round=booster.current_iteration())
+        model.booster_ = booster
+        return model
+
+    def fit(self, X, y, sample_weight=None, init_model=None, categorical_feature='auto'):
+        """
+        Entrenar (o continuar el boosting desde init_model) sobre una matriz.
+
+        Args:
+            X: Matriz de características
+            y: Variable objetivo (clases codificadas 0..n-1 en clasificación)
+            sample_weight: Pesos por fila
+            init_model: Booster del que continuar
+            categorical_feature: Columnas categóricas nativas
+        """
+        import lightgbm as lgb
+
+        dataset = lgb.Dataset(X, label=y, weight=sample_weight,
+                              categorical_feature=categorical_feature, free_raw_data=True)
+        self.booster_ = lgb.train(dict(self.params or {}), dataset,
+                                  num_boost_round=self.num_boost_round, init_model=init_model)
+        return self
+
+    @property
+    def _objective(self) -> str:
+        return (self.params or {}).get('objective', 'regression')
+
+    @property
+    def classes_(self) -> np.ndarray:
+        if self._objective == 'multiclass':
+            return np.arange(self.params['num_class'])
+        return np.arange(2)
+
+    @property
+    def n_features_in_(self) -> int:
+        return self.booster_.num_feature()
+
+    @property
+    def feature_importances_(self) -> np.ndarray:
+        return self.booster_.feature_importance(importance_type='split')
+
+    def predict_proba(self, X) -> np.ndarray:
+        """Probabilidad por clase."""
+        raw = self.booster_.predict(X)
+        if raw.ndim == 1:
+            return np.column_stack([1 - raw, raw])
+        return raw
+
+    def predict(self, X) -> np.ndarray:
+        """Clase más probable (clasificación) o valor predicho (regresión)."""
+        if self._objective in ('multiclass', 'binary'):
+            return self.predict_proba(X).argmax(axis=1)
+        return self.booster_.predict(X)
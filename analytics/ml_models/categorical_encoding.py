@@ -0,0 +1,152 @@
+"""
+Codificaciones de características para SatisfactionPredictor.
+
+create_preprocessor generaba una columna densa float64 por cada nivel
+categórico (OneHotEncoder(sparse_output=False)) junto a las numéricas en
+float64; con canal_fin_semana y tipo_consulta en 10M de filas la matriz no
+cabe en memoria. Codificaciones disponibles:
+- 'dense': la original (imputación, escalado y one-hot denso en float64)
+- 'sparse': numéricas imputadas y escaladas en float32 y one-hot CSR
+  float32; salida siempre CSR (modelos lineales y RandomForest)
+- 'native': numéricas float32 sin imputar ni escalar (los boosters manejan
+  NaN) y cada categórica como un código ordinal float32 (NaN = nulo o
+  categoría no vista); LightGBM y XGBoost las tratan como categóricas
+  nativas mediante configure_model
+"""
+
+from typing import Dict, List, Sequence
+
+import numpy as np
+from sklearn.compose import ColumnTransformer
+from sklearn.impute import SimpleImputer
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import (
+    FunctionTransformer, OneHotEncoder, OrdinalEncoder, StandardScaler
+)
+
+ENCODINGS = ('dense', 'sparse', 'native')
+
+# Codificación por familia de modelo para encoding='auto'
+MODEL_ENCODINGS = {
+    'logistic_regression': 'sparse',
+    'linear_regression': 'sparse',
+    'random_forest': 'sparse',
+    'xgboost': 'native',
+    'lightgbm': 'native'
+}
+
+
+def model_encoding(model_name: str, encoding: str) -> str:
+    """Codificación efectiva de un modelo ('auto' según su familia)."""
+    if encoding == 'auto':
+        return MODEL_ENCODINGS.get(model_name, 'dense')
+    if encoding not in ENCODINGS:
+        raise ValueError(f"Codificación no soportada: {encoding}. Opciones: {ENCODINGS + ('auto',)}")
+    return encoding
+
+
+def _float32() -> FunctionTransformer:
+    """Conversión a float32 que conserva los nombres de columnas."""
+    return FunctionTransformer(np.asarray, kw_args={'dtype': np.float32},
+                               feature_names_out='one-to-one')
+
+
+def build_preprocessor(numeric_features: List[str], categorical_features: List[str],
+                       encoding: str = 'dense') -> ColumnTransformer:
+    """
+    Crear el preprocesador de una codificación.
+
+    Args:
+        numeric_features: Columnas numéricas
+        categorical_features: Columnas categóricas
+        encoding: 'dense', 'sparse' o 'native'
+
+    Returns:
+        ColumnTransformer sin ajustar; las categóricas van siempre al final
+    """
+    if encoding == 'dense':
+        numeric_transformer = Pipeline(steps=[
+            ('imputer', SimpleImputer(strategy='median')),
+            ('scaler', StandardScaler())
+        ])
+        categorical_transformer = Pipeline(steps=[
+            ('imputer', SimpleImputer(strategy='constant', fill_value='unknown')),
+            ('onehot', OneHotEncoder(handle_unknown='ignore', sparse_output=False))
+        ])
+        sparse_threshold = 0.3
+    elif encoding == 'sparse':
+        numeric_transformer = Pipeline(steps=[
+            ('to_float32', _float32()),
+            ('imputer', SimpleImputer(strategy='median')),
+            ('scaler', StandardScaler())
+        ])
+        categorical_transformer = Pipeline(steps=[
+            ('imputer', SimpleImputer(strategy='constant', fill_value='unknown')),
+            ('onehot', OneHotEncoder(handle_unknown='ignore', sparse_output=True, dtype=np.float32))
+        ])
+        sparse_threshold = 1.0
+    elif encoding == 'native':
+        numeric_transformer = Pipeline(steps=[('to_float32', _float32())])
+        categorical_transformer = Pipeline(steps=[
+            ('ordinal', OrdinalEncoder(handle_unknown='use_encoded_value', unknown_value=np.nan,
+                                       encoded_missing_value=np.nan, dtype=np.float32))
+        ])
+        sparse_threshold = 0.0
+    else:
+        raise ValueError(f"Codificación no soportada: {encoding}. Opciones: {ENCODINGS}")
+
+    return ColumnTransformer(
+        transformers=[
+            ('num', numeric_transformer, numeric_features),
+            ('cat', categorical_transformer, categorical_features)
+        ],
+        sparse_threshold=sparse_threshold
+    )
+
+
+def categorical_indices(n_numeric: int, n_categorical: int) -> List[int]:
+    """Posiciones de las categóricas en la salida de la codificación 'native'."""
+    return list(range(n_numeric, n_numeric + n_categorical))
+
+
+def native_categorical_params(model_name: str, categorical: Sequence[int],
+                              n_features: int) -> Dict:
+    """
+    Parámetros para que un booster trate columnas como categóricas nativas.
+
+    Args:
+        model_name: 'lightgbm' o 'xgboost'
+        categorical: Posiciones de las columnas categóricas
+        n_features: Número total de columnas
+
+    Returns:
+        Parámetros para set_params (vacío si el modelo no las soporta)
+    """
+    if model_name == 'lightgbm':
+        # Alias de parámetro del Dataset (categorical_feature como parámetro
+        # del constructor choca con el argumento homónimo de fit)
+        return {'categorical_column': list(categorical)}
+    if model_name == 'xgboost':
+        categorical = set(categorical)
+        return {
+            'enable_categorical': True,
+            'tree_method': 'hist',
+            'feature_types': ['c' if i in categorical else 'q' for i in range(n_features)]
+        }
+    return {}
+
+
+def configure_model(model_name: str, model, encoding: str, n_numeric: int, n_categorical: int):
+    """
+    Ajustar un estimador (ya clonado) a la codificación de su matriz.
+
+    Returns:
+        El propio estimador
+    """
+    if encoding == 'native':
+        params = native_categorical_params(
+            model_name, categorical_indices(n_numeric, n_categorical), n_numeric + n_categorical
+        )
+        if params:
+            model.set_params(**params)
+    return model
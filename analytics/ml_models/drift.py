@@ -0,0 +1,108 @@
+"""
+Perfil de referencia de las características y deriva por PSI.
+
+train_models (y el entrenamiento fuera de memoria) guardan con el modelo un
+perfil de las características de entrenamiento: proporciones por decil de
+cada numérica (más un bin de nulos) y proporción de cada nivel de las
+categóricas. drift_by_feature compara los tickets nuevos con ese perfil
+mediante el Population Stability Index; como regla habitual, PSI < 0.1 es
+estable y PSI > 0.25 indica un cambio significativo.
+
+Las características de calendario (hora, día, mes, fin de semana) quedan
+fuera de la comparación por defecto: un lote de un día o una semana siempre
+difiere del año completo de entrenamiento en ellas sin que eso sea deriva.
+"""
+
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+PSI_EPSILON = 1e-4
+
+MISSING_CATEGORY = '__nulo__'
+
+# Columnas derivadas de fecha_creacion (TicketFeatureTransformer.row_features)
+TIME_FEATURES = ('hora', 'dia_semana', 'mes', 'trimestre', 'es_fin_semana',
+                 'es_horario_pico', 'canal_fin_semana')
+
+
+def feature_profile(X: pd.DataFrame, n_bins: int = 10,
+                    weights: Optional[np.ndarray] = None) -> Dict:
+    """
+    Perfil de referencia de las características de entrenamiento.
+
+    Args:
+        X: Características (columnas de feature_names)
+        n_bins: Bins por cuantiles de las numéricas
+        weights: Peso por fila (p. ej. pesos de estrato de una muestra)
+
+    Returns:
+        {'numeric': {col: {'edges', 'proportions'}}, 'categorical': {col: {cat: proporción}}}
+    """
+    weights = np.ones(len(X)) if weights is None else np.asarray(weights, dtype=np.float64)
+    profile = {'numeric': {}, 'categorical': {}}
+    for column in X.columns:
+        values = X[column]
+        if pd.api.types.is_numeric_dtype(values):
+            finite = values.dropna()
+            edges = np.unique(np.quantile(finite, np.linspace(0, 1, n_bins + 1)[1:-1])) \
+                if len(finite) else np.array([])
+            profile['numeric'][column] = {
+                'edges': edges.tolist(),
+                'proportions': _binned_proportions(values, edges, weights).tolist()
+            }
+        else:
+            shares = pd.Series(weights, index=values.index).groupby(
+                values.astype(object).fillna(MISSING_CATEGORY)
+            ).sum()
+            profile['categorical'][column] = (shares / shares.sum()).to_dict()
+    return profile
+
+
+def _binned_proportions(values: pd.Series, edges: np.ndarray, weights: np.ndarray) -> np.ndarray:
+    """Proporción por bin; el último bin es el de nulos."""
+    array = values.to_numpy(dtype=np.float64)
+    missing = np.isnan(array)
+    bins = np.where(missing, len(edges) + 1, np.searchsorted(edges, array, side='right'))
+    counts = np.bincount(bins, weights=weights, minlength=len(edges) + 2)
+    return counts / max(counts.sum(), PSI_EPSILON)
+
+
+def population_stability_index(expected: np.ndarray, actual: np.ndarray) -> float:
+    """PSI entre dos distribuciones de proporciones alineadas."""
+    expected = np.clip(np.asarray(expected, dtype=np.float64), PSI_EPSILON, None)
+    actual = np.clip(np.asarray(actual, dtype=np.float64), PSI_EPSILON, None)
+    return float(np.sum((actual - expected) * np.log(actual / expected)))
+
+
+def drift_by_feature(profile: Dict, X: pd.DataFrame,
+                     exclude: Iterable[str] = TIME_FEATURES) -> Dict[str, float]:
+    """
+    PSI de cada característica de X frente al perfil de referencia.
+
+    Args:
+        profile: Perfil de feature_profile
+        X: Características de los tickets nuevos
+        exclude: Columnas que no se comparan (por defecto, las de calendario)
+
+    Returns:
+        {columna: PSI}
+    """
+    columns = set(X.columns) - set(exclude)
+    weights = np.ones(len(X))
+    psi = {}
+    for column, reference in profile['numeric'].items():
+        if column in columns:
+            actual = _binned_proportions(X[column], np.asarray(reference['edges']), weights)
+            psi[column] = population_stability_index(reference['proportions'], actual)
+    for column, reference in profile['categorical'].items():
+        if column in columns:
+            values = X[column].astype(object).fillna(MISSING_CATEGORY)
+            actual_shares = values.value_counts(normalize=True)
+            categories = list(reference) + [c for c in actual_shares.index if c not in reference]
+            psi[column] = population_stability_index(
+                [reference.get(c, 0.0) for c in categories],
+                [actual_shares.get(c, 0.0) for c in categories]
+            )
+    return psi
@@ -0,0 +1,666 @@
+"""
+Transformador de características ajustable para SatisfactionPredictor.
+
+create_features calculaba en cada llamada (también al predecir) las
+estadísticas por agente y por canal con groupby + merge y los umbrales IQR
+de outliers sobre el lote recibido. Este módulo separa:
+- fit: aprende una sola vez estadísticas por agente/canal, umbrales IQR y
+  mapeos; las medias y desviaciones del target se codifican fuera de fold
+  (out-of-fold) para las filas de entrenamiento, sin fuga del target
+- transform: características por fila más búsquedas vectorizadas en las
+  tablas aprendidas (get_indexer + take), sin groupby ni merge
+
+El estado es serializable con el artefacto del modelo, de modo que las
+características de un lote pequeño son idénticas a las de uno grande.
+
+Además de las tablas finales se guardan las sumas por grupo (conteos,
+sumas y sumas de cuadrados), combinables entre lotes: partial_fit ajusta
+el transformador en streaming sobre lotes de un dataset que no cabe en
+memoria y permite actualizar las estadísticas con datos nuevos sin
+recorrer el histórico.
+"""
+
+import math
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+TARGET_COLUMN = 'satisfaccion_score'
+
+PRIORIDAD_MAP = {'baja': 1, 'media': 2, 'alta': 3, 'critica': 4}
+
+# Estadísticas por grupo: (columna de grupo, prefijo, incluye conteo y desviación)
+GROUP_KEYS = {
+    'agente': ('agente_id', True),
+    'canal': ('canal', False)
+}
+
+
+class GroupStatistics:
+    """Tabla de estadísticas por categoría con búsqueda vectorizada."""
+
+    def __init__(self, keys: pd.Index, columns: Dict[str, np.ndarray],
+                 defaults: Dict[str, float]):
+        """
+        Args:
+            keys: Categorías aprendidas
+            columns: {nombre: arreglo alineado con keys}
+            defaults: Valor para categorías no vistas o nulas
+        """
+        self.keys = keys
+        self.columns = columns
+        self.defaults = defaults
+        self._positions: Optional[Dict] = None
+
+    def lookup_value(self, value) -> Dict[str, float]:
+        """Estadísticas de una sola categoría (búsqueda en dict, sin pandas)."""
+        if self._positions is None:
+            self._positions = {key: i for i, key in enumerate(self.keys)}
+        position = self._positions.get(value) if _is_present(value) else None
+        if position is None:
+            return dict(self.defaults)
+        return {name: float(table[position]) for name, table in self.columns.items()}
+
+    def lookup(self, values: pd.Series) -> Dict[str, np.ndarray]:
+        """Buscar las estadísticas de cada fila (sin merge)."""
+        codes = self.keys.get_indexer(values)
+        known = codes >= 0
+        safe_codes = np.where(known, codes, 0)
+        return {
+            name: np.where(known, table[safe_codes] if len(table) else 0.0, self.defaults[name])
+            for name, table in self.columns.items()
+        }
+
+    def to_dict(self) -> Dict:
+        """Representación serializable."""
+        return {
+            'keys': self.keys.tolist(),
+            'columns': {name: table.tolist() for name, table in self.columns.items()},
+            'defaults': dict(self.defaults)
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'GroupStatistics':
+        """Reconstruir desde to_dict()."""
+        return cls(
+            pd.Index(data['keys'], dtype=object),
+            {name: np.asarray(table, dtype=np.float64) for name, table in data['columns'].items()},
+            data['defaults']
+        )
+
+
+def _is_present(value) -> bool:
+    """False para None, NaN y NaT (valores que pandas trata como nulos)."""
+    return value is not None and value is not pd.NaT and not (
+        isinstance(value, float) and math.isnan(value)
+    )
+
+
+def _to_datetime(value) -> Optional[datetime]:
+    """Fecha de un registro (datetime, Timestamp o texto ISO); None si es nula."""
+    if not _is_present(value):
+        return None
+    if isinstance(value, datetime):
+        return value
+    try:
+        return datetime.fromisoformat(str(value))
+    except ValueError:
+        timestamp = pd.Timestamp(value)
+        return None if timestamp is pd.NaT else timestamp
+
+
+def _group_sums(codes: np.ndarray, values: np.ndarray, n_groups: int,
+                mask: Optional[np.ndarray] = None):
+    """Conteo, suma y suma de cuadrados por grupo con bincount (ignora NaN)."""
+    valid = ~np.isnan(values)
+    if mask is not None:
+        valid &= mask
+    codes, values = codes[valid], values[valid]
+    count = np.bincount(codes, minlength=n_groups).astype(np.float64)
+    total = np.bincount(codes, weights=values, minlength=n_groups)
+    squares = np.bincount(codes, weights=values ** 2, minlength=n_groups)
+    return count, total, squares
+
+
+def _mean_std(count: np.ndarray, total: np.ndarray, squares: np.ndarray,
+              default_mean: float):
+    """Media y desviación muestral (0 con menos de 2 valores, como fillna(0))."""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean = np.where(count > 0, total / count, default_mean)
+        variance = np.where(count > 1, (squares - total ** 2 / count) / (count - 1), 0.0)
+    return mean, np.sqrt(np.clip(variance, 0.0, None))
+
+
+class GroupAccumulator:
+    """Sumas por categoría combinables entre lotes."""
+
+    FIELDS = ('target_count', 'target_sum', 'target_squares',
+              'tickets', 'duration_count', 'duration_sum')
+
+    def __init__(self, keys: Optional[pd.Index] = None,
+                 sums: Optional[Dict[str, np.ndarray]] = None):
+        """
+        Args:
+            keys: Categorías vistas
+            sums: {campo: arreglo alineado con keys}
+        """
+        self.keys = keys if keys is not None else pd.Index([], dtype=object)
+        self.sums = sums or {field: np.zeros(len(self.keys)) for field in self.FIELDS}
+
+    def _codes(self, values: pd.Series) -> np.ndarray:
+        """Códigos globales de cada fila (-1 = nulo), registrando categorías nuevas."""
+        codes, batch_keys = pd.factorize(values)
+        positions = self.keys.get_indexer(batch_keys)
+        new_keys = batch_keys[positions < 0]
+        if len(new_keys):
+            self.keys = self.keys.append(pd.Index(new_keys, dtype=object))
+            self.sums = {field: np.concatenate([array, np.zeros(len(new_keys))])
+                         for field, array in self.sums.items()}
+            positions = self.keys.get_indexer(batch_keys)
+        if not len(positions):
+            return np.full(len(codes), -1)
+        return np.where(codes >= 0, positions[np.maximum(codes, 0)], -1)
+
+    def update(self, values: pd.Series, y: Optional[np.ndarray] = None,
+               duration: Optional[np.ndarray] = None) -> 'GroupAccumulator':
+        """
+        Acumular un lote.
+
+        Args:
+            values: Categoría de cada fila
+            y: Target de cada fila (NaN se ignora)
+            duration: Duración de cada fila (NaN se ignora)
+        """
+        codes = self._codes(values)
+        valid_rows = codes >= 0
+        safe_codes = np.where(valid_rows, codes, 0)
+        n_groups = len(self.keys)
+
+        self.sums['tickets'] += np.bincount(safe_codes[valid_rows], minlength=n_groups)
+        if y is not None:
+            count, total, squares = _group_sums(safe_codes, y, n_groups, valid_rows)
+            self.sums['target_count'] += count
+            self.sums['target_sum'] += total
+            self.sums['target_squares'] += squares
+        if duration is not None:
+            count, total, _ = _group_sums(safe_codes, duration, n_groups, valid_rows)
+            self.sums['duration_count'] += count
+            self.sums['duration_sum'] += total
+        return self
+
+    def merge(self, other: 'GroupAccumulator') -> 'GroupAccumulator':
+        """Combinar las sumas de otro acumulador."""
+        codes = self._codes(pd.Series(other.keys, dtype=object))
+        for field in self.FIELDS:
+            np.add.at(self.sums[field], codes, other.sums[field])
+        return self
+
+    def statistics(self, prefix: str, with_spread: bool, global_mean: Optional[float],
+                   global_duration: Optional[float]) -> GroupStatistics:
+        """
+        Tablas de búsqueda equivalentes a las de un ajuste en memoria.
+
+        Args:
+            prefix: Prefijo de las columnas ('agente', 'canal')
+            with_spread: Incluir desviación y conteo de tickets
+            global_mean: Media global del target (None = sin target)
+            global_duration: Duración media global (None = sin duración)
+        """
+        columns, defaults = {}, {}
+        if global_mean is not None:
+            mean, std = _mean_std(self.sums['target_count'], self.sums['target_sum'],
+                                  self.sums['target_squares'], global_mean)
+            columns[f'{prefix}_satisfaccion_promedio'] = mean
+            defaults[f'{prefix}_satisfaccion_promedio'] = global_mean
+            if with_spread:
+                columns[f'{prefix}_satisfaccion_std'] = std
+                defaults[f'{prefix}_satisfaccion_std'] = 0.0
+        if with_spread:
+            columns[f'{prefix}_total_tickets'] = self.sums['tickets'].copy()
+            defaults[f'{prefix}_total_tickets'] = 0.0
+        if global_duration is not None:
+            count = self.sums['duration_count']
+            columns[f'{prefix}_duracion_promedio'] = np.where(
+                count > 0, self.sums['duration_sum'] / np.maximum(count, 1), global_duration
+            )
+            defaults[f'{prefix}_duracion_promedio'] = global_duration
+        return GroupStatistics(self.keys, columns, defaults)
+
+    def to_dict(self) -> Dict:
+        """Representación serializable."""
+        return {'keys': self.keys.tolist(),
+                'sums': {field: array.tolist() for field, array in self.sums.items()}}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'GroupAccumulator':
+        """Reconstruir desde to_dict()."""
+        return cls(pd.Index(data['keys'], dtype=object),
+                   {field: np.asarray(array, dtype=np.float64) for field, array in data['sums'].items()})
+
+
+class TicketFeatureTransformer:
+    """Características de tickets con estadísticas aprendidas en fit."""
+
+    def __init__(self, n_folds: int = 5, random_state: int = 42,
+                 target_column: str = TARGET_COLUMN):
+        """
+        Inicializar el transformador.
+
+        Args:
+            n_folds: Folds para la codificación del target fuera de fold
+            random_state: Semilla de la partición en folds
+            target_column: Columna objetivo
+        """
+        self.n_folds = n_folds
+        self.random_state = random_state
+        self.target_column = target_column
+        self.group_stats: Dict[str, GroupStatistics] = {}
+        self.group_sums: Dict[str, GroupAccumulator] = {}
+        self.global_sums: Dict[str, float] = {}
+        self.outlier_bounds: Dict[str, List[float]] = {}
+        self.is_fitted = False
+
+    @staticmethod
+    def row_features(df: pd.DataFrame) -> pd.DataFrame:
+        """Características que sólo dependen de cada fila."""
+        features_df = df.copy()
+
+        # 1. Características temporales
+        if 'fecha_creacion' in features_df.columns:
+            features_df['fecha_creacion'] = pd.to_datetime(features_df['fecha_creacion'])
+            features_df['hora'] = features_df['fecha_creacion'].dt.hour
+            features_df['dia_semana'] = features_df['fecha_creacion'].dt.dayofweek
+            features_df['mes'] = features_df['fecha_creacion'].dt.month
+            features_df['trimestre'] = features_df['fecha_creacion'].dt.quarter
+            features_df['es_fin_semana'] = (features_df['dia_semana'] >= 5).astype(int)
+            features_df['es_horario_pico'] = (
+                (features_df['hora'].between(9, 11)) |
+                (features_df['hora'].between(14, 16))
+            ).astype(int)
+
+        # 2. Características de duración
+        if 'duracion_minutos' in features_df.columns:
+            features_df['duracion_log'] = np.log1p(features_df['duracion_minutos'])
+            features_df['duracion_categoria'] = pd.cut(
+                features_df['duracion_minutos'],
+                bins=[0, 5, 15, 30, np.inf],
+                labels=['rapido', 'normal', 'largo', 'muy_largo']
+            )
+            features_df['es_duracion_extrema'] = (
+                (features_df['duracion_minutos'] < 2) |
+                (features_df['duracion_minutos'] > 60)
+            ).astype(int)
+
+        # 3. Características de cliente VIP
+        if 'cliente_vip' in features_df.columns:
+            features_df['cliente_vip_int'] = features_df['cliente_vip'].astype(int)
+
+        # 4. Características de resolución
+        if 'resolucion' in features_df.columns:
+            features_df['es_resuelto'] = (features_df['resolucion'] == 'resuelto').astype(int)
+            features_df['es_escalado'] = (features_df['resolucion'] == 'escalado').astype(int)
+
+        # 5. Características de prioridad
+        if 'prioridad' in features_df.columns:
+            features_df['prioridad_numerica'] = features_df['prioridad'].map(PRIORIDAD_MAP)
+
+        # 6. Interacciones entre características
+        if 'canal' in features_df.columns and 'es_fin_semana' in features_df.columns:
+            features_df['canal_fin_semana'] = (
+                features_df['canal'] + '_' +
+                features_df['es_fin_semana'].astype(str)
+            )
+
+        return features_df
+
+    @staticmethod
+    def record_row_features(record: Dict) -> Dict:
+        """
+        Características por fila de un registro, sin construir un DataFrame.
+
+        Mismos valores que row_features sobre un DataFrame de una fila: las
+        características de una columna ausente del registro no se crean y
+        las de un valor nulo quedan en NaN (o 0 en las marcas).
+        """
+        features = dict(record)
+
+        # 1. Características temporales
+        if 'fecha_creacion' in record:
+            created = _to_datetime(record['fecha_creacion'])
+            if created is None:
+                hour = weekday = month = quarter = math.nan
+                weekend = peak = 0
+            else:
+                hour, weekday, month = created.hour, created.weekday(), created.month
+                quarter = (month - 1) // 3 + 1
+                weekend = int(weekday >= 5)
+                peak = int(9 <= hour <= 11 or 14 <= hour <= 16)
+            features.update({
+                'fecha_creacion': created, 'hora': hour, 'dia_semana': weekday,
+                'mes': month, 'trimestre': quarter, 'es_fin_semana': weekend,
+                'es_horario_pico': peak
+            })
+
+        # 2. Características de duración
+        if 'duracion_minutos' in record:
+            duration = record['duracion_minutos']
+            duration = float(duration) if _is_present(duration) else math.nan
+            features['duracion_log'] = math.log1p(duration) if duration > -1 else math.nan
+            features['es_duracion_extrema'] = int(duration < 2 or duration > 60)
+
+        # 3. Características de cliente VIP
+        if 'cliente_vip' in record:
+            vip = record['cliente_vip']
+            features['cliente_vip_int'] = int(vip) if _is_present(vip) else math.nan
+
+        # 4. Características de resolución
+        if 'resolucion' in record:
+            features['es_resuelto'] = int(record['resolucion'] == 'resuelto')
+            features['es_escalado'] = int(record['resolucion'] == 'escalado')
+
+        # 5. Características de prioridad
+        if 'prioridad' in record:
+            features['prioridad_numerica'] = PRIORIDAD_MAP.get(record['prioridad'], math.nan)
+
+        # 6. Interacciones entre características
+        if 'canal' in record and 'es_fin_semana' in features:
+            canal = record['canal']
+            features['canal_fin_semana'] = (
+                f"{canal}_{features['es_fin_semana']}" if _is_present(canal) else math.nan
+            )
+
+        return features
+
+    def _fold_ids(self, n_rows: int) -> np.ndarray:
+        """Asignación aleatoria y reproducible de filas a folds."""
+        rng = np.random.default_rng(self.random_state)
+        return rng.permutation(n_rows) % self.n_folds
+
+    def _fit_group(self, prefix: str, df: pd.DataFrame, column: str, with_spread: bool,
+                   y: Optional[np.ndarray], out_of_fold: bool) -> Dict[str, np.ndarray]:
+        """
+        Aprender las estadísticas de un grupo y devolver las de cada fila.
+
+        Las columnas del target de las filas de entrenamiento se calculan
+        con los demás folds; conteos y duraciones usan todos los datos.
+        """
+        codes, keys = pd.factorize(df[column])
+        n_groups = len(keys)
+        valid_rows = codes >= 0
+        safe_codes = np.where(valid_rows, codes, 0)
+
+        columns, defaults, row_values = {}, {}, {}
+
+        if y is not None:
+            global_mean = float(np.nanmean(y)) if np.any(~np.isnan(y)) else 0.0
+            count, total, squares = _group_sums(safe_codes, y, n_groups, valid_rows)
+            mean, std = _mean_std(count, total, squares, global_mean)
+            columns[f'{prefix}_satisfaccion_promedio'] = mean
+            defaults[f'{prefix}_satisfaccion_promedio'] = global_mean
+            if with_spread:
+                columns[f'{prefix}_satisfaccion_std'] = std
+                defaults[f'{prefix}_satisfaccion_std'] = 0.0
+
+            if out_of_fold:
+                folds = self._fold_ids(len(df))
+                oof_mean = np.empty(len(df))
+                oof_std = np.empty(len(df))
+                for fold in range(self.n_folds):
+                    in_fold = folds == fold
+                    count, total, squares = _group_sums(
+                        safe_codes, y, n_groups, valid_rows & ~in_fold
+                    )
+                    fold_mean, fold_std = _mean_std(count, total, squares, global_mean)
+                    oof_mean[in_fold] = fold_mean[safe_codes[in_fold]]
+                    oof_std[in_fold] = fold_std[safe_codes[in_fold]]
+                row_values[f'{prefix}_satisfaccion_promedio'] = np.where(
+                    valid_rows, oof_mean, global_mean
+                )
+                if with_spread:
+                    row_values[f'{prefix}_satisfaccion_std'] = np.where(valid_rows, oof_std, 0.0)
+
+        if with_spread:
+            columns[f'{prefix}_total_tickets'] = np.bincount(
+                safe_codes[valid_rows], minlength=n_groups
+            ).astype(np.float64)
+            defaults[f'{prefix}_total_tickets'] = 0.0
+
+        if 'duracion_minutos' in df.columns:
+            duration = df['duracion_minutos'].to_numpy(dtype=np.float64)
+            count, total, _ = _group_sums(safe_codes, duration, n_groups, valid_rows)
+            global_duration = float(np.nanmean(duration)) if np.any(~np.isnan(duration)) else 0.0
+            columns[f'{prefix}_duracion_promedio'] = np.where(
+                count > 0, total / np.maximum(count, 1), global_duration
+            )
+            defaults[f'{prefix}_duracion_promedio'] = global_duration
+
+        self.group_stats[prefix] = GroupStatistics(pd.Index(keys, dtype=object), columns, defaults)
+        lookups = self.group_stats[prefix].lookup(df[column])
+        lookups.update(row_values)
+        return lookups
+
+    def _add_outlier_flags(self, features_df: pd.DataFrame) -> pd.DataFrame:
+        """Marcar outliers con los umbrales IQR aprendidos."""
+        flags = {}
+        for column, (low, high) in self.outlier_bounds.items():
+            if column in features_df.columns:
+                values = features_df[column].to_numpy(dtype=np.float64)
+                flags[f'{column}_es_outlier'] = ((values < low) | (values > high)).astype(int)
+        if flags:
+            features_df = pd.concat(
+                [features_df, pd.DataFrame(flags, index=features_df.index)], axis=1
+            )
+        return features_df
+
+    def fit_transform(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Aprender las estadísticas y devolver las características de entrenamiento.
+
+        Las medias y desviaciones del target por agente/canal de cada fila
+        se calculan sin esa fila (fuera de fold).
+
+        Args:
+            df: DataFrame con datos de tickets (incluye el target)
+
+        Returns:
+            DataFrame con características
+        """
+        return self._fit(df, out_of_fold=True)
+
+    def fit(self, df: pd.DataFrame) -> 'TicketFeatureTransformer':
+        """Aprender las estadísticas con todos los datos."""
+        self._fit(df, out_of_fold=False)
+        return self
+
+    def _fit(self, df: pd.DataFrame, out_of_fold: bool) -> pd.DataFrame:
+        """Ajuste común de fit y fit_transform."""
+        features_df = self.row_features(df)
+        y = None
+        if self.target_column in features_df.columns:
+            y = pd.to_numeric(features_df[self.target_column], errors='coerce').to_numpy(np.float64)
+
+        self.group_stats = {}
+        group_columns = {}
+        for prefix, (column, with_spread) in GROUP_KEYS.items():
+            if column in features_df.columns:
+                group_columns.update(
+                    self._fit_group(prefix, features_df, column, with_spread, y, out_of_fold)
+                )
+        if group_columns:
+            features_df = pd.concat(
+                [features_df, pd.DataFrame(group_columns, index=features_df.index)], axis=1
+            )
+
+        # Sumas combinables para actualizar el ajuste con datos nuevos
+        self.group_sums, self.global_sums = {}, {}
+        self._accumulate(features_df, y)
+
+        # Umbrales IQR sobre las características de entrenamiento
+        self._set_outlier_bounds(features_df)
+
+        self.is_fitted = True
+        return self._add_outlier_flags(features_df)
+
+    def _set_outlier_bounds(self, features_df: pd.DataFrame) -> None:
+        """Umbrales IQR de las columnas numéricas (sin el target)."""
+        numeric_cols = features_df.select_dtypes(include=[np.number]).columns
+        self.outlier_bounds = {}
+        for column in numeric_cols:
+            if column == self.target_column:
+                continue
+            q1, q3 = features_df[column].quantile([0.25, 0.75])
+            self.outlier_bounds[column] = [q1 - 1.5 * (q3 - q1), q3 + 1.5 * (q3 - q1)]
+
+    def _accumulate(self, features_df: pd.DataFrame, y: Optional[np.ndarray]) -> None:
+        """Sumar un lote a las sumas globales y por grupo."""
+        duration = None
+        if 'duracion_minutos' in features_df.columns:
+            duration = features_df['duracion_minutos'].to_numpy(dtype=np.float64)
+
+        totals = self.global_sums
+        for name, values in [('target', y), ('duration', duration)]:
+            if values is None:
+                continue
+            valid = ~np.isnan(values)
+            totals[f'{name}_count'] = totals.get(f'{name}_count', 0.0) + float(valid.sum())
+            totals[f'{name}_sum'] = totals.get(f'{name}_sum', 0.0) + float(values[valid].sum())
+
+        for prefix, (column, _) in GROUP_KEYS.items():
+            if column in features_df.columns:
+                self.group_sums.setdefault(prefix, GroupAccumulator()).update(
+                    features_df[column], y, duration
+                )
+
+    def _global_mean(self, name: str) -> Optional[float]:
+        """Media global acumulada (None si la columna nunca se vio)."""
+        if f'{name}_count' not in self.global_sums:
+            return None
+        count = self.global_sums[f'{name}_count']
+        return self.global_sums[f'{name}_sum'] / count if count else 0.0
+
+    def _refresh_group_stats(self) -> None:
+        """Recalcular las tablas de búsqueda desde las sumas acumuladas."""
+        global_mean = self._global_mean('target')
+        global_duration = self._global_mean('duration')
+        self.group_stats = {
+            prefix: accumulator.statistics(prefix, GROUP_KEYS[prefix][1], global_mean, global_duration)
+            for prefix, accumulator in self.group_sums.items()
+        }
+
+    def partial_fit(self, df: pd.DataFrame) -> 'TicketFeatureTransformer':
+        """
+        Acumular las estadísticas de un lote (ajuste en streaming).
+
+        Las tablas de búsqueda quedan actualizadas tras cada lote; los
+        umbrales de outliers no se tocan y se ajustan aparte con
+        fit_outlier_bounds sobre una muestra.
+
+        Args:
+            df: Lote de tickets (incluye el target)
+
+        Returns:
+            El propio transformador
+        """
+        features_df = self.row_features(df)
+        y = None
+        if self.target_column in features_df.columns:
+            y = pd.to_numeric(features_df[self.target_column], errors='coerce').to_numpy(np.float64)
+        self._accumulate(features_df, y)
+        self._refresh_group_stats()
+        self.is_fitted = True
+        return self
+
+    def fit_outlier_bounds(self, df: pd.DataFrame) -> 'TicketFeatureTransformer':
+        """
+        Ajustar los umbrales IQR sobre una muestra con las estadísticas actuales.
+
+        Args:
+            df: Muestra de tickets (por ejemplo, un reservoir del dataset)
+        """
+        self._set_outlier_bounds(self._lookup_features(df))
+        return self
+
+    def transform(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Calcular características con las estadísticas aprendidas.
+
+        Args:
+            df: DataFrame con datos de tickets (el target no es necesario)
+
+        Returns:
+            DataFrame con características
+        """
+        if not self.is_fitted:
+            raise ValueError("Transformador no ajustado. Ejecutar fit() primero.")
+        return self._add_outlier_flags(self._lookup_features(df))
+
+    def record_features(self, record: Dict) -> Dict:
+        """
+        Características de un registro (dict) con las estadísticas aprendidas.
+
+        Equivale a transform sobre un DataFrame de una fila (por fila,
+        búsquedas por grupo y marcas de outliers) sin pasar por pandas, para
+        el scoring de tickets individuales.
+
+        Args:
+            record: Ticket como diccionario {columna: valor}
+
+        Returns:
+            Diccionario {característica: valor}
+        """
+        if not self.is_fitted:
+            raise ValueError("Transformador no ajustado. Ejecutar fit() primero.")
+        features = self.record_row_features(record)
+        for prefix, (column, _) in GROUP_KEYS.items():
+            if prefix in self.group_stats and column in features:
+                features.update(self.group_stats[prefix].lookup_value(features[column]))
+        for column, (low, high) in self.outlier_bounds.items():
+            if column in features:
+                value = features[column]
+                features[f'{column}_es_outlier'] = int(
+                    _is_present(value) and (value < low or value > high)
+                )
+        return features
+
+    def _lookup_features(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Características por fila más las búsquedas por grupo (sin outliers)."""
+        features_df = self.row_features(df)
+        group_columns = {}
+        for prefix, (column, _) in GROUP_KEYS.items():
+            if prefix in self.group_stats and column in features_df.columns:
+                group_columns.update(self.group_stats[prefix].lookup(features_df[column]))
+        if group_columns:
+            features_df = pd.concat(
+                [features_df, pd.DataFrame(group_columns, index=features_df.index)], axis=1
+            )
+        return features_df
+
+    def to_dict(self) -> Dict:
+        """Estado serializable (para guardar con el modelo)."""
+        return {
+            'n_folds': self.n_folds,
+            'random_state': self.random_state,
+            'target_column': self.target_column,
+            'group_stats': {name: stats.to_dict() for name, stats in self.group_stats.items()},
+            'outlier_bounds': {column: list(map(float, bounds))
+                               for column, bounds in self.outlier_bounds.items()},
+            'group_sums': {name: sums.to_dict() for name, sums in self.group_sums.items()},
+            'global_sums': dict(self.global_sums)
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'TicketFeatureTransformer':
+        """Reconstruir un transformador ajustado desde to_dict()."""
+        transformer = cls(data['n_folds'], data['random_state'], data['target_column'])
+        transformer.group_stats = {
+            name: GroupStatistics.from_dict(stats) for name, stats in data['group_stats'].items()
+        }
+        transformer.outlier_bounds = data['outlier_bounds']
+        transformer.group_sums = {
+            name: GroupAccumulator.from_dict(sums) for name, sums in data.get('group_sums', {}).items()
+        }
+        transformer.global_sums = dict(data.get('global_sums', {}))
+        transformer.is_fitted = True
+        return transformer
@@ -0,0 +1,308 @@
+"""
+Búsqueda de hiperparámetros con poda, en paralelo y reanudable.
+
+optimize_hyperparameters ejecutaba 100 trials secuenciales; cada uno corría
+un cross_val_score de 3 folds que reajustaba el preprocesador y entrenaba
+XGBoost/RandomForest completos, sin poda ni early stopping, y rechazaba
+LightGBM. Este módulo:
+- Preprocesa una sola vez por fold (FoldMatrixCache) para todos los trials
+- Reporta a Optuna el score medio acumulado tras cada fold; el pruner
+  (mediana o hyperband, con los folds como recurso) corta los trials malos
+  sin completar la validación cruzada
+- Aplica early stopping sobre las rondas de boosting (XGBoost y LightGBM)
+  con una partición interna del entrenamiento del fold (el fold de
+  validación sólo se usa para puntuar) y guarda la mejor iteración
+- Guarda en el trial los parámetros fijos del espacio de búsqueda (p. ej.
+  subsample_freq de LightGBM) para devolverlos junto a los sugeridos
+- Ejecuta trials en varios procesos locales que comparten un estudio en un
+  almacenamiento RDB local (SQLite); el estudio se reanuda al volver a
+  llamarse con el mismo nombre y almacenamiento, y los trials que quedaron
+  en curso tras una interrupción se detectan por heartbeat y se reintentan
+"""
+
+import logging
+from typing import Dict, Optional
+
+import numpy as np
+from joblib import Parallel, delayed
+from sklearn.base import clone, is_classifier
+from sklearn.metrics import get_scorer
+from sklearn.model_selection import train_test_split
+
+from training_cache import FoldMatrixCache, set_thread_budget
+
+logger = logging.getLogger(__name__)
+
+SEARCHABLE_MODELS = ('xgboost', 'random_forest', 'lightgbm')
+
+PRUNERS = ('median', 'hyperband', None)
+
+
+def suggest_params(trial, model_name: str) -> Dict:
+    """
+    Espacio de búsqueda por modelo.
+
+    Args:
+        trial: Trial de Optuna
+        model_name: 'xgboost', 'random_forest' o 'lightgbm'
+
+    Returns:
+        Parámetros sugeridos para el estimador
+    """
+    if model_name == 'xgboost':
+        return {
+            'n_estimators': trial.suggest_int('n_estimators', 50, 300),
+            'max_depth': trial.suggest_int('max_depth', 3, 10),
+            'learning_rate': trial.suggest_float('learning_rate', 0.01, 0.3),
+            'subsample': trial.suggest_float('subsample', 0.6, 1.0),
+            'colsample_bytree': trial.suggest_float('colsample_bytree', 0.6, 1.0)
+        }
+    if model_name == 'random_forest':
+        return {
+            'n_estimators': trial.suggest_int('n_estimators', 50, 200),
+            'max_depth': trial.suggest_int('max_depth', 5, 20),
+            'min_samples_split': trial.suggest_int('min_samples_split', 2, 10),
+            'min_samples_leaf': trial.suggest_int('min_samples_leaf', 1, 5)
+        }
+    if model_name == 'lightgbm':
+        return {
+            'n_estimators': trial.suggest_int('n_estimators', 50, 500),
+            'num_leaves': trial.suggest_int('num_leaves', 15, 255, log=True),
+            'learning_rate': trial.suggest_float('learning_rate', 0.01, 0.3, log=True),
+            'min_child_samples': trial.suggest_int('min_child_samples', 5, 100),
+            'subsample': trial.suggest_float('subsample', 0.6, 1.0),
+            'subsample_freq': 1,
+            'colsample_bytree': trial.suggest_float('colsample_bytree', 0.6, 1.0),
+            'reg_lambda': trial.suggest_float('reg_lambda', 1e-3, 10.0, log=True)
+        }
+    raise ValueError(f"Optimización no implementada para {model_name}")
+
+
+def base_estimator(model_name: str, task_type: str, random_state: int = 42):
+    """Estimador sin ajustar sobre el que se aplican los parámetros sugeridos."""
+    if model_name == 'xgboost':
+        import xgboost as xgb
+        estimator = xgb.XGBClassifier if task_type == 'classification' else xgb.XGBRegressor
+        return estimator(random_state=random_state)
+    if model_name == 'random_forest':
+        from sklearn.ensemble import RandomForestClassifier, RandomForestRegressor
+        estimator = RandomForestClassifier if task_type == 'classification' else RandomForestRegressor
+        return estimator(random_state=random_state)
+    if model_name == 'lightgbm':
+        import lightgbm as lgb
+        estimator = lgb.LGBMClassifier if task_type == 'classification' else lgb.LGBMRegressor
+        return estimator(random_state=random_state, verbose=-1)
+    raise ValueError(f"Optimización no implementada para {model_name}")
+
+
+def make_pruner(pruner: Optional[str], n_folds: int):
+    """
+    Pruner de Optuna alimentado con los scores por fold.
+
+    Args:
+        pruner: 'median', 'hyperband' o None (sin poda)
+        n_folds: Folds de la validación cruzada (recurso máximo)
+    """
+    import optuna
+
+    if pruner == 'median':
+        return optuna.pruners.MedianPruner(n_startup_trials=5, n_warmup_steps=0)
+    if pruner == 'hyperband':
+        return optuna.pruners.HyperbandPruner(min_resource=1, max_resource=n_folds,
+                                              reduction_factor=3)
+    if pruner is None:
+        return optuna.pruners.NopPruner()
+    raise ValueError(f"Pruner no soportado: {pruner}. Opciones: {PRUNERS}")
+
+
+def make_storage(storage: Optional[str]):
+    """
+    Almacenamiento RDB con heartbeat para reintentar trials interrumpidos.
+
+    Args:
+        storage: URL de la base de datos (p. ej. 'sqlite:///optuna.db') o None
+    """
+    if storage is None:
+        return None
+
+    from optuna.storages import RDBStorage, RetryFailedTrialCallback
+
+    engine_kwargs = {'connect_args': {'timeout': 60}} if storage.startswith('sqlite') else None
+    return RDBStorage(
+        storage, engine_kwargs=engine_kwargs, heartbeat_interval=60, grace_period=180,
+        failed_trial_callback=RetryFailedTrialCallback(max_retry=1)
+    )
+
+
+class CrossValidationObjective:
+    """Objetivo de Optuna sobre matrices en caché, con poda por fold."""
+
+    def __init__(self, model_name: str, estimator, cache: FoldMatrixCache, y,
+                 scoring: str, early_stopping_rounds: Optional[int] = 50, n_threads: int = 1,
+                 early_stopping_fraction: float = 0.1, random_state: int = 42):
+        """
+        Args:
+            model_name: Modelo a optimizar
+            estimator: Estimador base (configurado para la codificación de la cache)
+            cache: Matrices preprocesadas por fold
+            y: Variable objetivo alineada con la cache
+            scoring: Métrica de sklearn a maximizar
+            early_stopping_rounds: Rondas sin mejora antes de parar (boosting)
+            n_threads: Hilos por trial
+            early_stopping_fraction: Parte del entrenamiento de cada fold
+                reservada para el early stopping
+            random_state: Semilla de la partición de early stopping
+        """
+        self.model_name = model_name
+        self.estimator = estimator
+        self.cache = cache
+        self.y = np.asarray(y)
+        self.scoring = scoring
+        self.early_stopping_rounds = early_stopping_rounds
+        self.n_threads = n_threads
+        self.early_stopping_fraction = early_stopping_fraction
+        self.random_state = random_state
+
+    def _fit(self, model, X_fit, y_fit):
+        """
+        Ajustar el modelo del fold.
+
+        Con early stopping (boosting) se separa una partición interna del
+        entrenamiento del fold para elegir las rondas; así el fold de
+        validación, que es el que se puntúa, no influye en el ajuste.
+
+        Returns:
+            Mejor iteración o None si no hubo early stopping
+        """
+        if not self.early_stopping_rounds or self.model_name not in ('xgboost', 'lightgbm'):
+            model.fit(X_fit, y_fit)
+            return None
+
+        X_inner, X_stop, y_inner, y_stop = train_test_split(
+            X_fit, y_fit, test_size=self.early_stopping_fraction,
+            random_state=self.random_state,
+            stratify=y_fit if is_classifier(model) else None
+        )
+        if self.model_name == 'xgboost':
+            model.set_params(early_stopping_rounds=self.early_stopping_rounds)
+            model.fit(X_inner, y_inner, eval_set=[(X_stop, y_stop)], verbose=False)
+            return model.best_iteration + 1
+
+        import lightgbm as lgb
+        model.fit(X_inner, y_inner, eval_set=[(X_stop, y_stop)],
+                  callbacks=[lgb.early_stopping(self.early_stopping_rounds, verbose=False)])
+        return model.best_iteration_ or model.n_estimators
+
+    def __call__(self, trial) -> float:
+        import optuna
+
+        params = suggest_params(trial, self.model_name)
+        fixed_params = {name: value for name, value in params.items() if name not in trial.params}
+        if fixed_params:
+            trial.set_user_attr('fixed_params', fixed_params)
+        scorer = get_scorer(self.scoring)
+        scores, iterations = [], []
+
+        for step, fold in enumerate(self.cache.folds):
+            model = set_thread_budget(clone(self.estimator).set_params(**params), self.n_threads)
+            y_fit, y_val = self.y[fold['train_index']], self.y[fold['val_index']]
+            best_iteration = self._fit(model, fold['X_train'], y_fit)
+            if best_iteration is not None:
+                iterations.append(best_iteration)
+
+            scores.append(scorer(model, fold['X_val'], y_val))
+            trial.report(float(np.mean(scores)), step)
+            if trial.should_prune():
+                raise optuna.TrialPruned()
+
+        if iterations:
+            trial.set_user_attr('best_iteration', int(np.mean(iterations)))
+        return float(np.mean(scores))
+
+
+def _optimize_worker(objective: CrossValidationObjective, study_name: str, storage: Optional[str],
+                     n_trials: int, pruner: Optional[str], seed: int,
+                     timeout: Optional[float]) -> None:
+    """Ejecutar trials de un estudio compartido hasta completar n_trials."""
+    import optuna
+    from optuna.study import MaxTrialsCallback
+    from optuna.trial import TrialState
+
+    optuna.logging.set_verbosity(optuna.logging.WARNING)
+    study = optuna.load_study(
+        study_name=study_name, storage=make_storage(storage),
+        sampler=optuna.samplers.TPESampler(seed=seed),
+        pruner=make_pruner(pruner, len(objective.cache.folds))
+    )
+    study.optimize(
+        objective, timeout=timeout,
+        callbacks=[MaxTrialsCallback(n_trials, states=(TrialState.COMPLETE, TrialState.PRUNED))]
+    )
+
+
+def best_params(study) -> Dict:
+    """
+    Parámetros del mejor trial, incluidos los fijos del espacio de búsqueda.
+
+    Args:
+        study: Estudio de Optuna terminado
+
+    Returns:
+        Parámetros listos para set_params del estimador
+    """
+    return {**study.best_trial.user_attrs.get('fixed_params', {}), **study.best_params}
+
+
+def run_study(objective: CrossValidationObjective, n_trials: int = 100,
+              study_name: Optional[str] = None, storage: Optional[str] = None,
+              pruner: Optional[str] = 'median', n_workers: int = 1, seed: int = 42,
+              timeout: Optional[float] = None):
+    """
+    Crear o reanudar un estudio y completarlo hasta n_trials.
+
+    Args:
+        objective: Objetivo de validación cruzada
+        n_trials: Trials terminados (completos o podados) a alcanzar en total,
+            contando los de ejecuciones anteriores del mismo estudio
+        study_name: Nombre del estudio en el almacenamiento
+        storage: URL RDB local (p. ej. 'sqlite:///optuna.db'); obligatorio
+            con n_workers > 1 y necesario para reanudar
+        pruner: 'median', 'hyperband' o None
+        n_workers: Procesos locales que ejecutan trials en paralelo
+        seed: Semilla del sampler (cada worker usa seed + índice)
+        timeout: Segundos máximos por worker
+
+    Returns:
+        Estudio de Optuna
+    """
+    import optuna
+    from optuna.trial import TrialState
+
+    if n_workers > 1 and storage is None:
+        raise ValueError("Los trials en paralelo requieren un storage RDB (p. ej. 'sqlite:///optuna.db')")
+
+    study_name = study_name or f'satisfaction_{objective.model_name}'
+    study = optuna.create_study(
+        study_name=study_name, storage=make_storage(storage), direction='maximize',
+        load_if_exists=True, sampler=optuna.samplers.TPESampler(seed=seed),
+        pruner=make_pruner(pruner, len(objective.cache.folds))
+    )
+    finished = len(study.get_trials(deepcopy=False, states=(TrialState.COMPLETE, TrialState.PRUNED)))
+    if finished:
+        logger.info(f"Reanudando estudio '{study_name}': {finished}/{n_trials} trials terminados")
+    if finished >= n_trials:
+        return study
+
+    if storage is None:
+        from optuna.study import MaxTrialsCallback
+        study.optimize(objective, timeout=timeout, callbacks=[
+            MaxTrialsCallback(n_trials, states=(TrialState.COMPLETE, TrialState.PRUNED))
+        ])
+        return study
+
+    Parallel(n_jobs=n_workers)(
+        delayed(_optimize_worker)(objective, study_name, storage, n_trials, pruner,
+                                  seed + worker, timeout)
+        for worker in range(n_workers)
+    )
+    return optuna.load_study(study_name=study_name, storage=make_storage(storage))
@@ -0,0 +1,222 @@
+"""
+Actualización incremental de SatisfactionPredictor con datos nuevos.
+
+Cada reentrenamiento recorría todo el histórico aunque sólo los tickets del
+último día fueran nuevos. refresh_predictor parte del artefacto anterior y
+trabaja sólo con las filas nuevas:
+1. Chequeos de deriva frente al perfil de referencia guardado con el modelo:
+   PSI por característica (numéricas por deciles, categóricas por
+   proporción; sin las de calendario, que en un lote diario siempre
+   difieren del histórico), proporción de tickets de agentes no vistos, y caída del
+   score del modelo actual sobre los tickets nuevos frente al de test
+2. Si no hay deriva significativa, actualización incremental:
+   - LightGBM: más rondas de boosting desde el Booster anterior (init_model)
+   - XGBoost: más rondas desde el Booster anterior (xgb_model)
+   - Modelos con partial_fit (SGD): una pasada sobre los tickets nuevos
+   La actualización se entrena una sola vez, sin la fracción de validación,
+   y es ese mismo modelo validado el que se conserva; su score en esa
+   fracción pasa a ser el reference_score y save_model(None, ruta) guarda el
+   modelo actualizado con las estadísticas actualizadas.
+   Las características de entrenamiento de las filas nuevas usan las
+   estadísticas anteriores (sin fuga del propio target); después se suman
+   los tickets nuevos a las estadísticas por agente/canal (partial_fit)
+3. Si hay deriva, el modelo no admite actualización incremental o el modelo
+   actualizado empeora en el holdout de los datos nuevos, se recomienda (o se
+   ejecuta, si se indica cómo) el reentrenamiento completo
+
+El costo de la actualización es proporcional a los tickets nuevos.
+"""
+
+import copy
+import time
+import logging
+from typing import Callable, Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+from sklearn.base import clone
+from sklearn.metrics import get_scorer
+from sklearn.pipeline import Pipeline
+
+from booster_model import LightGBMBoosterModel
+from categorical_encoding import categorical_indices
+from drift import TIME_FEATURES, drift_by_feature
+from out_of_core import satisfaction_strata
+from satisfaction_predictor import SATISFACTION_BINS, SATISFACTION_LABELS
+
+logger = logging.getLogger(__name__)
+
+
+def _labeled_features(predictor, df: pd.DataFrame):
+    """Características (estadísticas actuales) y target codificado de los tickets con target válido."""
+    target_column = predictor.feature_transformer.target_column
+    y = pd.to_numeric(df[target_column], errors='coerce').to_numpy(np.float64)
+    if predictor.target_encoder is not None:
+        keep = satisfaction_strata(y) >= 0
+    else:
+        keep = ~np.isnan(y)
+    df, y = df[keep], y[keep]
+    features = predictor.feature_transformer.transform(df)
+    if predictor.target_encoder is not None:
+        labels = pd.cut(y, bins=SATISFACTION_BINS, labels=SATISFACTION_LABELS)
+        y = predictor.target_encoder.transform(np.asarray(labels))
+    return df, features[predictor.feature_names], y
+
+
+def _native_categorical(preprocessor, X: pd.DataFrame, feature_types) -> List[int]:
+    """Posiciones de las categóricas nativas ('native') en la salida del preprocesador."""
+    categorical = preprocessor.named_transformers_.get('cat')
+    if not isinstance(categorical, Pipeline) or 'ordinal' not in categorical.named_steps:
+        return []
+    numeric, categorical_columns = feature_types(X)
+    return categorical_indices(len(numeric), len(categorical_columns))
+
+
+def _continue_training(model, X_matrix, y, n_rounds: int, categorical: List[int],
+                       n_classes: Optional[int]):
+    """
+    Copia del modelo actualizada con las filas nuevas, o None si el modelo no
+    admite actualización incremental (o a XGBoost le faltan clases en el lote).
+    """
+    import lightgbm as lgb
+    import xgboost as xgb
+
+    if isinstance(model, (lgb.LGBMModel, LightGBMBoosterModel)):
+        booster = model.booster_
+        params = {key: value for key, value in booster.params.items()
+                  if key not in ('num_iterations', 'n_estimators', 'num_boost_round')}
+        dataset = lgb.Dataset(X_matrix, label=y, categorical_feature=categorical or 'auto',
+                              free_raw_data=True)
+        updated = lgb.train(params, dataset, num_boost_round=n_rounds, init_model=booster,
+                            keep_training_booster=True)
+        return LightGBMBoosterModel.from_booster(updated, params)
+
+    if isinstance(model, xgb.XGBModel):
+        if n_classes is not None and len(np.unique(y)) < n_classes:
+            return None
+        updated = clone(model).set_params(n_estimators=n_rounds, early_stopping_rounds=None)
+        updated.fit(X_matrix, y, xgb_model=model.get_booster(), verbose=False)
+        return updated
+
+    if hasattr(model, 'partial_fit'):
+        updated = copy.deepcopy(model)
+        kwargs = {'classes': np.arange(n_classes)} if n_classes is not None else {}
+        updated.partial_fit(X_matrix, y, **kwargs)
+        return updated
+
+    return None
+
+
+def refresh_predictor(predictor, new_df: pd.DataFrame, n_rounds: int = 50,
+                      psi_threshold: float = 0.25, max_score_drop: float = 0.05,
+                      max_unseen_share: float = 0.10, validation_size: float = 0.2,
+                      drift_exclude: Iterable[str] = TIME_FEATURES,
+                      full_retrain: Optional[Callable[[], Dict]] = None) -> Dict:
+    """
+    Actualizar un predictor cargado con load_model usando sólo los tickets nuevos.
+
+    Args:
+        predictor: SatisfactionPredictor entrenado
+        new_df: Tickets nuevos con target
+        n_rounds: Rondas de boosting adicionales
+        psi_threshold: PSI a partir del cual una característica se considera derivada
+        max_score_drop: Caída máxima del score aceptada (accuracy o -MSE), frente
+            al de test del artefacto y entre el modelo anterior y el actualizado
+        max_unseen_share: Proporción máxima de tickets de agentes no vistos
+        validation_size: Fracción de los tickets nuevos para validar la actualización
+        drift_exclude: Características fuera del chequeo de PSI (por defecto,
+            las de calendario)
+        full_retrain: Función que reentrena desde cero (p. ej. con
+            train_from_parquet sobre el histórico); si no se indica, sólo se
+            recomienda el reentrenamiento
+
+    Returns:
+        Reporte con 'action' ('incremental', 'full_retrain' o
+        'full_retrain_required'), motivos, deriva y scores
+    """
+    start = time.perf_counter()
+    model_name = predictor.best_model_name
+    pipeline = predictor.trained_models[model_name]['pipeline']
+    transformer = predictor.feature_transformer
+    scoring = 'neg_mean_squared_error' if predictor.task_type == 'regression' else 'accuracy'
+    scorer = get_scorer(scoring)
+
+    # Características con las estadísticas anteriores (sin la fila propia)
+    new_df, X, y = _labeled_features(predictor, new_df)
+    if not len(X):
+        raise ValueError("Los tickets nuevos no tienen target válido")
+
+    report = {'rows': len(new_df), 'reasons': [], 'model': model_name}
+
+    # 1. Deriva
+    if predictor.reference_profile:
+        psi = drift_by_feature(predictor.reference_profile, X, exclude=drift_exclude)
+        report['psi'] = psi
+        drifted = sorted(column for column, value in psi.items() if value > psi_threshold)
+        if drifted:
+            report['reasons'].append(f"deriva (PSI > {psi_threshold}): {', '.join(drifted)}")
+
+    if 'agente' in transformer.group_stats and 'agente_id' in new_df.columns:
+        unseen = transformer.group_stats['agente'].keys.get_indexer(new_df['agente_id']) < 0
+        report['unseen_agent_share'] = float(unseen.mean()) if len(unseen) else 0.0
+        if report['unseen_agent_share'] > max_unseen_share:
+            report['reasons'].append(
+                f"{report['unseen_agent_share']:.1%} de tickets de agentes no vistos"
+            )
+
+    report['score_before'] = scorer(pipeline, X, y)
+    if predictor.reference_score is not None:
+        if report['score_before'] < predictor.reference_score - max_score_drop:
+            report['reasons'].append(
+                f"score {report['score_before']:.4f} vs {predictor.reference_score:.4f} en test"
+            )
+
+    if not transformer.group_sums:
+        report['reasons'].append("el artefacto no guarda sumas por grupo para actualizar estadísticas")
+
+    # 2. Actualización incremental
+    if not report['reasons']:
+        preprocessor = pipeline.named_steps['preprocessor']
+        rng = np.random.default_rng(predictor.random_state)
+        validation = rng.random(len(X)) < validation_size
+        categorical_idx = _native_categorical(preprocessor, X, predictor._feature_types)
+        n_classes = len(predictor.target_encoder.classes_) if predictor.target_encoder is not None else None
+
+        X_fit = preprocessor.transform(X[~validation])
+        updated = _continue_training(pipeline.named_steps['model'], X_fit, y[~validation],
+                                     n_rounds, categorical_idx, n_classes)
+        if updated is None:
+            report['reasons'].append(f"{model_name} no admite actualización incremental con estos tickets")
+        else:
+            candidate = Pipeline([('preprocessor', preprocessor), ('model', updated)])
+            X_val, y_val = X[validation], y[validation]
+            if len(X_val):
+                report['validation_before'] = scorer(pipeline, X_val, y_val)
+                report['validation_after'] = scorer(candidate, X_val, y_val)
+            if report.get('validation_after', 0) < report.get('validation_before', 0) - max_score_drop:
+                report['reasons'].append("el modelo actualizado empeora en los tickets nuevos")
+            else:
+                # Se conserva el modelo validado y se suman los tickets a las estadísticas
+                entry = {'pipeline': candidate, 'refreshed_rows': len(new_df)}
+                if 'validation_after' in report:
+                    score = report['validation_after']
+                    entry['test_score'] = score
+                    entry['metrics'] = {'mse': -score} if predictor.task_type == 'regression' \
+                        else {'accuracy': score}
+                    predictor.reference_score = score
+                predictor.trained_models[model_name] = entry
+                transformer.partial_fit(new_df)
+                report['action'] = 'incremental'
+
+    # 3. Reentrenamiento completo
+    if 'action' not in report:
+        if full_retrain is not None:
+            logger.info(f"Reentrenamiento completo: {'; '.join(report['reasons'])}")
+            report['retrain_results'] = full_retrain()
+            report['action'] = 'full_retrain'
+        else:
+            logger.warning(f"Se requiere reentrenamiento completo: {'; '.join(report['reasons'])}")
+            report['action'] = 'full_retrain_required'
+
+    report['seconds'] = time.perf_counter() - start
+    return report
@@ -0,0 +1,342 @@
+"""
+Artefacto compacto de SatisfactionPredictor.
+
+save_model serializaba con joblib todo training_results: el pipeline de cada
+modelo, X_test, y_test y las predicciones de test. load_model leía el archivo
+completo para quedarse sólo con el mejor pipeline. El artefacto compacto es
+un directorio con:
+- manifest.json: esquema de entrada (columnas numéricas y categóricas y
+  orden de feature_names), tarea, clases del target, estado escalar del
+  transformador (umbrales IQR, sumas globales, valores por defecto), perfil
+  de deriva, versiones de librerías y tamaño y SHA-256 de cada archivo; la
+  versión del artefacto es el hash del manifiesto
+- model.txt (LightGBM, texto nativo), model.ubj (XGBoost, UBJSON) o
+  model.joblib (resto de modelos)
+- preprocessor.joblib: el ColumnTransformer ajustado (sólo categorías y
+  escalas, sin datos)
+- stats_<grupo>.arrow y sums_<grupo>.arrow: tablas por agente/canal en Arrow
+  IPC sin compresión, leídas con memory-map (las columnas de búsqueda quedan
+  respaldadas por el archivo, sin copia)
+- metrics.json: métricas de entrenamiento por modelo, aparte del modelo
+
+Cargar el artefacto no lee métricas ni datos de test (load_metrics los lee a
+demanda).
+"""
+
+import os
+import sys
+import json
+import hashlib
+import logging
+from typing import Dict, List, Optional
+
+import joblib
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import LabelEncoder
+
+from booster_model import LightGBMBoosterModel, lightgbm_objective
+from feature_pipeline import GroupAccumulator, GroupStatistics, TicketFeatureTransformer
+
+# Utilidades de artefactos compartidas con SentimentAnalyzer
+sys.path.append(os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'nlp_models'
+))
+from analyzer_artifact import file_sha256, package_versions
+
+ARTIFACT_FORMAT = 1
+
+MANIFEST_FILE = 'manifest.json'
+METRICS_FILE = 'metrics.json'
+PREPROCESSOR_FILE = 'preprocessor.joblib'
+
+# Librerías cuya versión queda fijada en el artefacto
+TRACKED_PACKAGES = ('scikit-learn', 'lightgbm', 'xgboost', 'pyarrow', 'numpy', 'pandas')
+
+logger = logging.getLogger(__name__)
+
+
+def manifest_version(manifest: Dict) -> str:
+    """Hash del manifiesto (sin 'artifact_version')."""
+    payload = json.dumps(manifest, sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16]
+
+
+def artifact_size(path: str) -> int:
+    """Bytes en disco de un artefacto (directorio) o de un archivo joblib."""
+    if os.path.isfile(path):
+        return os.path.getsize(path)
+    return sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path))
+
+
+def _jsonable(value):
+    """Convertir escalares y arreglos de NumPy a tipos de JSON."""
+    if isinstance(value, dict):
+        return {str(key): _jsonable(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple, np.ndarray)):
+        return [_jsonable(item) for item in value]
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+METRIC_KEYS = ('cv_scores', 'cv_mean', 'cv_std', 'test_score', 'metrics', 'refreshed_rows')
+
+
+def training_metrics(results: Dict) -> Dict:
+    """Resumen serializable de training_results (sin pipelines ni datos de test)."""
+    metrics = {
+        'best_model': results['best_model'],
+        'best_score': results['best_score'],
+        'models': {
+            name: {key: entry[key] for key in METRIC_KEYS if key in entry}
+            for name, entry in results['models'].items()
+        }
+    }
+    for key in ('rows', 'sample_rows', 'memory_report'):
+        if key in results:
+            metrics[key] = results[key]
+    return _jsonable(metrics)
+
+
+def _write_json(path: str, payload: Dict) -> None:
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(payload, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+
+def _write_table(path: str, keys: pd.Index, columns: Dict[str, np.ndarray]) -> None:
+    """Tabla por grupo en Arrow IPC sin compresión (memory-mappable)."""
+    table = pa.table({'key': pa.array(keys.tolist()),
+                      **{name: pa.array(np.asarray(values, dtype=np.float64))
+                         for name, values in columns.items()}})
+    with pa.OSFile(path, 'wb') as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+
+
+def _read_table(path: str):
+    """Claves y columnas de una tabla Arrow; las columnas apuntan al archivo mapeado."""
+    table = pa.ipc.open_file(pa.memory_map(path, 'r')).read_all()
+    keys = pd.Index(table.column('key').to_pylist(), dtype=object)
+    columns = {name: table.column(name).to_numpy() for name in table.column_names if name != 'key'}
+    return keys, columns
+
+
+def _save_estimator(model, path: str) -> Dict:
+    """Guardar el estimador en su formato nativo; devuelve su descripción."""
+    import lightgbm as lgb
+    import xgboost as xgb
+
+    if isinstance(model, (lgb.LGBMModel, LightGBMBoosterModel)):
+        model.booster_.save_model(os.path.join(path, 'model.txt'))
+        return {'kind': 'lightgbm', 'file': 'model.txt'}
+    if isinstance(model, xgb.XGBModel):
+        model.save_model(os.path.join(path, 'model.ubj'))
+        return {'kind': 'xgboost', 'file': 'model.ubj', 'estimator': type(model).__name__}
+    joblib.dump(model, os.path.join(path, 'model.joblib'))
+    return {'kind': 'joblib', 'file': 'model.joblib'}
+
+
+def _load_estimator(description: Dict, path: str, task_type: str, n_classes: Optional[int]):
+    """Cargar el estimador descrito en el manifiesto."""
+    model_path = os.path.join(path, description['file'])
+    if description['kind'] == 'lightgbm':
+        import lightgbm as lgb
+        booster = lgb.Booster(model_file=model_path)
+        return LightGBMBoosterModel.from_booster(booster, lightgbm_objective(task_type, n_classes))
+    if description['kind'] == 'xgboost':
+        import xgboost as xgb
+        model = getattr(xgb, description['estimator'])()
+        model.load_model(model_path)
+        return model
+    return joblib.load(model_path)
+
+
+def save_artifact(predictor, path: str, results: Optional[Dict] = None) -> Dict:
+    """
+    Guardar el mejor modelo de un predictor como artefacto compacto.
+
+    El modelo se toma de predictor.trained_models (incluye las
+    actualizaciones de refresh), no de results.
+
+    Args:
+        predictor: SatisfactionPredictor entrenado, cargado o actualizado
+        path: Directorio del artefacto
+        results: Resultados de train_models o train_from_parquet, sólo para
+            metrics.json (por defecto, las métricas guardadas en trained_models)
+
+    Returns:
+        Manifiesto guardado (incluye 'artifact_version')
+    """
+    model_name = predictor.best_model_name
+    pipeline = predictor.trained_models[model_name]['pipeline']
+    if results is None:
+        results = {'best_model': model_name, 'best_score': predictor.reference_score,
+                   'models': predictor.trained_models}
+    preprocessor = pipeline.named_steps['preprocessor']
+    transformer = predictor.feature_transformer
+
+    os.makedirs(path, exist_ok=True)
+    model = _save_estimator(pipeline.named_steps['model'], path)
+    joblib.dump(preprocessor, os.path.join(path, PREPROCESSOR_FILE))
+    _write_json(os.path.join(path, METRICS_FILE), training_metrics(results))
+    written = [model['file'], PREPROCESSOR_FILE, METRICS_FILE]
+
+    group_defaults = {}
+    if transformer is not None:
+        for prefix, stats in transformer.group_stats.items():
+            written.append(f'stats_{prefix}.arrow')
+            _write_table(os.path.join(path, written[-1]), stats.keys, stats.columns)
+            group_defaults[prefix] = dict(stats.defaults)
+        for prefix, sums in transformer.group_sums.items():
+            written.append(f'sums_{prefix}.arrow')
+            _write_table(os.path.join(path, written[-1]), sums.keys, sums.sums)
+
+    columns = {name: list(selected) for name, _, selected in preprocessor.transformers_
+               if name in ('num', 'cat')}
+    manifest = {
+        'format': ARTIFACT_FORMAT,
+        'task_type': predictor.task_type,
+        'model_name': model_name,
+        'model': model,
+        'schema': {
+            'feature_names': list(predictor.feature_names),
+            'numeric': columns.get('num', []),
+            'categorical': columns.get('cat', [])
+        },
+        'target_classes': (predictor.target_encoder.classes_.tolist()
+                           if predictor.target_encoder is not None else None),
+        'feature_transformer': None if transformer is None else {
+            'n_folds': transformer.n_folds,
+            'random_state': transformer.random_state,
+            'target_column': transformer.target_column,
+            'outlier_bounds': {column: list(map(float, bounds))
+                               for column, bounds in transformer.outlier_bounds.items()},
+            'global_sums': dict(transformer.global_sums),
+            'group_defaults': group_defaults,
+            'group_sums': sorted(transformer.group_sums)
+        },
+        'reference_profile': predictor.reference_profile,
+        'reference_score': predictor.reference_score,
+        'packages': package_versions(TRACKED_PACKAGES),
+        'files': {
+            name: {'size': os.path.getsize(os.path.join(path, name)),
+                   'sha256': file_sha256(os.path.join(path, name))}
+            for name in sorted(written)
+        }
+    }
+    manifest = _jsonable(manifest)
+    manifest['artifact_version'] = manifest_version(manifest)
+    _write_json(os.path.join(path, MANIFEST_FILE), manifest)
+
+    logger.info(f"Artefacto {manifest['artifact_version']} guardado en: {path}")
+    return manifest
+
+
+def load_manifest(path: str, verify: bool = False) -> Dict:
+    """
+    Leer y validar el manifiesto de un artefacto.
+
+    Args:
+        path: Directorio del artefacto
+        verify: Recalcular los SHA-256 de los archivos; si no, sólo se
+            comprueban existencia y tamaño
+
+    Raises:
+        ValueError: Si el artefacto está incompleto, alterado o es de otro formato
+    """
+    with open(os.path.join(path, MANIFEST_FILE), encoding='utf-8') as f:
+        manifest = json.load(f)
+
+    if manifest.get('format') != ARTIFACT_FORMAT:
+        raise ValueError(f"Formato de artefacto no soportado: {manifest.get('format')}")
+
+    stored_version = manifest.pop('artifact_version')
+    if manifest_version(manifest) != stored_version:
+        raise ValueError(f"El manifiesto de {path} fue modificado")
+    manifest['artifact_version'] = stored_version
+
+    for name, expected in manifest['files'].items():
+        file_path = os.path.join(path, name)
+        if not os.path.exists(file_path):
+            raise ValueError(f"Falta el archivo del artefacto: {file_path}")
+        if os.path.getsize(file_path) != expected['size']:
+            raise ValueError(f"El archivo del artefacto cambió de tamaño: {file_path}")
+        if verify and file_sha256(file_path) != expected['sha256']:
+            raise ValueError(f"El archivo del artefacto cambió de contenido: {file_path}")
+
+    installed = package_versions(TRACKED_PACKAGES)
+    for package, pinned in manifest['packages'].items():
+        if installed.get(package) != pinned:
+            logger.warning(
+                f"{package} instalado ({installed.get(package)}) difiere del artefacto ({pinned})"
+            )
+    return manifest
+
+
+def _load_transformer(state: Dict, path: str) -> TicketFeatureTransformer:
+    """Transformador con las tablas por grupo leídas de Arrow."""
+    transformer = TicketFeatureTransformer(state['n_folds'], state['random_state'],
+                                           state['target_column'])
+    transformer.group_stats = {}
+    for prefix, defaults in state['group_defaults'].items():
+        keys, columns = _read_table(os.path.join(path, f'stats_{prefix}.arrow'))
+        transformer.group_stats[prefix] = GroupStatistics(keys, columns, defaults)
+    # Las sumas se copian: partial_fit las actualiza en sitio
+    transformer.group_sums = {}
+    for prefix in state['group_sums']:
+        keys, sums = _read_table(os.path.join(path, f'sums_{prefix}.arrow'))
+        transformer.group_sums[prefix] = GroupAccumulator(
+            keys, {field: np.array(values) for field, values in sums.items()}
+        )
+    transformer.outlier_bounds = state['outlier_bounds']
+    transformer.global_sums = dict(state['global_sums'])
+    transformer.is_fitted = True
+    return transformer
+
+
+def load_artifact(predictor_class, path: str, verify: bool = False):
+    """
+    Cargar un artefacto compacto.
+
+    Args:
+        predictor_class: Clase del predictor (SatisfactionPredictor)
+        path: Directorio del artefacto
+        verify: Verificar el SHA-256 de cada archivo
+
+    Returns:
+        Predictor listo para predecir, con 'artifact_version'
+    """
+    manifest = load_manifest(path, verify=verify)
+    classes: Optional[List[str]] = manifest['target_classes']
+    n_classes = len(classes) if classes is not None else None
+
+    model = _load_estimator(manifest['model'], path, manifest['task_type'], n_classes)
+    preprocessor = joblib.load(os.path.join(path, PREPROCESSOR_FILE))
+
+    predictor = predictor_class(task_type=manifest['task_type'])
+    predictor.best_model_name = manifest['model_name']
+    predictor.preprocessor = preprocessor
+    predictor.trained_models = {manifest['model_name']: {
+        'pipeline': Pipeline([('preprocessor', preprocessor), ('model', model)])
+    }}
+    predictor.feature_names = manifest['schema']['feature_names']
+    if manifest['feature_transformer'] is not None:
+        predictor.feature_transformer = _load_transformer(manifest['feature_transformer'], path)
+    if classes is not None:
+        predictor.target_encoder = LabelEncoder()
+        predictor.target_encoder.classes_ = np.asarray(classes, dtype=object)
+    predictor.reference_profile = manifest['reference_profile']
+    predictor.reference_score = manifest['reference_score']
+    predictor.artifact_version = manifest['artifact_version']
+    predictor.is_fitted = True
+    return predictor
+
+
+def load_metrics(path: str) -> Dict:
+    """Métricas de entrenamiento guardadas junto al artefacto."""
+    with open(os.path.join(path, METRICS_FILE), encoding='utf-8') as f:
+        return json.load(f)
@@ -0,0 +1,523 @@
+"""
+Entrenamiento fuera de memoria de SatisfactionPredictor sobre Parquet particionado.
+
+prepare_data y train_models necesitan todo el histórico como un DataFrame
+más varias copias (df.copy(), características, X, partición train/test);
+con ~20M de tickets el proceso se queda sin memoria. OutOfCoreTrainer lee el
+dataset por lotes de row groups (pyarrow.dataset) y:
+1. Primera pasada: acumula las estadísticas por agente/canal
+   (TicketFeatureTransformer.partial_fit), separa un holdout estable por
+   hash del id del ticket y mantiene una muestra estratificada por clase de
+   satisfacción con capacidad fijada por el presupuesto de memoria
+2. Ajusta umbrales de outliers y preprocesador sobre la muestra
+3. Entrena con uno de estos métodos:
+   - 'lightgbm': segunda pasada que escribe cada lote preprocesado a disco
+     (float32) y construye el Dataset de LightGBM por lotes (lgb.Sequence)
+   - 'sgd': SGDClassifier/SGDRegressor con partial_fit por lote y época
+   - 'sample': cualquier modelo del predictor sobre la muestra, con pesos
+     de estrato para corregir el muestreo
+4. Evalúa sobre el holdout y reporta memoria (RSS y pico) por etapa; con
+   'lightgbm' y early stopping, una parte del holdout se reserva para
+   elegir las rondas y no se usa en la evaluación
+
+Las características de la muestra usan las estadísticas del dataset
+completo (incluida la propia fila); con millones de filas por grupo el
+efecto es despreciable frente a la codificación fuera de fold en memoria.
+"""
+
+import os
+import time
+import shutil
+import logging
+import resource
+import tempfile
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional
+
+import lightgbm as lgb
+import numpy as np
+import pandas as pd
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import LabelEncoder
+
+from booster_model import LightGBMBoosterModel, lightgbm_objective
+from categorical_encoding import model_encoding
+from drift import feature_profile
+from feature_pipeline import TicketFeatureTransformer
+from satisfaction_predictor import SATISFACTION_BINS, SATISFACTION_LABELS
+from training_cache import cpu_budget, set_thread_budget, to_float32
+
+logger = logging.getLogger(__name__)
+
+METHODS = ('lightgbm', 'sgd', 'sample')
+
+# Fracción del presupuesto para la muestra de entrenamiento y el holdout
+SAMPLE_BUDGET_SHARE = 0.45
+HOLDOUT_BUDGET_SHARE = 0.05
+
+# Parte del holdout reservada para el early stopping de LightGBM
+EARLY_STOPPING_SHARE = 0.5
+
+
+def memory_usage_mb() -> Dict[str, Optional[float]]:
+    """RSS actual y pico del proceso en MB (pico reiniciable en Linux)."""
+    try:
+        with open('/proc/self/status') as f:
+            status = dict(line.split(':', 1) for line in f if ':' in line)
+        return {'rss_mb': int(status['VmRSS'].split()[0]) / 1024,
+                'peak_rss_mb': int(status['VmHWM'].split()[0]) / 1024}
+    except (OSError, KeyError, ValueError):
+        # ru_maxrss está en KB en Linux y en bytes en macOS
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return {'rss_mb': None, 'peak_rss_mb': peak / (1024 * 1024 if peak > 1 << 32 else 1024)}
+
+
+def _reset_peak_memory() -> None:
+    """Reiniciar el pico de RSS (VmHWM) para medir cada etapa por separado."""
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+    except OSError:
+        pass
+
+
+class MemoryReport:
+    """Tiempo, filas y memoria por etapa del entrenamiento."""
+
+    def __init__(self):
+        self.stages: List[Dict] = []
+
+    @contextmanager
+    def stage(self, name: str):
+        """Medir una etapa; el bloque puede fijar entry['rows']."""
+        _reset_peak_memory()
+        entry = {'stage': name, 'rows': None}
+        start = time.perf_counter()
+        try:
+            yield entry
+        finally:
+            entry['seconds'] = time.perf_counter() - start
+            entry.update(memory_usage_mb())
+            self.stages.append(entry)
+            logger.info(f"Etapa {name}: {entry['seconds']:.1f}s, pico {entry['peak_rss_mb']:.0f} MB")
+
+    def to_frame(self) -> pd.DataFrame:
+        """Reporte como DataFrame."""
+        return pd.DataFrame(self.stages)
+
+
+def iter_ticket_batches(path: str, batch_size: int = 100_000,
+                        columns: Optional[List[str]] = None) -> Iterator[pd.DataFrame]:
+    """
+    Leer un dataset Parquet (archivo o directorio particionado) por lotes.
+
+    Args:
+        path: Archivo o directorio (particiones hive, p. ej. fecha=2024-01-01/)
+        batch_size: Filas máximas por lote
+        columns: Columnas a leer (None = todas)
+
+    Yields:
+        DataFrame por lote
+    """
+    import pyarrow.dataset as ds
+
+    dataset = ds.dataset(path, format='parquet', partitioning='hive')
+    for batch in dataset.to_batches(columns=columns, batch_size=batch_size,
+                                    batch_readahead=1, fragment_readahead=1):
+        if batch.num_rows:
+            yield batch.to_pandas()
+
+
+def satisfaction_strata(y: np.ndarray) -> np.ndarray:
+    """Estrato de cada fila según su clase de satisfacción (-1 = sin target válido)."""
+    strata = np.digitize(y, SATISFACTION_BINS[1:-1], right=True)
+    valid = (y > SATISFACTION_BINS[0]) & (y <= SATISFACTION_BINS[-1])
+    return np.where(valid, strata, -1)
+
+
+class StratifiedReservoir:
+    """Muestra uniforme por estrato de tamaño fijo, acumulable por lotes."""
+
+    def __init__(self, capacity_per_stratum: int, random_state: int = 42):
+        """
+        Args:
+            capacity_per_stratum: Filas máximas por estrato
+            random_state: Semilla de las claves aleatorias
+        """
+        self.capacity = capacity_per_stratum
+        self.rng = np.random.default_rng(random_state)
+        self.frames: Dict[int, pd.DataFrame] = {}
+        self.keys: Dict[int, np.ndarray] = {}
+        self.seen: Dict[int, int] = {}
+
+    def update(self, df: pd.DataFrame, strata: np.ndarray) -> None:
+        """
+        Agregar un lote: cada estrato conserva las filas con las menores claves
+        aleatorias, que son una muestra uniforme de todas las filas vistas.
+        """
+        for stratum in np.unique(strata[strata >= 0]):
+            rows = df[strata == stratum]
+            keys = self.rng.random(len(rows))
+            self.seen[stratum] = self.seen.get(stratum, 0) + len(rows)
+            if stratum in self.frames:
+                rows = pd.concat([self.frames[stratum], rows], ignore_index=True)
+                keys = np.concatenate([self.keys[stratum], keys])
+            if len(rows) > self.capacity:
+                keep = np.argpartition(keys, self.capacity)[:self.capacity]
+                rows, keys = rows.iloc[keep].reset_index(drop=True), keys[keep]
+            self.frames[stratum], self.keys[stratum] = rows, keys
+
+    def sample(self):
+        """
+        Muestra combinada y pesos que la hacen representativa del total.
+
+        Returns:
+            Tupla (DataFrame, pesos por fila = filas vistas / filas guardadas del estrato)
+        """
+        if not self.frames:
+            return pd.DataFrame(), np.array([])
+        frames = [self.frames[stratum] for stratum in sorted(self.frames)]
+        weights = np.concatenate([
+            np.full(len(self.frames[stratum]), self.seen[stratum] / len(self.frames[stratum]))
+            for stratum in sorted(self.frames)
+        ])
+        return pd.concat(frames, ignore_index=True), weights
+
+
+class _MatrixSequence(lgb.Sequence):
+    """
+    Lote preprocesado en disco (memory-map) para construir el Dataset de LightGBM.
+
+    Las partes se guardan en float32 (la mitad de disco y de páginas
+    mapeadas); LightGBM sólo acepta filas float64 de un Sequence, así que
+    cada acceso convierte únicamente las filas pedidas.
+    """
+
+    def __init__(self, path: str, batch_size: int):
+        self.data = np.load(path, mmap_mode='r')
+        self.batch_size = batch_size
+
+    def __getitem__(self, index):
+        return np.asarray(self.data[index], dtype=np.float64)
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+
+class OutOfCoreTrainer:
+    """Entrenamiento en streaming sobre Parquet particionado."""
+
+    def __init__(self, predictor, batch_size: int = 100_000, memory_budget_mb: float = 2048,
+                 test_size: float = 0.1, id_column: str = 'ticket_id',
+                 target_column: str = 'satisfaccion_score', columns: Optional[List[str]] = None):
+        """
+        Args:
+            predictor: SatisfactionPredictor a entrenar
+            batch_size: Filas por lote leído
+            memory_budget_mb: Presupuesto para la muestra y el holdout
+            test_size: Fracción de tickets reservada para evaluación
+            id_column: Columna con la que se asigna el holdout (por hash);
+                si no existe se usa la posición del lote
+            target_column: Columna objetivo
+            columns: Columnas a leer del dataset (None = todas)
+        """
+        self.predictor = predictor
+        self.batch_size = batch_size
+        self.memory_budget_mb = memory_budget_mb
+        self.test_size = test_size
+        self.id_column = id_column
+        self.target_column = target_column
+        self.columns = columns
+        self.report = MemoryReport()
+        self.logger = logging.getLogger(__name__)
+
+    def _holdout_mask(self, df: pd.DataFrame, batch_index: int) -> np.ndarray:
+        """Filas de evaluación, estables entre pasadas."""
+        if self.id_column in df.columns:
+            hashes = pd.util.hash_pandas_object(df[self.id_column], index=False).to_numpy()
+            return (hashes % 10_000) < self.test_size * 10_000
+        rng = np.random.default_rng([self.predictor.random_state, batch_index])
+        return rng.random(len(df)) < self.test_size
+
+    def _training_batches(self, path: str) -> Iterator[pd.DataFrame]:
+        """Lotes sin las filas de holdout."""
+        for batch_index, batch in enumerate(iter_ticket_batches(path, self.batch_size, self.columns)):
+            yield batch[~self._holdout_mask(batch, batch_index)]
+
+    def _target(self, df: pd.DataFrame) -> np.ndarray:
+        return pd.to_numeric(df[self.target_column], errors='coerce').to_numpy(np.float64)
+
+    def _reservoir_row_bytes(self, batch: pd.DataFrame,
+                             transformer: TicketFeatureTransformer) -> float:
+        """
+        Memoria por fila retenida en los reservoirs.
+
+        La muestra se guarda cruda y después se transforma a características
+        (más anchas por las búsquedas por agente/canal) de las que se copia
+        la selección de columnas, así que se cuentan la fila cruda y dos
+        veces su ancho transformado.
+        """
+        raw_bytes = batch.memory_usage(deep=True).sum() / len(batch)
+        features = transformer.transform(batch.head(1000))
+        feature_bytes = features.memory_usage(deep=True).sum() / max(len(features), 1)
+        return raw_bytes + 2 * feature_bytes
+
+    def collect_statistics(self, path: str):
+        """
+        Primera pasada: estadísticas de características, muestra y holdout.
+
+        Returns:
+            Tupla (muestra, pesos de la muestra, holdout)
+        """
+        transformer = TicketFeatureTransformer(random_state=self.predictor.random_state,
+                                               target_column=self.target_column)
+        sample = holdout = None
+        n_rows = 0
+
+        with self.report.stage('estadisticas') as stage:
+            for batch_index, batch in enumerate(iter_ticket_batches(path, self.batch_size, self.columns)):
+                mask = self._holdout_mask(batch, batch_index)
+                train_rows = batch[~mask]
+                transformer.partial_fit(train_rows)
+
+                if sample is None:
+                    row_bytes = self._reservoir_row_bytes(batch, transformer)
+                    budget = self.memory_budget_mb * 1024 * 1024
+                    n_strata = len(SATISFACTION_BINS) - 1
+                    sample = StratifiedReservoir(
+                        max(1, int(budget * SAMPLE_BUDGET_SHARE / row_bytes) // n_strata),
+                        self.predictor.random_state
+                    )
+                    holdout = StratifiedReservoir(
+                        max(1, int(budget * HOLDOUT_BUDGET_SHARE / row_bytes)),
+                        self.predictor.random_state + 1
+                    )
+
+                y = self._target(train_rows)
+                sample.update(train_rows, satisfaction_strata(y))
+                held_out = batch[mask]
+                valid = ~np.isnan(self._target(held_out))
+                holdout.update(held_out, np.where(valid, 0, -1))
+                n_rows += len(batch)
+            stage['rows'] = n_rows
+
+        if sample is None:
+            raise ValueError(f"El dataset {path} no tiene filas")
+
+        sample_df, weights = sample.sample()
+        holdout_df, _ = holdout.sample()
+        transformer.fit_outlier_bounds(sample_df)
+        self.predictor.feature_transformer = transformer
+        self.n_rows = n_rows
+        self.logger.info(f"{n_rows:,} tickets: muestra de {len(sample_df):,}, holdout de {len(holdout_df):,}")
+        return sample_df, weights, holdout_df
+
+    def _encode_target(self, y: np.ndarray) -> np.ndarray:
+        """Target en la codificación del predictor (clases de satisfacción o valor)."""
+        if self.predictor.target_encoder is None:
+            return y
+        labels = pd.cut(y, bins=SATISFACTION_BINS, labels=SATISFACTION_LABELS)
+        return self.predictor.target_encoder.transform(np.asarray(labels))
+
+    def _features(self, df: pd.DataFrame):
+        """Características y target codificado de un lote (sin target nulo o fuera de escala)."""
+        y = self._target(df)
+        if self.predictor.target_encoder is not None:
+            df = df[satisfaction_strata(y) >= 0]
+        else:
+            df = df[~np.isnan(y)]
+        features = self.predictor.feature_transformer.transform(df)
+        return features[self.predictor.feature_names], self._encode_target(self._target(df))
+
+    def fit(self, path: str, method: str = 'lightgbm', model_name: Optional[str] = None,
+            epochs: int = 1, num_boost_round: int = 500, early_stopping_rounds: Optional[int] = 50,
+            lgb_params: Optional[Dict] = None, work_dir: Optional[str] = None,
+            n_jobs: Optional[int] = None) -> Dict:
+        """
+        Entrenar sobre el dataset sin cargarlo completo en memoria.
+
+        Args:
+            path: Archivo o directorio Parquet
+            method: 'lightgbm', 'sgd' o 'sample'
+            model_name: Modelo del predictor para method='sample' (por defecto lightgbm)
+            epochs: Pasadas sobre el dataset para method='sgd'
+            num_boost_round: Rondas máximas para method='lightgbm'
+            early_stopping_rounds: Rondas sin mejora (method='lightgbm') sobre la
+                parte EARLY_STOPPING_SHARE del holdout, que no se evalúa
+            lgb_params: Parámetros adicionales de lgb.train
+            work_dir: Directorio para los lotes preprocesados (por defecto temporal)
+            n_jobs: Núcleos a usar
+
+        Returns:
+            Resultados con la forma de train_models más 'memory_report'
+        """
+        if method not in METHODS:
+            raise ValueError(f"Método no soportado: {method}. Opciones: {METHODS}")
+
+        sample_df, weights, holdout_df = self.collect_statistics(path)
+
+        with self.report.stage('muestra') as stage:
+            predictor = self.predictor
+            y_sample = self._target(sample_df)
+            if predictor.task_type == 'classification':
+                predictor.target_encoder = LabelEncoder().fit(SATISFACTION_LABELS)
+            features = predictor.feature_transformer.transform(sample_df)
+            predictor.feature_names = predictor.select_feature_columns(features)
+            X_sample = features[predictor.feature_names]
+            y_sample = self._encode_target(y_sample)
+            if len(holdout_df):
+                X_holdout, y_holdout = self._features(holdout_df)
+            else:
+                X_holdout, y_holdout = X_sample.iloc[:0], y_sample[:0]
+            stage['rows'] = len(X_sample)
+
+            # Las rondas se eligen con una parte del holdout y se evalúa con el resto
+            X_stop, y_stop = X_holdout.iloc[:0], y_holdout[:0]
+            if method == 'lightgbm' and early_stopping_rounds and len(X_holdout):
+                rng = np.random.default_rng(predictor.random_state + 2)
+                stop_mask = rng.random(len(X_holdout)) < EARLY_STOPPING_SHARE
+                X_stop, y_stop = X_holdout[stop_mask], y_holdout[stop_mask]
+                X_holdout, y_holdout = X_holdout[~stop_mask], y_holdout[~stop_mask]
+
+        budget = cpu_budget(n_jobs)
+        with self.report.stage(f'entrenamiento_{method}') as stage:
+            if method == 'sample':
+                model_name = model_name or 'lightgbm'
+                encoding = model_encoding(model_name, 'auto')
+                model = set_thread_budget(predictor._encoded_model(model_name, X_sample, encoding), budget)
+                pipeline = Pipeline([('preprocessor', predictor.create_preprocessor(X_sample, encoding)),
+                                     ('model', model)])
+                pipeline.fit(X_sample, y_sample, model__sample_weight=weights)
+                stage['rows'] = len(X_sample)
+            elif method == 'sgd':
+                model_name = 'sgd'
+                pipeline, stage['rows'] = self._fit_sgd(path, X_sample, epochs)
+            else:
+                model_name = 'lightgbm'
+                pipeline, stage['rows'] = self._fit_lightgbm(
+                    path, X_sample, X_stop, y_stop, num_boost_round,
+                    early_stopping_rounds, lgb_params, work_dir, budget
+                )
+
+        with self.report.stage('evaluacion') as stage:
+            metrics, test_score = self._evaluate(pipeline, X_holdout, y_holdout)
+            stage['rows'] = len(X_holdout)
+
+        predictor.preprocessor = pipeline.named_steps['preprocessor']
+        predictor.trained_models = {model_name: {
+            'pipeline': pipeline, 'test_score': test_score, 'metrics': metrics
+        }}
+        predictor.best_model_name = model_name
+        predictor.reference_profile = feature_profile(X_sample, weights=weights)
+        predictor.reference_score = test_score
+        predictor.is_fitted = True
+
+        return {
+            'models': predictor.trained_models,
+            'best_model': model_name,
+            'best_score': test_score,
+            'rows': self.n_rows,
+            'sample_rows': len(X_sample),
+            'memory_report': self.report.stages
+        }
+
+    def _fit_sgd(self, path: str, X_sample: pd.DataFrame, epochs: int):
+        """partial_fit por lote sobre CSR float32 con el preprocesador de la muestra."""
+        from sklearn.linear_model import SGDClassifier, SGDRegressor
+
+        predictor = self.predictor
+        preprocessor = predictor.create_preprocessor(X_sample, 'sparse').fit(X_sample)
+        if predictor.task_type == 'classification':
+            model = SGDClassifier(loss='log_loss', random_state=predictor.random_state)
+            classes = np.arange(len(predictor.target_encoder.classes_))
+        else:
+            model = SGDRegressor(random_state=predictor.random_state)
+            classes = None
+
+        n_rows = 0
+        for _ in range(epochs):
+            for batch in self._training_batches(path):
+                X_batch, y_batch = self._features(batch)
+                if not len(X_batch):
+                    continue
+                X_matrix = preprocessor.transform(X_batch)
+                if classes is not None:
+                    model.partial_fit(X_matrix, y_batch, classes=classes)
+                else:
+                    model.partial_fit(X_matrix, y_batch)
+                n_rows += len(X_batch)
+
+        return Pipeline([('preprocessor', preprocessor), ('model', model)]), n_rows
+
+    def _fit_lightgbm(self, path: str, X_sample: pd.DataFrame, X_stop: pd.DataFrame,
+                      y_stop: np.ndarray, num_boost_round: int,
+                      early_stopping_rounds: Optional[int], lgb_params: Optional[Dict],
+                      work_dir: Optional[str], n_threads: int):
+        """Dataset de LightGBM construido por lotes desde matrices float32 en disco."""
+        predictor = self.predictor
+        preprocessor = predictor.create_preprocessor(X_sample, 'native').fit(X_sample)
+        numeric, categorical = predictor._feature_types(X_sample)
+        categorical_idx = list(range(len(numeric), len(numeric) + len(categorical)))
+
+        own_dir = work_dir is None
+        work_dir = work_dir or tempfile.mkdtemp(prefix='satisfaction_lgb_')
+        os.makedirs(work_dir, exist_ok=True)
+        try:
+            sequences, labels = [], []
+            for batch_index, batch in enumerate(self._training_batches(path)):
+                X_batch, y_batch = self._features(batch)
+                if not len(X_batch):
+                    continue
+                part_path = os.path.join(work_dir, f'part-{batch_index:05d}.npy')
+                np.save(part_path, to_float32(preprocessor.transform(X_batch)))
+                sequences.append(_MatrixSequence(part_path, self.batch_size))
+                labels.append(y_batch.astype(np.float32))
+            if not sequences:
+                raise ValueError(f"El dataset {path} no tiene filas de entrenamiento con target")
+
+            n_classes = len(predictor.target_encoder.classes_) if predictor.target_encoder else None
+            params = {
+                **lightgbm_objective(predictor.task_type, n_classes),
+                'learning_rate': 0.05, 'num_leaves': 63, 'verbose': -1,
+                'seed': predictor.random_state, 'num_threads': n_threads,
+                **(lgb_params or {})
+            }
+            train_set = lgb.Dataset(sequences, label=np.concatenate(labels),
+                                    categorical_feature=categorical_idx, params=params)
+            callbacks, valid_sets = [], []
+            if early_stopping_rounds and len(X_stop):
+                valid_sets = [lgb.Dataset(to_float32(preprocessor.transform(X_stop)),
+                                          label=y_stop, reference=train_set)]
+                callbacks = [lgb.early_stopping(early_stopping_rounds, verbose=False)]
+
+            booster = lgb.train(params, train_set, num_boost_round=num_boost_round,
+                                valid_sets=valid_sets, callbacks=callbacks)
+            n_rows = train_set.num_data()
+        finally:
+            if own_dir:
+                shutil.rmtree(work_dir, ignore_errors=True)
+
+        model = LightGBMBoosterModel.from_booster(booster, params)
+        return Pipeline([('preprocessor', preprocessor), ('model', model)]), n_rows
+
+    def _evaluate(self, pipeline: Pipeline, X_holdout: pd.DataFrame, y_holdout: np.ndarray):
+        """Métricas sobre el holdout (mismas que train_models)."""
+        from sklearn.metrics import (
+            accuracy_score, f1_score, mean_absolute_error, mean_squared_error,
+            precision_score, r2_score, recall_score
+        )
+
+        if not len(X_holdout):
+            return {}, np.nan
+        y_pred = pipeline.predict(X_holdout)
+        if self.predictor.task_type == 'classification':
+            test_score = accuracy_score(y_holdout, y_pred)
+            return {
+                'accuracy': test_score,
+                'precision': precision_score(y_holdout, y_pred, average='weighted'),
+                'recall': recall_score(y_holdout, y_pred, average='weighted'),
+                'f1': f1_score(y_holdout, y_pred, average='weighted')
+            }, test_score
+        mse = mean_squared_error(y_holdout, y_pred)
+        return {'mse': mse, 'mae': mean_absolute_error(y_holdout, y_pred),
+                'r2': r2_score(y_holdout, y_pred)}, -mse
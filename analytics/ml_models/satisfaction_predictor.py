@@ -18,6 +18,8 @@ import warnings
 from datetime import datetime
 from typing import Dict, List, Tuple, Optional, Union
 import logging
+import os
+import sys
 
 # Machine Learning
 from sklearn.model_selection import train_test_split, cross_val_score, GridSearchCV
@@ -38,6 +40,7 @@ import lightgbm as lgb
 from sklearn.pipeline import Pipeline
 from sklearn.compose import ColumnTransformer
 from sklearn.impute import SimpleImputer
+from sklearn.base import clone
 
 # Feature Selection
 from sklearn.feature_selection import SelectKBest, f_classif, f_regression
@@ -57,6 +60,19 @@ import optuna
 
 warnings.filterwarnings('ignore')
 
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from feature_pipeline import TicketFeatureTransformer
+from training_cache import FoldMatrixCache, cpu_budget, fit_models_on_cache, set_thread_budget
+from categorical_encoding import build_preprocessor, configure_model, model_encoding
+from hyperparameter_search import (
+    SEARCHABLE_MODELS, CrossValidationObjective, base_estimator, best_params, run_study
+)
+from drift import feature_profile
+
+# Categorías de satisfacción (escala 1-5) para clasificación
+SATISFACTION_BINS = [0, 2.5, 3.5, 5]
+SATISFACTION_LABELS = ['bajo', 'medio', 'alto']
+
 
 class SatisfactionPredictor:
     """Predictor de satisfacción del cliente usando Machine Learning."""
@@ -73,10 +89,16 @@ class SatisfactionPredictor:
         self.random_state = random_state
         self.models = {}
         self.preprocessor = None
+        self.feature_transformer = None
         self.feature_names = None
         self.target_encoder = None
         self.is_fitted = False
         
+        # Referencia para los chequeos de deriva de refresh()
+        self.reference_profile = None
+        self.reference_score = None
+        self.artifact_version = None
+        
         # Configurar logging
         logging.basicConfig(level=logging.INFO)
         self.logger = logging.getLogger(__name__)
@@ -123,119 +145,46 @@ class SatisfactionPredictor:
                 )
             }
     
-    def create_features(self, df: pd.DataFrame) -> pd.DataFrame:
+    def create_features(self, df: pd.DataFrame, fit: bool = False) -> pd.DataFrame:
         """
         Crear características avanzadas para el modelo.
         
+        Las estadísticas por agente/canal y los umbrales de outliers se
+        aprenden una sola vez (fit=True, con codificación del target fuera
+        de fold) y luego se aplican como búsquedas vectorizadas
+        (ver feature_pipeline.TicketFeatureTransformer).
+        
         Args:
             df: DataFrame con datos de tickets
+            fit: Aprender las estadísticas a partir de df (entrenamiento)
             
         Returns:
             DataFrame con características engineered
         """
-        features_df = df.copy()
-        
-        # 1. Características temporales
-        if 'fecha_creacion' in features_df.columns:
-            features_df['fecha_creacion'] = pd.to_datetime(features_df['fecha_creacion'])
-            features_df['hora'] = features_df['fecha_creacion'].dt.hour
-            features_df['dia_semana'] = features_df['fecha_creacion'].dt.dayofweek
-            features_df['mes'] = features_df['fecha_creacion'].dt.month
-            features_df['trimestre'] = features_df['fecha_creacion'].dt.quarter
-            features_df['es_fin_semana'] = (features_df['dia_semana'] >= 5).astype(int)
-            features_df['es_horario_pico'] = (
-                (features_df['hora'].between(9, 11)) | 
-                (features_df['hora'].between(14, 16))
-            ).astype(int)
-        
-        # 2. Características de duración
-        if 'duracion_minutos' in features_df.columns:
-            features_df['duracion_log'] = np.log1p(features_df['duracion_minutos'])
-            features_df['duracion_categoria'] = pd.cut(
-                features_df['duracion_minutos'],
-                bins=[0, 5, 15, 30, np.inf],
-                labels=['rapido', 'normal', 'largo', 'muy_largo']
-            )
-            features_df['es_duracion_extrema'] = (
-                (features_df['duracion_minutos'] < 2) | 
-                (features_df['duracion_minutos'] > 60)
-            ).astype(int)
-        
-        # 3. Características por agente
-        if 'agente_id' in features_df.columns:
-            agente_stats = features_df.groupby('agente_id').agg({
-                'satisfaccion_score': ['mean', 'count', 'std'],
-                'duracion_minutos': 'mean'
-            }).fillna(0)
-            
-            agente_stats.columns = [
-                'agente_satisfaccion_promedio',
-                'agente_total_tickets',
-                'agente_satisfaccion_std',
-                'agente_duracion_promedio'
-            ]
-            
-            features_df = features_df.merge(
-                agente_stats,
-                left_on='agente_id',
-                right_index=True,
-                how='left'
-            )
-        
-        # 4. Características por canal
-        if 'canal' in features_df.columns:
-            canal_stats = features_df.groupby('canal').agg({
-                'satisfaccion_score': 'mean',
-                'duracion_minutos': 'mean'
-            })
-            
-            canal_stats.columns = [
-                'canal_satisfaccion_promedio',
-                'canal_duracion_promedio'
-            ]
-            
-            features_df = features_df.merge(
-                canal_stats,
-                left_on='canal',
-                right_index=True,
-                how='left'
-            )
-        
-        # 5. Características de cliente VIP
-        if 'cliente_vip' in features_df.columns:
-            features_df['cliente_vip_int'] = features_df['cliente_vip'].astype(int)
-        
-        # 6. Características de resolución
-        if 'resolucion' in features_df.columns:
-            features_df['es_resuelto'] = (features_df['resolucion'] == 'resuelto').astype(int)
-            features_df['es_escalado'] = (features_df['resolucion'] == 'escalado').astype(int)
-        
-        # 7. Características de prioridad
-        if 'prioridad' in features_df.columns:
-            prioridad_map = {'baja': 1, 'media': 2, 'alta': 3, 'critica': 4}
-            features_df['prioridad_numerica'] = features_df['prioridad'].map(prioridad_map)
-        
-        # 8. Interacciones entre características
-        if 'canal' in features_df.columns and 'es_fin_semana' in features_df.columns:
-            features_df['canal_fin_semana'] = (
-                features_df['canal'] + '_' + 
-                features_df['es_fin_semana'].astype(str)
-            )
-        
-        # 9. Características estadísticas
-        numeric_cols = features_df.select_dtypes(include=[np.number]).columns
-        for col in numeric_cols:
-            if col not in ['satisfaccion_score']:  # No incluir target
-                Q1 = features_df[col].quantile(0.25)
-                Q3 = features_df[col].quantile(0.75)
-                features_df[f'{col}_es_outlier'] = (
-                    (features_df[col] < Q1 - 1.5*(Q3-Q1)) |
-                    (features_df[col] > Q3 + 1.5*(Q3-Q1))
-                ).astype(int)
+        if fit or self.feature_transformer is None:
+            self.feature_transformer = TicketFeatureTransformer(random_state=self.random_state)
+            features_df = self.feature_transformer.fit_transform(df)
+        else:
+            features_df = self.feature_transformer.transform(df)
         
         self.logger.info(f"Características creadas: {features_df.shape[1]} columnas")
         return features_df
     
+    def transform_features(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Características de predicción con las estadísticas del entrenamiento.
+        
+        Args:
+            df: DataFrame con datos de tickets (sin target)
+            
+        Returns:
+            DataFrame con las columnas usadas en el entrenamiento (feature_names)
+        """
+        if self.feature_transformer is None or self.feature_names is None:
+            raise ValueError("Modelo no entrenado. Ejecutar prepare_data() primero.")
+        features_df = self.feature_transformer.transform(df)
+        return features_df.reindex(columns=self.feature_names)
+    
     def prepare_data(self, df: pd.DataFrame, target_column: str = 'satisfaccion_score') -> Tuple[pd.DataFrame, pd.Series]:
         """
         Preparar datos para entrenamiento.
@@ -247,8 +196,8 @@ class SatisfactionPredictor:
         Returns:
             Tupla (X, y) con características y target
         """
-        # Crear características
-        df_features = self.create_features(df)
+        # Crear características (aprende las estadísticas de entrenamiento)
+        df_features = self.create_features(df, fit=True)
         
         # Separar características y target
         if target_column not in df_features.columns:
@@ -257,6 +206,27 @@ class SatisfactionPredictor:
         y = df_features[target_column].copy()
         
         # Seleccionar características relevantes
+        X = df_features[self.select_feature_columns(df_features)].copy()
+        
+        # Convertir target si es clasificación
+        if self.task_type == 'classification':
+            # Crear categorías de satisfacción
+            if y.min() >= 1 and y.max() <= 5:  # Escala 1-5
+                y_cat = pd.cut(y, bins=SATISFACTION_BINS, labels=SATISFACTION_LABELS)
+                self.target_encoder = LabelEncoder()
+                y = self.target_encoder.fit_transform(y_cat)
+        
+        self.feature_names = X.columns.tolist()
+        self.logger.info(f"Datos preparados: {X.shape[0]} muestras, {X.shape[1]} características")
+        
+        return X, y
+    
+    @staticmethod
+    def select_feature_columns(df_features: pd.DataFrame) -> List[str]:
+        """
+        Columnas de entrenamiento: numéricas seleccionadas y calculadas por
+        agente/canal, seguidas de las categóricas (las que existan).
+        """
         feature_columns = [
             'duracion_minutos', 'duracion_log', 'hora', 'dia_semana', 'mes',
             'es_fin_semana', 'es_horario_pico', 'es_duracion_extrema',
@@ -275,60 +245,35 @@ class SatisfactionPredictor:
         # Filtrar columnas que existen
         existing_numeric = [col for col in feature_columns if col in df_features.columns]
         existing_categorical = [col for col in categorical_features if col in df_features.columns]
-        
-        X = df_features[existing_numeric + existing_categorical].copy()
-        
-        # Convertir target si es clasificación
-        if self.task_type == 'classification':
-            # Crear categorías de satisfacción
-            if y.min() >= 1 and y.max() <= 5:  # Escala 1-5
-                y_cat = pd.cut(y, bins=[0, 2.5, 3.5, 5], labels=['bajo', 'medio', 'alto'])
-                self.target_encoder = LabelEncoder()
-                y = self.target_encoder.fit_transform(y_cat)
-        
-        self.feature_names = X.columns.tolist()
-        self.logger.info(f"Datos preparados: {X.shape[0]} muestras, {X.shape[1]} características")
-        
-        return X, y
+        return existing_numeric + existing_categorical
     
-    def create_preprocessor(self, X: pd.DataFrame) -> ColumnTransformer:
+    def create_preprocessor(self, X: pd.DataFrame, encoding: str = 'dense') -> ColumnTransformer:
         """
         Crear pipeline de preprocesamiento.
         
         Args:
             X: DataFrame con características
+            encoding: 'dense' (one-hot denso float64), 'sparse' (CSR float32)
+                o 'native' (códigos ordinales float32 para categóricas nativas
+                de LightGBM/XGBoost); ver categorical_encoding
             
         Returns:
             Preprocesador configurado
         """
-        # Identificar tipos de columnas
+        numeric_features, categorical_features = self._feature_types(X)
+        return build_preprocessor(numeric_features, categorical_features, encoding)
+    
+    @staticmethod
+    def _feature_types(X: pd.DataFrame) -> Tuple[List[str], List[str]]:
+        """Columnas numéricas y categóricas de X."""
         numeric_features = X.select_dtypes(include=[np.number]).columns.tolist()
         categorical_features = X.select_dtypes(include=['object', 'category']).columns.tolist()
-        
-        # Pipeline para características numéricas
-        numeric_transformer = Pipeline(steps=[
-            ('imputer', SimpleImputer(strategy='median')),
-            ('scaler', StandardScaler())
-        ])
-        
-        # Pipeline para características categóricas
-        categorical_transformer = Pipeline(steps=[
-            ('imputer', SimpleImputer(strategy='constant', fill_value='unknown')),
-            ('onehot', OneHotEncoder(handle_unknown='ignore', sparse_output=False))
-        ])
-        
-        # Combinar transformadores
-        preprocessor = ColumnTransformer(
-            transformers=[
-                ('num', numeric_transformer, numeric_features),
-                ('cat', categorical_transformer, categorical_features)
-            ]
-        )
-        
-        return preprocessor
+        return numeric_features, categorical_features
     
     def train_models(self, X: pd.DataFrame, y: pd.Series, 
-                    test_size: float = 0.2, cv_folds: int = 5) -> Dict:
+                    test_size: float = 0.2, cv_folds: int = 5,
+                    shared_preprocessing: bool = True, n_jobs: Optional[int] = None,
+                    encoding: str = 'dense') -> Dict:
         """
         Entrenar y evaluar múltiples modelos.
         
@@ -337,6 +282,14 @@ class SatisfactionPredictor:
             y: Variable objetivo
             test_size: Proporción de datos para test
             cv_folds: Número de folds para validación cruzada
+            shared_preprocessing: Ajustar el preprocesador una vez por fold y
+                entrenar todos los modelos en paralelo sobre las matrices
+                float32 en caché (training_cache); si es False, un Pipeline
+                con cross_val_score por modelo
+            n_jobs: Núcleos a usar en total (None = todos)
+            encoding: Codificación de características ('dense', 'sparse',
+                'native' o 'auto' = CSR para lineales y RandomForest y
+                categóricas nativas para LightGBM/XGBoost)
             
         Returns:
             Diccionario con resultados de entrenamiento
@@ -347,8 +300,8 @@ class SatisfactionPredictor:
             stratify=y if self.task_type == 'classification' else None
         )
         
-        # Crear preprocesador
-        self.preprocessor = self.create_preprocessor(X_train)
+        # Codificación por modelo
+        encodings = {name: model_encoding(name, encoding) for name in self.models}
         
         # Resultados
         results = {
@@ -362,27 +315,23 @@ class SatisfactionPredictor:
         # Métrica de evaluación
         scoring = 'neg_mean_squared_error' if self.task_type == 'regression' else 'accuracy'
         
-        for model_name, model in self.models.items():
-            self.logger.info(f"Entrenando {model_name}...")
-            
+        if shared_preprocessing:
+            fitted_models = self._train_on_shared_preprocessing(
+                X_train, y_train, X_test, cv_folds, scoring, n_jobs, encodings
+            )
+        else:
+            fitted_models = self._train_with_pipelines(
+                X_train, y_train, cv_folds, scoring, n_jobs, encodings
+            )
+        
+        for model_name, (pipeline, cv_scores, X_test_model) in fitted_models.items():
             try:
-                # Pipeline completo
-                pipeline = Pipeline([
-                    ('preprocessor', self.preprocessor),
-                    ('model', model)
-                ])
-                
-                # Validación cruzada
-                cv_scores = cross_val_score(
-                    pipeline, X_train, y_train, 
-                    cv=cv_folds, scoring=scoring, n_jobs=-1
-                )
-                
-                # Entrenar en todos los datos de entrenamiento
-                pipeline.fit(X_train, y_train)
+                model = pipeline.named_steps['model']
+                if X_test_model is None:
+                    X_test_model = pipeline.named_steps['preprocessor'].transform(X_test)
                 
                 # Predicciones en test
-                y_pred = pipeline.predict(X_test)
+                y_pred = model.predict(X_test_model)
                 
                 # Calcular métricas
                 if self.task_type == 'classification':
@@ -396,7 +345,7 @@ class SatisfactionPredictor:
                     
                     # AUC si es binario
                     if len(np.unique(y)) == 2:
-                        y_pred_proba = pipeline.predict_proba(X_test)[:, 1]
+                        y_pred_proba = model.predict_proba(X_test_model)[:, 1]
                         metrics['auc'] = roc_auc_score(y_test, y_pred_proba)
                 else:
                     test_score = -mean_squared_error(y_test, y_pred)  # Negativo para maximizar
@@ -424,8 +373,8 @@ class SatisfactionPredictor:
                     results['best_model'] = model_name
                 
                 # Feature importance (si disponible)
-                if hasattr(pipeline.named_steps['model'], 'feature_importances_'):
-                    importance = pipeline.named_steps['model'].feature_importances_
+                if hasattr(model, 'feature_importances_'):
+                    importance = model.feature_importances_
                     # Obtener nombres de características después del preprocessing
                     feature_names = self._get_feature_names_after_preprocessing(pipeline)
                     results['feature_importance'][model_name] = dict(zip(feature_names, importance))
@@ -433,11 +382,15 @@ class SatisfactionPredictor:
                 self.logger.info(f"{model_name} - CV: {cv_scores.mean():.4f} (±{cv_scores.std():.4f}), Test: {test_score:.4f}")
                 
             except Exception as e:
-                self.logger.error(f"Error entrenando {model_name}: {e}")
+                self.logger.error(f"Error evaluando {model_name}: {e}")
                 continue
         
         # Marcar como entrenado
         self.is_fitted = True
+        self.trained_models = results['models']
+        self.best_model_name = results['best_model']
+        self.reference_profile = feature_profile(X_train)
+        self.reference_score = results['best_score']
         
         # Guardar datos de test para análisis
         results['X_test'] = X_test
@@ -445,6 +398,131 @@ class SatisfactionPredictor:
         
         return results
     
+    def _encoded_model(self, model_name: str, X: pd.DataFrame, encoding: str):
+        """Clon del modelo configurado para la codificación de su matriz."""
+        numeric_features, categorical_features = self._feature_types(X)
+        return configure_model(model_name, clone(self.models[model_name]), encoding,
+                               len(numeric_features), len(categorical_features))
+    
+    def _train_on_shared_preprocessing(self, X_train: pd.DataFrame, y_train, X_test: pd.DataFrame,
+                                       cv_folds: int, scoring: str, n_jobs: Optional[int],
+                                       encodings: Dict[str, str]) -> Dict[str, Tuple]:
+        """
+        Validación cruzada y ajuste final de todos los modelos sobre matrices
+        preprocesadas una sola vez por fold (una cache por codificación).
+        
+        Returns:
+            {nombre: (pipeline ajustado, scores de CV, test transformado)}
+        """
+        fitted_models = {}
+        for encoding in dict.fromkeys(encodings.values()):
+            models = {name: self._encoded_model(name, X_train, encoding)
+                      for name in encodings if encodings[name] == encoding}
+            cache = FoldMatrixCache.build(
+                self.create_preprocessor(X_train, encoding), X_train, y_train, cv=cv_folds,
+                classifier=self.task_type == 'classification', X_test=X_test, n_jobs=n_jobs
+            )
+            self.preprocessor = cache.preprocessor
+            
+            fitted = fit_models_on_cache(models, cache, y_train, scoring, n_jobs=n_jobs)
+            for model_name, entry in fitted.items():
+                fitted_models[model_name] = (
+                    Pipeline([('preprocessor', cache.preprocessor), ('model', entry['model'])]),
+                    entry['cv_scores'],
+                    cache.X_test
+                )
+        return fitted_models
+    
+    def _train_with_pipelines(self, X_train: pd.DataFrame, y_train, cv_folds: int, scoring: str,
+                              n_jobs: Optional[int], encodings: Dict[str, str]) -> Dict[str, Tuple]:
+        """
+        Un Pipeline por modelo: cross_val_score reajusta el preprocesador en
+        cada fold. Los folds corren en paralelo con modelos de un hilo y el
+        ajuste final usa todo el presupuesto de CPU.
+        
+        Returns:
+            {nombre: (pipeline ajustado, scores de CV, None)}
+        """
+        budget = cpu_budget(n_jobs)
+        fitted = {}
+        for model_name, encoding in encodings.items():
+            self.logger.info(f"Entrenando {model_name}...")
+            
+            try:
+                self.preprocessor = self.create_preprocessor(X_train, encoding)
+                model = self._encoded_model(model_name, X_train, encoding)
+                
+                # Validación cruzada (un hilo por modelo, folds en paralelo)
+                cv_pipeline = Pipeline([
+                    ('preprocessor', self.preprocessor),
+                    ('model', set_thread_budget(clone(model), 1))
+                ])
+                cv_scores = cross_val_score(
+                    cv_pipeline, X_train, y_train, 
+                    cv=cv_folds, scoring=scoring, n_jobs=min(budget, cv_folds)
+                )
+                
+                # Entrenar en todos los datos de entrenamiento
+                pipeline = Pipeline([
+                    ('preprocessor', clone(self.preprocessor)),
+                    ('model', set_thread_budget(model, budget))
+                ])
+                pipeline.fit(X_train, y_train)
+                fitted[model_name] = (pipeline, cv_scores, None)
+                
+            except Exception as e:
+                self.logger.error(f"Error entrenando {model_name}: {e}")
+                continue
+        
+        return fitted
+    
+    def train_from_parquet(self, path: str, method: str = 'lightgbm', batch_size: int = 100_000,
+                           memory_budget_mb: float = 2048, test_size: float = 0.1, **kwargs) -> Dict:
+        """
+        Entrenar sobre un dataset Parquet (particionado) sin cargarlo en memoria.
+        
+        Args:
+            path: Archivo o directorio Parquet con tickets y target
+            method: 'lightgbm' (Dataset construido por lotes), 'sgd'
+                (partial_fit por lote) o 'sample' (muestra estratificada)
+            batch_size: Filas por lote leído
+            memory_budget_mb: Presupuesto de memoria para muestra y holdout
+            test_size: Fracción de tickets reservada para evaluación
+            **kwargs: Opciones de OutOfCoreTrainer.fit
+            
+        Returns:
+            Resultados de entrenamiento con 'memory_report' por etapa
+        """
+        from out_of_core import OutOfCoreTrainer
+        
+        trainer = OutOfCoreTrainer(self, batch_size=batch_size,
+                                   memory_budget_mb=memory_budget_mb, test_size=test_size)
+        results = trainer.fit(path, method=method, **kwargs)
+        self.logger.info(f"Entrenamiento fuera de memoria:\n{trainer.report.to_frame().to_string(index=False)}")
+        return results
+    
+    def refresh(self, new_df: pd.DataFrame, **kwargs) -> Dict:
+        """
+        Actualizar el modelo y las estadísticas por agente/canal sólo con
+        tickets nuevos, o indicar que hace falta reentrenar desde cero.
+        
+        Args:
+            new_df: Tickets nuevos con target
+            **kwargs: Opciones de incremental_refresh.refresh_predictor
+            
+        Returns:
+            Reporte con la acción tomada, deriva y scores
+        """
+        if not self.is_fitted:
+            raise ValueError("Modelo no entrenado. Ejecutar train_models() primero.")
+        
+        from incremental_refresh import refresh_predictor
+        
+        report = refresh_predictor(self, new_df, **kwargs)
+        self.logger.info(f"Actualización ({report['action']}) con {report['rows']} tickets "
+                         f"en {report['seconds']:.2f}s")
+        return report
+    
     def _get_feature_names_after_preprocessing(self, pipeline) -> List[str]:
         """Obtener nombres de características después del preprocessing."""
         try:
@@ -458,7 +536,10 @@ class SatisfactionPredictor:
             categorical_features = []
             if len(preprocessor.transformers_) > 1:
                 cat_transformer = preprocessor.transformers_[1][1]
-                if hasattr(cat_transformer.named_steps['onehot'], 'get_feature_names_out'):
+                if 'onehot' not in cat_transformer.named_steps:
+                    # Codificación nativa: una columna por categórica
+                    categorical_features = list(preprocessor.transformers_[1][2])
+                elif hasattr(cat_transformer.named_steps['onehot'], 'get_feature_names_out'):
                     cat_feature_names = cat_transformer.named_steps['onehot'].get_feature_names_out()
                     categorical_features = cat_feature_names.tolist()
             
@@ -470,70 +551,81 @@ class SatisfactionPredictor:
             return [f'feature_{i}' for i in range(n_features)]
     
     def optimize_hyperparameters(self, X: pd.DataFrame, y: pd.Series, 
-                                model_name: str = 'xgboost', n_trials: int = 100) -> Dict:
+                                model_name: str = 'xgboost', n_trials: int = 100,
+                                cv_folds: int = 3, pruner: Optional[str] = 'median',
+                                early_stopping_rounds: Optional[int] = 50,
+                                storage: Optional[str] = None, study_name: Optional[str] = None,
+                                n_workers: int = 1, n_jobs: Optional[int] = None,
+                                encoding: str = 'dense', timeout: Optional[float] = None) -> Dict:
         """
         Optimizar hiperparámetros usando Optuna.
         
+        El preprocesamiento se calcula una vez por fold para todos los trials;
+        cada trial reporta el score tras cada fold para que el pruner corte los
+        trials malos, y XGBoost/LightGBM usan early stopping sobre una
+        partición interna del entrenamiento de cada fold (ver
+        hyperparameter_search).
+        
         Args:
             X: Características
             y: Variable objetivo
-            model_name: Nombre del modelo a optimizar
-            n_trials: Número de trials para optimización
+            model_name: 'xgboost', 'random_forest' o 'lightgbm'
+            n_trials: Número total de trials (incluye los de ejecuciones
+                anteriores del mismo estudio)
+            cv_folds: Folds de validación cruzada por trial
+            pruner: 'median', 'hyperband' o None
+            early_stopping_rounds: Rondas sin mejora para parar el boosting
+                (None = entrenar todas las rondas)
+            storage: URL RDB local para compartir y reanudar el estudio
+                (p. ej. 'sqlite:///optuna.db')
+            study_name: Nombre del estudio (por defecto según el modelo)
+            n_workers: Procesos que ejecutan trials en paralelo
+            n_jobs: Núcleos a usar en total, repartidos entre workers
+            encoding: Codificación de características (ver create_preprocessor)
+            timeout: Segundos máximos por worker
             
         Returns:
             Mejores parámetros encontrados
         """
-        def objective(trial):
-            # Parámetros específicos por modelo
-            if model_name == 'xgboost':
-                params = {
-                    'n_estimators': trial.suggest_int('n_estimators', 50, 300),
-                    'max_depth': trial.suggest_int('max_depth', 3, 10),
-                    'learning_rate': trial.suggest_float('learning_rate', 0.01, 0.3),
-                    'subsample': trial.suggest_float('subsample', 0.6, 1.0),
-                    'colsample_bytree': trial.suggest_float('colsample_bytree', 0.6, 1.0)
-                }
-                if self.task_type == 'classification':
-                    model = xgb.XGBClassifier(**params, random_state=self.random_state)
-                else:
-                    model = xgb.XGBRegressor(**params, random_state=self.random_state)
-                    
-            elif model_name == 'random_forest':
-                params = {
-                    'n_estimators': trial.suggest_int('n_estimators', 50, 200),
-                    'max_depth': trial.suggest_int('max_depth', 5, 20),
-                    'min_samples_split': trial.suggest_int('min_samples_split', 2, 10),
-                    'min_samples_leaf': trial.suggest_int('min_samples_leaf', 1, 5)
-                }
-                if self.task_type == 'classification':
-                    model = RandomForestClassifier(**params, random_state=self.random_state)
-                else:
-                    model = RandomForestRegressor(**params, random_state=self.random_state)
-            else:
-                raise ValueError(f"Optimización no implementada para {model_name}")
-            
-            # Pipeline con preprocesamiento
-            pipeline = Pipeline([
-                ('preprocessor', self.create_preprocessor(X)),
-                ('model', model)
-            ])
-            
-            # Validación cruzada
-            scoring = 'neg_mean_squared_error' if self.task_type == 'regression' else 'accuracy'
-            scores = cross_val_score(pipeline, X, y, cv=3, scoring=scoring)
-            
-            return scores.mean()
+        from optuna.trial import TrialState
+        
+        if model_name not in SEARCHABLE_MODELS:
+            raise ValueError(f"Optimización no implementada para {model_name}")
+        
+        encoding = model_encoding(model_name, encoding)
+        numeric_features, categorical_features = self._feature_types(X)
+        estimator = configure_model(
+            model_name, base_estimator(model_name, self.task_type, self.random_state),
+            encoding, len(numeric_features), len(categorical_features)
+        )
+        cache = FoldMatrixCache.build(
+            self.create_preprocessor(X, encoding), X, y, cv=cv_folds,
+            classifier=self.task_type == 'classification', n_jobs=n_jobs
+        )
+        
+        scoring = 'neg_mean_squared_error' if self.task_type == 'regression' else 'accuracy'
+        objective = CrossValidationObjective(
+            model_name, estimator, cache, y, scoring,
+            early_stopping_rounds=early_stopping_rounds,
+            n_threads=max(1, cpu_budget(n_jobs) // n_workers),
+            random_state=self.random_state
+        )
         
         # Optimización
-        study = optuna.create_study(direction='maximize')
-        study.optimize(objective, n_trials=n_trials, show_progress_bar=True)
+        study = run_study(objective, n_trials=n_trials, study_name=study_name, storage=storage,
+                          pruner=pruner, n_workers=n_workers, seed=self.random_state,
+                          timeout=timeout)
         
-        self.logger.info(f"Mejores parámetros para {model_name}: {study.best_params}")
-        self.logger.info(f"Mejor score: {study.best_value:.4f}")
+        n_pruned = len(study.get_trials(deepcopy=False, states=(TrialState.PRUNED,)))
+        params = best_params(study)
+        self.logger.info(f"Mejores parámetros para {model_name}: {params}")
+        self.logger.info(f"Mejor score: {study.best_value:.4f} ({n_pruned}/{len(study.trials)} trials podados)")
         
         return {
-            'best_params': study.best_params,
+            'best_params': params,
             'best_score': study.best_value,
+            'best_iteration': study.best_trial.user_attrs.get('best_iteration'),
+            'n_pruned': n_pruned,
             'study': study
         }
     
@@ -631,20 +723,43 @@ class SatisfactionPredictor:
         pipeline = self.trained_models[model_name]['pipeline']
         return pipeline.predict(X)
     
-    def save_model(self, results: Dict, filepath: str) -> None:
+    def save_model(self, results: Optional[Dict], filepath: str, artifact_format: str = 'compact') -> None:
         """
         Guardar modelo entrenado.
         
+        Se guarda el mejor modelo de trained_models, de modo que un predictor
+        cargado o actualizado con refresh() se guarda con su modelo actual.
+        
         Args:
-            results: Resultados del entrenamiento
-            filepath: Ruta donde guardar el modelo
+            results: Resultados del entrenamiento (sólo para las métricas;
+                None en un predictor cargado con load_model)
+            filepath: Ruta donde guardar el modelo (directorio si es compacto)
+            artifact_format: 'compact' (mejor modelo en formato nativo,
+                estadísticas en Arrow y métricas aparte; ver model_artifact)
+                o 'joblib' (archivo único con todo training_results)
         """
+        if not self.is_fitted:
+            raise ValueError("Modelo no entrenado. Ejecutar train_models() primero.")
+        
+        if artifact_format == 'compact':
+            from model_artifact import save_artifact
+            self.artifact_version = save_artifact(self, filepath, results)['artifact_version']
+            self.logger.info(f"Modelo guardado en: {filepath}")
+            return
+        if artifact_format != 'joblib':
+            raise ValueError(f"Formato no soportado: {artifact_format}. Opciones: ('compact', 'joblib')")
+        
         model_data = {
-            'best_model_name': results['best_model'],
-            'best_pipeline': results['models'][results['best_model']]['pipeline'],
+            'best_model_name': self.best_model_name,
+            'best_pipeline': self.trained_models[self.best_model_name]['pipeline'],
             'feature_names': self.feature_names,
+            'feature_transformer': (
+                self.feature_transformer.to_dict() if self.feature_transformer else None
+            ),
             'task_type': self.task_type,
             'target_encoder': self.target_encoder,
+            'reference_profile': self.reference_profile,
+            'reference_score': self.reference_score,
             'training_results': results
         }
         
@@ -652,16 +767,21 @@ class SatisfactionPredictor:
         self.logger.info(f"Modelo guardado en: {filepath}")
     
     @classmethod
-    def load_model(cls, filepath: str) -> 'SatisfactionPredictor':
+    def load_model(cls, filepath: str, verify: bool = False) -> 'SatisfactionPredictor':
         """
         Cargar modelo guardado.
         
         Args:
-            filepath: Ruta del modelo guardado
+            filepath: Ruta del modelo guardado (directorio compacto o archivo joblib)
+            verify: Verificar el SHA-256 de cada archivo del artefacto compacto
             
         Returns:
             Instancia del predictor cargado
         """
+        if os.path.isdir(filepath):
+            from model_artifact import load_artifact
+            return load_artifact(cls, filepath, verify=verify)
+        
         model_data = joblib.load(filepath)
         
         predictor = cls(task_type=model_data['task_type'])
@@ -672,7 +792,13 @@ class SatisfactionPredictor:
             }
         }
         predictor.feature_names = model_data['feature_names']
+        if model_data.get('feature_transformer'):
+            predictor.feature_transformer = TicketFeatureTransformer.from_dict(
+                model_data['feature_transformer']
+            )
         predictor.target_encoder = model_data['target_encoder']
+        predictor.reference_profile = model_data.get('reference_profile')
+        predictor.reference_score = model_data.get('reference_score')
         predictor.is_fitted = True
         
         return predictor
@@ -762,7 +888,7 @@ def main():
     predictor.analyze_feature_importance(results)
     
     # Guardar modelo
-    predictor.save_model(results, 'satisfaction_model.joblib')
+    predictor.save_model(results, 'satisfaction_model')
     print(f"\nModelo guardado exitosamente!")
 
 
@@ -0,0 +1,347 @@
+"""
+Servicio de scoring de baja latencia para SatisfactionPredictor.
+
+predict necesitaba un DataFrame preparado con prepare_data/create_features
+y pasaba por el ColumnTransformer en cada llamada. El servicio:
+- Carga una sola vez un artefacto congelado (save_model/load_model)
+- Acepta un registro (dict), una lista de registros, un DataFrame o una
+  tabla Arrow
+- Calcula las características con el transformador ajustado (búsquedas
+  vectorizadas, sin groupby ni merge); los registros (dict o lista de
+  dicts) van por una ruta rápida que calcula las características y las
+  búsquedas por agente/canal directamente en una fila NumPy, sin DataFrame
+- Aplica el preprocesamiento compilado a operaciones NumPy (mediana,
+  escalado y one-hot por get_indexer) y llama directamente al modelo
+- Registra la latencia de cada llamada y reporta p50/p99
+
+Se puede usar en proceso (ScoringService.score) o como API HTTP local
+(create_app, con FastAPI y uvicorn).
+"""
+
+import os
+import sys
+import time
+import logging
+import argparse
+import threading
+from collections import deque
+from typing import Dict, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+Records = Union[Dict, List[Dict], pd.DataFrame, 'pa.Table', 'pa.RecordBatch']
+
+
+class CompiledPreprocessor:
+    """ColumnTransformer (imputación, escalado y one-hot) compilado a NumPy."""
+
+    def __init__(self, numeric_columns: List[str], medians: np.ndarray, means: np.ndarray,
+                 scales: np.ndarray, categorical_columns: List[str],
+                 categories: List[pd.Index], fill_value: str = 'unknown'):
+        """
+        Args:
+            numeric_columns: Columnas numéricas en orden de salida
+            medians: Valores de imputación de las numéricas
+            means: Medias del StandardScaler
+            scales: Escalas del StandardScaler
+            categorical_columns: Columnas categóricas en orden de salida
+            categories: Categorías del OneHotEncoder por columna
+            fill_value: Valor de imputación de las categóricas
+        """
+        self.numeric_columns = numeric_columns
+        self.medians = medians
+        self.means = means
+        self.scales = scales
+        self.categorical_columns = categorical_columns
+        self.categories = categories
+        self.fill_value = fill_value
+        self.offsets = np.cumsum([0] + [len(index) for index in categories])
+        self.category_positions = [
+            {value: i for i, value in enumerate(index)} for index in categories
+        ]
+
+    @classmethod
+    def from_column_transformer(cls, preprocessor) -> Optional['CompiledPreprocessor']:
+        """
+        Compilar un preprocesador de create_preprocessor.
+
+        Returns:
+            Preprocesador compilado, o None si la estructura no es la esperada
+        """
+        try:
+            transformers = {name: (step, columns)
+                            for name, step, columns in preprocessor.transformers_
+                            if name != 'remainder'}
+            numeric, numeric_columns = transformers['num']
+            categorical, categorical_columns = transformers['cat']
+            imputer = numeric.named_steps['imputer']
+            scaler = numeric.named_steps['scaler']
+            cat_imputer = categorical.named_steps['imputer']
+            onehot = categorical.named_steps['onehot']
+            if (imputer.strategy != 'median' or cat_imputer.strategy != 'constant'
+                    or onehot.handle_unknown != 'ignore' or onehot.drop is not None):
+                return None
+            return cls(
+                list(numeric_columns),
+                np.asarray(imputer.statistics_, dtype=np.float64),
+                np.asarray(scaler.mean_, dtype=np.float64),
+                np.asarray(scaler.scale_, dtype=np.float64),
+                list(categorical_columns),
+                [pd.Index(values, dtype=object) for values in onehot.categories_],
+                cat_imputer.fill_value
+            )
+        except (AttributeError, KeyError, TypeError, ValueError):
+            return None
+
+    def transform(self, features: pd.DataFrame) -> np.ndarray:
+        """
+        Matriz densa equivalente a ColumnTransformer.transform.
+
+        Args:
+            features: DataFrame con las columnas del entrenamiento
+
+        Returns:
+            Arreglo (filas, características) float64
+        """
+        n_rows = len(features)
+        numeric = features[self.numeric_columns].to_numpy(dtype=np.float64, na_value=np.nan)
+        numeric = np.where(np.isnan(numeric), self.medians, numeric)
+        numeric = (numeric - self.means) / self.scales
+
+        onehot = np.zeros((n_rows, self.offsets[-1]), dtype=np.float64)
+        rows = np.arange(n_rows)
+        for j, column in enumerate(self.categorical_columns):
+            values = features[column].astype(object)
+            values = values.where(values.notna(), self.fill_value)
+            codes = self.categories[j].get_indexer(values)
+            known = codes >= 0
+            onehot[rows[known], self.offsets[j] + codes[known]] = 1.0
+
+        return np.hstack([numeric, onehot])
+
+    def transform_records(self, features: List[Dict]) -> np.ndarray:
+        """
+        Matriz densa a partir de características por registro (sin DataFrame).
+
+        Args:
+            features: Diccionarios de TicketFeatureTransformer.record_features
+
+        Returns:
+            Arreglo (registros, características) float64, igual que transform
+        """
+        n_numeric = len(self.numeric_columns)
+        matrix = np.zeros((len(features), n_numeric + self.offsets[-1]), dtype=np.float64)
+        for i, row in enumerate(features):
+            for j, column in enumerate(self.numeric_columns):
+                value = row.get(column)
+                matrix[i, j] = np.nan if value is None or pd.isna(value) else value
+            for j, column in enumerate(self.categorical_columns):
+                value = row.get(column)
+                if value is None or pd.isna(value):
+                    value = self.fill_value
+                position = self.category_positions[j].get(value)
+                if position is not None:
+                    matrix[i, n_numeric + self.offsets[j] + position] = 1.0
+
+        numeric = matrix[:, :n_numeric]
+        numeric[:] = np.where(np.isnan(numeric), self.medians, numeric)
+        numeric -= self.means
+        numeric /= self.scales
+        return matrix
+
+
+class ScoringService:
+    """Servicio en proceso que puntúa tickets con un modelo congelado."""
+
+    def __init__(self, predictor, model_name: Optional[str] = None,
+                 latency_window: int = 10_000):
+        """
+        Inicializar el servicio.
+
+        Args:
+            predictor: SatisfactionPredictor entrenado o cargado con load_model
+            model_name: Modelo a usar (por defecto el mejor)
+            latency_window: Llamadas recientes consideradas en las métricas
+        """
+        if not predictor.is_fitted:
+            raise ValueError("Modelo no entrenado. Ejecutar train_models() primero.")
+
+        self.predictor = predictor
+        self.model_name = model_name or predictor.best_model_name
+        pipeline = predictor.trained_models[self.model_name]['pipeline']
+        self.pipeline = pipeline
+        self.model = pipeline.named_steps['model']
+        self.compiled = CompiledPreprocessor.from_column_transformer(
+            pipeline.named_steps['preprocessor']
+        )
+        self.logger = logging.getLogger(__name__)
+        if self.compiled is None:
+            self.logger.warning("Preprocesador no compilable; se usa el ColumnTransformer")
+
+        self._lock = threading.Lock()
+        self._latencies = deque(maxlen=latency_window)
+        self._requests = 0
+        self._records = 0
+
+    @classmethod
+    def from_artifact(cls, path: str, **kwargs) -> 'ScoringService':
+        """Cargar el artefacto una sola vez y crear el servicio."""
+        from satisfaction_predictor import SatisfactionPredictor
+        return cls(SatisfactionPredictor.load_model(path), **kwargs)
+
+    @staticmethod
+    def _to_frame(records: Records) -> pd.DataFrame:
+        """Normalizar la entrada a DataFrame."""
+        if isinstance(records, pd.DataFrame):
+            return records
+        if isinstance(records, dict):
+            return pd.DataFrame([records])
+        if isinstance(records, list):
+            return pd.DataFrame.from_records(records)
+        if hasattr(records, 'to_pandas'):
+            return records.to_pandas()
+        raise TypeError(f"Entrada no soportada: {type(records).__name__}")
+
+    @staticmethod
+    def _as_record_list(records: Records) -> Optional[List[Dict]]:
+        """Registros para la ruta rápida (dict o lista de dicts con las mismas claves)."""
+        if isinstance(records, dict):
+            return [records]
+        if isinstance(records, list) and records and all(isinstance(r, dict) for r in records):
+            keys = records[0].keys()
+            if all(r.keys() == keys for r in records):
+                return records
+        return None
+
+    def _features_matrix(self, records: Records):
+        """Matriz de entrada del modelo y número de registros."""
+        record_list = self._as_record_list(records) if self.compiled is not None else None
+        if record_list is not None:
+            transformer = self.predictor.feature_transformer
+            features = [transformer.record_features(record) for record in record_list]
+            return self.compiled.transform_records(features), len(features)
+
+        features = self.predictor.transform_features(self._to_frame(records))
+        if self.compiled is not None:
+            return self.compiled.transform(features), len(features)
+        return features, len(features)
+
+    def score(self, records: Records) -> Dict:
+        """
+        Puntuar uno o varios tickets.
+
+        Los registros (dict o lista de dicts) se convierten directamente en
+        la matriz del modelo; DataFrames y tablas Arrow usan las búsquedas
+        vectorizadas de transform_features.
+
+        Args:
+            records: Registro, lista de registros, DataFrame o tabla Arrow
+
+        Returns:
+            Diccionario con predicciones (y etiquetas en clasificación) y
+            latencia de la llamada en milisegundos
+        """
+        start = time.perf_counter()
+
+        matrix, n_records = self._features_matrix(records)
+        if self.compiled is not None:
+            predictions = self.model.predict(matrix)
+        else:
+            predictions = self.pipeline.predict(matrix)
+
+        result = {'predictions': predictions.tolist()}
+        if self.predictor.target_encoder is not None:
+            result['labels'] = self.predictor.target_encoder.inverse_transform(
+                predictions.astype(int)
+            ).tolist()
+
+        latency_ms = (time.perf_counter() - start) * 1000
+        with self._lock:
+            self._latencies.append(latency_ms)
+            self._requests += 1
+            self._records += n_records
+        result['latency_ms'] = latency_ms
+        return result
+
+    def metrics(self) -> Dict:
+        """
+        Métricas de latencia de las llamadas recientes.
+
+        Returns:
+            Diccionario con llamadas, registros y latencias p50/p99/media en ms
+        """
+        with self._lock:
+            latencies = np.array(self._latencies, dtype=np.float64)
+            requests, records = self._requests, self._records
+        if len(latencies) == 0:
+            return {'requests': requests, 'records': records,
+                    'p50_ms': None, 'p99_ms': None, 'mean_ms': None}
+        p50, p99 = np.percentile(latencies, [50, 99])
+        return {
+            'requests': requests,
+            'records': records,
+            'p50_ms': float(p50),
+            'p99_ms': float(p99),
+            'mean_ms': float(latencies.mean())
+        }
+
+    def reset_metrics(self) -> None:
+        """Reiniciar las métricas de latencia."""
+        with self._lock:
+            self._latencies.clear()
+            self._requests = 0
+            self._records = 0
+
+
+def create_app(service: ScoringService):
+    """
+    API HTTP local sobre un ScoringService.
+
+    Endpoints:
+        POST /predict: registro o lista de registros en JSON
+        GET /metrics: latencias p50/p99
+        GET /health: estado y modelo cargado
+
+    Args:
+        service: Servicio a exponer
+
+    Returns:
+        Aplicación FastAPI
+    """
+    from fastapi import Body, FastAPI
+
+    app = FastAPI(title='Satisfaction scoring')
+
+    @app.post('/predict')
+    def predict(records: Union[Dict, List[Dict]] = Body(...)):
+        return service.score(records)
+
+    @app.get('/metrics')
+    def metrics():
+        return service.metrics()
+
+    @app.get('/health')
+    def health():
+        return {'status': 'ok', 'model': service.model_name}
+
+    return app
+
+
+def main():
+    """Servir un artefacto por HTTP local."""
+    parser = argparse.ArgumentParser(description='Servicio de scoring de satisfacción')
+    parser.add_argument('model_path', help='Artefacto guardado con save_model')
+    parser.add_argument('--host', default='127.0.0.1', help='Interfaz de escucha')
+    parser.add_argument('--port', type=int, default=8080, help='Puerto')
+    args = parser.parse_args()
+
+    import uvicorn
+    service = ScoringService.from_artifact(args.model_path)
+    uvicorn.run(create_app(service), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
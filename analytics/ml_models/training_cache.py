@@ -0,0 +1,225 @@
+"""
+Preprocesamiento compartido y entrenamiento paralelo de modelos candidatos.
+
+train_models envolvía el mismo preprocesador en un Pipeline por modelo y
+cross_val_score lo reajustaba en cada fold de cada modelo, más un ajuste
+final por modelo: con 4 modelos y 5 folds, 24 ajustes del imputer, el
+escalador y el one-hot. Además, RandomForest(n_jobs=-1) corría dentro de
+cross_val_score(n_jobs=-1), con más hilos que núcleos.
+
+Este módulo:
+- Ajusta el preprocesador una vez por fold y una vez sobre todo el
+  entrenamiento, y guarda las matrices transformadas como float32 (CSR si
+  el preprocesador produce salida dispersa)
+- Entrena todas las combinaciones (modelo, fold) y los ajustes finales con
+  un único pool de procesos; joblib comparte las matrices grandes con los
+  workers mediante memory-map
+- Reparte un presupuesto de CPU: workers externos x hilos por modelo no
+  supera el número de núcleos asignado
+"""
+
+import os
+import logging
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+from scipy import sparse
+from sklearn.base import clone
+from sklearn.metrics import get_scorer
+from sklearn.model_selection import check_cv
+
+logger = logging.getLogger(__name__)
+
+# Parámetros con los que cada librería fija su número de hilos
+THREAD_PARAMS = ('n_jobs', 'nthread', 'thread_count')
+
+FULL_FIT = -1
+
+
+def cpu_budget(n_jobs: Optional[int] = None) -> int:
+    """
+    Núcleos disponibles para entrenar.
+
+    Args:
+        n_jobs: Núcleos a usar (None o -1 = todos los asignados al proceso)
+
+    Returns:
+        Número de núcleos (al menos 1)
+    """
+    try:
+        available = len(os.sched_getaffinity(0))
+    except AttributeError:
+        available = os.cpu_count() or 1
+    if n_jobs is None or n_jobs < 0:
+        return available
+    return max(1, min(n_jobs, available))
+
+
+def set_thread_budget(estimator, n_threads: int):
+    """Fijar los hilos internos de un estimador (si los expone)."""
+    params = estimator.get_params(deep=False)
+    estimator.set_params(**{name: n_threads for name in THREAD_PARAMS if name in params})
+    return estimator
+
+
+def split_budget(budget: int, n_tasks: int) -> Tuple[int, int]:
+    """
+    Repartir el presupuesto de CPU entre tareas paralelas.
+
+    Returns:
+        Tupla (workers externos, hilos por tarea)
+    """
+    workers = max(1, min(budget, n_tasks))
+    return workers, max(1, budget // workers)
+
+
+def to_float32(matrix):
+    """Matriz transformada como float32 (CSR si es dispersa)."""
+    if sparse.issparse(matrix):
+        return sparse.csr_matrix(matrix, dtype=np.float32)
+    return np.ascontiguousarray(matrix, dtype=np.float32)
+
+
+class FoldMatrixCache:
+    """Matrices preprocesadas por fold, compartidas por todos los modelos."""
+
+    def __init__(self, preprocessor, folds: List[Dict], X_train, X_test=None):
+        """
+        Args:
+            preprocessor: Preprocesador ajustado sobre todo el entrenamiento
+            folds: [{'train_index', 'val_index', 'X_train', 'X_val'}] por fold
+            X_train: Entrenamiento completo transformado
+            X_test: Test transformado con el preprocesador completo
+        """
+        self.preprocessor = preprocessor
+        self.folds = folds
+        self.X_train = X_train
+        self.X_test = X_test
+
+    @classmethod
+    def build(cls, preprocessor, X: pd.DataFrame, y, cv=5, classifier: bool = True,
+              X_test: Optional[pd.DataFrame] = None,
+              n_jobs: Optional[int] = None) -> 'FoldMatrixCache':
+        """
+        Ajustar el preprocesador una vez por fold y sobre todo X.
+
+        Args:
+            preprocessor: Preprocesador sin ajustar (se clona por fold)
+            X: Características de entrenamiento
+            y: Variable objetivo (para los folds estratificados)
+            cv: Número de folds o splitter (mismos folds que cross_val_score)
+            classifier: Usar folds estratificados
+            X_test: Test a transformar con el preprocesador completo
+            n_jobs: Presupuesto de CPU
+
+        Returns:
+            Cache con las matrices float32
+        """
+        splits = list(check_cv(cv, y, classifier=classifier).split(X, y))
+        workers, _ = split_budget(cpu_budget(n_jobs), len(splits) + 1)
+
+        def fit_fold(train_index, val_index):
+            fold_preprocessor = clone(preprocessor)
+            X_fit = to_float32(fold_preprocessor.fit_transform(X.iloc[train_index]))
+            X_val = (to_float32(fold_preprocessor.transform(X.iloc[val_index]))
+                     if val_index is not None else None)
+            return fold_preprocessor, X_fit, X_val
+
+        jobs = [(np.arange(len(X)), None)] + splits
+        fitted = Parallel(n_jobs=workers, prefer='threads')(
+            delayed(fit_fold)(train_index, val_index) for train_index, val_index in jobs
+        )
+
+        full_preprocessor, X_full, _ = fitted[0]
+        folds = [
+            {'train_index': train_index, 'val_index': val_index,
+             'X_train': X_fold_train, 'X_val': X_fold_val}
+            for (train_index, val_index), (_, X_fold_train, X_fold_val) in zip(splits, fitted[1:])
+        ]
+        X_test_matrix = (to_float32(full_preprocessor.transform(X_test))
+                         if X_test is not None else None)
+
+        cache = cls(full_preprocessor, folds, X_full, X_test_matrix)
+        logger.info(f"Cache de preprocesamiento: {len(folds)} folds, {cache.nbytes / 1e6:.1f} MB")
+        return cache
+
+    @property
+    def nbytes(self) -> int:
+        """Memoria ocupada por las matrices en caché."""
+        def size(matrix):
+            if matrix is None:
+                return 0
+            if sparse.issparse(matrix):
+                return matrix.data.nbytes + matrix.indices.nbytes + matrix.indptr.nbytes
+            return matrix.nbytes
+        return (size(self.X_train) + size(self.X_test)
+                + sum(size(fold['X_train']) + size(fold['X_val']) for fold in self.folds))
+
+
+def _fit_task(name: str, estimator, fold: int, X_fit, y_fit, X_val, y_val,
+              scoring: str, n_threads: int):
+    """Entrenar un modelo en un fold (devuelve el score) o en todo el entrenamiento."""
+    from threadpoolctl import threadpool_limits
+
+    model = set_thread_budget(clone(estimator), n_threads)
+    with threadpool_limits(limits=n_threads):
+        model.fit(X_fit, y_fit)
+        if fold == FULL_FIT:
+            return name, fold, model
+        return name, fold, get_scorer(scoring)(model, X_val, y_val)
+
+
+def fit_models_on_cache(models: Dict, cache: FoldMatrixCache, y, scoring: str,
+                        n_jobs: Optional[int] = None) -> Dict[str, Dict]:
+    """
+    Validación cruzada y ajuste final de varios modelos sobre la cache.
+
+    Args:
+        models: {nombre: estimador sin ajustar}
+        cache: Matrices preprocesadas por fold
+        y: Variable objetivo de entrenamiento (alineada con cache.X_train)
+        scoring: Métrica de sklearn para los folds
+        n_jobs: Presupuesto de CPU total
+
+    Returns:
+        {nombre: {'cv_scores': arreglo por fold, 'model': estimador ajustado}};
+        los modelos que fallan se registran y se omiten
+    """
+    y = np.asarray(y)
+    tasks = []
+    for name, estimator in models.items():
+        for index, fold in enumerate(cache.folds):
+            tasks.append((name, estimator, index, fold['X_train'], y[fold['train_index']],
+                          fold['X_val'], y[fold['val_index']]))
+        tasks.append((name, estimator, FULL_FIT, cache.X_train, y, None, None))
+
+    budget = cpu_budget(n_jobs)
+    workers, threads = split_budget(budget, len(tasks))
+    logger.info(f"Entrenando {len(models)} modelos: {len(tasks)} tareas, "
+                f"{workers} workers x {threads} hilos (presupuesto {budget})")
+
+    def safe_task(*task):
+        try:
+            return _fit_task(*task, scoring=scoring, n_threads=threads)
+        except Exception as e:
+            return task[0], task[2], e
+
+    outputs = Parallel(n_jobs=workers)(delayed(safe_task)(*task) for task in tasks)
+
+    fitted: Dict[str, Dict] = {}
+    failed = set()
+    for name, fold, output in outputs:
+        if isinstance(output, Exception):
+            if name not in failed:
+                logger.error(f"Error entrenando {name}: {output}")
+            failed.add(name)
+            continue
+        entry = fitted.setdefault(name, {'cv_scores': np.full(len(cache.folds), np.nan)})
+        if fold == FULL_FIT:
+            entry['model'] = output
+        else:
+            entry['cv_scores'][fold] = output
+
+    return {name: entry for name, entry in fitted.items() if name not in failed}
@@ -0,0 +1,246 @@
+"""
+Artefactos versionados de SentimentAnalyzer.
+
+Un artefacto es un directorio con:
+- manifest.json: idioma, analizadores, patrones de limpieza, umbrales de
+  categorías, backend transformer, versiones de librerías y referencias a
+  modelos locales (ruta relativa, tamaño y SHA-256 de cada archivo)
+- lexicons.json: léxicos del dominio en el mismo formato que
+  lexicons/banking_lexicon.json
+
+La versión del artefacto es el hash de todo su contenido y se incorpora a
+la huella de la caché de resultados: cambiar léxicos, umbrales, patrones o
+pesos de un modelo produce una versión nueva e invalida los resultados
+anteriores. Cargar un artefacto sólo lee los dos JSON; los pesos de los
+modelos se cargan bajo demanda desde las rutas locales referenciadas
+(safetensors se lee con memory-map).
+"""
+
+import os
+import sys
+import json
+import hashlib
+import logging
+from typing import Dict, Iterable, Optional
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from sentiment_cache import config_fingerprint
+
+ARTIFACT_FORMAT = 1
+
+MANIFEST_FILE = 'manifest.json'
+LEXICONS_FILE = 'lexicons.json'
+
+# Librerías cuya versión queda fijada en el artefacto
+TRACKED_PACKAGES = ('vaderSentiment', 'textblob', 'nltk', 'transformers', 'torch', 'onnxruntime')
+
+logger = logging.getLogger(__name__)
+
+
+def package_versions(packages: Iterable[str] = TRACKED_PACKAGES) -> Dict[str, Optional[str]]:
+    """Versiones instaladas de las librerías indicadas (None = no instalada)."""
+    from importlib.metadata import PackageNotFoundError, version
+    versions = {}
+    for package in packages:
+        try:
+            versions[package] = version(package)
+        except PackageNotFoundError:
+            versions[package] = None
+    return versions
+
+
+def file_sha256(path: str, chunk_size: int = 1 << 20) -> str:
+    """SHA-256 de un archivo leído por bloques."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def relative_path(path: str, base_dir: str) -> str:
+    """Ruta relativa a base_dir con separadores '/' (portable entre máquinas)."""
+    return os.path.relpath(os.path.abspath(path), os.path.abspath(base_dir)).replace(os.sep, '/')
+
+
+def resolve_path(path: str, base_dir: str) -> str:
+    """Ruta guardada en un manifiesto resuelta contra base_dir (las absolutas no cambian)."""
+    return os.path.normpath(os.path.join(base_dir, path))
+
+
+def describe_model_dir(path: str, base_dir: str) -> Dict:
+    """
+    Referencia a un modelo local con tamaño y hash de cada archivo.
+
+    Args:
+        path: Directorio del modelo (por ejemplo, guardado con save_pretrained)
+        base_dir: Directorio contra el que se guarda la ruta del modelo
+
+    Returns:
+        Diccionario con la ruta relativa a base_dir y {ruta relativa: {size, sha256}}
+    """
+    if not os.path.isdir(path):
+        raise ValueError(f"El modelo referenciado no es un directorio local: {path}")
+
+    files = {}
+    for root, dirs, names in os.walk(path):
+        dirs[:] = sorted(d for d in dirs if not d.startswith('.'))
+        for name in sorted(names):
+            if name.startswith('.'):
+                continue
+            full_path = os.path.join(root, name)
+            files[os.path.relpath(full_path, path)] = {
+                'size': os.path.getsize(full_path),
+                'sha256': file_sha256(full_path)
+            }
+    return {'path': relative_path(path, base_dir), 'files': files}
+
+
+def verify_model_dir(reference: Dict, check_hashes: bool = False) -> None:
+    """
+    Comprobar que un modelo local coincide con su referencia.
+
+    Args:
+        reference: Referencia producida por describe_model_dir, con la ruta
+            ya resuelta (ver load_manifest)
+        check_hashes: Recalcular SHA-256 (lento en modelos grandes); si no,
+            sólo se comprueban existencia y tamaño
+
+    Raises:
+        ValueError: Si falta un archivo o su contenido cambió
+    """
+    for relative_path, expected in reference['files'].items():
+        full_path = os.path.join(reference['path'], relative_path)
+        if not os.path.exists(full_path):
+            raise ValueError(f"Falta el archivo del modelo: {full_path}")
+        if os.path.getsize(full_path) != expected['size']:
+            raise ValueError(f"El archivo del modelo cambió de tamaño: {full_path}")
+        if check_hashes and file_sha256(full_path) != expected['sha256']:
+            raise ValueError(f"El archivo del modelo cambió de contenido: {full_path}")
+
+
+def _model_name(model: str, base_dir: str) -> str:
+    """Nombre de modelo para el manifiesto: ruta relativa si es local, si no el id del Hub."""
+    return relative_path(model, base_dir) if os.path.isdir(model) else model
+
+
+def save_artifact(analyzer, path: str, model_paths: Optional[Dict[str, str]] = None,
+                  nltk_data_path: Optional[str] = None,
+                  models_root: Optional[str] = None) -> Dict:
+    """
+    Guardar un analizador como artefacto versionado.
+
+    Las rutas locales (modelos y datos de NLTK) se guardan relativas a
+    models_root o, si no se indica, al directorio del artefacto, así que el
+    artefacto sigue siendo válido al copiarlo a otra máquina junto con los
+    modelos. La ruta base no forma parte de la versión.
+
+    Args:
+        analyzer: SentimentAnalyzer a guardar
+        path: Directorio del artefacto
+        model_paths: Modelos locales {'transformer_sentiment' | 'transformer_emotion': ruta};
+            por defecto se referencian los modelos del analizador que sean directorios locales
+        nltk_data_path: Directorio local con los datos de NLTK (punkt, stopwords)
+        models_root: Directorio base de las rutas locales (por defecto path)
+
+    Returns:
+        Manifiesto guardado (incluye 'artifact_version')
+    """
+    base_dir = models_root or path
+    model_paths = dict(model_paths or {})
+    for name, model in [('transformer_sentiment', analyzer.transformer_sentiment_model),
+                        ('transformer_emotion', analyzer.transformer_emotion_model)]:
+        if name not in model_paths and os.path.isdir(model):
+            model_paths[name] = model
+
+    lexicons = {
+        'version': analyzer.lexicon_version,
+        'lexicons': {
+            'banking_positive': dict(analyzer.lexicon_matchers[0].terms),
+            'banking_negative': dict(analyzer.lexicon_matchers[1].terms)
+        }
+    }
+
+    manifest = {
+        'format': ARTIFACT_FORMAT,
+        'language': analyzer.language,
+        'analyzers': list(analyzer.analyzers),
+        'cleaning_patterns': dict(analyzer.cleaning_patterns),
+        'category_thresholds': {
+            name: list(thresholds) for name, thresholds in analyzer.category_thresholds.items()
+        },
+        'transformer': {
+            'backend': analyzer.transformer_backend,
+            'threads': analyzer.transformer_threads,
+            'sentiment_model': _model_name(analyzer.transformer_sentiment_model, base_dir),
+            'emotion_model': _model_name(analyzer.transformer_emotion_model, base_dir)
+        },
+        'models': {
+            name: describe_model_dir(model, base_dir) for name, model in model_paths.items()
+        },
+        'nltk_data_path': relative_path(nltk_data_path, base_dir) if nltk_data_path else None,
+        'packages': package_versions(),
+        'lexicons_sha256': config_fingerprint(lexicons)
+    }
+    manifest['artifact_version'] = config_fingerprint(manifest)
+
+    os.makedirs(path, exist_ok=True)
+    for file_name, payload in [(LEXICONS_FILE, lexicons), (MANIFEST_FILE, manifest)]:
+        tmp_path = os.path.join(path, f'{file_name}.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(payload, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, os.path.join(path, file_name))
+
+    logger.info(f"Artefacto {manifest['artifact_version']} guardado en: {path}")
+    return manifest
+
+
+def load_manifest(path: str, verify_models: bool = False,
+                  models_root: Optional[str] = None) -> Dict:
+    """
+    Leer y validar el manifiesto de un artefacto.
+
+    Args:
+        path: Directorio del artefacto
+        verify_models: Recalcular los SHA-256 de los modelos referenciados
+        models_root: Directorio base de las rutas locales (por defecto path)
+
+    Returns:
+        Manifiesto con 'artifact_version', 'lexicon_path' y las rutas
+        locales resueltas
+
+    Raises:
+        ValueError: Si el artefacto está incompleto, alterado o es de otro formato
+    """
+    with open(os.path.join(path, MANIFEST_FILE), encoding='utf-8') as f:
+        manifest = json.load(f)
+
+    if manifest.get('format') != ARTIFACT_FORMAT:
+        raise ValueError(f"Formato de artefacto no soportado: {manifest.get('format')}")
+
+    stored_version = manifest.pop('artifact_version')
+    if config_fingerprint(manifest) != stored_version:
+        raise ValueError(f"El manifiesto de {path} fue modificado")
+    manifest['artifact_version'] = stored_version
+
+    lexicon_path = os.path.join(path, LEXICONS_FILE)
+    with open(lexicon_path, encoding='utf-8') as f:
+        if config_fingerprint(json.load(f)) != manifest['lexicons_sha256']:
+            raise ValueError(f"Los léxicos de {path} no coinciden con el manifiesto")
+    manifest['lexicon_path'] = lexicon_path
+
+    base_dir = models_root or path
+    for reference in manifest['models'].values():
+        reference['path'] = resolve_path(reference['path'], base_dir)
+        verify_model_dir(reference, check_hashes=verify_models)
+    if manifest['nltk_data_path']:
+        manifest['nltk_data_path'] = resolve_path(manifest['nltk_data_path'], base_dir)
+
+    installed = package_versions()
+    for package, pinned in manifest['packages'].items():
+        if installed.get(package) != pinned:
+            logger.warning(
+                f"{package} instalado ({installed.get(package)}) difiere del artefacto ({pinned}); "
+                "los resultados pueden no ser reproducibles"
+            )
+    return manifest
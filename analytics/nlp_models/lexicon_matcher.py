@@ -0,0 +1,167 @@
+"""
+Búsqueda de términos de léxicos de dominio en una sola pasada.
+
+Los textos se normalizan (minúsculas, sin tildes) y se tokenizan en
+palabras; los términos del léxico se indexan por su primer token, de modo
+que cada texto se recorre una vez con una búsqueda en diccionario por
+token, sin importar el tamaño del léxico:
+- Coincidencia por palabra completa ("error" no coincide en "errores")
+- Frases de varias palabras con prioridad a la coincidencia más larga
+  ("sin problemas" consume "problemas")
+- Pesos por término (un peso 0 neutraliza una frase)
+
+El mismo módulo y el mismo archivo de léxicos se usan en SentimentAnalyzer
+y en el puntaje de comentarios del job de Spark.
+"""
+
+import os
+import re
+import json
+from typing import Dict, Iterable, List, Tuple, Union
+
+import numpy as np
+
+DEFAULT_LEXICON_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), 'lexicons', 'banking_lexicon.json'
+)
+
+# Las tildes se eliminan para que "pesimo" coincida con "pésimo"; la ñ se conserva
+ACCENT_TABLE = str.maketrans('áéíóúüàèìòù', 'aeiouuaeiou')
+TOKEN_PATTERN = re.compile(r'[a-zñ]+')
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Normalizar y separar un texto en palabras.
+
+    Args:
+        text: Texto original
+
+    Returns:
+        Lista de tokens en minúsculas y sin tildes
+    """
+    if not isinstance(text, str):
+        return []
+    return TOKEN_PATTERN.findall(text.lower().translate(ACCENT_TABLE))
+
+
+def parse_lexicons(raw: Dict) -> Dict:
+    """
+    Validar el contenido de un archivo de léxicos.
+
+    Args:
+        raw: JSON con 'version' y 'lexicons' ({nombre: {término: peso}})
+
+    Returns:
+        Diccionario con versión y léxicos con pesos float
+    """
+    if 'version' not in raw or 'lexicons' not in raw:
+        raise ValueError("El archivo de léxicos requiere las claves 'version' y 'lexicons'")
+    return {
+        'version': str(raw['version']),
+        'lexicons': {
+            name: {term: float(weight) for term, weight in terms.items()}
+            for name, terms in raw['lexicons'].items()
+        }
+    }
+
+
+def load_lexicons(path: str = DEFAULT_LEXICON_PATH) -> Dict:
+    """
+    Cargar un archivo de léxicos local.
+
+    Args:
+        path: Ruta del JSON de léxicos
+
+    Returns:
+        Diccionario con versión y léxicos
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        return parse_lexicons(json.load(f))
+
+
+class LexiconMatcher:
+    """Buscador de términos y frases ponderadas con límites de palabra."""
+
+    def __init__(self, terms: Union[Dict[str, float], Iterable[str]]):
+        """
+        Inicializar el buscador.
+
+        Args:
+            terms: Diccionario {término: peso} o lista de términos (peso 1.0)
+        """
+        self.terms = self.weighted_terms(terms)
+
+        # Índice por primer token; frases más largas primero
+        self._index: Dict[str, List[Tuple[Tuple[str, ...], str, float]]] = {}
+        for term, weight in self.terms.items():
+            tokens = tuple(tokenize(term))
+            if not tokens:
+                continue
+            self._index.setdefault(tokens[0], []).append((tokens, term, float(weight)))
+        for candidates in self._index.values():
+            candidates.sort(key=lambda candidate: len(candidate[0]), reverse=True)
+
+    @staticmethod
+    def weighted_terms(terms: Union[Dict[str, float], Iterable[str]]) -> Dict[str, float]:
+        """Convertir una lista de términos o un diccionario a {término: peso}."""
+        if isinstance(terms, dict):
+            return {term: float(weight) for term, weight in terms.items()}
+        return {term: 1.0 for term in terms}
+
+    def find(self, text: str) -> List[Tuple[str, float]]:
+        """
+        Encontrar todas las coincidencias del léxico en un texto.
+
+        Args:
+            text: Texto a analizar
+
+        Returns:
+            Lista de (término, peso) en orden de aparición
+        """
+        return self._match_tokens(tokenize(text))
+
+    def _match_tokens(self, tokens: List[str]) -> List[Tuple[str, float]]:
+        """Recorrer los tokens una vez con coincidencia más larga primero."""
+        hits = []
+        i = 0
+        n_tokens = len(tokens)
+        while i < n_tokens:
+            candidates = self._index.get(tokens[i])
+            step = 1
+            if candidates:
+                for phrase, term, weight in candidates:
+                    length = len(phrase)
+                    if length == 1 or tuple(tokens[i:i + length]) == phrase:
+                        hits.append((term, weight))
+                        step = length
+                        break
+            i += step
+        return hits
+
+    def score(self, text: str) -> float:
+        """
+        Suma de pesos de las coincidencias de un texto.
+
+        Args:
+            text: Texto a analizar
+
+        Returns:
+            Puntaje del texto (0.0 sin coincidencias)
+        """
+        return float(sum(weight for _, weight in self.find(text)))
+
+    def score_many(self, texts: Iterable[str]) -> np.ndarray:
+        """
+        Puntajes de varios textos.
+
+        Args:
+            texts: Textos a analizar
+
+        Returns:
+            Arreglo float64 con la suma de pesos por texto
+        """
+        return np.array(
+            [sum(weight for _, weight in self._match_tokens(tokenize(text))) for text in texts],
+            dtype=np.float64
+        )
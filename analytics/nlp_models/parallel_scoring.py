@@ -0,0 +1,254 @@
+"""
+Ejecución multiproceso del análisis de sentimientos.
+
+VADER y TextBlob son Python puro y usan un solo núcleo. Este módulo reparte
+analyze_dataframe entre un pool de procesos:
+- Cada worker crea su SentimentAnalyzer una sola vez (NLTK y modelos se
+  cargan en el inicializador del proceso, no por tarea)
+- Los textos se publican una vez como buffer Arrow en memoria compartida;
+  cada tarea recibe sólo el rango de filas a procesar
+- Los resultados vuelven como Arrow IPC y se reensamblan en orden
+- Si se piden frecuencias de tokens, cada tarea devuelve su contador
+  (to_dict) y el proceso principal los combina, sin volver a limpiar textos
+"""
+
+import os
+import sys
+import logging
+import multiprocessing as mp
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+import pyarrow as pa
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from token_frequencies import TokenFrequencies
+
+
+# Analizador del proceso worker (uno por proceso)
+_worker_analyzer = None
+_worker_options: Dict = {}
+
+TEXT_FIELD = 'texto'
+
+
+def _init_worker(config: Dict, options: Dict, threads_per_worker: int) -> None:
+    """
+    Inicializar un worker: limitar hilos y crear el analizador una sola vez.
+
+    Args:
+        config: Configuración del analizador (ver SentimentAnalyzer.worker_config)
+        options: Argumentos para analyze_dataframe en el worker
+        threads_per_worker: Hilos de BLAS/PyTorch por proceso
+    """
+    global _worker_analyzer, _worker_options
+
+    # Evitar sobre-suscripción: N procesos x M hilos
+    for var in ['OMP_NUM_THREADS', 'MKL_NUM_THREADS', 'OPENBLAS_NUM_THREADS']:
+        os.environ[var] = str(threads_per_worker)
+
+    from sentiment_analyzer import SentimentAnalyzer
+
+    _worker_analyzer = SentimentAnalyzer.from_worker_config(config)
+    _worker_analyzer.logger.setLevel(logging.WARNING)
+    _worker_options = options
+
+    try:
+        import torch
+        torch.set_num_threads(threads_per_worker)
+    except ImportError:
+        pass
+
+    # Cargar NLTK y modelos aquí y no en la primera tarea del worker
+    _worker_analyzer.preload(options.get('analyzers'))
+
+
+def _attach_shared_memory(name: str) -> shared_memory.SharedMemory:
+    """Abrir un segmento existente sin que el worker lo elimine al salir."""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Python < 3.13: los workers del pool comparten el resource tracker
+        # del proceso principal, que es quien elimina el segmento
+        return shared_memory.SharedMemory(name=name)
+
+
+def _score_chunk(task: Tuple[str, int, int, int, Optional[Dict]]) -> Tuple[bytes, Optional[Dict]]:
+    """
+    Analizar un rango de filas del buffer compartido.
+
+    Args:
+        task: (nombre del segmento, tamaño en bytes, fila inicial, fila final,
+            configuración de TokenFrequencies o None para no contar tokens)
+
+    Returns:
+        Resultados serializados como Arrow IPC y conteos de tokens de la
+        tarea (TokenFrequencies.to_dict) o None
+    """
+    shm_name, size, start, stop, token_config = task
+    shm = _attach_shared_memory(shm_name)
+    try:
+        # Lectura sin copia del buffer; sólo se materializa el rango de la tarea
+        reader = pa.ipc.open_stream(pa.py_buffer(shm.buf[:size]))
+        table = reader.read_all()
+        texts = table.slice(start, stop - start).column(TEXT_FIELD).to_pylist()
+        # Liberar las referencias al segmento antes de cerrarlo
+        del table, reader
+    finally:
+        shm.close()
+
+    token_frequencies = None
+    if token_config is not None:
+        token_frequencies = TokenFrequencies(**token_config)
+
+    chunk_df = pd.DataFrame({TEXT_FIELD: texts})
+    result = _worker_analyzer.analyze_dataframe(
+        chunk_df, TEXT_FIELD, token_frequencies=token_frequencies, **_worker_options
+    )
+    result = result.drop(columns=[TEXT_FIELD])
+
+    sink = pa.BufferOutputStream()
+    result_table = pa.Table.from_pandas(result, preserve_index=False)
+    with pa.ipc.new_stream(sink, result_table.schema) as writer:
+        writer.write_table(result_table)
+    counts = token_frequencies.to_dict() if token_frequencies is not None else None
+    return sink.getvalue().to_pybytes(), counts
+
+
+def _publish_texts(texts: pd.Series) -> Tuple[shared_memory.SharedMemory, int]:
+    """Copiar los textos a un segmento de memoria compartida como Arrow IPC."""
+    table = pa.table({TEXT_FIELD: pa.array(texts.fillna('').astype(str), type=pa.string())})
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    buffer = sink.getvalue()
+
+    shm = shared_memory.SharedMemory(create=True, size=max(buffer.size, 1))
+    shm.buf[:buffer.size] = buffer.to_pybytes()
+    return shm, buffer.size
+
+
+class ParallelScorer:
+    """
+    Pool de procesos reutilizable para analizar varios DataFrames.
+
+    Los workers se crean (y cargan sus modelos) una sola vez; cada llamada a
+    score sólo publica los textos y reparte las tareas. Usar como context
+    manager o llamar a close al terminar.
+    """
+
+    def __init__(self, analyzer, n_workers: int, chunk_size: int = 5000,
+                 threads_per_worker: int = 1, start_method: str = 'spawn',
+                 **options):
+        """
+        Crear el pool de workers.
+
+        Args:
+            analyzer: SentimentAnalyzer del proceso principal (aporta la configuración)
+            n_workers: Número de procesos
+            chunk_size: Filas por tarea
+            threads_per_worker: Hilos de BLAS/PyTorch por proceso
+            start_method: Método de arranque de procesos ('spawn', 'forkserver', 'fork')
+            **options: Argumentos para analyze_dataframe en cada worker
+        """
+        self.analyzer = analyzer
+        self.n_workers = n_workers
+        self.chunk_size = chunk_size
+        ctx = mp.get_context(start_method)
+        self._pool = ctx.Pool(
+            processes=n_workers,
+            initializer=_init_worker,
+            initargs=(analyzer.worker_config(), options, threads_per_worker)
+        )
+
+    def score(self, df: pd.DataFrame, text_column: str,
+              token_frequencies=None) -> pd.DataFrame:
+        """
+        Analizar un DataFrame con los workers del pool.
+
+        Args:
+            df: DataFrame con textos
+            text_column: Nombre de la columna con texto
+            token_frequencies: TokenFrequencies donde combinar los conteos
+                que devuelve cada tarea
+
+        Returns:
+            DataFrame original con las columnas de análisis, en el orden original
+        """
+        n_texts = len(df)
+        self.analyzer.logger.info(
+            f"Analizando {n_texts} textos con {self.n_workers} procesos "
+            f"(tareas de {self.chunk_size} filas)..."
+        )
+
+        token_config = token_frequencies.config() if token_frequencies is not None else None
+        shm, size = _publish_texts(df[text_column])
+        tasks: List[Tuple[str, int, int, int, Optional[Dict]]] = [
+            (shm.name, size, start, min(start + self.chunk_size, n_texts), token_config)
+            for start in range(0, n_texts, self.chunk_size)
+        ]
+
+        try:
+            # imap conserva el orden de las tareas
+            parts = []
+            results = self._pool.imap(_score_chunk, tasks)
+            for done, (payload, counts) in enumerate(results, start=1):
+                parts.append(pa.ipc.open_stream(payload).read_all())
+                if counts is not None:
+                    token_frequencies.merge(TokenFrequencies.from_dict(counts))
+                self.analyzer.logger.info(f"Procesadas {done}/{len(tasks)} tareas")
+        finally:
+            shm.close()
+            shm.unlink()
+
+        if parts:
+            analysis_df = pa.concat_tables(parts, promote_options='default').to_pandas()
+        else:
+            analysis_df = pd.DataFrame()
+        analysis_df.index = df.index
+
+        return pd.concat([df, analysis_df], axis=1)
+
+    def close(self) -> None:
+        """Esperar a que terminen los workers y liberar el pool."""
+        self._pool.close()
+        self._pool.join()
+
+    def __enter__(self) -> 'ParallelScorer':
+        return self
+
+    def __exit__(self, exc_type, exc, traceback) -> None:
+        if exc_type is not None:
+            self._pool.terminate()
+        self.close()
+
+
+def analyze_parallel(analyzer, df: pd.DataFrame, text_column: str,
+                     n_workers: int, chunk_size: int = 5000,
+                     threads_per_worker: int = 1, start_method: str = 'spawn',
+                     token_frequencies=None, **options) -> pd.DataFrame:
+    """
+    Ejecutar analyze_dataframe en un pool de procesos creado para esta llamada.
+
+    Para varias llamadas seguidas (p. ej. lotes de un archivo en streaming)
+    conviene reutilizar un ParallelScorer.
+
+    Args:
+        analyzer: SentimentAnalyzer del proceso principal (aporta la configuración)
+        df: DataFrame con textos
+        text_column: Nombre de la columna con texto
+        n_workers: Número de procesos
+        chunk_size: Filas por tarea
+        threads_per_worker: Hilos de BLAS/PyTorch por proceso
+        start_method: Método de arranque de procesos ('spawn', 'forkserver', 'fork')
+        token_frequencies: TokenFrequencies donde combinar los conteos de los workers
+        **options: Argumentos para analyze_dataframe en cada worker
+
+    Returns:
+        DataFrame original con las columnas de análisis, en el orden original
+    """
+    with ParallelScorer(analyzer, n_workers, chunk_size, threads_per_worker,
+                        start_method, **options) as scorer:
+        return scorer.score(df, text_column, token_frequencies=token_frequencies)
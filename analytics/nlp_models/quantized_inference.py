@@ -0,0 +1,227 @@
+"""
+Inferencia transformer optimizada para CPU.
+
+Alternativas al pipeline de Hugging Face en float32 para los workers sin GPU:
+- 'torch_int8': cuantización dinámica int8 de las capas lineales en PyTorch
+- 'onnx_int8': exportación a ONNX, cuantización dinámica int8 con
+  onnxruntime y ejecución con ONNX Runtime (requiere onnx y onnxruntime)
+
+Ambas ejecutan lotes agrupados por longitud, truncan por tokens (no por
+caracteres) y permiten fijar el número de hilos. La salida imita la del
+pipeline ({'label', 'score'} por texto) para que SentimentAnalyzer pueda
+usarlas de forma intercambiable.
+"""
+
+import os
+import json
+import hashlib
+import inspect
+import logging
+from typing import Dict, List, Optional, Union
+
+import numpy as np
+
+try:
+    import onnxruntime as ort
+    ONNXRUNTIME_AVAILABLE = True
+except ImportError:
+    ONNXRUNTIME_AVAILABLE = False
+
+OPTIMIZED_BACKENDS = ('torch_int8', 'onnx_int8')
+
+DEFAULT_ONNX_CACHE_DIR = os.path.join(
+    os.path.expanduser('~'), '.cache', 'customer_satisfaction', 'onnx'
+)
+
+
+def label_agreement(reference: List[Dict], candidate: List[Dict]) -> float:
+    """
+    Proporción de textos con la misma etiqueta en dos salidas de clasificación.
+
+    Args:
+        reference: Resultados del modelo de referencia
+        candidate: Resultados del modelo optimizado
+
+    Returns:
+        Acuerdo de etiquetas entre 0 y 1
+    """
+    if len(reference) != len(candidate):
+        raise ValueError("Las salidas a comparar deben tener la misma longitud")
+    if not reference:
+        return 1.0
+    matches = sum(ref['label'] == cand['label'] for ref, cand in zip(reference, candidate))
+    return matches / len(reference)
+
+
+def model_revision(model_name: str, model=None) -> str:
+    """
+    Identificador de la versión de los pesos de un modelo.
+
+    Para un directorio local combina ruta relativa, tamaño y fecha de
+    modificación de sus archivos; para un modelo del Hub usa el commit
+    resuelto por transformers. Se usa como clave de la caché ONNX para que
+    reemplazar los pesos obligue a exportar de nuevo.
+
+    Args:
+        model_name: Modelo de Hugging Face (nombre o ruta local)
+        model: Modelo cargado (aporta el commit del Hub)
+
+    Returns:
+        Hash hexadecimal de 16 caracteres
+    """
+    if os.path.isdir(model_name):
+        entries = []
+        for root, _, files in os.walk(model_name):
+            for name in files:
+                path = os.path.join(root, name)
+                stat = os.stat(path)
+                entries.append([os.path.relpath(path, model_name), stat.st_size, stat.st_mtime_ns])
+        payload = json.dumps(sorted(entries))
+    else:
+        commit = getattr(getattr(model, 'config', None), '_commit_hash', None)
+        payload = json.dumps([model_name, commit])
+    return hashlib.blake2b(payload.encode('utf-8'), digest_size=8).hexdigest()
+
+
+class OptimizedSequenceClassifier:
+    """Clasificador de secuencias cuantizado con interfaz compatible con pipeline."""
+
+    def __init__(self, model_name: str, backend: str = 'onnx_int8',
+                 num_threads: Optional[int] = None, max_length: int = 512,
+                 cache_dir: str = DEFAULT_ONNX_CACHE_DIR):
+        """
+        Cargar y cuantizar el modelo.
+
+        Args:
+            model_name: Modelo de Hugging Face (nombre o ruta local)
+            backend: 'torch_int8' u 'onnx_int8'
+            num_threads: Hilos de inferencia (None = valor por defecto de la librería)
+            max_length: Máximo de tokens por texto
+            cache_dir: Directorio para los modelos ONNX exportados (uno por
+                versión de los pesos, ver model_revision)
+        """
+        if backend not in OPTIMIZED_BACKENDS:
+            raise ValueError(f"Backend desconocido: {backend}. Disponibles: {OPTIMIZED_BACKENDS}")
+        if backend == 'onnx_int8' and not ONNXRUNTIME_AVAILABLE:
+            raise ImportError("onnxruntime no disponible. Usar pip install onnxruntime onnx")
+
+        import torch
+        from transformers import AutoTokenizer, AutoModelForSequenceClassification
+
+        self.model_name = model_name
+        self.backend = backend
+        self.num_threads = num_threads
+        self.max_length = max_length
+        self.logger = logging.getLogger(__name__)
+
+        if num_threads:
+            torch.set_num_threads(num_threads)
+
+        self.tokenizer = AutoTokenizer.from_pretrained(model_name)
+        model = AutoModelForSequenceClassification.from_pretrained(model_name).eval()
+        self.id2label = model.config.id2label
+
+        if backend == 'torch_int8':
+            self.model = torch.ao.quantization.quantize_dynamic(
+                model, {torch.nn.Linear}, dtype=torch.qint8
+            )
+            self.session = None
+        else:
+            self.model = None
+            self.session = self._build_onnx_session(model, cache_dir)
+
+        self.logger.info(f"Modelo {model_name} cargado con backend {backend}")
+
+    def _build_onnx_session(self, model, cache_dir: str):
+        """Exportar (una sola vez) el modelo a ONNX int8 y abrir la sesión."""
+        model_dir = os.path.join(
+            cache_dir, self.model_name.strip('/').replace('/', '--'),
+            model_revision(self.model_name, model)
+        )
+        fp32_path = os.path.join(model_dir, 'model.onnx')
+        int8_path = os.path.join(model_dir, 'model.int8.onnx')
+
+        if not os.path.exists(int8_path):
+            from onnxruntime.quantization import QuantType, quantize_dynamic
+
+            os.makedirs(model_dir, exist_ok=True)
+            self._export_onnx(model, fp32_path)
+            quantize_dynamic(fp32_path, int8_path, weight_type=QuantType.QInt8)
+            self.logger.info(f"Modelo ONNX int8 exportado en: {int8_path}")
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        options.intra_op_num_threads = self.num_threads or 0
+        options.inter_op_num_threads = 1
+        session = ort.InferenceSession(int8_path, options, providers=['CPUExecutionProvider'])
+        self._onnx_inputs = [node.name for node in session.get_inputs()]
+        return session
+
+    def _export_onnx(self, model, path: str) -> None:
+        """Exportar el modelo PyTorch a ONNX con ejes dinámicos de lote y secuencia."""
+        import torch
+
+        sample = self.tokenizer(["texto de ejemplo"], return_tensors='pt')
+        input_names = [name for name in ('input_ids', 'attention_mask', 'token_type_ids')
+                       if name in sample]
+        dynamic_axes = {name: {0: 'batch', 1: 'sequence'} for name in input_names}
+        dynamic_axes['logits'] = {0: 'batch'}
+
+        # Exportador por trazado; 'dynamo' sólo existe desde torch 2.5
+        export_options = {}
+        if 'dynamo' in inspect.signature(torch.onnx.export).parameters:
+            export_options['dynamo'] = False
+
+        with torch.no_grad():
+            torch.onnx.export(
+                model, tuple(sample[name] for name in input_names), path,
+                input_names=input_names, output_names=['logits'],
+                dynamic_axes=dynamic_axes, opset_version=17, **export_options
+            )
+
+    def _logits(self, texts: List[str], max_length: int) -> np.ndarray:
+        """Tokenizar un lote (truncando por tokens) y obtener los logits."""
+        if self.session is not None:
+            encoded = self.tokenizer(texts, truncation=True, max_length=max_length,
+                                     padding=True, return_tensors='np')
+            feeds = {name: encoded[name].astype(np.int64) for name in self._onnx_inputs}
+            return self.session.run(['logits'], feeds)[0]
+
+        import torch
+        encoded = self.tokenizer(texts, truncation=True, max_length=max_length,
+                                 padding=True, return_tensors='pt')
+        with torch.inference_mode():
+            return self.model(**encoded).logits.numpy()
+
+    def __call__(self, texts: Union[str, List[str]], batch_size: int = 32,
+                 truncation: bool = True, max_length: Optional[int] = None,
+                 **kwargs) -> List[Dict]:
+        """
+        Clasificar textos con la misma salida que un pipeline de Hugging Face.
+
+        Args:
+            texts: Texto o lista de textos
+            batch_size: Textos por lote de inferencia
+            truncation: Se acepta por compatibilidad; siempre se trunca por tokens
+            max_length: Máximo de tokens (por defecto el del constructor)
+
+        Returns:
+            Lista de {'label', 'score'} en el orden de entrada
+        """
+        if isinstance(texts, str):
+            texts = [texts]
+        max_length = max_length or self.max_length
+
+        results: List[Optional[Dict]] = [None] * len(texts)
+        # Lotes por longitud para reducir padding
+        order = np.argsort([len(text) for text in texts], kind='stable')
+        for start in range(0, len(order), batch_size):
+            batch = order[start:start + batch_size]
+            logits = self._logits([texts[i] for i in batch], max_length)
+            logits = logits - logits.max(axis=1, keepdims=True)
+            probabilities = np.exp(logits)
+            probabilities /= probabilities.sum(axis=1, keepdims=True)
+            labels = probabilities.argmax(axis=1)
+            for i, label, row in zip(batch, labels, probabilities):
+                results[i] = {'label': self.id2label[int(label)], 'score': float(row[label])}
+        return results
@@ -6,139 +6,319 @@ Este módulo proporciona análisis de sentimientos usando múltiples técnicas:
 - TextBlob
 - Transformers (BERT, RoBERTa)
 - Análisis de emociones
+
+Las librerías de cada backend (NLTK, VADER, TextBlob, transformers,
+matplotlib, wordcloud) se importan y cargan sólo la primera vez que se
+usan, de modo que importar el módulo y crear el analizador es inmediato.
 """
 
 import pandas as pd
 import numpy as np
-from typing import Dict, List, Tuple, Optional
-import re
+from typing import Dict, List, Tuple, Optional, Sequence
+import os
+import sys
 import logging
+import importlib.util
+from functools import lru_cache
 from datetime import datetime
 import warnings
 warnings.filterwarnings('ignore')
 
-# NLP Libraries
-import nltk
-from nltk.corpus import stopwords
-from nltk.tokenize import word_tokenize, sent_tokenize
-from nltk.stem import SnowballStemmer
-
-# Sentiment Analysis
-from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
-from textblob import TextBlob
-
-# Advanced NLP
-try:
-    from transformers import pipeline, AutoTokenizer, AutoModelForSequenceClassification
-    TRANSFORMERS_AVAILABLE = True
-except ImportError:
-    TRANSFORMERS_AVAILABLE = False
+# Advanced NLP (se detecta sin importar; la carga es diferida)
+TRANSFORMERS_AVAILABLE = importlib.util.find_spec('transformers') is not None
+if not TRANSFORMERS_AVAILABLE:
     logging.warning("Transformers no disponible. Usar pip install transformers")
 
-# Visualization
-import matplotlib.pyplot as plt
-import seaborn as sns
-import plotly.graph_objects as go
-import plotly.express as px
-from wordcloud import WordCloud
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from sentiment_cache import SentimentResultCache, config_fingerprint
+from text_cleaning import DEFAULT_CLEANING_PATTERNS, TextCleaner
+from lexicon_matcher import DEFAULT_LEXICON_PATH, LexiconMatcher, load_lexicons
+
 
-# Machine Learning
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.model_selection import train_test_split
-from sklearn.linear_model import LogisticRegression
-from sklearn.metrics import classification_report, confusion_matrix
-import joblib
+@lru_cache(maxsize=None)
+def _package_version(package: str) -> str:
+    """Versión instalada de una librería (consultada una vez por proceso)."""
+    try:
+        from importlib.metadata import version
+        return version(package)
+    except Exception:
+        return 'desconocida'
 
 
 class SentimentAnalyzer:
     """Analizador de sentimientos multimodal para textos de clientes."""
     
-    def __init__(self, language: str = 'spanish'):
+    # Analizadores disponibles en el motor por lotes
+    ANALYZERS = ('features', 'vader', 'textblob', 'transformer')
+    
+    # Columnas producidas por cada analizador (sin el prefijo 'sentiment_')
+    ANALYZER_COLUMNS = {
+        'features': [
+            'length', 'word_count', 'sentence_count', 'avg_word_length',
+            'exclamation_count', 'question_count', 'uppercase_ratio',
+            'positive_words', 'negative_words'
+        ],
+        'vader': [
+            'vader_compound', 'vader_positive', 'vader_neutral',
+            'vader_negative', 'vader_category'
+        ],
+        'textblob': [
+            'textblob_polarity', 'textblob_subjectivity', 'textblob_category'
+        ],
+        'transformer': [
+            'transformer_sentiment_label', 'transformer_sentiment_score',
+            'transformer_emotion_label', 'transformer_emotion_score'
+        ]
+    }
+    
+    # Modelos transformer usados por defecto
+    TRANSFORMER_SENTIMENT_MODEL = "nlptown/bert-base-multilingual-uncased-sentiment"
+    TRANSFORMER_EMOTION_MODEL = "j-hartmann/emotion-english-distilroberta-base"
+    
+    # Backends de inferencia del modelo de sentimientos (ver quantized_inference)
+    TRANSFORMER_BACKENDS = ('pytorch', 'torch_int8', 'onnx_int8')
+    
+    # Máximo de tokens por texto en los modelos transformer
+    TRANSFORMER_MAX_LENGTH = 512
+    
+    # Umbrales (positivo, negativo) para categorizar los scores
+    CATEGORY_THRESHOLDS = {
+        'vader': (0.05, -0.05),
+        'textblob': (0.1, -0.1)
+    }
+    
+    # Librería que define la versión de cada analizador cacheable
+    ANALYZER_PACKAGES = {
+        'vader': 'vaderSentiment',
+        'textblob': 'textblob',
+        'transformer': 'transformers'
+    }
+    
+    def __init__(self, language: str = 'spanish', cache_path: Optional[str] = None,
+                 cache_memory_items: int = 100_000, lexicon_path: str = DEFAULT_LEXICON_PATH,
+                 analyzers: Optional[List[str]] = None,
+                 transformer_backend: str = 'pytorch',
+                 transformer_threads: Optional[int] = None,
+                 transformer_model: Optional[str] = None):
         """
         Inicializar el analizador de sentimientos.
         
+        Los modelos no se cargan aquí: cada backend se construye la primera
+        vez que se usa (ver preload para cargarlos por adelantado).
+        
         Args:
             language: Idioma para el análisis ('spanish' o 'english')
+            cache_path: Archivo SQLite para persistir resultados entre ejecuciones
+            cache_memory_items: Entradas máximas de la caché LRU en memoria
+            lexicon_path: Archivo JSON con los léxicos ponderados del dominio
+            analyzers: Backends a ejecutar por defecto (ver ANALYZERS; None = todos)
+            transformer_backend: Inferencia del modelo de sentimientos ('pytorch',
+                'torch_int8' u 'onnx_int8', ver TRANSFORMER_BACKENDS)
+            transformer_threads: Hilos de inferencia transformer (None = por defecto)
+            transformer_model: Modelo de sentimientos (por defecto TRANSFORMER_SENTIMENT_MODEL)
         """
         self.language = language
         self.logger = logging.getLogger(__name__)
+        self.cache_path = cache_path
+        self.cache_memory_items = cache_memory_items
+        self.result_cache = SentimentResultCache(cache_path, cache_memory_items)
         
         # Configurar logging
         logging.basicConfig(level=logging.INFO)
         
-        # Inicializar componentes
-        self._setup_nltk()
-        self._setup_analyzers()
-        
-        # Patrones para cleaning
-        self.cleaning_patterns = {
-            'email': r'\S+@\S+',
-            'url': r'http\S+|www\S+',
-            'mention': r'@\w+',
-            'hashtag': r'#\w+',
-            'special_chars': r'[^a-zA-ZáéíóúñüÁÉÍÓÚÑÜ\s]',
-            'multiple_spaces': r'\s+',
-            'numbers': r'\d+'
-        }
-        
-        # Palabras específicas del dominio bancario
-        self.banking_positive_words = [
-            'excelente', 'rápido', 'eficiente', 'profesional', 'amable',
-            'resuelto', 'satisfecho', 'recomiendo', 'fácil', 'conveniente'
-        ]
-        
-        self.banking_negative_words = [
-            'lento', 'complicado', 'problema', 'error', 'demora',
-            'malo', 'terrible', 'pésimo', 'frustrado', 'molesto'
-        ]
+        # Backends seleccionados; se construyen bajo demanda
+        self.analyzers = self._resolve_analyzers(analyzers)
+        self._backends: Dict = {}
+        self._backend_errors: Dict[str, Exception] = {}
+        
+        if transformer_backend not in self.TRANSFORMER_BACKENDS:
+            raise ValueError(
+                f"Backend transformer desconocido: {transformer_backend}. "
+                f"Disponibles: {self.TRANSFORMER_BACKENDS}"
+            )
+        self.transformer_backend = transformer_backend
+        self.transformer_threads = transformer_threads
+        self.transformer_sentiment_model = transformer_model or self.TRANSFORMER_SENTIMENT_MODEL
+        self.transformer_emotion_model = self.TRANSFORMER_EMOTION_MODEL
+        
+        # Calibración de categorías y artefacto de origen (ver save_model/load_model)
+        self.category_thresholds = dict(self.CATEGORY_THRESHOLDS)
+        self.artifact_version: Optional[str] = None
+        self.nltk_data_path: Optional[str] = None
+        
+        # Patrones para cleaning (se compilan en TextCleaner)
+        self.cleaning_patterns = dict(DEFAULT_CLEANING_PATTERNS)
+        self._text_cleaner = TextCleaner(self.cleaning_patterns)
+        
+        # Léxicos ponderados del dominio bancario (compartidos con el job de Spark)
+        self.lexicon_path = lexicon_path
+        lexicons = load_lexicons(lexicon_path)
+        self.lexicon_version = lexicons['version']
+        self.banking_positive_words = lexicons['lexicons']['banking_positive']
+        self.banking_negative_words = lexicons['lexicons']['banking_negative']
+        self._lexicon_matchers = None
+        self._fingerprints: Dict[str, Tuple] = {}
     
-    def _setup_nltk(self):
-        """Configurar recursos de NLTK."""
+    def _ensure_nltk_resource(self, resource: str, path: str) -> None:
+        """Descargar un recurso de NLTK sólo si no está instalado."""
+        import nltk
+        if self.nltk_data_path and self.nltk_data_path not in nltk.data.path:
+            nltk.data.path.insert(0, self.nltk_data_path)
         try:
-            # Descargar recursos necesarios
-            nltk.download('punkt', quiet=True)
-            nltk.download('stopwords', quiet=True)
-            nltk.download('vader_lexicon', quiet=True)
-            
-            # Configurar stopwords
-            if self.language == 'spanish':
-                self.stop_words = set(stopwords.words('spanish'))
-                self.stemmer = SnowballStemmer('spanish')
-            else:
-                self.stop_words = set(stopwords.words('english'))
-                self.stemmer = SnowballStemmer('english')
-                
-            self.logger.info("NLTK configurado correctamente")
-            
-        except Exception as e:
-            self.logger.error(f"Error configurando NLTK: {e}")
+            nltk.data.find(path)
+        except LookupError:
+            nltk.download(resource, quiet=True)
     
-    def _setup_analyzers(self):
-        """Configurar analizadores de sentimientos."""
-        try:
-            # VADER
-            self.vader_analyzer = SentimentIntensityAnalyzer()
-            
-            # Transformers (si está disponible)
-            if TRANSFORMERS_AVAILABLE:
-                # Modelo en español para análisis de sentimientos
-                self.transformer_sentiment = pipeline(
-                    "sentiment-analysis",
-                    model="nlptown/bert-base-multilingual-uncased-sentiment",
-                    tokenizer="nlptown/bert-base-multilingual-uncased-sentiment"
-                )
+    def _backend(self, name: str):
+        """
+        Obtener un backend, construyéndolo la primera vez que se usa.
+        
+        Args:
+            name: Nombre del backend ('vader', 'textblob', 'sentence_tokenizer',
+                'stopwords', 'transformer_sentiment', 'transformer_emotion')
                 
-                # Modelo para análisis de emociones
-                self.transformer_emotion = pipeline(
-                    "text-classification",
-                    model="j-hartmann/emotion-english-distilroberta-base",
-                    tokenizer="j-hartmann/emotion-english-distilroberta-base"
-                )
-            
-            self.logger.info("Analizadores configurados correctamente")
+        Returns:
+            Objeto del backend
+        """
+        if name not in self._backends:
+            # Un backend que falló no se reintenta en cada texto
+            if name in self._backend_errors:
+                raise self._backend_errors[name]
+            try:
+                self._backends[name] = getattr(self, f'_load_{name}')()
+            except Exception as e:
+                self._backend_errors[name] = e
+                self.logger.error(f"Error cargando backend '{name}': {e}")
+                raise
+            self.logger.info(f"Backend '{name}' cargado")
+        return self._backends[name]
+    
+    def _load_vader(self):
+        """Construir el analizador VADER."""
+        from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+        return SentimentIntensityAnalyzer()
+    
+    def _load_textblob(self):
+        """Construir el analizador de TextBlob (reutilizable entre textos)."""
+        from textblob.sentiments import PatternAnalyzer
+        return PatternAnalyzer()
+    
+    def _load_sentence_tokenizer(self):
+        """Preparar el tokenizador de oraciones de NLTK (punkt/punkt_tab)."""
+        from nltk.tokenize import sent_tokenize
+        # NLTK >= 3.9 usa punkt_tab; versiones anteriores usan punkt
+        self._ensure_nltk_resource('punkt_tab', 'tokenizers/punkt_tab')
+        self._ensure_nltk_resource('punkt', 'tokenizers/punkt')
+        return sent_tokenize
+    
+    def _load_stopwords(self):
+        """Cargar stopwords y stemmer del idioma."""
+        from nltk.corpus import stopwords
+        from nltk.stem import SnowballStemmer
+        self._ensure_nltk_resource('stopwords', 'corpora/stopwords')
+        language = 'spanish' if self.language == 'spanish' else 'english'
+        return set(stopwords.words(language)), SnowballStemmer(language)
+    
+    def _load_transformer_sentiment(self):
+        """Construir el modelo de sentimientos con el backend configurado."""
+        if self.transformer_backend == 'pytorch':
+            return self._build_sentiment_pipeline()
+        
+        from quantized_inference import OptimizedSequenceClassifier
+        return OptimizedSequenceClassifier(
+            self.transformer_sentiment_model,
+            backend=self.transformer_backend,
+            num_threads=self.transformer_threads,
+            max_length=self.TRANSFORMER_MAX_LENGTH
+        )
+    
+    def _build_sentiment_pipeline(self):
+        """Pipeline de referencia en float32 de Hugging Face."""
+        from transformers import pipeline
+        if self.transformer_threads:
+            import torch
+            torch.set_num_threads(self.transformer_threads)
+        return pipeline(
+            "sentiment-analysis",
+            model=self.transformer_sentiment_model,
+            tokenizer=self.transformer_sentiment_model
+        )
+    
+    def _load_transformer_emotion(self):
+        """Construir el pipeline transformer de emociones."""
+        from transformers import pipeline
+        return pipeline(
+            "text-classification",
+            model=self.transformer_emotion_model,
+            tokenizer=self.transformer_emotion_model
+        )
+    
+    @property
+    def vader_analyzer(self):
+        """Analizador VADER (carga diferida)."""
+        return self._backend('vader')
+    
+    @property
+    def textblob_analyzer(self):
+        """Analizador de TextBlob (carga diferida)."""
+        return self._backend('textblob')
+    
+    @property
+    def transformer_sentiment(self):
+        """Pipeline de sentimientos (carga diferida)."""
+        return self._backend('transformer_sentiment')
+    
+    @property
+    def transformer_emotion(self):
+        """Pipeline de emociones (carga diferida, sólo se usa en inglés)."""
+        return self._backend('transformer_emotion')
+    
+    @property
+    def stop_words(self) -> set:
+        """Stopwords del idioma (carga diferida)."""
+        return self._backend('stopwords')[0]
+    
+    @property
+    def stemmer(self):
+        """Stemmer Snowball del idioma (carga diferida)."""
+        return self._backend('stopwords')[1]
+    
+    def sent_tokenize(self, text: str) -> List[str]:
+        """Separar un texto en oraciones con NLTK (carga diferida)."""
+        return self._backend('sentence_tokenizer')(text)
+    
+    def preload(self, analyzers: Optional[List[str]] = None) -> List[str]:
+        """
+        Cargar por adelantado los backends de los analizadores indicados.
+        
+        Útil en servicios de larga vida para no pagar la carga en la primera
+        petición.
+        
+        Args:
+            analyzers: Analizadores a cargar (por defecto los seleccionados)
             
-        except Exception as e:
-            self.logger.error(f"Error configurando analizadores: {e}")
+        Returns:
+            Backends cargados
+        """
+        required = {
+            'features': ['sentence_tokenizer'],
+            'vader': ['vader'],
+            'textblob': ['textblob'],
+            'transformer': ['transformer_sentiment'] + (
+                ['transformer_emotion'] if self.language == 'english' else []
+            )
+        }
+        for analyzer in self._resolve_analyzers(analyzers or self.analyzers):
+            for backend in required[analyzer]:
+                try:
+                    self._backend(backend)
+                except Exception:
+                    pass
+        return self.loaded_backends()
+    
+    def loaded_backends(self) -> List[str]:
+        """Backends construidos hasta el momento."""
+        return sorted(self._backends)
     
     def clean_text(self, text: str) -> str:
         """
@@ -150,23 +330,25 @@ class SentimentAnalyzer:
         Returns:
             Texto limpio
         """
-        if not isinstance(text, str):
-            return ""
-        
-        # Convertir a minúsculas
-        text = text.lower()
-        
-        # Aplicar patrones de limpieza
-        for pattern_name, pattern in self.cleaning_patterns.items():
-            if pattern_name == 'multiple_spaces':
-                text = re.sub(pattern, ' ', text)
-            else:
-                text = re.sub(pattern, '', text)
-        
-        # Eliminar espacios extra
-        text = text.strip()
-        
-        return text
+        return self.text_cleaner.clean(text)
+    
+    @property
+    def text_cleaner(self) -> TextCleaner:
+        """Limpiador compilado, reconstruido si cambian los patrones."""
+        if self._text_cleaner.patterns != self.cleaning_patterns:
+            self._text_cleaner = TextCleaner(self.cleaning_patterns)
+        return self._text_cleaner
+    
+    @property
+    def lexicon_matchers(self) -> Tuple[LexiconMatcher, LexiconMatcher]:
+        """Buscadores de léxico positivo y negativo, reconstruidos si cambian los términos."""
+        positive = LexiconMatcher.weighted_terms(self.banking_positive_words)
+        negative = LexiconMatcher.weighted_terms(self.banking_negative_words)
+        if (self._lexicon_matchers is None
+                or self._lexicon_matchers[0].terms != positive
+                or self._lexicon_matchers[1].terms != negative):
+            self._lexicon_matchers = (LexiconMatcher(positive), LexiconMatcher(negative))
+        return self._lexicon_matchers
     
     def extract_features(self, text: str) -> Dict:
         """
@@ -183,7 +365,7 @@ class SentimentAnalyzer:
         # Características básicas
         features['length'] = len(text)
         features['word_count'] = len(text.split())
-        features['sentence_count'] = len(sent_tokenize(text))
+        features['sentence_count'] = len(self.sent_tokenize(text))
         features['avg_word_length'] = np.mean([len(word) for word in text.split()])
         
         # Conteos de puntuación
@@ -192,9 +374,9 @@ class SentimentAnalyzer:
         features['uppercase_ratio'] = sum(1 for c in text if c.isupper()) / len(text) if text else 0
         
         # Palabras específicas del dominio
-        text_lower = text.lower()
-        features['positive_words'] = sum(1 for word in self.banking_positive_words if word in text_lower)
-        features['negative_words'] = sum(1 for word in self.banking_negative_words if word in text_lower)
+        positive_matcher, negative_matcher = self.lexicon_matchers
+        features['positive_words'] = positive_matcher.score(text)
+        features['negative_words'] = negative_matcher.score(text)
         
         return features
     
@@ -211,9 +393,10 @@ class SentimentAnalyzer:
         scores = self.vader_analyzer.polarity_scores(text)
         
         # Categorizar sentimiento
-        if scores['compound'] >= 0.05:
+        positive, negative = self.category_thresholds['vader']
+        if scores['compound'] >= positive:
             category = 'positivo'
-        elif scores['compound'] <= -0.05:
+        elif scores['compound'] <= negative:
             category = 'negativo'
         else:
             category = 'neutro'
@@ -236,13 +419,15 @@ class SentimentAnalyzer:
         Returns:
             Diccionario con scores TextBlob
         """
+        from textblob import TextBlob
         blob = TextBlob(text)
         
         # Categorizar sentimiento
         polarity = blob.sentiment.polarity
-        if polarity > 0.1:
+        positive, negative = self.category_thresholds['textblob']
+        if polarity > positive:
             category = 'positivo'
-        elif polarity < -0.1:
+        elif polarity < negative:
             category = 'negativo'
         else:
             category = 'neutro'
@@ -267,18 +452,20 @@ class SentimentAnalyzer:
             return {}
         
         try:
-            # Truncar texto si es muy largo
-            max_length = 512
-            if len(text) > max_length:
-                text = text[:max_length]
+            # Truncar por tokens (no por caracteres)
+            max_length = self.TRANSFORMER_MAX_LENGTH
             
             # Análisis de sentimientos
-            sentiment_result = self.transformer_sentiment(text)[0]
+            sentiment_result = self.transformer_sentiment(
+                text, truncation=True, max_length=max_length
+            )[0]
             
             # Análisis de emociones (solo en inglés)
             emotion_result = {}
             if self.language == 'english':
-                emotion_result = self.transformer_emotion(text)[0]
+                emotion_result = self.transformer_emotion(
+                    text, truncation=True, max_length=max_length
+                )[0]
             
             return {
                 'transformer_sentiment_label': sentiment_result['label'],
@@ -291,6 +478,55 @@ class SentimentAnalyzer:
             self.logger.error(f"Error en análisis transformer: {e}")
             return {}
     
+    def verify_transformer_backend(self, texts: List[str], min_agreement: float = 0.95,
+                                   batch_size: int = 32) -> Dict:
+        """
+        Verificar que el backend optimizado coincide con el modelo de referencia.
+        
+        Compara las etiquetas del backend configurado con las del pipeline
+        float32 de PyTorch sobre una muestra de textos.
+        
+        Args:
+            texts: Textos de validación
+            min_agreement: Acuerdo mínimo de etiquetas exigido (0-1)
+            batch_size: Textos por lote de inferencia
+            
+        Returns:
+            Diccionario con acuerdo y tiempos de ambos modelos
+            
+        Raises:
+            ValueError: Si el acuerdo queda por debajo de min_agreement
+        """
+        from quantized_inference import label_agreement
+        
+        kwargs = {'batch_size': batch_size, 'truncation': True,
+                  'max_length': self.TRANSFORMER_MAX_LENGTH}
+        
+        start = datetime.now()
+        reference = self._build_sentiment_pipeline()(list(texts), **kwargs)
+        reference_seconds = (datetime.now() - start).total_seconds()
+        
+        start = datetime.now()
+        candidate = self.transformer_sentiment(list(texts), **kwargs)
+        candidate_seconds = (datetime.now() - start).total_seconds()
+        
+        agreement = label_agreement(reference, candidate)
+        report = {
+            'backend': self.transformer_backend,
+            'textos': len(texts),
+            'acuerdo_etiquetas': agreement,
+            'segundos_referencia': reference_seconds,
+            'segundos_backend': candidate_seconds
+        }
+        self.logger.info(f"Verificación de backend transformer: {report}")
+        
+        if agreement < min_agreement:
+            raise ValueError(
+                f"Acuerdo de etiquetas {agreement:.3f} del backend {self.transformer_backend} "
+                f"por debajo del mínimo {min_agreement:.3f}"
+            )
+        return report
+    
     def analyze_text(self, text: str) -> Dict:
         """
         Análisis completo de sentimientos.
@@ -308,12 +544,18 @@ class SentimentAnalyzer:
         clean_text = self.clean_text(text)
         
         # Extraer características
-        features = self.extract_features(text)
-        
-        # Análisis de sentimientos
-        vader_results = self.vader_analysis(clean_text)
-        textblob_results = self.textblob_analysis(clean_text)
-        transformer_results = self.transformer_analysis(clean_text)
+        features = self.extract_features(text) if 'features' in self.analyzers else {}
+        
+        # Análisis de sentimientos de los backends seleccionados (con caché por contenido)
+        vader_results, textblob_results, transformer_results = {}, {}, {}
+        if 'vader' in self.analyzers:
+            vader_results = self._cached_single('vader', clean_text, self.vader_analysis)
+        if 'textblob' in self.analyzers:
+            textblob_results = self._cached_single('textblob', clean_text, self.textblob_analysis)
+        if 'transformer' in self.analyzers:
+            transformer_results = self._cached_single(
+                'transformer', clean_text, self.transformer_analysis
+            )
         
         # Combinar resultados
         results = {
@@ -374,90 +616,470 @@ class SentimentAnalyzer:
         
         return max(vote_counts, key=vote_counts.get)
     
-    def analyze_dataframe(self, df: pd.DataFrame, text_column: str) -> pd.DataFrame:
+    def analyze_dataframe(self, df: pd.DataFrame, text_column: str,
+                          batch_size: int = 1000,
+                          analyzers: Optional[List[str]] = None,
+                          transformer_batch_size: int = 32,
+                          n_workers: int = 1,
+                          chunk_size: int = 5000,
+                          token_frequencies=None,
+                          scorer=None) -> pd.DataFrame:
         """
-        Analizar sentimientos en un DataFrame.
+        Analizar sentimientos en un DataFrame por lotes.
+        
+        Los textos se procesan en lotes de batch_size: la limpieza y las
+        características se calculan de forma vectorizada, los transformers
+        reciben lotes agrupados por longitud (menos padding) y los
+        resultados se escriben directamente en arreglos por columna.
+        
+        Con n_workers > 1 los lotes se reparten en un pool de procesos
+        (ver parallel_scoring), cada uno con sus propios modelos. Para
+        varias llamadas seguidas se puede pasar un ParallelScorer ya creado
+        y reutilizar sus workers.
         
         Args:
             df: DataFrame con textos
             text_column: Nombre de la columna con texto
+            batch_size: Número de textos por lote
+            analyzers: Analizadores a ejecutar (por defecto los seleccionados al crear el analizador)
+            transformer_batch_size: Tamaño de lote para inferencia transformer
+            n_workers: Número de procesos (1 = en el proceso actual)
+            chunk_size: Filas por tarea en modo multiproceso
+            token_frequencies: TokenFrequencies a actualizar con los textos
+                limpios por clase de consenso (ver generate_wordcloud)
+            scorer: ParallelScorer abierto a reutilizar (sus workers ya
+                tienen fijados analyzers y tamaños de lote)
             
         Returns:
             DataFrame con análisis de sentimientos
         """
-        self.logger.info(f"Analizando {len(df)} textos...")
+        if scorer is not None or n_workers > 1:
+            # Los workers cuentan los tokens de sus tareas; aquí sólo se combinan
+            if scorer is not None:
+                return scorer.score(df, text_column, token_frequencies=token_frequencies)
+            from parallel_scoring import analyze_parallel
+            return analyze_parallel(
+                self, df, text_column, n_workers, chunk_size=chunk_size,
+                token_frequencies=token_frequencies, batch_size=batch_size,
+                analyzers=analyzers, transformer_batch_size=transformer_batch_size
+            )
+        
+        analyzers = self._resolve_analyzers(analyzers or self.analyzers)
+        n_texts = len(df)
+        self.logger.info(f"Analizando {n_texts} textos en lotes de {batch_size} ({analyzers})...")
+        
+        # Nulos como texto vacío (con pandas 3 astype(str) los deja como NaN)
+        texts = df[text_column].fillna('').astype(str).to_numpy(dtype=object)
+        valid = np.array([bool(text.strip()) for text in texts], dtype=bool)
+        
+        # Arreglos de salida preasignados por columna
+        columns = {}
+        for analyzer in analyzers:
+            for name in self.ANALYZER_COLUMNS[analyzer]:
+                if name.endswith(('_category', '_label')):
+                    columns[name] = np.full(n_texts, None, dtype=object)
+                else:
+                    columns[name] = np.full(n_texts, np.nan, dtype=np.float64)
+        columns['analysis_timestamp'] = np.full(n_texts, None, dtype=object)
+        columns['consensus_sentiment'] = np.full(n_texts, None, dtype=object)
+        
+        for start in range(0, n_texts, batch_size):
+            stop = min(start + batch_size, n_texts)
+            batch_idx = np.arange(start, stop)[valid[start:stop]]
+            if len(batch_idx) == 0:
+                continue
+            
+            batch_texts = pd.Series(texts[batch_idx])
+            clean_texts = self.clean_texts(batch_texts)
+            batch_results = {}
+            
+            if 'features' in analyzers:
+                batch_results.update(self._batch_features(batch_texts))
+            if 'vader' in analyzers:
+                batch_results.update(
+                    self._cached_batch('vader', clean_texts, self._batch_vader)
+                )
+            if 'textblob' in analyzers:
+                batch_results.update(
+                    self._cached_batch('textblob', clean_texts, self._batch_textblob)
+                )
+            if 'transformer' in analyzers:
+                batch_results.update(self._cached_batch(
+                    'transformer', clean_texts,
+                    lambda texts: self._batch_transformer(texts, transformer_batch_size)
+                ))
+            
+            batch_results['consensus_sentiment'] = self._batch_consensus(batch_results)
+            batch_results['analysis_timestamp'] = datetime.now().isoformat()
+            
+            if token_frequencies is not None:
+                token_frequencies.update(clean_texts, batch_results['consensus_sentiment'])
+            
+            for name, values in batch_results.items():
+                if name in columns:
+                    columns[name][batch_idx] = values
+            
+            self.logger.info(f"Procesado {stop}/{n_texts} textos")
+        
+        # Combinar sin copiar el DataFrame original columna a columna
+        analysis_df = pd.DataFrame(
+            {f'sentiment_{name}': values for name, values in columns.items()},
+            index=df.index
+        )
+        result_df = pd.concat([df, analysis_df], axis=1)
+        
+        self.logger.info(f"Análisis completado. Caché de resultados: {self.result_cache.stats()}")
+        return result_df
+    
+    def analyze_file(self, input_path: str, output_dir: str, text_column: str,
+                     id_columns: Optional[List[str]] = None, batch_size: int = 10_000,
+                     rows_per_part: int = 200_000, resume: bool = True,
+                     **options) -> Dict:
+        """
+        Analizar un archivo Parquet, CSV o NDJSON en streaming.
         
-        # Crear una copia del DataFrame
-        result_df = df.copy()
+        Los resultados (ids y columnas de análisis, sin copias del texto) se
+        escriben como dataset Parquet en output_dir con checkpoints
+        reanudables (ver streaming_scoring).
         
-        # Analizar cada texto
-        analysis_results = []
-        for idx, text in enumerate(df[text_column]):
-            if idx % 100 == 0:
-                self.logger.info(f"Procesado {idx}/{len(df)} textos")
+        Args:
+            input_path: Archivo de entrada
+            output_dir: Directorio del dataset Parquet de salida
+            text_column: Columna con el texto a analizar
+            id_columns: Columnas de identificación a conservar
+            batch_size: Filas leídas y analizadas por lote
+            rows_per_part: Filas por archivo de salida (y por checkpoint)
+            resume: Continuar desde el último checkpoint si existe
+            **options: Argumentos para analyze_dataframe (analyzers, n_workers, ...)
+                y token_frequencies, que se combina por parte confirmada
             
-            analysis = self.analyze_text(str(text))
-            analysis_results.append(analysis)
+        Returns:
+            Diccionario con filas procesadas, partes escritas, filas reanudadas
+            y reporte de sentimientos
+        """
+        from streaming_scoring import analyze_file
+        return analyze_file(
+            self, input_path, output_dir, text_column, id_columns=id_columns,
+            batch_size=batch_size, rows_per_part=rows_per_part, resume=resume, **options
+        )
+    
+    def analyze_transcripts(self, df: pd.DataFrame, text_column: str,
+                            speakers: Optional[Sequence[str]] = ('cliente',), unit: str = 'turn',
+                            **options) -> pd.DataFrame:
+        """
+        Analizar transcripciones "Cliente:"/"Agente:" turno a turno.
         
-        # Convertir resultados a DataFrame y combinar
-        analysis_df = pd.DataFrame(analysis_results)
+        Cada turno se analiza por separado (sin truncar la conversación) y
+        los scores se agregan por transcripción: media, primer y último
+        turno, peor turno y tendencia (ver transcript_analysis).
         
-        # Combinar con DataFrame original
-        for col in analysis_df.columns:
-            if col not in ['original_text', 'clean_text']:
-                result_df[f'sentiment_{col}'] = analysis_df[col]
+        Args:
+            df: DataFrame con transcripciones
+            text_column: Columna con el texto de la transcripción
+            speakers: Hablantes a analizar (None = todos)
+            unit: 'turn' (por turno) o 'sentence' (por oración de cada turno)
+            **options: Argumentos para analyze_dataframe (analyzers, batch_size, ...)
+            
+        Returns:
+            DataFrame con columnas sentiment_turn_* y sentiment_final_consensus
+        """
+        from transcript_analysis import analyze_transcripts
+        return analyze_transcripts(
+            self, df, text_column, speakers=speakers, unit=unit, **options
+        )
+    
+    def _resolve_analyzers(self, analyzers: Optional[List[str]]) -> List[str]:
+        """Validar la lista de analizadores solicitados."""
+        if analyzers is None:
+            analyzers = list(self.ANALYZERS)
+        unknown = [name for name in analyzers if name not in self.ANALYZERS]
+        if unknown:
+            raise ValueError(f"Analizadores desconocidos: {unknown}. Disponibles: {self.ANALYZERS}")
+        if 'transformer' in analyzers and not TRANSFORMERS_AVAILABLE:
+            analyzers = [name for name in analyzers if name != 'transformer']
+        return analyzers
+    
+    def _fingerprint_state(self, name: str) -> Tuple:
+        """Copia de los atributos que definen la huella de un analizador."""
+        return (
+            self.language, dict(self.banking_positive_words), dict(self.banking_negative_words),
+            dict(self.cleaning_patterns), self.category_thresholds.get(name),
+            self.artifact_version, self.transformer_sentiment_model,
+            self.transformer_emotion_model, self.transformer_backend
+        )
+    
+    def _analyzer_fingerprint(self, name: str) -> Tuple[str, str]:
+        """
+        Huella de configuración de un analizador para la caché de resultados.
         
-        self.logger.info("Análisis completado")
-        return result_df
+        Incluye versión de librería, modelo, léxicos, patrones de limpieza,
+        umbrales y versión del artefacto cargado, de modo que cualquier
+        cambio invalida automáticamente las entradas anteriores. El ámbito
+        (idioma y, para transformer, modelos y backend) separa
+        configuraciones que comparten el archivo de caché.
+        
+        La huella se calcula una vez y se recalcula sólo si cambia alguno de
+        los atributos de configuración.
+        
+        Returns:
+            Tupla (ámbito, huella)
+        """
+        state = self._fingerprint_state(name)
+        cached = self._fingerprints.get(name)
+        if cached is not None and cached[0] == state:
+            return cached[1]
+        
+        scope = {'analyzer': name, 'language': self.language}
+        if name == 'transformer':
+            scope['models'] = [self.transformer_sentiment_model, self.transformer_emotion_model]
+            scope['backend'] = self.transformer_backend
+        config = {
+            **scope,
+            'version': _package_version(self.ANALYZER_PACKAGES[name]),
+            'lexicons': [sorted(matcher.terms.items()) for matcher in self.lexicon_matchers],
+            'cleaning_patterns': self.cleaning_patterns,
+            'thresholds': self.category_thresholds.get(name),
+            'artifact': self.artifact_version
+        }
+        fingerprint = (config_fingerprint(scope), config_fingerprint(config))
+        self._fingerprints[name] = (state, fingerprint)
+        return fingerprint
     
-    def generate_sentiment_report(self, df: pd.DataFrame) -> Dict:
+    @staticmethod
+    def _is_cacheable(result: Dict) -> bool:
+        """Sólo se cachean resultados completos (sin errores ni valores faltantes)."""
+        return bool(result) and all(
+            value is not None and not (isinstance(value, float) and np.isnan(value))
+            for value in result.values()
+        )
+    
+    def _cached_single(self, name: str, clean_text: str, compute) -> Dict:
+        """Ejecutar un analizador sobre un texto consultando la caché."""
+        scope, namespace = self._analyzer_fingerprint(name)
+        found = self.result_cache.get_many(name, namespace, [clean_text], scope)
+        if clean_text in found:
+            return found[clean_text]
+        
+        result = compute(clean_text)
+        if self._is_cacheable(result):
+            self.result_cache.put_many(
+                name, namespace, {clean_text: result}, scope, deferred=True
+            )
+        return result
+    
+    def _cached_batch(self, name: str, clean_texts: pd.Series, compute) -> Dict[str, np.ndarray]:
         """
-        Generar reporte de análisis de sentimientos.
+        Ejecutar un analizador sobre un lote calculando sólo textos no vistos.
+        
+        Los textos se deduplican dentro del lote y los únicos se buscan en
+        la caché; sólo los fallos se envían al analizador.
         
         Args:
-            df: DataFrame con análisis completo
+            name: Nombre del analizador ('vader', 'textblob', 'transformer')
+            clean_texts: Textos limpios del lote
+            compute: Función que recibe una serie de textos y devuelve arreglos por columna
             
         Returns:
-            Diccionario con estadísticas del reporte
+            Arreglos por columna alineados con clean_texts
+        """
+        codes, uniques = pd.factorize(clean_texts)
+        uniques = list(uniques)
+        scope, namespace = self._analyzer_fingerprint(name)
+        
+        known = self.result_cache.get_many(name, namespace, uniques, scope)
+        missing = [text for text in uniques if text not in known]
+        
+        if missing:
+            computed = compute(pd.Series(missing, dtype=object))
+            new_results = {}
+            for i, text in enumerate(missing):
+                result = {
+                    column: values[i].item() if hasattr(values[i], 'item') else values[i]
+                    for column, values in computed.items()
+                }
+                known[text] = result
+                if self._is_cacheable(result):
+                    new_results[text] = result
+            self.result_cache.put_many(name, namespace, new_results, scope)
+        
+        columns = {}
+        for column in self.ANALYZER_COLUMNS[name]:
+            dtype = object if column.endswith(('_category', '_label')) else np.float64
+            unique_values = np.array([known[text][column] for text in uniques], dtype=dtype)
+            columns[column] = unique_values[codes]
+        return columns
+    
+    def clean_texts(self, texts: pd.Series) -> pd.Series:
         """
-        report = {}
+        Limpiar una serie de textos de forma vectorizada.
         
-        # Estadísticas generales
-        total_texts = len(df)
-        report['total_texts'] = total_texts
+        Args:
+            texts: Serie de textos
+            
+        Returns:
+            Serie de textos limpios (equivalente a clean_text por elemento)
+        """
+        return self.text_cleaner.clean_series(texts)
+    
+    def _batch_features(self, texts: pd.Series) -> Dict[str, np.ndarray]:
+        """Características de texto vectorizadas (equivalentes a extract_features)."""
+        lengths = texts.str.len().to_numpy(dtype=np.float64)
+        word_counts = texts.str.split().str.len().to_numpy(dtype=np.float64)
+        # Suma de longitudes de palabras = caracteres que no son espacio
+        word_chars = lengths - texts.str.count(r'\s').to_numpy(dtype=np.float64)
         
-        # Distribución de sentimientos
-        if 'sentiment_consensus_sentiment' in df.columns:
-            sentiment_counts = df['sentiment_consensus_sentiment'].value_counts()
-            report['sentiment_distribution'] = sentiment_counts.to_dict()
-            report['sentiment_percentages'] = (sentiment_counts / total_texts * 100).to_dict()
+        with np.errstate(divide='ignore', invalid='ignore'):
+            avg_word_length = np.where(word_counts > 0, word_chars / word_counts, np.nan)
+            uppercase = np.array([sum(map(str.isupper, text)) for text in texts], dtype=np.float64)
+            uppercase_ratio = np.where(lengths > 0, uppercase / lengths, 0.0)
         
-        # Estadísticas de scores
-        if 'sentiment_vader_compound' in df.columns:
-            report['vader_stats'] = {
-                'mean': df['sentiment_vader_compound'].mean(),
-                'std': df['sentiment_vader_compound'].std(),
-                'min': df['sentiment_vader_compound'].min(),
-                'max': df['sentiment_vader_compound'].max()
-            }
+        positive_matcher, negative_matcher = self.lexicon_matchers
         
-        if 'sentiment_textblob_polarity' in df.columns:
-            report['textblob_stats'] = {
-                'mean': df['sentiment_textblob_polarity'].mean(),
-                'std': df['sentiment_textblob_polarity'].std(),
-                'min': df['sentiment_textblob_polarity'].min(),
-                'max': df['sentiment_textblob_polarity'].max()
-            }
+        return {
+            'length': lengths,
+            'word_count': word_counts,
+            'sentence_count': np.array([len(self.sent_tokenize(text)) for text in texts],
+                                       dtype=np.float64),
+            'avg_word_length': avg_word_length,
+            'exclamation_count': texts.str.count('!').to_numpy(dtype=np.float64),
+            'question_count': texts.str.count(r'\?').to_numpy(dtype=np.float64),
+            'uppercase_ratio': uppercase_ratio,
+            'positive_words': positive_matcher.score_many(texts),
+            'negative_words': negative_matcher.score_many(texts)
+        }
+    
+    @staticmethod
+    def _categorize(scores: np.ndarray, positive: float, negative: float,
+                    inclusive: bool) -> np.ndarray:
+        """Asignar categorías positivo/negativo/neutro según umbrales."""
+        if inclusive:
+            is_positive, is_negative = scores >= positive, scores <= negative
+        else:
+            is_positive, is_negative = scores > positive, scores < negative
+        return np.where(is_positive, 'positivo', np.where(is_negative, 'negativo', 'neutro')).astype(object)
+    
+    def _batch_vader(self, clean_texts: pd.Series) -> Dict[str, np.ndarray]:
+        """Scores VADER de un lote."""
+        polarity_scores = self.vader_analyzer.polarity_scores
+        scores = np.array([
+            (s['compound'], s['pos'], s['neu'], s['neg'])
+            for s in map(polarity_scores, clean_texts)
+        ], dtype=np.float64).reshape(-1, 4)
         
-        # Características de texto
-        if 'sentiment_length' in df.columns:
-            report['text_stats'] = {
-                'avg_length': df['sentiment_length'].mean(),
-                'avg_word_count': df['sentiment_word_count'].mean(),
-                'avg_sentence_count': df['sentiment_sentence_count'].mean()
-            }
+        return {
+            'vader_compound': scores[:, 0],
+            'vader_positive': scores[:, 1],
+            'vader_neutral': scores[:, 2],
+            'vader_negative': scores[:, 3],
+            'vader_category': self._categorize(
+                scores[:, 0], *self.category_thresholds['vader'], inclusive=True
+            )
+        }
+    
+    def _batch_textblob(self, clean_texts: pd.Series) -> Dict[str, np.ndarray]:
+        """Scores TextBlob de un lote (sin crear un objeto TextBlob por texto)."""
+        analyze = self.textblob_analyzer.analyze
+        scores = np.array(
+            [tuple(analyze(text)) for text in clean_texts], dtype=np.float64
+        ).reshape(-1, 2)
         
-        return report
+        return {
+            'textblob_polarity': scores[:, 0],
+            'textblob_subjectivity': scores[:, 1],
+            'textblob_category': self._categorize(
+                scores[:, 0], *self.category_thresholds['textblob'], inclusive=False
+            )
+        }
+    
+    @staticmethod
+    def _length_buckets(texts: pd.Series, batch_size: int) -> List[np.ndarray]:
+        """Agrupar índices por longitud para minimizar padding en cada lote."""
+        order = np.argsort(texts.str.len().to_numpy(), kind='stable')
+        return [order[i:i + batch_size] for i in range(0, len(order), batch_size)]
+    
+    def _batch_transformer(self, clean_texts: pd.Series,
+                           batch_size: int) -> Dict[str, np.ndarray]:
+        """Inferencia transformer por lotes agrupados por longitud."""
+        n = len(clean_texts)
+        results = {
+            'transformer_sentiment_label': np.full(n, None, dtype=object),
+            'transformer_sentiment_score': np.full(n, np.nan),
+            'transformer_emotion_label': np.full(n, '', dtype=object),
+            'transformer_emotion_score': np.zeros(n)
+        }
+        
+        try:
+            for bucket in self._length_buckets(clean_texts, batch_size):
+                bucket_texts = clean_texts.iloc[bucket].tolist()
+                sentiment = self.transformer_sentiment(
+                    bucket_texts, batch_size=batch_size, truncation=True,
+                    max_length=self.TRANSFORMER_MAX_LENGTH
+                )
+                results['transformer_sentiment_label'][bucket] = [r['label'] for r in sentiment]
+                results['transformer_sentiment_score'][bucket] = [r['score'] for r in sentiment]
+                
+                # Análisis de emociones (solo en inglés)
+                if self.language == 'english':
+                    emotion = self.transformer_emotion(
+                        bucket_texts, batch_size=batch_size, truncation=True,
+                        max_length=self.TRANSFORMER_MAX_LENGTH
+                    )
+                    results['transformer_emotion_label'][bucket] = [r['label'] for r in emotion]
+                    results['transformer_emotion_score'][bucket] = [r['score'] for r in emotion]
+        except Exception as e:
+            self.logger.error(f"Error en análisis transformer por lotes: {e}")
+        
+        return results
+    
+    def _batch_consensus(self, results: Dict[str, np.ndarray]) -> np.ndarray:
+        """Consenso por mayoría vectorizado (ver _calculate_consensus_sentiment)."""
+        n = len(next(v for v in results.values() if isinstance(v, np.ndarray)))
+        votes = {label: np.zeros(n, dtype=np.int64) for label in ['positivo', 'negativo', 'neutro']}
+        
+        for category_col in ['vader_category', 'textblob_category']:
+            if category_col in results:
+                for label in votes:
+                    votes[label] += results[category_col] == label
+        
+        positive_words = results.get('positive_words', np.zeros(n))
+        negative_words = results.get('negative_words', np.zeros(n))
+        votes['positivo'] += positive_words > negative_words
+        votes['negativo'] += negative_words > positive_words
+        votes['neutro'] += positive_words == negative_words
+        
+        # En empate gana el primero en orden positivo, negativo, neutro (como max())
+        stacked = np.vstack([votes['positivo'], votes['negativo'], votes['neutro']])
+        labels = np.array(['positivo', 'negativo', 'neutro'], dtype=object)
+        return labels[np.argmax(stacked, axis=0)]
+    
+    def generate_sentiment_report(self, df: pd.DataFrame) -> Dict:
+        """
+        Generar reporte de análisis de sentimientos.
+        
+        El reporte se calcula en una sola pasada sobre un estado agregado
+        combinable (ver sentiment_report.SentimentReportState); usar
+        report_state para combinar reportes de lotes, workers o días.
+        
+        Args:
+            df: DataFrame con análisis completo
+            
+        Returns:
+            Diccionario con estadísticas del reporte
+        """
+        return self.report_state(df).report()
+    
+    def report_state(self, df: pd.DataFrame):
+        """
+        Estado agregado y combinable del reporte de un DataFrame analizado.
+        
+        Args:
+            df: DataFrame con columnas sentiment_*
+            
+        Returns:
+            SentimentReportState con conteos, momentos, extremos e histogramas
+        """
+        from sentiment_report import SentimentReportState
+        return SentimentReportState.from_dataframe(df)
     
     def visualize_sentiment_distribution(self, df: pd.DataFrame, save_path: Optional[str] = None):
         """
@@ -471,6 +1093,8 @@ class SentimentAnalyzer:
             self.logger.error("No se encontró columna de sentimientos")
             return
         
+        import matplotlib.pyplot as plt
+        
         # Crear figura con subplots
         fig, ((ax1, ax2), (ax3, ax4)) = plt.subplots(2, 2, figsize=(15, 12))
         
@@ -512,39 +1136,73 @@ class SentimentAnalyzer:
         
         plt.show()
     
-    def generate_wordcloud(self, df: pd.DataFrame, sentiment: str = 'all', 
-                          save_path: Optional[str] = None):
+    def create_token_frequencies(self, lexicon_only: bool = False):
+        """
+        Crear un contador de frecuencias de tokens para nubes de palabras.
+        
+        Args:
+            lexicon_only: Contar sólo las palabras de los léxicos del dominio
+            
+        Returns:
+            TokenFrequencies con las stopwords del idioma
+        """
+        from token_frequencies import TokenFrequencies
+        vocabulary = None
+        if lexicon_only:
+            vocabulary = {
+                word for matcher in self.lexicon_matchers
+                for term in matcher.terms for word in term.split()
+            }
+        return TokenFrequencies(stopwords=self.stop_words, vocabulary=vocabulary)
+    
+    def generate_wordcloud(self, df: Optional[pd.DataFrame] = None, sentiment: str = 'all',
+                          save_path: Optional[str] = None, frequencies=None,
+                          max_words: int = 100, chunk_size: int = 50_000):
         """
         Generar nube de palabras.
         
+        Con frequencies (un TokenFrequencies llenado durante analyze_dataframe)
+        la nube se renderiza sin recorrer los textos; si no, las frecuencias
+        se acumulan por bloques de df sin unir todos los textos.
+        
         Args:
-            df: DataFrame con análisis
+            df: DataFrame con análisis (no se usa si se indica frequencies)
             sentiment: Sentimiento específico o 'all'
             save_path: Ruta para guardar la imagen
+            frequencies: TokenFrequencies precalculado
+            max_words: Máximo de palabras en la nube
+            chunk_size: Textos por bloque al contar desde df
         """
-        # Filtrar por sentimiento si se especifica
-        if sentiment != 'all' and 'sentiment_consensus_sentiment' in df.columns:
-            filtered_df = df[df['sentiment_consensus_sentiment'] == sentiment]
-        else:
-            filtered_df = df
-        
-        if 'sentiment_clean_text' in filtered_df.columns:
-            text_col = 'sentiment_clean_text'
+        if frequencies is None:
+            # Filtrar por sentimiento si se especifica
+            if sentiment != 'all' and 'sentiment_consensus_sentiment' in df.columns:
+                filtered_df = df[df['sentiment_consensus_sentiment'] == sentiment]
+            else:
+                filtered_df = df
+            
+            if 'sentiment_clean_text' in filtered_df.columns:
+                text_col = 'sentiment_clean_text'
+            else:
+                text_col = df.columns[0]  # Usar primera columna de texto
+            
+            frequencies = self.create_token_frequencies()
+            for start in range(0, len(filtered_df), chunk_size):
+                frequencies.update(filtered_df[text_col].iloc[start:start + chunk_size].astype(str))
+            sentiment_key = 'all'
         else:
-            text_col = df.columns[0]  # Usar primera columna de texto
+            sentiment_key = sentiment
         
-        # Combinar todos los textos
-        all_text = ' '.join(filtered_df[text_col].astype(str))
+        import matplotlib.pyplot as plt
+        from wordcloud import WordCloud
         
         # Generar nube de palabras
         wordcloud = WordCloud(
             width=800, 
             height=400, 
             background_color='white',
-            stopwords=self.stop_words,
-            max_words=100,
+            max_words=max_words,
             colormap='viridis'
-        ).generate(all_text)
+        ).generate_from_frequencies(frequencies.frequencies(sentiment_key, max_words))
         
         # Visualizar
         plt.figure(figsize=(12, 6))
@@ -558,23 +1216,139 @@ class SentimentAnalyzer:
         
         plt.show()
     
-    def save_model(self, model_path: str):
+    def worker_config(self) -> Dict:
         """
-        Guardar configuración del analizador.
+        Configuración necesaria para reconstruir el analizador en otro proceso.
         
-        Args:
-            model_path: Ruta para guardar el modelo
+        Returns:
+            Diccionario serializable con idioma, léxicos y patrones
         """
-        model_config = {
+        return {
             'language': self.language,
-            'banking_positive_words': self.banking_positive_words,
-            'banking_negative_words': self.banking_negative_words,
-            'cleaning_patterns': self.cleaning_patterns
+            'cache_path': self.cache_path,
+            'cache_memory_items': self.cache_memory_items,
+            'analyzers': list(self.analyzers),
+            'transformer_backend': self.transformer_backend,
+            'transformer_threads': self.transformer_threads,
+            'transformer_model': self.transformer_sentiment_model,
+            'transformer_emotion_model': self.transformer_emotion_model,
+            'banking_positive_words': dict(self.lexicon_matchers[0].terms),
+            'banking_negative_words': dict(self.lexicon_matchers[1].terms),
+            'cleaning_patterns': dict(self.cleaning_patterns),
+            'category_thresholds': dict(self.category_thresholds),
+            'artifact_version': self.artifact_version,
+            'nltk_data_path': self.nltk_data_path
         }
+    
+    @classmethod
+    def from_worker_config(cls, config: Dict) -> 'SentimentAnalyzer':
+        """
+        Crear un analizador a partir de worker_config().
         
-        joblib.dump(model_config, model_path)
+        Args:
+            config: Configuración producida por worker_config
+            
+        Returns:
+            Analizador con la misma configuración
+        """
+        analyzer = cls(
+            language=config['language'],
+            cache_path=config.get('cache_path'),
+            cache_memory_items=config.get('cache_memory_items', 100_000),
+            analyzers=config.get('analyzers'),
+            transformer_backend=config.get('transformer_backend', 'pytorch'),
+            transformer_threads=config.get('transformer_threads'),
+            transformer_model=config.get('transformer_model')
+        )
+        analyzer.banking_positive_words = config['banking_positive_words']
+        analyzer.banking_negative_words = config['banking_negative_words']
+        analyzer.cleaning_patterns = config['cleaning_patterns']
+        analyzer.transformer_emotion_model = config.get(
+            'transformer_emotion_model', cls.TRANSFORMER_EMOTION_MODEL
+        )
+        thresholds = config.get('category_thresholds', cls.CATEGORY_THRESHOLDS)
+        analyzer.category_thresholds = {name: tuple(pair) for name, pair in thresholds.items()}
+        analyzer.artifact_version = config.get('artifact_version')
+        analyzer.nltk_data_path = config.get('nltk_data_path')
+        return analyzer
+    
+    def save_model(self, model_path: str, model_paths: Optional[Dict[str, str]] = None,
+                   nltk_data_path: Optional[str] = None,
+                   models_root: Optional[str] = None) -> str:
+        """
+        Guardar el analizador como artefacto versionado.
+        
+        El artefacto (un directorio) contiene léxicos, patrones de limpieza,
+        umbrales de categorías, versiones de librerías y referencias con
+        hash a los modelos locales (ver analyzer_artifact).
+        
+        Args:
+            model_path: Directorio del artefacto
+            model_paths: Modelos locales {'transformer_sentiment' | 'transformer_emotion': ruta}
+            nltk_data_path: Directorio local con los datos de NLTK
+            models_root: Directorio base de las rutas locales guardadas
+                (por defecto el del artefacto)
+            
+        Returns:
+            Versión (hash) del artefacto
+        """
+        from analyzer_artifact import save_artifact
+        manifest = save_artifact(self, model_path, model_paths, nltk_data_path, models_root)
         self.logger.info(f"Configuración guardada en: {model_path}")
-
+        return manifest['artifact_version']
+    
+    @classmethod
+    def load_model(cls, model_path: str, cache_path: Optional[str] = None,
+                   cache_memory_items: int = 100_000,
+                   verify_models: bool = False,
+                   models_root: Optional[str] = None) -> 'SentimentAnalyzer':
+        """
+        Crear un analizador desde un artefacto guardado con save_model.
+        
+        Sólo se leen el manifiesto y los léxicos; los modelos se cargan bajo
+        demanda desde las rutas locales referenciadas. La versión del
+        artefacto forma parte de la huella de la caché de resultados.
+        
+        Args:
+            model_path: Directorio del artefacto
+            cache_path: Archivo SQLite para persistir resultados
+            cache_memory_items: Entradas máximas de la caché LRU en memoria
+            verify_models: Recalcular los hashes de los archivos de los modelos
+            models_root: Directorio base de las rutas locales (el mismo
+                usado al guardar; por defecto el del artefacto)
+            
+        Returns:
+            Analizador con la configuración fijada por el artefacto
+        """
+        from analyzer_artifact import load_manifest
+        manifest = load_manifest(model_path, verify_models=verify_models,
+                                 models_root=models_root)
+        models = manifest['models']
+        transformer = manifest['transformer']
+        
+        analyzer = cls(
+            language=manifest['language'],
+            cache_path=cache_path,
+            cache_memory_items=cache_memory_items,
+            lexicon_path=manifest['lexicon_path'],
+            analyzers=manifest['analyzers'],
+            transformer_backend=transformer['backend'],
+            transformer_threads=transformer['threads'],
+            transformer_model=models.get('transformer_sentiment', {}).get(
+                'path', transformer['sentiment_model']
+            )
+        )
+        analyzer.transformer_emotion_model = models.get('transformer_emotion', {}).get(
+            'path', transformer['emotion_model']
+        )
+        analyzer.cleaning_patterns = manifest['cleaning_patterns']
+        analyzer.category_thresholds = {
+            name: tuple(thresholds) for name, thresholds in manifest['category_thresholds'].items()
+        }
+        analyzer.nltk_data_path = manifest['nltk_data_path']
+        analyzer.artifact_version = manifest['artifact_version']
+        analyzer.logger.info(f"Artefacto {analyzer.artifact_version} cargado desde: {model_path}")
+        return analyzer
 
 def main():
     """Función principal para testing."""
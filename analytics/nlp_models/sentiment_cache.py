@@ -0,0 +1,257 @@
+"""
+Caché de resultados de análisis de sentimientos por contenido.
+
+Los textos de clientes son muy repetitivos (aperturas de reviews con
+plantilla, comentarios NPS como "Excelente atención", líneas de agente en
+transcripciones), así que los resultados se memorizan por hash del texto
+limpio y de la configuración del analizador:
+- Nivel 1: LRU en memoria del proceso
+- Nivel 2: SQLite en disco, persistente entre ejecuciones nocturnas
+
+Cada analizador (vader, textblob, transformer) tiene su propia huella de
+configuración (versión de librería, modelo, léxicos, patrones de limpieza).
+Las huellas se agrupan en ámbitos (p. ej. idioma y backend): cuando la
+huella de un ámbito cambia, sólo se eliminan las entradas de la huella
+anterior de ese ámbito, así que varias configuraciones pueden compartir el
+mismo archivo SQLite sin borrarse entre sí.
+"""
+
+import json
+import atexit
+import hashlib
+import sqlite3
+import logging
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional
+
+
+def config_fingerprint(config: Dict) -> str:
+    """
+    Huella estable de una configuración de analizador.
+
+    Args:
+        config: Diccionario serializable a JSON
+
+    Returns:
+        Hash hexadecimal de 16 caracteres
+    """
+    payload = json.dumps(config, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.blake2b(payload.encode('utf-8'), digest_size=8).hexdigest()
+
+
+def text_key(text: str) -> bytes:
+    """Hash de 128 bits del texto limpio."""
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=16).digest()
+
+
+class SentimentResultCache:
+    """Caché de dos niveles (LRU en memoria + SQLite) para resultados por texto."""
+
+    def __init__(self, path: Optional[str] = None, max_memory_items: int = 100_000,
+                 write_batch_size: int = 500):
+        """
+        Inicializar la caché.
+
+        Args:
+            path: Archivo SQLite para el nivel persistente (None = sólo memoria)
+            max_memory_items: Entradas máximas del nivel en memoria
+            write_batch_size: Escrituras diferidas acumuladas antes de confirmar en disco
+        """
+        self.path = path
+        self.max_memory_items = max_memory_items
+        self.write_batch_size = write_batch_size
+        self.logger = logging.getLogger(__name__)
+
+        self._memory: OrderedDict = OrderedDict()
+        self._validated_namespaces = set()
+        self._scope_namespaces: Dict = {}
+        self._pending_rows: List = []
+        self.stats_counters = {'hits_memoria': 0, 'hits_disco': 0, 'misses': 0}
+
+        self._conn = None
+        if path:
+            self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                "analyzer TEXT NOT NULL, namespace TEXT NOT NULL, key BLOB NOT NULL, "
+                "value TEXT NOT NULL, PRIMARY KEY (analyzer, namespace, key))"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS namespaces ("
+                "analyzer TEXT NOT NULL, scope TEXT NOT NULL, namespace TEXT NOT NULL, "
+                "PRIMARY KEY (analyzer, scope))"
+            )
+            self._conn.commit()
+            atexit.register(self.flush)
+
+    def _validate_namespace(self, analyzer: str, namespace: str, scope: str) -> None:
+        """
+        Eliminar las entradas de la huella anterior del ámbito (una vez por proceso).
+
+        Sólo se invalida la huella registrada para el mismo analizador y
+        ámbito; las de otros ámbitos se conservan.
+        """
+        if (analyzer, scope, namespace) in self._validated_namespaces:
+            return
+        self._validated_namespaces.add((analyzer, scope, namespace))
+
+        previous = self._scope_namespaces.get((analyzer, scope))
+        if self._conn is not None:
+            row = self._conn.execute(
+                "SELECT namespace FROM namespaces WHERE analyzer = ? AND scope = ?",
+                (analyzer, scope)
+            ).fetchone()
+            previous = row[0] if row else previous
+        self._scope_namespaces[(analyzer, scope)] = namespace
+        if previous == namespace:
+            return
+
+        if previous is not None:
+            stale = [k for k in self._memory if k[0] == analyzer and k[1] == previous]
+            for k in stale:
+                del self._memory[k]
+
+        if self._conn is not None:
+            self._flush_pending()
+            deleted = 0
+            if previous is not None:
+                deleted = self._conn.execute(
+                    "DELETE FROM results WHERE analyzer = ? AND namespace = ?",
+                    (analyzer, previous)
+                ).rowcount
+            self._conn.execute(
+                "INSERT OR REPLACE INTO namespaces (analyzer, scope, namespace) VALUES (?, ?, ?)",
+                (analyzer, scope, namespace)
+            )
+            self._conn.commit()
+            if deleted:
+                self.logger.info(
+                    f"Caché de {analyzer} invalidada: {deleted} entradas de versiones anteriores"
+                )
+
+    def _remember(self, memory_key, value: Dict) -> None:
+        """Guardar en el LRU expulsando la entrada menos usada si hace falta."""
+        self._memory[memory_key] = value
+        self._memory.move_to_end(memory_key)
+        if len(self._memory) > self.max_memory_items:
+            self._memory.popitem(last=False)
+
+    def get_many(self, analyzer: str, namespace: str, texts: Iterable[str],
+                 scope: str = '') -> Dict[str, Dict]:
+        """
+        Buscar resultados de varios textos limpios.
+
+        Args:
+            analyzer: Nombre del analizador
+            namespace: Huella de configuración del analizador
+            texts: Textos limpios (sin duplicados)
+            scope: Ámbito de la huella (configuraciones que conviven en el archivo)
+
+        Returns:
+            Diccionario {texto: resultado} con los aciertos
+        """
+        self._validate_namespace(analyzer, namespace, scope)
+        found = {}
+        pending = {}
+
+        for text in texts:
+            key = text_key(text)
+            memory_key = (analyzer, namespace, key)
+            value = self._memory.get(memory_key)
+            if value is not None:
+                self._memory.move_to_end(memory_key)
+                found[text] = value
+                self.stats_counters['hits_memoria'] += 1
+            else:
+                pending[key] = text
+
+        if pending and self._conn is not None:
+            keys = list(pending)
+            # SQLite limita el número de parámetros por consulta
+            for i in range(0, len(keys), 500):
+                chunk = keys[i:i + 500]
+                placeholders = ','.join('?' * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT key, value FROM results WHERE analyzer = ? AND namespace = ? "
+                    f"AND key IN ({placeholders})",
+                    [analyzer, namespace, *chunk]
+                ).fetchall()
+                for key, value in rows:
+                    text = pending.pop(bytes(key))
+                    result = json.loads(value)
+                    found[text] = result
+                    self._remember((analyzer, namespace, bytes(key)), result)
+                    self.stats_counters['hits_disco'] += 1
+
+        self.stats_counters['misses'] += len(pending)
+        return found
+
+    def put_many(self, analyzer: str, namespace: str, results: Dict[str, Dict],
+                 scope: str = '', deferred: bool = False) -> None:
+        """
+        Guardar resultados de varios textos limpios.
+
+        Args:
+            analyzer: Nombre del analizador
+            namespace: Huella de configuración del analizador
+            results: Diccionario {texto: resultado}
+            scope: Ámbito de la huella (ver get_many)
+            deferred: Acumular las filas y confirmarlas en disco cada
+                write_batch_size escrituras (para resultados de a uno)
+        """
+        if not results:
+            return
+        self._validate_namespace(analyzer, namespace, scope)
+        for text, value in results.items():
+            key = text_key(text)
+            self._remember((analyzer, namespace, key), value)
+            if self._conn is not None:
+                self._pending_rows.append((analyzer, namespace, key, json.dumps(value)))
+
+        if not deferred or len(self._pending_rows) >= self.write_batch_size:
+            self._flush_pending()
+
+    def _flush_pending(self) -> None:
+        """Confirmar en disco las filas pendientes en una sola transacción."""
+        if self._conn is None or not self._pending_rows:
+            return
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO results (analyzer, namespace, key, value) "
+            "VALUES (?, ?, ?, ?)",
+            self._pending_rows
+        )
+        self._conn.commit()
+        self._pending_rows = []
+
+    def flush(self) -> None:
+        """Confirmar en disco las escrituras diferidas."""
+        self._flush_pending()
+
+    def stats(self) -> Dict:
+        """
+        Métricas de aciertos de la caché.
+
+        Returns:
+            Diccionario con aciertos por nivel, fallos y tasa de acierto
+        """
+        hits = self.stats_counters['hits_memoria'] + self.stats_counters['hits_disco']
+        total = hits + self.stats_counters['misses']
+        return {
+            **self.stats_counters,
+            'entradas_memoria': len(self._memory),
+            'hit_rate': hits / total if total else 0.0
+        }
+
+    def reset_stats(self) -> None:
+        """Reiniciar los contadores de aciertos."""
+        for name in self.stats_counters:
+            self.stats_counters[name] = 0
+
+    def close(self) -> None:
+        """Cerrar la conexión al nivel persistente."""
+        if self._conn is not None:
+            self._flush_pending()
+            self._conn.close()
+            self._conn = None
@@ -0,0 +1,278 @@
+"""
+Reportes de sentimientos con estado agregado combinable.
+
+generate_sentiment_report necesitaba el DataFrame completo y recorría cada
+columna varias veces (value_counts, mean, std, min, max). Aquí el reporte
+se construye a partir de un estado agregado que:
+- Se actualiza en una sola pasada vectorizada por lote
+- Se combina entre lotes, workers, archivos o días (merge)
+- Se serializa a JSON para hacer roll-ups diarios -> mensuales sin volver
+  a analizar los textos
+
+Por columna numérica se guardan conteo, media, M2 (suma de cuadrados de
+desviaciones, combinada con el algoritmo paralelo de Chan), mínimo,
+máximo e histograma de bins fijos.
+"""
+
+import json
+from typing import Dict, Iterable, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+CONSENSUS_COLUMN = 'sentiment_consensus_sentiment'
+
+# Columnas de score con histograma (rango fijo para que los bins sean combinables)
+HISTOGRAM_COLUMNS = {
+    'sentiment_vader_compound': (-1.0, 1.0),
+    'sentiment_textblob_polarity': (-1.0, 1.0)
+}
+HISTOGRAM_BINS = 20
+
+# Columnas de características de texto (sólo estadísticas)
+TEXT_STAT_COLUMNS = (
+    'sentiment_length', 'sentiment_word_count', 'sentiment_sentence_count'
+)
+
+
+class NumericAggregate:
+    """Estadísticas combinables de una columna numérica."""
+
+    def __init__(self, value_range: Optional[Tuple[float, float]] = None,
+                 bins: int = HISTOGRAM_BINS):
+        """
+        Inicializar un agregado vacío.
+
+        Args:
+            value_range: Rango (mínimo, máximo) del histograma (None = sin histograma)
+            bins: Número de bins del histograma
+        """
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+        self.value_range = tuple(value_range) if value_range else None
+        self.histogram = np.zeros(bins, dtype=np.int64) if value_range else None
+
+    def update(self, values: np.ndarray) -> None:
+        """Incorporar un arreglo de valores (los NaN se ignoran)."""
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return
+
+        batch = NumericAggregate(self.value_range, len(self.histogram) if self.value_range else 0)
+        batch.count = len(values)
+        batch.mean = float(values.mean())
+        batch.m2 = float(((values - batch.mean) ** 2).sum())
+        batch.min = float(values.min())
+        batch.max = float(values.max())
+        if self.value_range:
+            clipped = np.clip(values, *self.value_range)
+            batch.histogram = np.histogram(
+                clipped, bins=len(self.histogram), range=self.value_range
+            )[0].astype(np.int64)
+        self.merge(batch)
+
+    def merge(self, other: 'NumericAggregate') -> 'NumericAggregate':
+        """Combinar otro agregado en este (algoritmo paralelo de Chan)."""
+        if other.count == 0:
+            return self
+        if self.value_range != other.value_range:
+            raise ValueError("No se pueden combinar histogramas con rangos distintos")
+
+        total = self.count + other.count
+        delta = other.mean - self.mean
+        self.m2 += other.m2 + delta ** 2 * self.count * other.count / total
+        self.mean += delta * other.count / total
+        self.count = total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        if self.histogram is not None:
+            self.histogram = self.histogram + other.histogram
+        return self
+
+    def stats(self) -> Dict:
+        """Media, desviación estándar muestral, mínimo y máximo."""
+        if self.count == 0:
+            return {'mean': np.nan, 'std': np.nan, 'min': np.nan, 'max': np.nan}
+        return {
+            'mean': self.mean,
+            'std': np.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else np.nan,
+            'min': self.min,
+            'max': self.max
+        }
+
+    def to_dict(self) -> Dict:
+        """Representación serializable a JSON."""
+        return {
+            'count': self.count,
+            'mean': self.mean,
+            'm2': self.m2,
+            'min': self.min if self.count else None,
+            'max': self.max if self.count else None,
+            'value_range': list(self.value_range) if self.value_range else None,
+            'histogram': self.histogram.tolist() if self.histogram is not None else None
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'NumericAggregate':
+        """Reconstruir un agregado desde to_dict()."""
+        histogram = data.get('histogram')
+        aggregate = cls(data.get('value_range'), len(histogram) if histogram else 0)
+        aggregate.count = data['count']
+        aggregate.mean = data['mean']
+        aggregate.m2 = data['m2']
+        if aggregate.count:
+            aggregate.min = data['min']
+            aggregate.max = data['max']
+        if histogram:
+            aggregate.histogram = np.array(histogram, dtype=np.int64)
+        return aggregate
+
+
+class SentimentReportState:
+    """Estado agregado y combinable de un reporte de sentimientos."""
+
+    def __init__(self):
+        """Inicializar un estado vacío."""
+        self.total_texts = 0
+        self.sentiment_counts: Dict[str, int] = {}
+        self.columns: Dict[str, NumericAggregate] = {}
+
+    def update(self, df: pd.DataFrame) -> 'SentimentReportState':
+        """
+        Incorporar un lote de resultados de análisis.
+
+        Args:
+            df: DataFrame con columnas sentiment_* (por ejemplo, de analyze_dataframe)
+
+        Returns:
+            El propio estado (para encadenar)
+        """
+        self.total_texts += len(df)
+
+        if CONSENSUS_COLUMN in df.columns:
+            labels, counts = np.unique(
+                df[CONSENSUS_COLUMN].dropna().to_numpy(dtype=str), return_counts=True
+            )
+            for label, count in zip(labels, counts):
+                self.sentiment_counts[label] = self.sentiment_counts.get(label, 0) + int(count)
+
+        for column in list(HISTOGRAM_COLUMNS) + list(TEXT_STAT_COLUMNS):
+            if column in df.columns:
+                if column not in self.columns:
+                    self.columns[column] = NumericAggregate(HISTOGRAM_COLUMNS.get(column))
+                self.columns[column].update(
+                    pd.to_numeric(df[column], errors='coerce').to_numpy(dtype=np.float64)
+                )
+        return self
+
+    def merge(self, other: 'SentimentReportState') -> 'SentimentReportState':
+        """
+        Combinar otro estado (otro lote, worker, archivo o día) en este.
+
+        Args:
+            other: Estado a combinar
+
+        Returns:
+            El propio estado (para encadenar)
+        """
+        self.total_texts += other.total_texts
+        for label, count in other.sentiment_counts.items():
+            self.sentiment_counts[label] = self.sentiment_counts.get(label, 0) + count
+        for column, aggregate in other.columns.items():
+            if column in self.columns:
+                self.columns[column].merge(aggregate)
+            else:
+                self.columns[column] = NumericAggregate.from_dict(aggregate.to_dict())
+        return self
+
+    @classmethod
+    def from_dataframe(cls, df: pd.DataFrame) -> 'SentimentReportState':
+        """Construir el estado de un DataFrame completo."""
+        return cls().update(df)
+
+    @classmethod
+    def merge_all(cls, states: Iterable['SentimentReportState']) -> 'SentimentReportState':
+        """Combinar varios estados (por ejemplo, reportes diarios en uno mensual)."""
+        merged = cls()
+        for state in states:
+            merged.merge(state)
+        return merged
+
+    def report(self) -> Dict:
+        """
+        Reporte con el mismo formato que generate_sentiment_report.
+
+        Returns:
+            Diccionario con estadísticas del reporte
+        """
+        report = {'total_texts': self.total_texts}
+
+        if self.sentiment_counts:
+            ordered = sorted(self.sentiment_counts.items(), key=lambda item: -item[1])
+            report['sentiment_distribution'] = dict(ordered)
+            report['sentiment_percentages'] = {
+                label: count / self.total_texts * 100 for label, count in ordered
+            }
+
+        if 'sentiment_vader_compound' in self.columns:
+            report['vader_stats'] = self.columns['sentiment_vader_compound'].stats()
+        if 'sentiment_textblob_polarity' in self.columns:
+            report['textblob_stats'] = self.columns['sentiment_textblob_polarity'].stats()
+
+        if 'sentiment_length' in self.columns:
+            mean = {
+                column: self.columns.get(column, NumericAggregate()).stats()['mean']
+                for column in TEXT_STAT_COLUMNS
+            }
+            report['text_stats'] = {
+                'avg_length': mean['sentiment_length'],
+                'avg_word_count': mean['sentiment_word_count'],
+                'avg_sentence_count': mean['sentiment_sentence_count']
+            }
+
+        histograms = {
+            column.replace('sentiment_', ''): {
+                'edges': np.linspace(*aggregate.value_range, len(aggregate.histogram) + 1).tolist(),
+                'counts': aggregate.histogram.tolist()
+            }
+            for column, aggregate in self.columns.items() if aggregate.histogram is not None
+        }
+        if histograms:
+            report['score_histograms'] = histograms
+
+        return report
+
+    def to_dict(self) -> Dict:
+        """Representación serializable a JSON."""
+        return {
+            'total_texts': self.total_texts,
+            'sentiment_counts': dict(self.sentiment_counts),
+            'columns': {column: aggregate.to_dict() for column, aggregate in self.columns.items()}
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'SentimentReportState':
+        """Reconstruir un estado desde to_dict()."""
+        state = cls()
+        state.total_texts = data['total_texts']
+        state.sentiment_counts = dict(data['sentiment_counts'])
+        state.columns = {
+            column: NumericAggregate.from_dict(aggregate)
+            for column, aggregate in data['columns'].items()
+        }
+        return state
+
+    def save(self, path: str) -> None:
+        """Guardar el estado como JSON."""
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, indent=2)
+
+    @classmethod
+    def load(cls, path: str) -> 'SentimentReportState':
+        """Cargar un estado guardado con save()."""
+        with open(path, encoding='utf-8') as f:
+            return cls.from_dict(json.load(f))
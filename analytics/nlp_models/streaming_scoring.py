@@ -0,0 +1,358 @@
+"""
+Análisis de sentimientos en streaming de archivo a archivo.
+
+Para corpus de reviews y transcripciones que no caben en memoria:
+- Lee Parquet, CSV o NDJSON por lotes de registros (sólo las columnas de
+  id y de texto)
+- Analiza cada lote con SentimentAnalyzer.analyze_dataframe
+- Escribe sólo los ids y las columnas de análisis en un dataset Parquet
+  de salida (un archivo part-NNNNN.parquet por checkpoint)
+- Registra un checkpoint JSON tras cada parte cerrada, de modo que una
+  ejecución interrumpida continúa desde la última parte completa
+- Acumula el estado del reporte (SentimentReportState) lote a lote y lo
+  guarda en el checkpoint, sin releer la salida para reportar
+- Opcionalmente cuenta frecuencias de tokens (TokenFrequencies) por parte,
+  también guardadas en el checkpoint para que una reanudación no las pierda
+
+La memoria queda acotada por batch_size y rows_per_part,
+independientemente del tamaño del corpus.
+"""
+
+import os
+import sys
+import json
+import glob
+import logging
+import argparse
+from typing import Dict, Iterator, List, Optional
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from sentiment_cache import config_fingerprint
+from sentiment_report import SentimentReportState
+from token_frequencies import TokenFrequencies
+
+CHECKPOINT_FILE = '_checkpoint.json'
+
+INPUT_FORMATS = ('parquet', 'csv', 'ndjson')
+
+
+def detect_format(path: str) -> str:
+    """Deducir el formato de entrada por la extensión del archivo."""
+    extension = os.path.splitext(path)[1].lower()
+    formats = {'.parquet': 'parquet', '.csv': 'csv', '.ndjson': 'ndjson', '.jsonl': 'ndjson'}
+    if extension not in formats:
+        raise ValueError(f"Formato no reconocido para {path}. Disponibles: {INPUT_FORMATS}")
+    return formats[extension]
+
+
+def iter_record_batches(path: str, columns: List[str], batch_size: int,
+                        input_format: Optional[str] = None,
+                        skip_rows: int = 0) -> Iterator[pd.DataFrame]:
+    """
+    Leer un archivo por lotes de registros sin cargarlo completo.
+
+    Las filas iniciales indicadas en skip_rows se saltan sin convertirlas:
+    en Parquet se omiten row groups completos según los metadatos, en CSV
+    las descarta el lector de Arrow y en NDJSON se saltan líneas sin
+    parsear el JSON.
+
+    Args:
+        path: Archivo de entrada
+        columns: Columnas a leer
+        batch_size: Filas máximas por lote
+        input_format: 'parquet', 'csv' o 'ndjson' (None = según la extensión)
+        skip_rows: Filas iniciales a saltar (p. ej. al reanudar)
+
+    Yields:
+        DataFrames con a lo sumo batch_size filas
+    """
+    input_format = input_format or detect_format(path)
+
+    if input_format == 'parquet':
+        parquet_file = pq.ParquetFile(path)
+        row_groups, offset = [], skip_rows
+        for index in range(parquet_file.num_row_groups):
+            group_rows = parquet_file.metadata.row_group(index).num_rows
+            if not row_groups and offset >= group_rows:
+                offset -= group_rows
+                continue
+            row_groups.append(index)
+        if not row_groups:
+            return
+        for batch in parquet_file.iter_batches(batch_size=batch_size, columns=columns,
+                                               row_groups=row_groups):
+            if offset:
+                skipped = min(offset, batch.num_rows)
+                batch = batch.slice(skipped)
+                offset -= skipped
+            if batch.num_rows:
+                yield batch.to_pandas()
+    elif input_format == 'csv':
+        from pyarrow import csv
+        reader = csv.open_csv(
+            path,
+            read_options=csv.ReadOptions(skip_rows_after_names=skip_rows),
+            convert_options=csv.ConvertOptions(include_columns=columns)
+        )
+        for batch in reader:
+            # Los bloques del lector CSV se ajustan a batch_size
+            for start in range(0, batch.num_rows, batch_size):
+                yield batch.slice(start, batch_size).to_pandas()
+    elif input_format == 'ndjson':
+        with open(path, encoding='utf-8') as f:
+            # pandas ignora las líneas vacías, así que no cuentan como filas
+            skipped = 0
+            while skipped < skip_rows:
+                line = f.readline()
+                if not line:
+                    break
+                if line.strip():
+                    skipped += 1
+            with pd.read_json(f, lines=True, chunksize=batch_size, dtype=False) as reader:
+                for chunk in reader:
+                    yield chunk[columns]
+    else:
+        raise ValueError(f"Formato desconocido: {input_format}. Disponibles: {INPUT_FORMATS}")
+
+
+def _output_schema(analyzer, analyzers: List[str], id_table: pa.Table) -> pa.Schema:
+    """Esquema fijo de salida para que todas las partes sean compatibles."""
+    fields = list(id_table.schema)
+    for name in analyzers:
+        for column in analyzer.ANALYZER_COLUMNS[name]:
+            dtype = pa.string() if column.endswith(('_category', '_label')) else pa.float64()
+            fields.append(pa.field(f'sentiment_{column}', dtype))
+    fields.append(pa.field('sentiment_analysis_timestamp', pa.string()))
+    fields.append(pa.field('sentiment_consensus_sentiment', pa.string()))
+    return pa.schema(fields)
+
+
+def _write_json_atomic(path: str, payload: Dict) -> None:
+    """Escribir un JSON reemplazando el archivo de forma atómica."""
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(payload, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+
+def analyze_file(analyzer, input_path: str, output_dir: str, text_column: str,
+                 id_columns: Optional[List[str]] = None, batch_size: int = 10_000,
+                 rows_per_part: int = 200_000, input_format: Optional[str] = None,
+                 resume: bool = True, token_frequencies: Optional[TokenFrequencies] = None,
+                 **options) -> Dict:
+    """
+    Analizar un archivo en streaming y escribir los resultados en Parquet.
+
+    Args:
+        analyzer: SentimentAnalyzer a utilizar
+        input_path: Archivo Parquet, CSV o NDJSON de entrada
+        output_dir: Directorio del dataset Parquet de salida
+        text_column: Columna con el texto a analizar
+        id_columns: Columnas de identificación a conservar en la salida
+        batch_size: Filas leídas y analizadas por lote
+        rows_per_part: Filas por archivo de salida (y por checkpoint)
+        input_format: 'parquet', 'csv' o 'ndjson' (None = según la extensión)
+        resume: Continuar desde el último checkpoint si existe
+        token_frequencies: TokenFrequencies donde combinar, parte a parte, los
+            tokens de los textos por clase de consenso (incluye las partes
+            ya confirmadas al reanudar)
+        **options: Argumentos para analyze_dataframe (analyzers, n_workers, ...).
+            Con n_workers > 1 se usa un único pool de procesos para todo el archivo
+
+    Returns:
+        Diccionario con filas procesadas, partes escritas, filas reanudadas y
+        reporte de sentimientos de todas las filas escritas
+
+    Raises:
+        ValueError: Si el checkpoint existente corresponde a otra entrada o configuración
+    """
+    id_columns = list(id_columns or [])
+    analyzers = analyzer._resolve_analyzers(options.pop('analyzers', None) or analyzer.analyzers)
+    options['analyzers'] = analyzers
+
+    token_config = token_frequencies.config() if token_frequencies is not None else None
+
+    stat = os.stat(input_path)
+    run_config = {
+        'input': os.path.abspath(input_path),
+        'size': stat.st_size,
+        'mtime': stat.st_mtime,
+        'text_column': text_column,
+        'id_columns': id_columns,
+        'analyzers': analyzers,
+        'fingerprints': {
+            name: analyzer._analyzer_fingerprint(name)[1]
+            for name in analyzers if name in analyzer.ANALYZER_PACKAGES
+        }
+    }
+    if token_config is not None:
+        # Un checkpoint sin conteos no sirve para reanudar contando tokens
+        run_config['token_frequencies'] = token_config
+    run_key = config_fingerprint(run_config)
+
+    os.makedirs(output_dir, exist_ok=True)
+    checkpoint_path = os.path.join(output_dir, CHECKPOINT_FILE)
+    checkpoint = {'run_key': run_key, 'rows_done': 0, 'parts': 0, 'completed': False,
+                  'report_state': SentimentReportState().to_dict(),
+                  'token_frequencies': {}}
+
+    if resume and os.path.exists(checkpoint_path):
+        with open(checkpoint_path, encoding='utf-8') as f:
+            previous = json.load(f)
+        if previous['run_key'] != run_key:
+            raise ValueError(
+                f"El checkpoint de {output_dir} corresponde a otra entrada o configuración. "
+                "Usar resume=False o un directorio de salida nuevo"
+            )
+        checkpoint = previous
+        if token_frequencies is not None:
+            token_frequencies.merge(TokenFrequencies.from_dict(checkpoint.get('token_frequencies', {})))
+        if checkpoint['completed']:
+            analyzer.logger.info(f"{input_path} ya fue procesado en {output_dir}")
+            return {'rows': checkpoint['rows_done'], 'parts': checkpoint['parts'],
+                    'resumed_rows': checkpoint['rows_done'],
+                    'report': load_report_state(output_dir).report()}
+    else:
+        for stale in glob.glob(os.path.join(output_dir, 'part-*.parquet')):
+            os.remove(stale)
+        _write_json_atomic(checkpoint_path, checkpoint)
+
+    resumed_rows = checkpoint['rows_done']
+    if resumed_rows:
+        analyzer.logger.info(f"Reanudando {input_path} desde la fila {resumed_rows}")
+
+    # Partes a medio escribir de una ejecución interrumpida
+    for partial in glob.glob(os.path.join(output_dir, 'part-*.parquet.tmp')):
+        os.remove(partial)
+
+    writer, part_rows, part_tmp, schema = None, 0, None, None
+    # Estado de las partes confirmadas y de la parte en curso
+    report_state = SentimentReportState.from_dict(checkpoint['report_state'])
+    part_state = SentimentReportState()
+    if token_frequencies is not None:
+        run_tokens = TokenFrequencies.from_dict(checkpoint.get('token_frequencies', {}),
+                                               **token_config)
+        options['token_frequencies'] = TokenFrequencies(**token_config)
+
+    # Un solo pool de workers para todos los lotes del archivo
+    n_workers = options.pop('n_workers', 1)
+    chunk_size = options.pop('chunk_size', 5000)
+    scorer = None
+    if n_workers > 1:
+        from parallel_scoring import ParallelScorer
+        worker_options = {key: value for key, value in options.items()
+                          if key in ('analyzers', 'transformer_batch_size')}
+        scorer = ParallelScorer(analyzer, n_workers, chunk_size, **worker_options)
+        options['scorer'] = scorer
+
+    def close_part():
+        nonlocal writer, part_rows, part_state
+        writer.close()
+        os.replace(part_tmp, part_tmp[:-len('.tmp')])
+        checkpoint['parts'] += 1
+        checkpoint['rows_done'] += part_rows
+        checkpoint['report_state'] = report_state.merge(part_state).to_dict()
+        if token_frequencies is not None:
+            part_tokens = options['token_frequencies']
+            checkpoint['token_frequencies'] = run_tokens.merge(part_tokens).to_dict()
+        _write_json_atomic(checkpoint_path, checkpoint)
+        if token_frequencies is not None:
+            # Sólo se combinan los tokens de partes ya confirmadas
+            token_frequencies.merge(part_tokens)
+            options['token_frequencies'] = TokenFrequencies(**token_config)
+        analyzer.logger.info(
+            f"Checkpoint: {checkpoint['rows_done']} filas en {checkpoint['parts']} partes"
+        )
+        writer, part_rows, part_state = None, 0, SentimentReportState()
+
+    # Las filas ya escritas en partes completas no se vuelven a leer
+    batches = iter_record_batches(input_path, id_columns + [text_column], batch_size,
+                                  input_format, skip_rows=resumed_rows)
+    try:
+        for batch in batches:
+            texts = batch[text_column].fillna('')
+            scored = analyzer.analyze_dataframe(batch[id_columns].assign(**{text_column: texts}),
+                                                text_column, **options)
+            scored = scored.drop(columns=[text_column])
+
+            if schema is None:
+                id_table = pa.Table.from_pandas(batch[id_columns], preserve_index=False)
+                schema = _output_schema(analyzer, analyzers, id_table)
+            if writer is None:
+                part_tmp = os.path.join(output_dir, f"part-{checkpoint['parts']:05d}.parquet.tmp")
+                writer = pq.ParquetWriter(part_tmp, schema)
+
+            writer.write_table(pa.Table.from_pandas(scored[schema.names], schema=schema,
+                                                    preserve_index=False))
+            part_rows += len(scored)
+            part_state.update(scored)
+            if part_rows >= rows_per_part:
+                close_part()
+
+        if writer is not None:
+            close_part()
+    finally:
+        if scorer is not None:
+            scorer.close()
+
+    checkpoint['completed'] = True
+    _write_json_atomic(checkpoint_path, checkpoint)
+    analyzer.logger.info(
+        f"Análisis en streaming completado: {checkpoint['rows_done']} filas en "
+        f"{checkpoint['parts']} partes ({output_dir})"
+    )
+    return {'rows': checkpoint['rows_done'], 'parts': checkpoint['parts'],
+            'resumed_rows': resumed_rows, 'report': report_state.report()}
+
+
+def load_report_state(output_dir: str) -> SentimentReportState:
+    """
+    Estado del reporte de las partes confirmadas de un directorio de salida.
+
+    Los estados de varios directorios (por ejemplo, uno por día) se combinan
+    con SentimentReportState.merge_all para obtener reportes agregados.
+
+    Args:
+        output_dir: Directorio de salida de analyze_file
+
+    Returns:
+        SentimentReportState guardado en el checkpoint
+    """
+    with open(os.path.join(output_dir, CHECKPOINT_FILE), encoding='utf-8') as f:
+        return SentimentReportState.from_dict(json.load(f)['report_state'])
+
+
+def main():
+    """Analizar un archivo desde la línea de comandos."""
+    parser = argparse.ArgumentParser(description='Análisis de sentimientos en streaming')
+    parser.add_argument('input', help='Archivo Parquet, CSV o NDJSON')
+    parser.add_argument('output', help='Directorio del dataset Parquet de salida')
+    parser.add_argument('--text-column', required=True, help='Columna con el texto')
+    parser.add_argument('--id-columns', nargs='*', default=[], help='Columnas de id a conservar')
+    parser.add_argument('--analyzers', nargs='+', default=None, help='Analizadores a ejecutar')
+    parser.add_argument('--batch-size', type=int, default=10_000, help='Filas por lote')
+    parser.add_argument('--rows-per-part', type=int, default=200_000, help='Filas por parte')
+    parser.add_argument('--workers', type=int, default=1, help='Procesos de análisis')
+    parser.add_argument('--cache-path', default=None, help='Caché SQLite de resultados')
+    parser.add_argument('--no-resume', action='store_true', help='Ignorar checkpoints previos')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    from sentiment_analyzer import SentimentAnalyzer
+
+    analyzer = SentimentAnalyzer(cache_path=args.cache_path, analyzers=args.analyzers)
+    summary = analyze_file(
+        analyzer, args.input, args.output, args.text_column,
+        id_columns=args.id_columns, batch_size=args.batch_size,
+        rows_per_part=args.rows_per_part, resume=not args.no_resume,
+        n_workers=args.workers
+    )
+    print(summary)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""
+Frecuencias de tokens incrementales para nubes de palabras.
+
+generate_wordcloud unía todos los textos en un único string y WordCloud
+volvía a tokenizarlo. Aquí las frecuencias se acumulan por lotes y por
+clase de sentimiento:
+- Tokenización vectorizada con pandas (mismo patrón de palabra que WordCloud)
+- Filtrado de stopwords y, opcionalmente, restricción a un vocabulario
+  (por ejemplo, los términos de los léxicos del dominio)
+- Contadores combinables entre lotes, workers y ejecuciones (merge)
+
+Las frecuencias se entregan a WordCloud.generate_from_frequencies, de modo
+que renderizar la nube no requiere volver a recorrer los textos.
+"""
+
+from collections import Counter
+from typing import Dict, Iterable, Optional
+
+import pandas as pd
+
+# Patrón de palabra por defecto de WordCloud (al menos 2 caracteres)
+TOKEN_PATTERN = r"\w[\w']+"
+
+ALL_SENTIMENTS = 'all'
+
+
+class TokenFrequencies:
+    """Conteo de tokens por clase de sentimiento, acumulable por lotes."""
+
+    def __init__(self, stopwords: Optional[Iterable[str]] = None,
+                 vocabulary: Optional[Iterable[str]] = None,
+                 token_pattern: str = TOKEN_PATTERN):
+        """
+        Inicializar contadores vacíos.
+
+        Args:
+            stopwords: Palabras a descartar
+            vocabulary: Si se indica, sólo se cuentan estos tokens
+            token_pattern: Expresión regular de un token
+        """
+        self.stopwords = {word.lower() for word in stopwords or ()}
+        self.vocabulary = {word.lower() for word in vocabulary} if vocabulary is not None else None
+        self.token_pattern = token_pattern
+        self.counts: Dict[str, Counter] = {}
+
+    def update(self, texts: pd.Series, labels: Optional[pd.Series] = None) -> 'TokenFrequencies':
+        """
+        Acumular los tokens de un lote de textos.
+
+        Args:
+            texts: Textos del lote (idealmente ya limpios)
+            labels: Clase de sentimiento de cada texto (None = sin clase)
+
+        Returns:
+            El propio contador (para encadenar)
+        """
+        texts = pd.Series(texts, dtype=object).reset_index(drop=True)
+        if labels is None:
+            labels = pd.Series('', index=texts.index, dtype=object)
+        else:
+            labels = pd.Series(labels, dtype=object).reset_index(drop=True).fillna('')
+
+        tokens = texts.fillna('').astype(str).str.lower().str.findall(self.token_pattern)
+        frame = pd.DataFrame({'label': labels, 'token': tokens}).explode('token')
+        frame = frame.dropna(subset=['token'])
+
+        keep = ~frame['token'].isin(self.stopwords)
+        if self.vocabulary is not None:
+            keep &= frame['token'].isin(self.vocabulary)
+        frame = frame[keep]
+        if frame.empty:
+            return self
+
+        counts = frame.groupby(['label', 'token'], sort=False).size()
+        for label, group in counts.groupby(level='label', sort=False):
+            self.counts.setdefault(label, Counter()).update(group.droplevel('label').to_dict())
+        return self
+
+    def merge(self, other: 'TokenFrequencies') -> 'TokenFrequencies':
+        """
+        Combinar los conteos de otro contador en este.
+
+        Args:
+            other: Contador a combinar
+
+        Returns:
+            El propio contador (para encadenar)
+        """
+        for label, counter in other.counts.items():
+            self.counts.setdefault(label, Counter()).update(counter)
+        return self
+
+    def frequencies(self, sentiment: str = ALL_SENTIMENTS,
+                    max_words: Optional[int] = None) -> Dict[str, int]:
+        """
+        Frecuencias de tokens de una clase (o de todas).
+
+        Args:
+            sentiment: Clase de sentimiento o 'all'
+            max_words: Devolver sólo los max_words tokens más frecuentes
+
+        Returns:
+            Diccionario token -> frecuencia
+        """
+        if sentiment == ALL_SENTIMENTS:
+            counter = Counter()
+            for label_counter in self.counts.values():
+                counter.update(label_counter)
+        else:
+            counter = self.counts.get(sentiment, Counter())
+        return dict(counter.most_common(max_words))
+
+    def config(self) -> Dict:
+        """
+        Parámetros para crear un contador vacío equivalente.
+
+        Se usa para repartir el conteo entre workers y para identificar la
+        configuración en checkpoints (listas ordenadas, serializable a JSON).
+
+        Returns:
+            Argumentos para el constructor (stopwords, vocabulary, token_pattern)
+        """
+        return {
+            'stopwords': sorted(self.stopwords),
+            'vocabulary': sorted(self.vocabulary) if self.vocabulary is not None else None,
+            'token_pattern': self.token_pattern
+        }
+
+    def to_dict(self) -> Dict:
+        """Representación serializable a JSON."""
+        return {label: dict(counter) for label, counter in self.counts.items()}
+
+    @classmethod
+    def from_dict(cls, data: Dict, **kwargs) -> 'TokenFrequencies':
+        """Reconstruir un contador desde to_dict()."""
+        frequencies = cls(**kwargs)
+        frequencies.counts = {label: Counter(counts) for label, counts in data.items()}
+        return frequencies
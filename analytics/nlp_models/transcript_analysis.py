@@ -0,0 +1,213 @@
+"""
+Análisis de sentimientos por turno para transcripciones de conversaciones.
+
+Las transcripciones de conversation_transcripts son diálogos de varias
+líneas "Cliente: ..." / "Agente: ...". Analizarlas como un solo texto
+mezcla al agente con el cliente y, en los transformers, descarta todo lo
+que excede el límite de tokens. Este módulo:
+- Separa cada transcripción en turnos por hablante (y opcionalmente en
+  oraciones dentro de cada turno)
+- Analiza los turnos de los hablantes seleccionados en lotes con
+  SentimentAnalyzer.analyze_dataframe, cuya caché por contenido evita
+  recalcular las líneas con plantilla que se repiten entre transcripciones
+- Agrega por transcripción: media, primer y último turno, peor turno y
+  tendencia (pendiente del score a lo largo de la conversación)
+"""
+
+import re
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Hablantes reconocidos como prefijo de turno ("Cliente:", "Agente:", ...)
+KNOWN_SPEAKERS = ('cliente', 'agente', 'asesor', 'ejecutivo', 'customer', 'agent')
+
+SPEAKER_PATTERN = re.compile(
+    r'^\s*(' + '|'.join(KNOWN_SPEAKERS) + r')\s*:\s*', re.MULTILINE | re.IGNORECASE
+)
+
+# Columnas de score por turno, en orden de preferencia
+TURN_SCORE_COLUMNS = ('vader_compound', 'textblob_polarity')
+
+SEGMENT_UNITS = ('turn', 'sentence')
+
+
+def split_turns(text: str) -> List[Tuple[str, str]]:
+    """
+    Separar una transcripción en turnos por hablante.
+
+    Las líneas sin prefijo de hablante se agregan al turno anterior; un
+    texto sin ningún prefijo se devuelve como un único turno sin hablante.
+
+    Args:
+        text: Transcripción completa
+
+    Returns:
+        Lista de (hablante en minúsculas, texto del turno)
+    """
+    if not isinstance(text, str) or not text.strip():
+        return []
+
+    matches = list(SPEAKER_PATTERN.finditer(text))
+    if not matches:
+        return [('', text.strip())]
+
+    turns = []
+    preamble = text[:matches[0].start()].strip()
+    if preamble:
+        turns.append(('', preamble))
+    for i, match in enumerate(matches):
+        end = matches[i + 1].start() if i + 1 < len(matches) else len(text)
+        turn_text = ' '.join(text[match.end():end].split())
+        if turn_text:
+            turns.append((match.group(1).lower(), turn_text))
+    return turns
+
+
+def explode_turns(texts: pd.Series, speakers: Optional[Sequence[str]] = ('cliente',),
+                  unit: str = 'turn', sent_tokenize=None) -> pd.DataFrame:
+    """
+    Convertir transcripciones en una tabla de segmentos (uno por fila).
+
+    Args:
+        texts: Serie de transcripciones
+        speakers: Hablantes a conservar (None = todos)
+        unit: 'turn' (un segmento por turno) o 'sentence' (por oración del turno)
+        sent_tokenize: Función de separación en oraciones (requerida si unit='sentence')
+
+    Returns:
+        DataFrame con transcript_pos, turn_index, speaker y segment_text
+    """
+    if unit not in SEGMENT_UNITS:
+        raise ValueError(f"Unidad desconocida: {unit}. Disponibles: {SEGMENT_UNITS}")
+    if unit == 'sentence' and sent_tokenize is None:
+        raise ValueError("unit='sentence' requiere sent_tokenize")
+
+    wanted = {speaker.lower() for speaker in speakers} if speakers is not None else None
+    positions, turn_indexes, turn_speakers, segments = [], [], [], []
+
+    for position, text in enumerate(texts):
+        for turn_index, (speaker, turn_text) in enumerate(split_turns(text)):
+            # Textos sin prefijos se tratan como un único turno del cliente
+            if wanted is not None and speaker and speaker not in wanted:
+                continue
+            parts = sent_tokenize(turn_text) if unit == 'sentence' else [turn_text]
+            for part in parts:
+                positions.append(position)
+                turn_indexes.append(turn_index)
+                turn_speakers.append(speaker)
+                segments.append(part)
+
+    return pd.DataFrame({
+        'transcript_pos': np.array(positions, dtype=np.int64),
+        'turn_index': np.array(turn_indexes, dtype=np.int64),
+        'speaker': pd.Series(turn_speakers, dtype=object),
+        'segment_text': pd.Series(segments, dtype=object)
+    })
+
+
+def aggregate_turn_scores(segments: pd.DataFrame, scores: np.ndarray,
+                          n_transcripts: int) -> pd.DataFrame:
+    """
+    Agregar scores de segmentos por transcripción de forma vectorizada.
+
+    Args:
+        segments: Tabla producida por explode_turns
+        scores: Score numérico por segmento (NaN = sin score)
+        n_transcripts: Número de transcripciones originales
+
+    Returns:
+        DataFrame con una fila por transcripción (en orden de posición)
+    """
+    frame = pd.DataFrame({
+        'pos': segments['transcript_pos'].to_numpy(),
+        'turn': segments['turn_index'].to_numpy(),
+        'score': np.asarray(scores, dtype=np.float64)
+    })
+    frame = frame[~np.isnan(frame['score'].to_numpy())].copy()
+    # Orden dentro de la conversación para la tendencia
+    frame['x'] = frame.groupby('pos').cumcount().astype(np.float64)
+    frame['xx'] = frame['x'] ** 2
+    frame['xy'] = frame['x'] * frame['score']
+
+    grouped = frame.groupby('pos', sort=True)
+    sums = grouped[['x', 'score', 'xx', 'xy']].sum()
+    n = grouped.size().astype(np.float64)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        denominator = n * sums['xx'] - sums['x'] ** 2
+        slope = np.where(
+            n > 1, (n * sums['xy'] - sums['x'] * sums['score']) / denominator, np.nan
+        )
+
+    worst_rows = grouped['score'].idxmin()
+    summary = pd.DataFrame({
+        'turn_count': n,
+        'turn_mean': sums['score'] / n,
+        'turn_first': grouped['score'].first(),
+        'turn_final': grouped['score'].last(),
+        'turn_worst': grouped['score'].min(),
+        'turn_worst_index': frame.loc[worst_rows.to_numpy(), 'turn'].to_numpy(),
+        'turn_trend': slope
+    })
+
+    summary = summary.reindex(np.arange(n_transcripts))
+    summary['turn_count'] = summary['turn_count'].fillna(0.0)
+    return summary
+
+
+def analyze_transcripts(analyzer, df: pd.DataFrame, text_column: str,
+                        speakers: Optional[Sequence[str]] = ('cliente',),
+                        unit: str = 'turn', return_segments: bool = False,
+                        **options):
+    """
+    Analizar transcripciones turno a turno y agregar por transcripción.
+
+    Args:
+        analyzer: SentimentAnalyzer a utilizar
+        df: DataFrame con transcripciones
+        text_column: Columna con el texto de la transcripción
+        speakers: Hablantes cuyos turnos se analizan (None = todos)
+        unit: 'turn' o 'sentence'
+        return_segments: Devolver también la tabla de segmentos analizados
+        **options: Argumentos para analyze_dataframe (analyzers, batch_size, ...)
+
+    Returns:
+        DataFrame original con columnas sentiment_turn_*; con return_segments,
+        una tupla (DataFrame, segmentos analizados)
+    """
+    sent_tokenize = analyzer.sent_tokenize if unit == 'sentence' else None
+    segments = explode_turns(df[text_column], speakers, unit, sent_tokenize)
+    analyzer.logger.info(
+        f"Analizando {len(segments)} segmentos ({unit}) de {len(df)} transcripciones..."
+    )
+
+    scored = analyzer.analyze_dataframe(segments, 'segment_text', **options)
+
+    score_column = next(
+        (f'sentiment_{name}' for name in TURN_SCORE_COLUMNS if f'sentiment_{name}' in scored),
+        None
+    )
+    if score_column is None:
+        raise ValueError(
+            f"El análisis por turnos requiere un analizador con score numérico: {TURN_SCORE_COLUMNS}"
+        )
+
+    summary = aggregate_turn_scores(segments, scored[score_column].to_numpy(), len(df))
+
+    # Consenso del último turno analizado de cada transcripción
+    last_rows = scored.groupby('transcript_pos', sort=True).tail(1)
+    final_consensus = pd.Series(
+        last_rows['sentiment_consensus_sentiment'].to_numpy(),
+        index=last_rows['transcript_pos'].to_numpy()
+    ).reindex(np.arange(len(df)))
+
+    summary['final_consensus'] = final_consensus.to_numpy()
+    summary.columns = [f'sentiment_{name}' for name in summary.columns]
+    summary.index = df.index
+    result = pd.concat([df, summary], axis=1)
+
+    if return_segments:
+        return result, scored
+    return result
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Benchmark de conteo de clientes únicos: countDistinct exacto vs sketches HLL.
+
+Compara, sobre tickets sintéticos en Spark local:
+- Tiempo de ejecución de la agregación diaria por canal
+- Bytes escritos en shuffle (leídos de la API REST de Spark UI)
+- Error relativo de la estimación frente al conteo exacto
+- Costo de un roll-up mensual (recontar tickets vs unir sketches)
+
+Uso:
+    python benchmarks/distinct_count_benchmark.py --rows 5000000 --lg-config-k 12
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import urllib.request
+from typing import Callable, Dict
+
+from pyspark.sql import SparkSession, DataFrame
+from pyspark.sql import functions as F
+
+sys.path.append(os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    'processing', 'pyspark_jobs'
+))
+from distinct_sketches import (
+    error_bound, sketch_agg, sketch_estimate, merge_sketches_spark
+)
+
+
+GROUP_COLS = ["year", "month", "day", "canal_normalizado"]
+
+
+def build_tickets(spark: SparkSession, rows: int, clientes: int) -> DataFrame:
+    """Generar tickets sintéticos con la forma de customer_tickets limpio."""
+    canales = F.array(*[F.lit(c) for c in
+                        ["telefono", "chat", "email", "presencial", "app_movil"]])
+    df = spark.range(rows).select(
+        F.concat(F.lit("CLI-"), (F.rand(7) * clientes).cast("long")).alias("cliente_id"),
+        F.element_at(canales, (F.rand(11) * 5).cast("int") + 1).alias("canal_normalizado"),
+        F.date_add(F.lit("2024-01-01").cast("date"), (F.rand(13) * 365).cast("int")).alias("fecha")
+    )
+    return df.select(
+        "cliente_id", "canal_normalizado",
+        F.year("fecha").alias("year"),
+        F.month("fecha").alias("month"),
+        F.dayofmonth("fecha").alias("day")
+    ).cache()
+
+
+def shuffle_write_bytes(spark: SparkSession) -> int:
+    """Sumar bytes de shuffle escritos por todas las etapas completadas."""
+    sc = spark.sparkContext
+    url = f"{sc.uiWebUrl}/api/v1/applications/{sc.applicationId}/stages?status=complete"
+    with urllib.request.urlopen(url) as response:
+        stages = json.loads(response.read().decode("utf-8"))
+    return int(sum(stage.get("shuffleWriteBytes", 0) for stage in stages))
+
+
+def measure(spark: SparkSession, name: str, action: Callable[[], DataFrame]) -> Dict:
+    """Ejecutar una agregación y medir tiempo y bytes de shuffle."""
+    before = shuffle_write_bytes(spark)
+    start = time.perf_counter()
+    result = action().collect()
+    elapsed = time.perf_counter() - start
+    # La API REST actualiza las métricas de etapa de forma asíncrona
+    time.sleep(1.0)
+    shuffled = shuffle_write_bytes(spark) - before
+    print(f"{name:<28} {elapsed:>8.2f}s  shuffle={shuffled / 1024 ** 2:>9.2f} MB  "
+          f"filas={len(result)}")
+    return {'name': name, 'seconds': elapsed, 'shuffle_bytes': shuffled, 'result': result}
+
+
+def main():
+    """Función principal del benchmark."""
+    parser = argparse.ArgumentParser(description='Benchmark countDistinct vs HLL')
+    parser.add_argument('--rows', type=int, default=2_000_000, help='Tickets sintéticos')
+    parser.add_argument('--clientes', type=int, default=200_000, help='Clientes distintos')
+    parser.add_argument('--lg-config-k', type=int, default=12, help='Precisión HLL')
+    parser.add_argument('--partitions', type=int, default=16, help='Particiones de shuffle')
+    args = parser.parse_args()
+
+    spark = SparkSession.builder \
+        .master("local[*]") \
+        .appName("distinct-count-benchmark") \
+        .config("spark.sql.shuffle.partitions", args.partitions) \
+        .config("spark.ui.enabled", "true") \
+        .getOrCreate()
+
+    tickets = build_tickets(spark, args.rows, args.clientes)
+    tickets.count()
+
+    print(f"=== Conteo de clientes únicos ({args.rows:,} tickets, "
+          f"lg_config_k={args.lg_config_k}, error ±{error_bound(args.lg_config_k):.2%}) ===")
+
+    exact = measure(spark, "diario exacto", lambda: tickets.groupBy(*GROUP_COLS).agg(
+        F.countDistinct("cliente_id").alias("clientes_unicos")
+    ))
+
+    daily_sketches = tickets.groupBy(*GROUP_COLS).agg(
+        sketch_agg("cliente_id", args.lg_config_k).alias("clientes_sketch")
+    ).withColumn("clientes_unicos", sketch_estimate("clientes_sketch")).cache()
+    approx = measure(spark, "diario HLL", lambda: daily_sketches)
+
+    monthly_exact = measure(spark, "mensual exacto (tickets)", lambda: tickets.groupBy(
+        "year", "month"
+    ).agg(F.countDistinct("cliente_id").alias("clientes_unicos")))
+
+    monthly_sketch = measure(spark, "mensual HLL (sketches)", lambda: merge_sketches_spark(
+        daily_sketches, ["year", "month"], "clientes_sketch", "clientes_unicos",
+        args.lg_config_k
+    ))
+
+    # Error observado frente al conteo exacto
+    def observed_errors(exact_rows, approx_rows, keys):
+        exact_map = {tuple(r[k] for k in keys): r["clientes_unicos"] for r in exact_rows}
+        return [
+            abs(r["clientes_unicos"] - exact_map[tuple(r[k] for k in keys)]) /
+            exact_map[tuple(r[k] for k in keys)]
+            for r in approx_rows
+        ]
+
+    daily_errors = observed_errors(exact['result'], approx['result'], GROUP_COLS)
+    monthly_errors = observed_errors(
+        monthly_exact['result'], monthly_sketch['result'], ["year", "month"]
+    )
+
+    print("\n=== Error relativo observado ===")
+    print(f"diario:  medio={sum(daily_errors) / len(daily_errors):.4%}  "
+          f"máximo={max(daily_errors):.4%}")
+    print(f"mensual: medio={sum(monthly_errors) / len(monthly_errors):.4%}  "
+          f"máximo={max(monthly_errors):.4%}")
+    print(f"cota teórica (2σ): {error_bound(args.lg_config_k):.4%}")
+
+    spark.stop()
+
+
+if __name__ == "__main__":
+    main()
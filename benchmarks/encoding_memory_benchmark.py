@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Benchmark de memoria y tiempo de las codificaciones de create_preprocessor.
+
+Para cada familia de modelo (regresión logística/lineal, RandomForest,
+XGBoost, LightGBM) compara la codificación original ('dense': one-hot denso
+float64) con la de su familia en encoding='auto' ('sparse': CSR float32, o
+'native': códigos ordinales float32 con categóricas nativas). Reporta pico
+de memoria y tamaño de la matriz al preprocesar, tiempo de ajuste y score en
+test.
+
+Uso:
+    python benchmarks/encoding_memory_benchmark.py --rows 500000 --consulta-levels 2000
+    python benchmarks/encoding_memory_benchmark.py --models lightgbm xgboost --task regression
+"""
+
+import os
+import sys
+import time
+import logging
+import argparse
+import tracemalloc
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from scoring_service_benchmark import ROOT_DIR, generate_tickets  # noqa: E402
+
+sys.path.append(os.path.join(ROOT_DIR, 'analytics', 'ml_models'))
+
+
+def matrix_bytes(matrix) -> int:
+    """Bytes de una matriz densa o dispersa."""
+    if hasattr(matrix, 'indptr'):
+        return matrix.data.nbytes + matrix.indices.nbytes + matrix.indptr.nbytes
+    return matrix.nbytes
+
+
+def main():
+    """Función principal del benchmark."""
+    parser = argparse.ArgumentParser(description='Memoria y tiempo por codificación')
+    parser.add_argument('--rows', type=int, default=200_000, help='Tickets sintéticos')
+    parser.add_argument('--consulta-levels', type=int, default=500,
+                        help='Niveles de tipo_consulta (alta cardinalidad)')
+    parser.add_argument('--task', default='classification', choices=['classification', 'regression'])
+    parser.add_argument('--models', nargs='+', default=None, help='Modelos a medir (por defecto todos)')
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+    from sklearn.base import clone
+    from sklearn.metrics import get_scorer
+    from sklearn.model_selection import train_test_split
+    from satisfaction_predictor import SatisfactionPredictor
+    from categorical_encoding import configure_model, model_encoding
+
+    df = generate_tickets(args.rows)
+    rng = np.random.default_rng(0)
+    df['tipo_consulta'] = [f'consulta_{i}' for i in rng.zipf(1.3, args.rows) % args.consulta_levels]
+
+    predictor = SatisfactionPredictor(task_type=args.task)
+    predictor.logger.setLevel(logging.WARNING)
+    X, y = predictor.prepare_data(df)
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2,
+                                                        random_state=predictor.random_state)
+    numeric, categorical = predictor._feature_types(X)
+    scorer = get_scorer('accuracy' if args.task == 'classification' else 'neg_mean_squared_error')
+
+    print(f"Tickets: {args.rows:,} | numéricas: {len(numeric)} | categóricas: {len(categorical)} "
+          f"({', '.join(f'{c}={X[c].nunique()}' for c in categorical)})")
+
+    results: List[Dict] = []
+    for model_name in args.models or list(predictor.models):
+        for encoding in dict.fromkeys(['dense', model_encoding(model_name, 'auto')]):
+            preprocessor = predictor.create_preprocessor(X_train, encoding)
+
+            tracemalloc.start()
+            start = time.perf_counter()
+            train_matrix = preprocessor.fit_transform(X_train)
+            preprocess_s = time.perf_counter() - start
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            test_matrix = preprocessor.transform(X_test)
+
+            model = configure_model(model_name, clone(predictor.models[model_name]), encoding,
+                                    len(numeric), len(categorical))
+            start = time.perf_counter()
+            model.fit(train_matrix, y_train)
+            fit_s = time.perf_counter() - start
+
+            results.append({
+                'modelo': model_name,
+                'codificación': encoding,
+                'columnas': train_matrix.shape[1],
+                'dtype': str(train_matrix.dtype),
+                'matriz_MB': matrix_bytes(train_matrix) / 1e6,
+                'pico_preproc_MB': peak / 1e6,
+                'preproc_s': preprocess_s,
+                'ajuste_s': fit_s,
+                'score_test': scorer(model, test_matrix, y_test)
+            })
+
+    print("\n=== Codificaciones por familia de modelo ===")
+    print(pd.DataFrame(results).to_string(index=False, float_format=lambda v: f'{v:,.3f}'))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Benchmark de arranque en frío de analytics.nlp_models.
+
+Cada medición se ejecuta en un proceso nuevo para incluir la importación
+de módulos: tiempo de import de sentiment_analyzer, de creación del
+analizador y del primer análisis con cada selección de backends, más las
+librerías pesadas que quedaron cargadas.
+
+Uso:
+    python benchmarks/import_time_benchmark.py --repeats 5
+    python benchmarks/import_time_benchmark.py --selections vader features,vader,textblob
+"""
+
+import os
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+from typing import Dict, List
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from sentiment_benchmark import ROOT_DIR  # noqa: E402
+
+HEAVY_MODULES = ['torch', 'transformers', 'nltk', 'textblob', 'vaderSentiment',
+                 'matplotlib', 'seaborn', 'plotly', 'wordcloud', 'sklearn']
+
+CHILD_SCRIPT = """
+import sys, time, json, logging
+sys.path.append({models_dir!r})
+start = time.perf_counter()
+import sentiment_analyzer
+imported = time.perf_counter()
+logging.disable(logging.CRITICAL)
+analyzer = sentiment_analyzer.SentimentAnalyzer(analyzers={analyzers!r})
+created = time.perf_counter()
+analyzer.analyze_text("Excelente atención, muy rápidos. El proceso fue lento.")
+analyzed = time.perf_counter()
+print(json.dumps({{
+    'import': imported - start,
+    'init': created - imported,
+    'primer_analisis': analyzed - created,
+    'modulos': [m for m in {heavy!r} if m in sys.modules]
+}}))
+"""
+
+
+def measure(analyzers: List[str]) -> Dict:
+    """Ejecutar una medición de arranque en frío en un proceso nuevo."""
+    script = CHILD_SCRIPT.format(
+        models_dir=os.path.join(ROOT_DIR, 'analytics', 'nlp_models'),
+        analyzers=analyzers, heavy=HEAVY_MODULES
+    )
+    output = subprocess.run(
+        [sys.executable, '-c', script], capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    """Función principal del benchmark."""
+    parser = argparse.ArgumentParser(description='Arranque en frío de SentimentAnalyzer')
+    parser.add_argument('--repeats', type=int, default=3, help='Procesos por selección')
+    parser.add_argument('--selections', nargs='+',
+                        default=['vader', 'textblob', 'features,vader,textblob'],
+                        help='Selecciones de backends separadas por coma')
+    args = parser.parse_args()
+
+    rows = []
+    for selection in args.selections:
+        runs = [measure(selection.split(',')) for _ in range(args.repeats)]
+        rows.append({
+            'backends': selection,
+            'import_s': statistics.median(run['import'] for run in runs),
+            'init_s': statistics.median(run['init'] for run in runs),
+            'primer_analisis_s': statistics.median(run['primer_analisis'] for run in runs),
+            'modulos_pesados': ','.join(runs[-1]['modulos']) or '-'
+        })
+
+    import pandas as pd
+    print(f"\n=== Arranque en frío (mediana de {args.repeats} procesos) ===")
+    print(pd.DataFrame(rows).to_string(index=False, float_format=lambda v: f"{v:.3f}"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Benchmark de tamaño y tiempo de carga del artefacto de SatisfactionPredictor.
+
+Entrena los modelos del predictor sobre tickets sintéticos y guarda el
+resultado con save_model en los dos formatos: 'joblib' (archivo único con
+todo training_results) y 'compact' (mejor modelo en formato nativo,
+estadísticas en Arrow y métricas aparte). Reporta bytes en disco, tiempo de
+load_model (mediana de varias cargas) y tiempo de la primera predicción de
+un ticket tras la carga.
+
+Uso:
+    python benchmarks/model_artifact_benchmark.py --rows 200000
+    python benchmarks/model_artifact_benchmark.py --models lightgbm xgboost --repeats 20
+"""
+
+import os
+import sys
+import time
+import logging
+import argparse
+import tempfile
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from scoring_service_benchmark import ROOT_DIR, generate_tickets  # noqa: E402
+
+sys.path.append(os.path.join(ROOT_DIR, 'analytics', 'ml_models'))
+
+
+def main():
+    """Función principal del benchmark."""
+    parser = argparse.ArgumentParser(description='Tamaño y carga del artefacto: joblib vs compacto')
+    parser.add_argument('--rows', type=int, default=100_000, help='Tickets sintéticos de entrenamiento')
+    parser.add_argument('--agents', type=int, default=5_000, help='Agentes distintos')
+    parser.add_argument('--task', default='classification', choices=['classification', 'regression'])
+    parser.add_argument('--models', nargs='+', default=None, help='Modelos a entrenar (por defecto todos)')
+    parser.add_argument('--repeats', type=int, default=10, help='Cargas por formato')
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+    from satisfaction_predictor import SatisfactionPredictor
+    from model_artifact import artifact_size
+
+    df = generate_tickets(args.rows)
+    rng = np.random.default_rng(0)
+    df['agente_id'] = [f'AGT-{i:05d}' for i in rng.integers(0, args.agents, args.rows)]
+
+    predictor = SatisfactionPredictor(task_type=args.task)
+    predictor.logger.setLevel(logging.WARNING)
+    if args.models:
+        predictor.models = {name: predictor.models[name] for name in args.models}
+    X, y = predictor.prepare_data(df)
+    results = predictor.train_models(X, y, cv_folds=3, encoding='auto')
+    print(f"Tickets: {args.rows:,} | agentes: {args.agents:,} | mejor modelo: {results['best_model']}")
+
+    ticket = generate_tickets(1, seed=7).drop(columns=['satisfaccion_score'])
+    rows: List[Dict] = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for artifact_format, name in [('joblib', 'model.joblib'), ('compact', 'model')]:
+            path = os.path.join(tmp_dir, name)
+            start = time.perf_counter()
+            predictor.save_model(results, path, artifact_format=artifact_format)
+            save_s = time.perf_counter() - start
+
+            load_times = []
+            for _ in range(args.repeats):
+                start = time.perf_counter()
+                loaded = SatisfactionPredictor.load_model(path)
+                load_times.append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            loaded.predict(loaded.transform_features(ticket))
+            first_predict_s = time.perf_counter() - start
+
+            rows.append({
+                'formato': artifact_format,
+                'tamaño_MB': artifact_size(path) / 1e6,
+                'guardado_s': save_s,
+                'carga_ms': float(np.median(load_times)) * 1e3,
+                'primera_pred_ms': first_predict_s * 1e3
+            })
+
+    table = pd.DataFrame(rows)
+    print("\n=== Artefacto: joblib vs compacto ===")
+    print(table.to_string(index=False, float_format=lambda v: f'{v:,.3f}'))
+    joblib_row, compact_row = table.iloc[0], table.iloc[1]
+    print(f"\nTamaño: {joblib_row['tamaño_MB'] / compact_row['tamaño_MB']:.1f}x menor | "
+          f"carga: {joblib_row['carga_ms'] / compact_row['carga_ms']:.1f}x más rápida")
+
+
+if __name__ == "__main__":
+    main()
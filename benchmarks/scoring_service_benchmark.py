@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Benchmark de latencia del servicio de scoring de satisfacción.
+
+Entrena un modelo sobre tickets sintéticos, lo guarda con save_model y lo
+sirve con ScoringService. Compara la ruta original (transform_features +
+Pipeline.predict) con el servicio (preprocesamiento compilado) para tickets
+individuales, micro-lotes y una tabla Arrow, y ejecuta una prueba de carga
+con clientes concurrentes en proceso o contra la API HTTP local.
+
+Uso:
+    python benchmarks/scoring_service_benchmark.py --requests 2000 --batch-size 32
+    python benchmarks/scoring_service_benchmark.py --concurrency 1 4 8
+    python benchmarks/scoring_service_benchmark.py --url http://127.0.0.1:8080
+"""
+
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+import tempfile
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List
+
+import numpy as np
+import pandas as pd
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(ROOT_DIR, 'analytics', 'ml_models'))
+# Mismos tickets sintéticos que los tests
+sys.path.append(os.path.join(ROOT_DIR, 'tests'))
+from conftest import generate_tickets  # noqa: E402
+
+
+def latency_summary(latencies: List[float], records: int, elapsed: float) -> Dict:
+    """p50/p99 en ms y registros/segundo."""
+    p50, p99 = np.percentile(latencies, [50, 99])
+    return {'p50_ms': p50, 'p99_ms': p99, 'records_per_sec': records / elapsed}
+
+
+def payload_rows(payload) -> int:
+    """Tickets contenidos en un payload (dict, lista o tabla Arrow)."""
+    if isinstance(payload, dict):
+        return 1
+    if hasattr(payload, 'num_rows'):
+        return payload.num_rows
+    return len(payload)
+
+
+def measure(call: Callable, payloads: List) -> Dict:
+    """Latencia de una llamada por payload, en serie."""
+    latencies = []
+    records = 0
+    start = time.perf_counter()
+    for payload in payloads:
+        t0 = time.perf_counter()
+        call(payload)
+        latencies.append((time.perf_counter() - t0) * 1000)
+        records += payload_rows(payload)
+    return latency_summary(latencies, records, time.perf_counter() - start)
+
+
+def http_call(url: str) -> Callable:
+    """Cliente HTTP mínimo para POST /predict."""
+    def call(payload):
+        request = urllib.request.Request(
+            f'{url.rstrip("/")}/predict', data=json.dumps(payload).encode('utf-8'),
+            headers={'Content-Type': 'application/json'}
+        )
+        with urllib.request.urlopen(request) as response:
+            return json.loads(response.read())
+    return call
+
+
+def load_test(call: Callable, payloads: List, concurrency: int) -> Dict:
+    """Prueba de carga: `concurrency` clientes enviando los payloads."""
+    def timed(payload):
+        t0 = time.perf_counter()
+        call(payload)
+        return (time.perf_counter() - t0) * 1000
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        latencies = list(pool.map(timed, payloads))
+    return latency_summary(latencies, sum(payload_rows(p) for p in payloads), time.perf_counter() - start)
+
+
+def main():
+    """Función principal del benchmark."""
+    parser = argparse.ArgumentParser(description='Latencia del servicio de scoring')
+    parser.add_argument('--train-rows', type=int, default=20_000, help='Tickets de entrenamiento')
+    parser.add_argument('--requests', type=int, default=2000, help='Llamadas por medición')
+    parser.add_argument('--batch-size', type=int, default=32, help='Tickets por micro-lote')
+    parser.add_argument('--model', default='lightgbm', help='Modelo a entrenar y servir')
+    parser.add_argument('--task', default='classification', choices=['classification', 'regression'])
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 4, 8],
+                        help='Clientes concurrentes de la prueba de carga')
+    parser.add_argument('--url', default=None,
+                        help='API HTTP ya levantada con scoring_service.py (si no, en proceso)')
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+    from satisfaction_predictor import SatisfactionPredictor
+    from scoring_service import ScoringService
+
+    train = generate_tickets(args.train_rows)
+    predictor = SatisfactionPredictor(task_type=args.task)
+    predictor.logger.setLevel(logging.WARNING)
+    predictor.models = {args.model: predictor.models[args.model]}
+    X, y = predictor.prepare_data(train)
+    results = predictor.train_models(X, y, cv_folds=2)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        model_path = os.path.join(tmp_dir, 'satisfaction_model')
+        predictor.save_model(results, model_path)
+
+        t0 = time.perf_counter()
+        service = ScoringService.from_artifact(model_path)
+        load_s = time.perf_counter() - t0
+        loaded = service.predictor
+
+    new = generate_tickets(args.requests * args.batch_size, seed=7).drop(columns=['satisfaccion_score'])
+    records = new.astype({'fecha_creacion': str}).to_dict(orient='records')
+    singles = records[:args.requests]
+    batches = [records[i:i + args.batch_size] for i in range(0, len(records), args.batch_size)]
+
+    def pipeline_call(payload):
+        return loaded.predict(loaded.transform_features(pd.DataFrame.from_records(
+            [payload] if isinstance(payload, dict) else payload
+        )))
+
+    print(f"Modelo: {service.model_name} | carga del artefacto: {load_s * 1000:.1f} ms | "
+          f"preprocesamiento compilado: {service.compiled is not None}")
+
+    rows = []
+    for mode, payloads in [('ticket individual', singles), (f'micro-lote de {args.batch_size}', batches)]:
+        for path, call in [('Pipeline.predict', pipeline_call), ('ScoringService', service.score)]:
+            rows.append({'modo': mode, 'ruta': path, **measure(call, payloads)})
+
+    try:
+        import pyarrow as pa
+        table = pa.Table.from_pandas(new, preserve_index=False)
+        rows.append({'modo': f'tabla Arrow de {len(new)}', 'ruta': 'ScoringService',
+                     **measure(service.score, [table] * 5)})
+    except ImportError:
+        pass
+
+    print("\n=== Latencia por llamada ===")
+    print(pd.DataFrame(rows).to_string(index=False, float_format=lambda v: f'{v:,.2f}'))
+
+    target = http_call(args.url) if args.url else service.score
+    load_rows = []
+    for concurrency in args.concurrency:
+        load_rows.append({'clientes': concurrency, **load_test(target, batches, concurrency)})
+
+    print(f"\n=== Prueba de carga ({'HTTP ' + args.url if args.url else 'en proceso'}, "
+          f"micro-lotes de {args.batch_size}) ===")
+    print(pd.DataFrame(load_rows).to_string(index=False, float_format=lambda v: f'{v:,.2f}'))
+    print(f"\nMétricas del servicio: {service.metrics()}")
+
+
+if __name__ == "__main__":
+    main()
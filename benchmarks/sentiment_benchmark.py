@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Benchmark de throughput (textos/segundo) de SentimentAnalyzer.
+
+Compara el recorrido fila a fila con analyze_text contra el motor por lotes
+de analyze_dataframe para cada combinación de analizadores.
+
+Uso:
+    python benchmarks/sentiment_benchmark.py --rows 100000 --batch-size 2000
+    python benchmarks/sentiment_benchmark.py --combinations vader vader,textblob
+"""
+
+import os
+import sys
+import time
+import random
+import logging
+import argparse
+from typing import Dict, List
+
+import pandas as pd
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(ROOT_DIR, 'analytics', 'nlp_models'))
+
+
+# Plantillas con la forma de reviews, comentarios NPS y transcripciones
+TEMPLATES = [
+    "Excelente atención, muy rápidos",
+    "Excelente banco, {banco} siempre cumple mis expectativas. El servicio en {canal} es excepcional.",
+    "En general satisfecho con {banco}. El servicio de {canal} es bueno pero podría ser más rápido.",
+    "Decepcionado con {banco}. El servicio de {canal} es muy deficiente.",
+    "El proceso fue muy lento y complicado, tuve un problema con mi tarjeta {n}",
+    "¡Terrible experiencia! Nunca más vuelvo a {banco}",
+    "Cliente: Hola, tengo un problema con mi cuenta. Agente: Con gusto le ayudo. "
+    "Cliente: No puedo hacer transferencias desde la app. Agente: Ya quedó resuelto.",
+    "Rápido y eficiente, recomiendo este banco. Escribir a soporte@{banco}.com",
+]
+
+BANCOS = ['Banco Nacional', 'Banco Popular', 'Banco Central', 'Banco del Estado']
+CANALES = ['telefono', 'chat', 'email', 'presencial', 'app_movil']
+
+DEFAULT_COMBINATIONS = [
+    'features',
+    'vader',
+    'textblob',
+    'features,vader,textblob',
+    'features,vader,textblob,transformer',
+]
+
+
+def generate_texts(n: int, seed: int = 42) -> List[str]:
+    """Generar textos sintéticos repetitivos como los de producción."""
+    rng = random.Random(seed)
+    return [
+        rng.choice(TEMPLATES).format(
+            banco=rng.choice(BANCOS), canal=rng.choice(CANALES), n=rng.randint(1000, 9999)
+        )
+        for _ in range(n)
+    ]
+
+
+def run_legacy(analyzer, texts: List[str]) -> float:
+    """Medir textos/seg del recorrido fila a fila con analyze_text."""
+    start = time.perf_counter()
+    for text in texts:
+        analyzer.analyze_text(text)
+    return len(texts) / (time.perf_counter() - start)
+
+
+def run_batch(analyzer, df: pd.DataFrame, analyzers: List[str], batch_size: int) -> float:
+    """Medir textos/seg del motor por lotes."""
+    start = time.perf_counter()
+    analyzer.analyze_dataframe(df, 'texto', batch_size=batch_size, analyzers=analyzers)
+    return len(df) / (time.perf_counter() - start)
+
+
+def main():
+    """Función principal del benchmark."""
+    parser = argparse.ArgumentParser(description='Benchmark de SentimentAnalyzer')
+    parser.add_argument('--rows', type=int, default=20000, help='Textos para el motor por lotes')
+    parser.add_argument('--legacy-rows', type=int, default=2000,
+                        help='Textos para el recorrido fila a fila (0 para omitir)')
+    parser.add_argument('--batch-size', type=int, default=1000, help='Textos por lote')
+    parser.add_argument('--combinations', nargs='+', default=DEFAULT_COMBINATIONS,
+                        help='Combinaciones de analizadores separadas por coma')
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+    from sentiment_analyzer import SentimentAnalyzer, TRANSFORMERS_AVAILABLE
+
+    # Sin caché de resultados para medir el costo real de los analizadores
+    analyzer = SentimentAnalyzer(language='spanish', cache_memory_items=0)
+    analyzer.logger.setLevel(logging.WARNING)
+    df = pd.DataFrame({'texto': generate_texts(args.rows)})
+
+    results: List[Dict] = []
+    if args.legacy_rows:
+        legacy = run_legacy(analyzer, df['texto'].iloc[:args.legacy_rows].tolist())
+        results.append({'modo': 'analyze_text (fila a fila)', 'analizadores': 'todos',
+                        'textos_seg': legacy})
+
+    for combination in args.combinations:
+        analyzers = combination.split(',')
+        if 'transformer' in analyzers and not TRANSFORMERS_AVAILABLE:
+            print(f"Omitiendo {combination}: transformers no disponible")
+            continue
+        throughput = run_batch(analyzer, df, analyzers, args.batch_size)
+        results.append({'modo': f'lotes de {args.batch_size}', 'analizadores': combination,
+                        'textos_seg': throughput})
+
+    print(f"\n=== Throughput de análisis de sentimientos ({args.rows:,} textos) ===")
+    print(pd.DataFrame(results).to_string(index=False, float_format=lambda v: f"{v:,.0f}"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Benchmark de escalado del análisis de sentimientos multiproceso.
+
+Mide textos/segundo de analyze_dataframe con 1..N procesos y genera un
+gráfico de speedup frente al ideal lineal. El tiempo incluye el arranque
+del pool y la inicialización de modelos de cada worker.
+
+Uso:
+    python benchmarks/sentiment_parallel_benchmark.py --rows 200000 --workers 1 2 4 8 16
+"""
+
+import os
+import sys
+import time
+import logging
+import argparse
+
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from sentiment_benchmark import generate_texts  # noqa: E402
+
+
+def main():
+    """Función principal del benchmark."""
+    parser = argparse.ArgumentParser(description='Escalado multiproceso de SentimentAnalyzer')
+    parser.add_argument('--rows', type=int, default=100000, help='Textos a analizar')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8, 16],
+                        help='Números de procesos a medir')
+    parser.add_argument('--analyzers', default='features,vader,textblob',
+                        help='Analizadores separados por coma')
+    parser.add_argument('--chunk-size', type=int, default=5000, help='Filas por tarea')
+    parser.add_argument('--output', default='sentiment_parallel_scaling.png',
+                        help='Ruta del gráfico de escalado')
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+    from sentiment_analyzer import SentimentAnalyzer
+
+    # Sin caché de resultados para medir el costo real de los analizadores
+    analyzer = SentimentAnalyzer(language='spanish', cache_memory_items=0)
+    analyzer.logger.setLevel(logging.WARNING)
+    df = pd.DataFrame({'texto': generate_texts(args.rows)})
+    analyzers = args.analyzers.split(',')
+
+    rows = []
+    for n_workers in args.workers:
+        start = time.perf_counter()
+        analyzer.analyze_dataframe(
+            df, 'texto', analyzers=analyzers,
+            n_workers=n_workers, chunk_size=args.chunk_size
+        )
+        elapsed = time.perf_counter() - start
+        rows.append({'procesos': n_workers, 'segundos': elapsed,
+                     'textos_seg': args.rows / elapsed})
+        print(f"{n_workers:>3} procesos: {elapsed:8.2f}s  {args.rows / elapsed:10,.0f} textos/seg")
+
+    results = pd.DataFrame(rows)
+    base = results.loc[results['procesos'].idxmin(), 'textos_seg']
+    results['speedup'] = results['textos_seg'] / base
+    print(f"\n=== Escalado ({args.rows:,} textos, {os.cpu_count()} CPUs) ===")
+    print(results.to_string(index=False, float_format=lambda v: f"{v:,.2f}"))
+
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    fig, ax = plt.subplots(figsize=(8, 5))
+    ax.plot(results['procesos'], results['speedup'], marker='o', label='Medido')
+    ax.plot(results['procesos'], results['procesos'] / results['procesos'].min(),
+            linestyle='--', color='gray', label='Ideal lineal')
+    ax.set_xlabel('Procesos')
+    ax.set_ylabel('Speedup')
+    ax.set_title(f'Escalado de análisis de sentimientos ({args.analyzers})')
+    ax.legend()
+    fig.tight_layout()
+    fig.savefig(args.output, dpi=150)
+    print(f"Gráfico guardado en: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
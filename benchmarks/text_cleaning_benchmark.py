@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Benchmark de la limpieza de textos del análisis de sentimientos.
+
+Compara el recorrido original (re.sub por patrón sobre cada texto) con el
+limpiador compilado por texto y con las variantes vectorizadas sobre la
+serie completa (cadena de str.replace de pandas y pasadas Arrow).
+
+Uso:
+    python benchmarks/text_cleaning_benchmark.py --rows 1000000
+"""
+
+import os
+import re
+import sys
+import time
+import argparse
+from typing import Callable, Dict, List
+
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from sentiment_benchmark import generate_texts  # noqa: E402
+
+from text_cleaning import DEFAULT_CLEANING_PATTERNS, TextCleaner  # noqa: E402
+
+
+def legacy_clean(text: str) -> str:
+    """Limpieza original: una pasada de re.sub por patrón."""
+    text = text.lower()
+    for pattern_name, pattern in DEFAULT_CLEANING_PATTERNS.items():
+        if pattern_name == 'multiple_spaces':
+            text = re.sub(pattern, ' ', text)
+        else:
+            text = re.sub(pattern, '', text)
+    return text.strip()
+
+
+def pandas_chain(texts: pd.Series) -> pd.Series:
+    """Limpieza vectorizada con una llamada a str.replace por patrón."""
+    cleaned = texts.str.lower()
+    for pattern_name, pattern in DEFAULT_CLEANING_PATTERNS.items():
+        replacement = ' ' if pattern_name == 'multiple_spaces' else ''
+        cleaned = cleaned.str.replace(pattern, replacement, regex=True)
+    return cleaned.str.strip()
+
+
+def measure(name: str, func: Callable, n_texts: int) -> Dict:
+    """Ejecutar una variante y devolver su throughput."""
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    print(f"{name:<32} {elapsed:8.2f}s  {n_texts / elapsed:12,.0f} textos/seg")
+    return {'variante': name, 'segundos': elapsed, 'textos_seg': n_texts / elapsed,
+            'resultado': list(result)}
+
+
+def main():
+    """Función principal del benchmark."""
+    parser = argparse.ArgumentParser(description='Benchmark de limpieza de textos')
+    parser.add_argument('--rows', type=int, default=1000000, help='Textos a limpiar')
+    args = parser.parse_args()
+
+    texts = generate_texts(args.rows)
+    series = pd.Series(texts)
+    cleaner = TextCleaner()
+
+    results: List[Dict] = [
+        measure('re.sub por patrón (original)', lambda: [legacy_clean(t) for t in texts], args.rows),
+        measure('TextCleaner.clean', lambda: [cleaner.clean(t) for t in texts], args.rows),
+        measure('pandas str.replace por patrón', lambda: pandas_chain(series), args.rows),
+        measure('TextCleaner.clean_series', lambda: cleaner.clean_series(series), args.rows),
+    ]
+
+    reference = results[0]['resultado']
+    for result in results[1:]:
+        if result['resultado'] != reference:
+            print(f"ADVERTENCIA: {result['variante']} difiere de la limpieza original")
+
+    summary = pd.DataFrame(results).drop(columns=['resultado'])
+    summary['speedup'] = summary['textos_seg'] / summary['textos_seg'].iloc[0]
+    print(f"\n=== Limpieza de textos ({args.rows:,} textos) ===")
+    print(summary.to_string(index=False, float_format=lambda v: f"{v:,.2f}"))
+
+
+if __name__ == "__main__":
+    main()
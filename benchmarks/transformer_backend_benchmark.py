@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Benchmark de los backends de inferencia transformer en CPU.
+
+Compara el pipeline float32 de PyTorch texto a texto (como
+transformer_analysis), el mismo pipeline por lotes y los backends
+cuantizados int8 (PyTorch dinámico y ONNX Runtime), reportando
+textos/segundo y acuerdo de etiquetas frente al pipeline de referencia.
+
+Uso:
+    python benchmarks/transformer_backend_benchmark.py --rows 2000 --threads 4
+    python benchmarks/transformer_backend_benchmark.py --model ./modelo_local --backends torch_int8
+"""
+
+import os
+import sys
+import time
+import logging
+import argparse
+from typing import Dict, List
+
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from sentiment_benchmark import generate_texts  # noqa: E402
+
+
+def main():
+    """Función principal del benchmark."""
+    parser = argparse.ArgumentParser(description='Backends de inferencia transformer')
+    parser.add_argument('--rows', type=int, default=2000, help='Textos a clasificar')
+    parser.add_argument('--single-rows', type=int, default=200,
+                        help='Textos para el recorrido texto a texto (0 para omitir)')
+    parser.add_argument('--batch-size', type=int, default=32, help='Textos por lote')
+    parser.add_argument('--threads', type=int, default=None, help='Hilos de inferencia')
+    parser.add_argument('--model', default=None, help='Modelo de sentimientos (nombre o ruta)')
+    parser.add_argument('--backends', nargs='+', default=['torch_int8', 'onnx_int8'],
+                        help='Backends optimizados a medir')
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+    from sentiment_analyzer import SentimentAnalyzer
+    from quantized_inference import label_agreement
+
+    texts = generate_texts(args.rows)
+    kwargs = {'batch_size': args.batch_size, 'truncation': True,
+              'max_length': SentimentAnalyzer.TRANSFORMER_MAX_LENGTH}
+
+    def build(backend: str) -> SentimentAnalyzer:
+        analyzer = SentimentAnalyzer(
+            analyzers=['transformer'], cache_memory_items=0, transformer_backend=backend,
+            transformer_threads=args.threads, transformer_model=args.model
+        )
+        analyzer.logger.setLevel(logging.WARNING)
+        analyzer.preload()
+        return analyzer
+
+    results: List[Dict] = []
+    reference_analyzer = build('pytorch')
+
+    if args.single_rows:
+        subset = texts[:args.single_rows]
+        start = time.perf_counter()
+        for text in subset:
+            reference_analyzer.transformer_analysis(text)
+        elapsed = time.perf_counter() - start
+        results.append({'backend': 'pytorch (texto a texto)', 'textos_seg': len(subset) / elapsed,
+                        'acuerdo': 1.0})
+
+    start = time.perf_counter()
+    reference = reference_analyzer.transformer_sentiment(texts, **kwargs)
+    elapsed = time.perf_counter() - start
+    results.append({'backend': f'pytorch (lotes de {args.batch_size})',
+                    'textos_seg': len(texts) / elapsed, 'acuerdo': 1.0})
+
+    for backend in args.backends:
+        try:
+            model = build(backend).transformer_sentiment
+        except Exception as e:
+            print(f"Omitiendo {backend}: {e}")
+            continue
+        start = time.perf_counter()
+        predictions = model(texts, **kwargs)
+        elapsed = time.perf_counter() - start
+        results.append({'backend': f'{backend} (lotes de {args.batch_size})',
+                        'textos_seg': len(texts) / elapsed,
+                        'acuerdo': label_agreement(reference, predictions)})
+
+    summary = pd.DataFrame(results)
+    summary['speedup'] = summary['textos_seg'] / summary['textos_seg'].iloc[0]
+    print(f"\n=== Inferencia transformer ({args.rows:,} textos, hilos={args.threads}) ===")
+    print(summary.to_string(index=False, float_format=lambda v: f"{v:,.3f}"))
+
+
+if __name__ == "__main__":
+    main()
@@ -9,6 +9,7 @@ Este job realiza:
 - Análisis de sentimientos básico
 """
 
+import os
 import sys
 from awsglue.transforms import *
 from awsglue.utils import getResolvedOptions
@@ -18,25 +19,98 @@ from awsglue.job import Job
 from pyspark.sql import DataFrame
 from pyspark.sql.functions import *
 from pyspark.sql.types import *
+from pyspark.sql.window import Window
+from pyspark import StorageLevel
 import boto3
+import json
+import math
 from datetime import datetime, timedelta
+from typing import Dict, List, Optional
 import logging
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+# Módulos compartidos con analytics (en Glue se distribuyen con --extra-py-files)
+sys.path.append(os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+    'analytics', 'nlp_models'
+))
+from distinct_sketches import (
+    DEFAULT_LG_CONFIG_K, validate_lg_config_k, error_bound,
+    sketch_agg, sketch_estimate, merge_sketches_spark
+)
+import key_bloom_filter
+from key_bloom_filter import KeyBloomFilter
+import lexicon_matcher
+from lexicon_matcher import DEFAULT_LEXICON_PATH, LexiconMatcher, parse_lexicons
+
+DEFAULT_MAPPINGS_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), 'mappings', 'categorical_mappings.json'
+)
 
 
 class CustomerSatisfactionProcessor:
     """Procesador de datos de satisfacción del cliente."""
     
-    def __init__(self, glue_context: GlueContext, job_name: str):
+    # Relación aproximada entre tamaño en Parquet/snappy y tamaño en memoria
+    PARQUET_COMPRESSION_RATIO = 0.35
+    
+    # Margen de capacidad del filtro de claves procesadas al (re)construirlo
+    BLOOM_HEADROOM = 4
+    
+    # Clave de negocio y columna de evento por dataset para deduplicar
+    DEDUP_KEYS = {
+        'customer_tickets': ('ticket_id', 'fecha_creacion'),
+        'nps_surveys': ('encuesta_id', 'fecha_encuesta'),
+        'customer_reviews': ('review_id', 'fecha_review')
+    }
+    
+    def __init__(self, glue_context: GlueContext, job_name: str,
+                 hll_lg_config_k: int = DEFAULT_LG_CONFIG_K,
+                 broadcast_threshold_mb: int = 64,
+                 skew_factor: float = 5.0,
+                 skew_salt_buckets: int = 16,
+                 log_partition_stats: bool = False,
+                 target_file_size_mb: int = 128,
+                 late_arrival_days: int = 2,
+                 bloom_fpp: float = 0.01,
+                 mappings_path: str = DEFAULT_MAPPINGS_PATH,
+                 lexicon_path: str = DEFAULT_LEXICON_PATH):
         """
         Inicializar el procesador.
         
         Args:
             glue_context: Contexto de AWS Glue
             job_name: Nombre del job
+            hll_lg_config_k: Precisión de los sketches HLL de clientes únicos
+            broadcast_threshold_mb: Tamaño estimado máximo para hacer broadcast
+            skew_factor: Veces sobre la media para considerar una clave caliente
+                (y sobre la mediana para que AQE parta una partición)
+            skew_salt_buckets: Número de sales para repartir claves calientes
+            log_partition_stats: Registrar histogramas de particiones por etapa
+                (ejecuta una acción adicional por etapa; para diagnóstico)
+            target_file_size_mb: Tamaño objetivo de los archivos Parquet
+            late_arrival_days: Días de retraso para considerar una llegada tardía
+            bloom_fpp: Tasa de falsos positivos de los filtros de claves procesadas
+            mappings_path: Tabla versionada de normalización (local o s3://)
+            lexicon_path: Léxicos ponderados de sentimiento (local o s3://)
         """
         self.glue_context = glue_context
         self.spark = glue_context.spark_session
         self.job_name = job_name
+        self.hll_lg_config_k = validate_lg_config_k(hll_lg_config_k)
+        self.broadcast_threshold_bytes = broadcast_threshold_mb * 1024 * 1024
+        self.skew_factor = skew_factor
+        self.skew_salt_buckets = skew_salt_buckets
+        self.log_partition_stats = log_partition_stats
+        self.join_decisions = []
+        self.target_file_size_mb = target_file_size_mb
+        self.late_arrival_days = late_arrival_days
+        self.bloom_fpp = bloom_fpp
+        self.dedup_metrics = {}
+        self.superseded_partitions = {}
+        self.dedup_cached = {}
+        self.mapping_metrics = {}
         
         # Configurar logging
         self.logger = logging.getLogger(job_name)
@@ -46,6 +120,22 @@ class CustomerSatisfactionProcessor:
         self.spark.conf.set("spark.sql.adaptive.enabled", "true")
         self.spark.conf.set("spark.sql.adaptive.coalescePartitions.enabled", "true")
         self.spark.conf.set("spark.sql.parquet.compression.codec", "snappy")
+        self.spark.conf.set("spark.sql.adaptive.skewJoin.enabled", "true")
+        self.spark.conf.set(
+            "spark.sql.adaptive.skewJoin.skewedPartitionFactor", str(self.skew_factor)
+        )
+        self.spark.conf.set(
+            "spark.sql.autoBroadcastJoinThreshold", str(self.broadcast_threshold_bytes)
+        )
+        
+        # Tabla de normalización de categorías
+        self.categorical_mappings = self.load_categorical_mappings(mappings_path)
+        
+        # Léxicos de sentimiento compartidos con SentimentAnalyzer
+        self.lexicons = self.load_lexicons(lexicon_path)
+        self.spark.sparkContext.addPyFile(lexicon_matcher.__file__)
+        # El pre-chequeo de deduplicación usa el filtro de Bloom en los ejecutores
+        self.spark.sparkContext.addPyFile(key_bloom_filter.__file__)
         
     def read_raw_data(self, database_name: str, table_name: str) -> DataFrame:
         """
@@ -73,6 +163,391 @@ class CustomerSatisfactionProcessor:
             self.logger.error(f"Error leyendo {table_name}: {e}")
             raise
     
+    def load_categorical_mappings(self, mappings_path: str) -> Dict:
+        """
+        Cargar la tabla versionada de normalización de categorías.
+        
+        Args:
+            mappings_path: Ruta del JSON de mapeos (local o s3://)
+            
+        Returns:
+            Diccionario con versión, valor por defecto y mapeos por columna
+        """
+        data = self._read_bytes(mappings_path)
+        if data is None:
+            raise FileNotFoundError(f"Tabla de mapeos no encontrada: {mappings_path}")
+        
+        mappings = json.loads(data.decode('utf-8'))
+        
+        # Las búsquedas se hacen sobre valores en minúsculas y sin espacios
+        for spec in mappings['mappings'].values():
+            spec['values'] = {
+                str(raw).strip().lower(): normalized
+                for raw, normalized in spec['values'].items()
+            }
+        
+        self.logger.info(
+            f"Mapeos categóricos versión {mappings['version']} cargados: "
+            f"{list(mappings['mappings'].keys())}"
+        )
+        return mappings
+    
+    def load_lexicons(self, lexicon_path: str) -> Dict:
+        """
+        Cargar el archivo versionado de léxicos de sentimiento.
+        
+        Args:
+            lexicon_path: Ruta del JSON de léxicos (local o s3://)
+            
+        Returns:
+            Diccionario con versión y léxicos ponderados
+        """
+        data = self._read_bytes(lexicon_path)
+        if data is None:
+            raise FileNotFoundError(f"Archivo de léxicos no encontrado: {lexicon_path}")
+        
+        lexicons = parse_lexicons(json.loads(data.decode('utf-8')))
+        self.logger.info(
+            f"Léxicos versión {lexicons['version']} cargados: {list(lexicons['lexicons'].keys())}"
+        )
+        return lexicons
+    
+    def lexicon_score(self, lexicon_name: str):
+        """
+        Crear una pandas UDF que puntúa textos con un léxico ponderado.
+        
+        El puntaje es la suma de pesos de los términos encontrados (palabras
+        completas y frases, ver LexiconMatcher), acotada a [-1, 1].
+        
+        Args:
+            lexicon_name: Nombre del léxico en el archivo de léxicos
+            
+        Returns:
+            pandas UDF que recibe una columna de texto y devuelve un double
+        """
+        matcher = LexiconMatcher(self.lexicons['lexicons'][lexicon_name])
+        
+        @pandas_udf(DoubleType())
+        def score(texts: pd.Series) -> pd.Series:
+            return pd.Series(matcher.score_many(texts).clip(-1.0, 1.0))
+        
+        return score
+    
+    def normalize_categoricals(self, df: DataFrame, stage: str) -> DataFrame:
+        """
+        Normalizar columnas categóricas con la tabla de mapeos.
+        
+        Cada mapeo se compila en una única expresión map literal, de modo
+        que cada fila hace una búsqueda por columna en lugar de una cadena
+        de comparaciones. Los valores sin mapeo reciben el valor por
+        defecto y se cuentan como métrica; el resultado queda persistido
+        para que ese conteo no obligue a recalcular la entrada.
+        
+        Args:
+            df: DataFrame con las columnas crudas
+            stage: Nombre de la etapa para métricas y logs
+            
+        Returns:
+            DataFrame con las columnas normalizadas agregadas
+        """
+        default = self.categorical_mappings['default']
+        version = self.categorical_mappings['version']
+        unmapped_flags = {}
+        
+        for source_col, spec in self.categorical_mappings['mappings'].items():
+            if source_col not in df.columns:
+                continue
+            
+            lookup = create_map(*[
+                lit(value) for pair in spec['values'].items() for value in pair
+            ])
+            mapped = try_element_at(lookup, lower(trim(col(source_col))))
+            
+            df = df.withColumn(spec['output_column'], coalesce(mapped, lit(default)))
+            unmapped_flags[source_col] = col(source_col).isNotNull() & mapped.isNull()
+        
+        if not unmapped_flags:
+            return df
+        
+        # Las métricas son acciones: persistir para no releer la entrada
+        # cuando la etapa siguiente use el resultado
+        df = df.persist(StorageLevel.MEMORY_AND_DISK)
+        
+        # Conteo de valores sin mapeo en una sola pasada
+        counts = df.agg(*[
+            sum(when(flag, 1).otherwise(0)).alias(source_col)
+            for source_col, flag in unmapped_flags.items()
+        ]).first().asDict()
+        
+        stage_metrics = {'version': version, 'sin_mapear': counts, 'valores': {}}
+        for source_col, unmapped_count in counts.items():
+            if not unmapped_count:
+                continue
+            top_values = df.filter(unmapped_flags[source_col]) \
+                           .groupBy(source_col).count() \
+                           .orderBy(col("count").desc()) \
+                           .limit(20).collect()
+            stage_metrics['valores'][source_col] = {
+                row[source_col]: row["count"] for row in top_values
+            }
+            self.logger.warning(
+                f"[{stage}] {unmapped_count} valores de {source_col} sin mapeo "
+                f"(mapeos v{version}): {stage_metrics['valores'][source_col]}"
+            )
+        
+        self.mapping_metrics[stage] = stage_metrics
+        return df
+    
+    def _read_bytes(self, path: str) -> Optional[bytes]:
+        """Leer un archivo binario local o de S3 (None si no existe)."""
+        try:
+            if path.startswith("s3://"):
+                bucket, key = path[len("s3://"):].split("/", 1)
+                response = boto3.client('s3').get_object(Bucket=bucket, Key=key)
+                return response['Body'].read()
+            with open(path, 'rb') as f:
+                return f.read()
+        except Exception as e:
+            self.logger.info(f"No se encontró {path}: {e}")
+            return None
+    
+    def _write_bytes(self, path: str, data: bytes) -> None:
+        """Escribir un archivo binario local o en S3."""
+        if path.startswith("s3://"):
+            bucket, key = path[len("s3://"):].split("/", 1)
+            boto3.client('s3').put_object(Bucket=bucket, Key=key, Body=data)
+        else:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'wb') as f:
+                f.write(data)
+    
+    @staticmethod
+    def _bloom_path(processed_path: str, key_col: str) -> str:
+        """Ruta del filtro de claves (prefijo '_' para que Spark lo ignore)."""
+        return f"{processed_path.rstrip('/')}/_dedup/{key_col}.bloom"
+    
+    def deduplicate(self, df: DataFrame, dataset: str,
+                    processed_path: Optional[str] = None) -> DataFrame:
+        """
+        Eliminar duplicados por clave de negocio.
+        
+        1. Dentro del lote se conserva la versión más reciente de cada clave,
+           ordenando por la partición de carga cruda (year/month/day, si
+           existe) y luego por la fecha del evento.
+        2. Si se indica processed_path, las claves se comparan contra un
+           filtro de Bloom de claves ya procesadas. Sólo las candidatas se
+           buscan en el histórico (si no hay candidatas no se lee). Gana la
+           versión con la fecha de evento más reciente y, a igualdad, la del
+           lote; las versiones del lote más antiguas que el histórico se
+           descartan. Las particiones donde estaba la versión reemplazada
+           quedan en superseded_partitions[dataset] para reescribirlas.
+        
+        Los DataFrames intermedios quedan en caché porque el resultado se
+        vuelve a leer al limpiar, escribir y registrar las claves; liberarlos
+        con release_dedup_cache cuando el dataset ya se escribió.
+        
+        Las llegadas tardías (eventos de días anteriores) se cuentan en las
+        métricas y se escriben en su partición de evento al reescribir las
+        particiones afectadas (ver write_incremental).
+        
+        Args:
+            df: DataFrame crudo
+            dataset: Nombre del dataset (clave de DEDUP_KEYS)
+            processed_path: Ruta de los datos ya procesados (modo incremental)
+            
+        Returns:
+            DataFrame sin duplicados
+        """
+        key_col, event_col = self.DEDUP_KEYS[dataset]
+        self.logger.info(f"Deduplicando {dataset} por {key_col}...")
+        
+        total_rows = df.count()
+        
+        # 1. Última versión por clave dentro del lote
+        version_cols = [c for c in ["year", "month", "day"] if c in df.columns]
+        order_cols = [col(c).cast("int").desc_nulls_last() for c in version_cols]
+        order_cols.append(to_timestamp(col(event_col)).desc_nulls_last())
+        
+        window = Window.partitionBy(key_col).orderBy(*order_cols)
+        latest = df.withColumn("_version", row_number().over(window)) \
+                   .filter(col("_version") == 1) \
+                   .drop("_version")
+        latest = latest.cache()
+        self.dedup_cached[dataset] = [latest]
+        batch_unique = latest.count()
+        
+        metrics = {
+            'registros_entrada': total_rows,
+            'duplicados_lote': total_rows - batch_unique,
+            'candidatos_bloom': 0,
+            'duplicados_historico': 0,
+            'actualizaciones_historico': 0,
+            'falsos_positivos_bloom': 0
+        }
+        self.superseded_partitions[dataset] = []
+        
+        # 2. Pre-chequeo con filtro de Bloom contra claves ya procesadas
+        if processed_path:
+            bloom_bytes = self._read_bytes(self._bloom_path(processed_path, key_col))
+            if bloom_bytes:
+                bloom_broadcast = self.spark.sparkContext.broadcast(bloom_bytes)
+                
+                @pandas_udf("boolean")
+                def might_be_processed(keys: pd.Series) -> pd.Series:
+                    bloom = KeyBloomFilter.from_bytes(bloom_broadcast.value)
+                    return pd.Series(bloom.might_contain(keys))
+                
+                flagged = latest.withColumn("_candidato", might_be_processed(col(key_col)))
+                candidates = flagged.filter(col("_candidato")).drop("_candidato")
+                metrics['candidatos_bloom'] = candidates.count()
+                
+                if metrics['candidatos_bloom'] > 0:
+                    history = self.spark.read.parquet(processed_path) \
+                        .join(broadcast(candidates.select(key_col)), key_col, "left_semi") \
+                        .groupBy(key_col).agg(
+                            max(to_timestamp(col(event_col))).alias("_evento_historico"),
+                            collect_set(struct("year", "month", "day")).alias("_particiones_historico")
+                        ).withColumn("_en_historico", lit(True))
+                    
+                    resolved = candidates.join(history, key_col, "left")
+                    in_history = col("_en_historico").isNotNull()
+                    is_newer = col("_evento_historico").isNull() | \
+                        (to_timestamp(col(event_col)) >= col("_evento_historico"))
+                    resolved = resolved.withColumn(
+                        "_resolucion",
+                        when(~in_history, "nuevo")
+                        .when(is_newer, "actualizacion")
+                        .otherwise("obsoleto")
+                    ).cache()
+                    self.dedup_cached[dataset].append(resolved)
+                    
+                    counts = dict(resolved.groupBy("_resolucion").count().collect())
+                    metrics['falsos_positivos_bloom'] = counts.get("nuevo", 0)
+                    metrics['actualizaciones_historico'] = counts.get("actualizacion", 0)
+                    metrics['duplicados_historico'] = counts.get("obsoleto", 0)
+                    
+                    if metrics['actualizaciones_historico']:
+                        superseded = resolved.filter(col("_resolucion") == "actualizacion") \
+                            .select(explode("_particiones_historico").alias("p")) \
+                            .select("p.*").distinct().collect()
+                        self.superseded_partitions[dataset] = [row.asDict() for row in superseded]
+                    
+                    new_rows = flagged.filter(~col("_candidato")).drop("_candidato")
+                    kept = resolved.filter(col("_resolucion") != "obsoleto") \
+                        .drop("_evento_historico", "_particiones_historico",
+                              "_en_historico", "_resolucion")
+                    latest = new_rows.unionByName(kept)
+        
+        # Llegadas tardías: eventos más antiguos que el máximo del lote
+        event_ts = to_timestamp(col(event_col))
+        max_event = latest.agg(max(event_ts).alias("max_evento")).first()["max_evento"]
+        if max_event is not None:
+            metrics['llegadas_tardias'] = latest.filter(
+                event_ts < lit(max_event - timedelta(days=self.late_arrival_days))
+            ).count()
+        
+        duplicates = metrics['duplicados_lote'] + metrics['duplicados_historico']
+        metrics['registros_salida'] = total_rows - duplicates
+        metrics['tasa_duplicados'] = duplicates / total_rows if total_rows else 0.0
+        self.dedup_metrics[dataset] = metrics
+        
+        self.logger.info(
+            f"{dataset}: {duplicates} duplicados de {total_rows} registros "
+            f"({metrics['tasa_duplicados']:.2%}) | {metrics}"
+        )
+        return latest
+    
+    def release_dedup_cache(self, dataset: str) -> None:
+        """
+        Liberar los DataFrames que deduplicate dejó en caché para un dataset.
+        
+        Args:
+            dataset: Nombre del dataset (clave de DEDUP_KEYS)
+        """
+        for cached_df in self.dedup_cached.pop(dataset, []):
+            cached_df.unpersist()
+    
+    @staticmethod
+    def _build_key_filter(keys_df: DataFrame, num_bits: int,
+                          num_hashes: int) -> KeyBloomFilter:
+        """
+        Construir un filtro de Bloom en los ejecutores.
+        
+        Cada partición arma su filtro por bloques de claves y los filtros se
+        combinan con treeReduce, así que las claves nunca llegan al driver.
+        
+        Args:
+            keys_df: DataFrame con una sola columna de claves
+            num_bits: Tamaño del arreglo de bits
+            num_hashes: Número de funciones hash
+            
+        Returns:
+            Filtro con todas las claves
+        """
+        chunk_size = 100_000
+        
+        def build_partition(rows):
+            bloom = KeyBloomFilter(num_bits, num_hashes)
+            chunk = []
+            for row in rows:
+                chunk.append(row[0])
+                if len(chunk) >= chunk_size:
+                    bloom.add(pd.Series(chunk))
+                    chunk = []
+            bloom.add(pd.Series(chunk))
+            yield bloom.to_bytes()
+        
+        def merge_filters(left: bytes, right: bytes) -> bytes:
+            return KeyBloomFilter.from_bytes(left).merge(KeyBloomFilter.from_bytes(right)).to_bytes()
+        
+        rdd = keys_df.rdd
+        if rdd.getNumPartitions() == 0:
+            return KeyBloomFilter(num_bits, num_hashes)
+        return KeyBloomFilter.from_bytes(rdd.mapPartitions(build_partition).treeReduce(merge_filters))
+    
+    def update_processed_keys(self, df: DataFrame, dataset: str,
+                              processed_path: str) -> None:
+        """
+        Agregar las claves escritas al filtro de Bloom del dataset.
+        
+        Si no hay filtro, o si al agregar el lote la tasa de falsos positivos
+        estimada supera bloom_fpp, el filtro se reconstruye desde todas las
+        claves procesadas con capacidad para BLOOM_HEADROOM veces las
+        claves actuales.
+        
+        Args:
+            df: DataFrame recién escrito
+            dataset: Nombre del dataset (clave de DEDUP_KEYS)
+            processed_path: Ruta de los datos procesados
+        """
+        key_col, _ = self.DEDUP_KEYS[dataset]
+        bloom_path = self._bloom_path(processed_path, key_col)
+        
+        bloom = None
+        bloom_bytes = self._read_bytes(bloom_path)
+        if bloom_bytes:
+            bloom = KeyBloomFilter.from_bytes(bloom_bytes)
+            bloom.merge(self._build_key_filter(
+                df.select(key_col), bloom.num_bits, bloom.num_hashes
+            ))
+        
+        if bloom is None or bloom.estimated_fpp() > self.bloom_fpp:
+            all_keys = self.spark.read.parquet(processed_path).select(key_col)
+            expected = bloom.count if bloom is not None else all_keys.count()
+            if bloom is not None:
+                self.logger.info(
+                    f"Filtro de {dataset} saturado (fpp estimada {bloom.estimated_fpp():.3%}); "
+                    f"reconstruyendo para {expected * self.BLOOM_HEADROOM} claves"
+                )
+            sized = KeyBloomFilter.for_capacity(expected * self.BLOOM_HEADROOM, self.bloom_fpp)
+            bloom = self._build_key_filter(all_keys, sized.num_bits, sized.num_hashes)
+        
+        self._write_bytes(bloom_path, bloom.to_bytes())
+        self.logger.info(
+            f"Filtro de claves de {dataset} actualizado: {bloom.count} claves, "
+            f"fpp estimada {bloom.estimated_fpp():.3%}"
+        )
+    
     def clean_customer_tickets(self, df: DataFrame) -> DataFrame:
         """
         Limpiar y validar datos de tickets de cliente.
@@ -93,16 +568,8 @@ class CustomerSatisfactionProcessor:
             (col("cliente_id").isNotNull())
         )
         
-        # Estandarizar valores categóricos
-        df_clean = df_clean.withColumn(
-            "canal_normalizado",
-            when(col("canal").isin(["telefono", "phone"]), "telefono")
-            .when(col("canal").isin(["chat", "webchat"]), "chat")
-            .when(col("canal").isin(["email", "correo"]), "email")
-            .when(col("canal").isin(["presencial", "branch"]), "presencial")
-            .when(col("canal").isin(["app_movil", "mobile", "app"]), "app_movil")
-            .otherwise("otros")
-        )
+        # Estandarizar valores categóricos (canal, departamento, resolución)
+        df_clean = self.normalize_categoricals(df_clean, "customer_tickets")
         
         # Crear categorías de satisfacción
         df_clean = df_clean.withColumn(
@@ -135,6 +602,7 @@ class CustomerSatisfactionProcessor:
                            .withColumn("day", dayofmonth(col("fecha_creacion")))
         
         self.logger.info(f"Tickets limpiados: {df_clean.count()} registros válidos")
+        self._log_partition_histogram(df_clean, "clean_customer_tickets")
         return df_clean
     
     def clean_nps_surveys(self, df: DataFrame) -> DataFrame:
@@ -164,26 +632,10 @@ class CustomerSatisfactionProcessor:
             .otherwise("detractor")
         )
         
-        # Análisis básico de sentimientos en comentarios
+        # Análisis básico de sentimientos en comentarios (léxico ponderado compartido)
         df_clean = df_clean.withColumn(
             "sentiment_score_simple",
-            when(
-                lower(col("comentario")).rlike(".*(excelente|genial|perfecto|magnifico|increible).*"), 
-                1.0
-            )
-            .when(
-                lower(col("comentario")).rlike(".*(bueno|bien|satisfecho|correcto).*"), 
-                0.5
-            )
-            .when(
-                lower(col("comentario")).rlike(".*(malo|pesimo|terrible|horrible|awful).*"), 
-                -1.0
-            )
-            .when(
-                lower(col("comentario")).rlike(".*(problema|error|fallo|demora|lento).*"), 
-                -0.5
-            )
-            .otherwise(0.0)
+            self.lexicon_score("nps_sentiment")(col("comentario"))
         )
         
         # Convertir fechas
@@ -198,6 +650,7 @@ class CustomerSatisfactionProcessor:
                            .withColumn("day", dayofmonth(col("fecha_encuesta")))
         
         self.logger.info(f"Encuestas NPS procesadas: {df_clean.count()} registros")
+        self._log_partition_histogram(df_clean, "clean_nps_surveys")
         return df_clean
     
     def clean_customer_reviews(self, df: DataFrame) -> DataFrame:
@@ -256,22 +709,259 @@ class CustomerSatisfactionProcessor:
                            .withColumn("day", dayofmonth(col("fecha_review")))
         
         self.logger.info(f"Reviews procesadas: {df_clean.count()} registros")
+        self._log_partition_histogram(df_clean, "clean_customer_reviews")
         return df_clean
     
+    def _estimate_size_bytes(self, df: DataFrame, max_bytes: int) -> Optional[int]:
+        """
+        Estimar el tamaño de un DataFrame contando filas hasta un límite.
+        
+        No se usan las estadísticas del plan: los DataFrames que llegan de
+        DynamicFrames de Glue no las tienen y Spark supone
+        spark.sql.defaultSizeInBytes. Se cuentan como mucho las filas que
+        caben en max_bytes con el tamaño por fila del esquema, así que el
+        costo está acotado aunque el DataFrame sea grande.
+        
+        Args:
+            df: DataFrame a estimar (conviene persistirlo antes)
+            max_bytes: Tamaño a partir del cual no interesa la cifra exacta
+            
+        Returns:
+            Tamaño estimado en bytes o None si supera max_bytes
+        """
+        row_bytes = df._jdf.schema().defaultSize()
+        row_bytes = row_bytes if row_bytes > 0 else 1
+        max_rows = max_bytes // row_bytes
+        rows = df.limit(max_rows + 1).count()
+        if rows > max_rows:
+            return None
+        return rows * row_bytes
+    
+    @staticmethod
+    def _format_bytes(size: Optional[int]) -> str:
+        """Formatear un tamaño en bytes para logs."""
+        if size is None:
+            return "desconocido"
+        for unit in ["B", "KB", "MB", "GB"]:
+            if size < 1024:
+                return f"{size:.1f}{unit}"
+            size /= 1024
+        return f"{size:.1f}TB"
+    
+    def _log_partition_histogram(self, df: DataFrame, stage: str) -> Optional[Dict]:
+        """
+        Registrar el histograma de filas por partición de una etapa.
+        
+        Args:
+            df: DataFrame de la etapa
+            stage: Nombre de la etapa para el log
+            
+        Returns:
+            Diccionario con estadísticas de particiones o None si está desactivado
+        """
+        if not self.log_partition_stats:
+            return None
+        
+        rows_per_partition = sorted(
+            row["count"] for row in
+            df.groupBy(spark_partition_id().alias("particion")).count().collect()
+        )
+        if not rows_per_partition:
+            self.logger.info(f"[{stage}] Sin particiones con datos")
+            return None
+        
+        # Buckets por orden de magnitud de filas
+        histogram = {}
+        for rows in rows_per_partition:
+            bucket = f"<{10 ** len(str(rows)):,}"
+            histogram[bucket] = histogram.get(bucket, 0) + 1
+        
+        n = len(rows_per_partition)
+        partition_stats = {
+            'particiones': n,
+            'min': rows_per_partition[0],
+            'p50': rows_per_partition[n // 2],
+            'p90': rows_per_partition[(n * 9) // 10],
+            'max': rows_per_partition[-1],
+            'histograma': histogram
+        }
+        
+        self.logger.info(
+            f"[{stage}] Particiones: {n} | filas min/p50/p90/max: "
+            f"{partition_stats['min']}/{partition_stats['p50']}/"
+            f"{partition_stats['p90']}/{partition_stats['max']} | "
+            f"histograma: {histogram}"
+        )
+        return partition_stats
+    
+    def _find_skewed_keys(self, df: DataFrame, key: str, max_keys: int = 20) -> List:
+        """
+        Detectar claves calientes (p. ej. agente_id o cliente_id en campañas).
+        
+        Args:
+            df: DataFrame del lado grande del join (conviene persistirlo antes)
+            key: Columna a analizar
+            max_keys: Máximo de claves calientes a devolver
+            
+        Returns:
+            Lista de valores cuya frecuencia supera skew_factor veces la media
+        """
+        key_counts = df.groupBy(key).count().persist(StorageLevel.MEMORY_AND_DISK)
+        try:
+            mean_count = key_counts.agg(avg("count").alias("media")).first()["media"]
+            if mean_count is None:
+                return []
+            hot_rows = key_counts.filter(
+                col("count") > mean_count * self.skew_factor
+            ).orderBy(col("count").desc()).limit(max_keys).collect()
+        finally:
+            key_counts.unpersist()
+        
+        return [row[key] for row in hot_rows]
+    
+    def _salted_join(self, left: DataFrame, right: DataFrame, on: List[str],
+                     how: str, skew_key: str, hot_keys: List) -> DataFrame:
+        """
+        Join con sal aleatoria sólo para las claves calientes.
+        
+        Las filas del lado izquierdo con claves calientes se reparten entre
+        skew_salt_buckets sales; las del lado derecho se replican una vez
+        por sal. El resto de claves usa sal 0 y no se replica.
+        
+        Args:
+            left: DataFrame grande (con sesgo)
+            right: DataFrame a unir
+            on: Columnas de join (incluye skew_key)
+            how: Tipo de join ('inner' o 'left')
+            skew_key: Columna con sesgo
+            hot_keys: Valores calientes detectados
+            
+        Returns:
+            DataFrame unido sin la columna de sal
+        """
+        salts = array(*[lit(i) for i in range(self.skew_salt_buckets)])
+        
+        left_salted = left.withColumn(
+            "_salt",
+            when(left[skew_key].isin(hot_keys),
+                 (rand() * self.skew_salt_buckets).cast("int")).otherwise(lit(0))
+        )
+        right_salted = right.withColumn(
+            "_salt",
+            explode(when(right[skew_key].isin(hot_keys), salts).otherwise(array(lit(0))))
+        )
+        
+        return left_salted.join(right_salted, on + ["_salt"], how).drop("_salt")
+    
+    def join_with_strategy(self, left: DataFrame, right: DataFrame, on: List[str],
+                           how: str = "inner", stage: str = "join",
+                           skew_key: Optional[str] = None) -> DataFrame:
+        """
+        Unir DataFrames eligiendo broadcast o salting según estimaciones.
+        
+        - Si el lado derecho cabe en broadcast_threshold_mb se hace broadcast
+          (un full_outer se reescribe como left + anti-join para permitirlo).
+        - Si no, y se indica skew_key (opcional, p. ej. 'agente_id' o
+          'cliente_id' en joins a nivel de ticket), se detectan claves
+          calientes del lado izquierdo y sólo esas se reparten con sal.
+        - En otro caso se deja el shuffle join; AQE con skewJoin sigue
+          partiendo las particiones sesgadas según skew_factor.
+        
+        El lado derecho se persiste antes de estimar su tamaño y se libera
+        cuando el resultado queda materializado (persistido), así que ni el
+        conteo ni el histograma obligan a recalcular las entradas.
+        
+        Args:
+            left: DataFrame izquierdo (normalmente el más grande)
+            right: DataFrame derecho
+            on: Columnas de join
+            how: Tipo de join
+            stage: Nombre de la etapa para logs
+            skew_key: Columna candidata a sesgo; debe ser una de las columnas de join
+            
+        Returns:
+            DataFrame unido (persistido)
+        """
+        if skew_key is not None and skew_key not in on:
+            raise ValueError(
+                f"skew_key '{skew_key}' debe ser una de las columnas de join {on}"
+            )
+        
+        right = right.persist(StorageLevel.MEMORY_AND_DISK)
+        persisted = [right]
+        right_size = self._estimate_size_bytes(right, self.broadcast_threshold_bytes)
+        right_small = right_size is not None
+        
+        if right_small and how == "full_outer":
+            strategy = "broadcast_left_mas_anti_join"
+            matched = left.join(broadcast(right), on, "left")
+            right_only = right.join(left.select(*on).distinct(), on, "left_anti")
+            result = matched.unionByName(right_only, allowMissingColumns=True)
+        elif right_small and how in ("inner", "left", "left_semi", "left_anti"):
+            strategy = "broadcast"
+            result = left.join(broadcast(right), on, how)
+        elif skew_key and how in ("inner", "left"):
+            left = left.persist(StorageLevel.MEMORY_AND_DISK)
+            persisted.append(left)
+            hot_keys = self._find_skewed_keys(left, skew_key)
+            if hot_keys:
+                strategy = f"salting ({len(hot_keys)} claves calientes en {skew_key})"
+                result = self._salted_join(left, right, on, how, skew_key, hot_keys)
+            else:
+                strategy = "shuffle"
+                result = left.join(right, on, how)
+        else:
+            strategy = "shuffle"
+            result = left.join(right, on, how)
+        
+        # Materializar el resultado antes de liberar las entradas persistidas
+        result = result.persist(StorageLevel.MEMORY_AND_DISK)
+        result.count()
+        for df in persisted:
+            df.unpersist()
+        
+        self.join_decisions.append({
+            'stage': stage,
+            'how': how,
+            'strategy': strategy,
+            'right_bytes': right_size
+        })
+        self.logger.info(
+            f"[{stage}] Join {how} -> {strategy} "
+            f"(derecha ~{self._format_bytes(right_size)})"
+        )
+        self._log_partition_histogram(result, stage)
+        
+        return result
+    
     def calculate_satisfaction_metrics(self, tickets_df: DataFrame, 
-                                     nps_df: DataFrame) -> DataFrame:
+                                     nps_df: DataFrame,
+                                     exact_distinct: bool = False) -> DataFrame:
         """
         Calcular métricas agregadas de satisfacción.
         
+        Los clientes únicos se estiman con un sketch HLL que se guarda en
+        la columna ``clientes_sketch`` para poder combinarlo en roll-ups
+        (ver ``rollup_satisfaction_metrics``). Con exact_distinct no hay
+        sketch y el resultado no admite roll-ups.
+        
         Args:
             tickets_df: DataFrame de tickets limpio
             nps_df: DataFrame de NPS limpio
+            exact_distinct: Usar countDistinct exacto en lugar del sketch
             
         Returns:
             DataFrame con métricas agregadas
         """
         self.logger.info("Calculando métricas de satisfacción...")
         
+        if exact_distinct:
+            distinct_clientes = countDistinct("cliente_id").alias("clientes_unicos")
+        else:
+            distinct_clientes = sketch_agg(
+                "cliente_id", self.hll_lg_config_k
+            ).alias("clientes_sketch")
+        
         # Métricas diarias por canal
         daily_metrics = tickets_df.groupBy(
             "year", "month", "day", "canal_normalizado"
@@ -281,11 +971,20 @@ class CustomerSatisfactionProcessor:
             avg("duracion_minutos").alias("duracion_promedio"),
             sum(when(col("categoria_satisfaccion").isin(["muy_satisfecho", "satisfecho"]), 1)
                 .otherwise(0)).alias("tickets_satisfactorios"),
-            sum(when(col("resolucion") == "resuelto", 1)
+            sum(when(col("resolucion_normalizada") == "resuelto", 1)
                 .otherwise(0)).alias("tickets_resueltos"),
-            countDistinct("cliente_id").alias("clientes_unicos")
+            distinct_clientes
         )
         
+        # Estimación de clientes únicos y su cota de error
+        if not exact_distinct:
+            daily_metrics = daily_metrics.withColumn(
+                "clientes_unicos", sketch_estimate("clientes_sketch")
+            ).withColumn(
+                "clientes_unicos_error_relativo",
+                lit(error_bound(self.hll_lg_config_k))
+            )
+        
         # Calcular tasas
         daily_metrics = daily_metrics.withColumn(
             "tasa_satisfaccion",
@@ -311,11 +1010,13 @@ class CustomerSatisfactionProcessor:
             ((col("promotores") - col("detractores")) / col("total_encuestas")) * 100
         )
         
-        # Combinar métricas
-        combined_metrics = daily_metrics.join(
+        # Combinar métricas (el lado NPS es pequeño: se evalúa broadcast)
+        combined_metrics = self.join_with_strategy(
+            daily_metrics,
             nps_daily,
             ["year", "month", "day"],
-            "full_outer"
+            "full_outer",
+            stage="satisfaction_metrics"
         )
         
         # Agregar fecha para facilitar consultas
@@ -327,23 +1028,236 @@ class CustomerSatisfactionProcessor:
         self.logger.info("Métricas calculadas exitosamente")
         return combined_metrics
     
+    def rollup_satisfaction_metrics(self, metrics_df: DataFrame,
+                                    group_cols: list) -> DataFrame:
+        """
+        Agregar métricas diarias a un nivel superior sin releer tickets.
+        
+        Los conteos se suman, los promedios se ponderan por número de
+        tickets (o de encuestas) y los clientes únicos se obtienen uniendo
+        los sketches HLL. Las métricas NPS son diarias y se repiten en cada
+        canal, así que se agregan una sola vez por día y se unen por las
+        columnas de fecha del nuevo nivel.
+        
+        Args:
+            metrics_df: Salida de calculate_satisfaction_metrics (con sketches)
+            group_cols: Columnas del nuevo nivel (p. ej. ["year", "month"])
+            
+        Returns:
+            DataFrame con métricas agregadas al nivel solicitado
+        """
+        if "clientes_sketch" not in metrics_df.columns:
+            raise ValueError(
+                "Las métricas no tienen clientes_sketch (calculadas con "
+                "exact_distinct): los clientes únicos exactos no se pueden combinar"
+            )
+        
+        self.logger.info(f"Agregando métricas por {group_cols}...")
+        
+        tickets_rollup = metrics_df.filter(col("total_tickets").isNotNull()).groupBy(
+            *group_cols
+        ).agg(
+            sum("total_tickets").alias("total_tickets"),
+            (sum(col("satisfaccion_promedio") * col("total_tickets")) /
+             sum("total_tickets")).alias("satisfaccion_promedio"),
+            (sum(col("duracion_promedio") * col("total_tickets")) /
+             sum("total_tickets")).alias("duracion_promedio"),
+            sum("tickets_satisfactorios").alias("tickets_satisfactorios"),
+            sum("tickets_resueltos").alias("tickets_resueltos")
+        ).withColumn(
+            "tasa_satisfaccion",
+            col("tickets_satisfactorios") / col("total_tickets")
+        ).withColumn(
+            "tasa_resolucion",
+            col("tickets_resueltos") / col("total_tickets")
+        )
+        
+        clientes_rollup = merge_sketches_spark(
+            metrics_df.filter(col("clientes_sketch").isNotNull()),
+            group_cols, "clientes_sketch", "clientes_unicos",
+            self.hll_lg_config_k
+        )
+        rollup = tickets_rollup.join(clientes_rollup, group_cols, "left")
+        
+        # NPS: una fila por día (la métrica no depende del canal)
+        date_cols = [c for c in group_cols if c in ("year", "month", "day")]
+        nps_rollup = metrics_df.filter(col("total_encuestas").isNotNull()) \
+            .dropDuplicates(["year", "month", "day"]) \
+            .groupBy(*date_cols).agg(
+                sum("total_encuestas").alias("total_encuestas"),
+                sum("promotores").alias("promotores"),
+                sum("detractores").alias("detractores"),
+                (sum(col("nps_promedio") * col("total_encuestas")) /
+                 sum("total_encuestas")).alias("nps_promedio")
+            ).withColumn(
+                "nps_score_calculado",
+                ((col("promotores") - col("detractores")) / col("total_encuestas")) * 100
+            )
+        
+        if not date_cols:
+            return rollup.crossJoin(nps_rollup)
+        return rollup.join(nps_rollup, date_cols, "full_outer")
+    
+    def _plan_output_files(self, df: DataFrame, target_file_size_mb: int) -> Dict:
+        """
+        Estimar cuántos archivos Parquet escribir a partir del volumen de datos.
+        
+        Args:
+            df: DataFrame a escribir
+            target_file_size_mb: Tamaño objetivo por archivo
+            
+        Returns:
+            Diccionario con filas, bytes estimados, archivos y filas por archivo
+        """
+        total_rows = df.count()
+        row_bytes = int(df._jdf.schema().defaultSize() * self.PARQUET_COMPRESSION_RATIO)
+        row_bytes = row_bytes if row_bytes > 0 else 1
+        estimated_bytes = total_rows * row_bytes
+        target_bytes = target_file_size_mb * 1024 * 1024
+        
+        return {
+            'rows': total_rows,
+            'estimated_bytes': estimated_bytes,
+            'num_files': math.ceil(estimated_bytes / target_bytes) if total_rows else 1,
+            'rows_per_file': target_bytes // row_bytes
+        }
+    
+    def _report_written_files(self, output_path: str,
+                              written_partitions: Optional[List[Dict]] = None) -> Dict:
+        """
+        Listar los archivos Parquet escritos y resumirlos por partición.
+        
+        Args:
+            output_path: Ruta de salida (S3 o sistema de archivos de Hadoop)
+            written_partitions: Particiones escritas en esta ejecución
+                ({columna: valor}); None lista la ruta completa
+            
+        Returns:
+            Diccionario {partición: {'files': n, 'avg_size_mb': x}}
+        """
+        jvm = self.spark.sparkContext._jvm
+        hadoop_conf = self.spark.sparkContext._jsc.hadoopConfiguration()
+        root = jvm.org.apache.hadoop.fs.Path(output_path)
+        fs = root.getFileSystem(hadoop_conf)
+        root_uri = fs.makeQualified(root).toString().rstrip("/")
+        
+        if written_partitions is None:
+            directories = [root]
+        else:
+            directories = [
+                jvm.org.apache.hadoop.fs.Path(
+                    root, "/".join(f"{name}={value}" for name, value in partition.items())
+                )
+                for partition in written_partitions
+            ]
+        
+        partitions = {}
+        for directory in directories:
+            if not fs.exists(directory):
+                continue
+            files = fs.listFiles(directory, True)
+            while files.hasNext():
+                status = files.next()
+                path = status.getPath()
+                if not path.getName().endswith(".parquet"):
+                    continue
+                partition = path.getParent().toString().replace(root_uri, "").strip("/") or "/"
+                entry = partitions.setdefault(partition, {'files': 0, 'bytes': 0})
+                entry['files'] += 1
+                entry['bytes'] += status.getLen()
+        
+        report = {}
+        total_files = 0
+        for partition, entry in sorted(partitions.items()):
+            total_files += entry['files']
+            avg_size_mb = entry['bytes'] / entry['files'] / (1024 * 1024)
+            report[partition] = {'files': entry['files'], 'avg_size_mb': avg_size_mb}
+            self.logger.info(
+                f"  {partition}: {entry['files']} archivos, "
+                f"tamaño promedio {avg_size_mb:.2f} MB"
+            )
+        
+        self.logger.info(
+            f"Archivos escritos en {output_path}: {total_files} "
+            f"en {len(partitions)} particiones"
+        )
+        return report
+    
     def write_processed_data(self, df: DataFrame, output_path: str, 
-                           partition_cols: list = None) -> None:
+                           partition_cols: list = None,
+                           sort_cols: list = None,
+                           target_file_size_mb: int = None,
+                           mode: str = "overwrite",
+                           written_partitions: Optional[List[Dict]] = None,
+                           persist_input: bool = True) -> Dict:
         """
         Escribir datos procesados a S3 en formato Parquet.
         
+        Antes de escribir se reparticiona por rango sobre las columnas de
+        partición, de modo que cada tarea escribe en pocas particiones y el
+        número de archivos se ajusta al volumen estimado. Opcionalmente se
+        ordena dentro de cada archivo para mejorar el pruning por min/max.
+        
+        Con written_partitions la sobrescritura es dinámica: sólo se
+        reemplazan las particiones presentes en df y el reporte de archivos
+        se limita a ellas.
+        
+        El conteo de filas del plan es una acción, así que df se persiste
+        mientras dura la escritura para no calcularlo dos veces.
+        
         Args:
             df: DataFrame a escribir
             output_path: Ruta de salida en S3
             partition_cols: Columnas para particionamiento
+            sort_cols: Columnas de orden dentro de cada archivo
+                (p. ej. ["canal_normalizado", "agente_id"])
+            target_file_size_mb: Tamaño objetivo por archivo
+                (por defecto self.target_file_size_mb)
+            mode: Modo de escritura ('overwrite' o 'append')
+            written_partitions: Particiones que se reescriben ({columna: valor})
+            persist_input: Persistir df durante la escritura (False si ya
+                está materializado, p. ej. con localCheckpoint)
+            
+        Returns:
+            Diccionario con archivos escritos y tamaño promedio por partición
         """
+        if persist_input:
+            df = df.persist(StorageLevel.MEMORY_AND_DISK)
+        source = df
         try:
-            writer = df.write.mode("overwrite") \
+            target_file_size_mb = target_file_size_mb or self.target_file_size_mb
+            partition_cols = partition_cols or []
+            sort_cols = [c for c in (sort_cols or []) if c in df.columns]
+            
+            plan = self._plan_output_files(df, target_file_size_mb)
+            self.logger.info(
+                f"Escribiendo {plan['rows']} registros (~{self._format_bytes(plan['estimated_bytes'])}) "
+                f"en {plan['num_files']} archivos objetivo de {target_file_size_mb} MB"
+            )
+            
+            # Desempate para repartir particiones grandes entre varias tareas
+            range_cols = partition_cols + sort_cols
+            if not sort_cols:
+                df = df.withColumn("_file_bucket", xxhash64(*df.columns))
+                range_cols = range_cols + ["_file_bucket"]
+            
+            if range_cols:
+                df = df.repartitionByRange(plan['num_files'], *range_cols)
+            else:
+                df = df.repartition(plan['num_files'])
+            df = df.sortWithinPartitions(*(partition_cols + sort_cols)) \
+                if partition_cols or sort_cols else df
+            df = df.drop("_file_bucket")
+            
+            writer = df.write.mode(mode) \
                       .option("compression", "snappy") \
+                      .option("maxRecordsPerFile", plan['rows_per_file']) \
                       .format("parquet")
             
             if partition_cols:
                 writer = writer.partitionBy(*partition_cols)
+            if written_partitions is not None:
+                writer = writer.option("partitionOverwriteMode", "dynamic")
             
             writer.save(output_path)
             
@@ -352,6 +1266,126 @@ class CustomerSatisfactionProcessor:
         except Exception as e:
             self.logger.error(f"Error escribiendo datos en {output_path}: {e}")
             raise
+        finally:
+            if persist_input:
+                source.unpersist()
+        
+        try:
+            return self._report_written_files(output_path, written_partitions)
+        except Exception as e:
+            self.logger.warning(f"No se pudo generar el reporte de archivos: {e}")
+            return {}
+    
+    def _path_exists(self, path: str) -> bool:
+        """Comprobar si una ruta existe (S3 o sistema de archivos de Hadoop)."""
+        jvm = self.spark.sparkContext._jvm
+        hadoop_conf = self.spark.sparkContext._jsc.hadoopConfiguration()
+        hadoop_path = jvm.org.apache.hadoop.fs.Path(path)
+        return hadoop_path.getFileSystem(hadoop_conf).exists(hadoop_path)
+    
+    @staticmethod
+    def _partition_filter(partitions: List[Dict]):
+        """Condición que selecciona las particiones dadas (permite pruning)."""
+        condition = lit(False)
+        for partition in partitions:
+            match = lit(True)
+            for name, value in partition.items():
+                match = match & col(name).eqNullSafe(value)
+            condition = condition | match
+        return condition
+    
+    def write_incremental(self, df: DataFrame, output_path: str,
+                          partition_cols: list,
+                          key_cols: list = None,
+                          extra_partitions: Optional[List[Dict]] = None,
+                          sort_cols: list = None) -> List[Dict]:
+        """
+        Reescribir sólo las particiones afectadas por un lote incremental.
+        
+        Las particiones afectadas son las que contienen filas del lote más
+        extra_partitions (p. ej. donde estaba la versión anterior de un
+        registro actualizado). Con key_cols, las filas existentes de esas
+        particiones se conservan salvo las que el lote reemplaza; sin
+        key_cols el lote sustituye las particiones completas (métricas
+        recalculadas). El resto de la tabla no se toca.
+        
+        Args:
+            df: Lote a escribir
+            output_path: Ruta de la tabla
+            partition_cols: Columnas de partición
+            key_cols: Clave de negocio para combinar con lo existente
+            extra_partitions: Particiones adicionales a reescribir
+            sort_cols: Columnas de orden dentro de cada archivo
+            
+        Returns:
+            Lista de particiones reescritas ({columna: valor})
+        """
+        partitions = {tuple(row) for row in df.select(*partition_cols).distinct().collect()}
+        partitions |= {
+            tuple(partition[c] for c in partition_cols) for partition in (extra_partitions or [])
+        }
+        partitions = [dict(zip(partition_cols, values)) for values in sorted(partitions, key=str)]
+        if not partitions:
+            self.logger.info(f"Sin particiones afectadas en {output_path}")
+            return []
+        
+        merged = df
+        if key_cols and self._path_exists(output_path):
+            existing = self.spark.read.parquet(output_path) \
+                .filter(self._partition_filter(partitions)) \
+                .join(df.select(*key_cols), key_cols, "left_anti")
+            # Se sobrescriben particiones que se acaban de leer: cortar el linaje
+            merged = df.unionByName(existing, allowMissingColumns=True).localCheckpoint()
+        
+        self.logger.info(f"Reescribiendo {len(partitions)} particiones de {output_path}")
+        self.write_processed_data(
+            merged, output_path, partition_cols,
+            sort_cols=sort_cols, written_partitions=partitions,
+            persist_input=merged is df
+        )
+        return partitions
+    
+    def refresh_satisfaction_metrics(self, tickets_path: str, nps_path: str,
+                                     metrics_path: str, monthly_path: str,
+                                     days: List[Dict]) -> None:
+        """
+        Recalcular las métricas de los días afectados por un lote incremental.
+        
+        Las métricas diarias se recalculan leyendo de nuevo los tickets y
+        encuestas procesados de esos días, y las mensuales agregando las
+        diarias de los meses afectados. En ambos casos se reemplazan las
+        particiones completas, así que reprocesar un día no duplica conteos.
+        
+        Args:
+            tickets_path: Ruta de los tickets procesados
+            nps_path: Ruta de las encuestas procesadas
+            metrics_path: Ruta de las métricas diarias
+            monthly_path: Ruta de las métricas mensuales
+            days: Particiones diarias afectadas ({year, month, day})
+        """
+        days = [dict(values) for values in {tuple(day.items()) for day in days}]
+        if not days:
+            return
+        
+        day_filter = self._partition_filter(days)
+        daily_metrics = self.calculate_satisfaction_metrics(
+            self.spark.read.parquet(tickets_path).filter(day_filter),
+            self.spark.read.parquet(nps_path).filter(day_filter)
+        )
+        self.write_incremental(
+            daily_metrics, metrics_path, ["year", "month", "day"],
+            sort_cols=["canal_normalizado"]
+        )
+        
+        months = [
+            dict(values) for values in
+            {(('year', day['year']), ('month', day['month'])) for day in days}
+        ]
+        monthly_metrics = self.rollup_satisfaction_metrics(
+            self.spark.read.parquet(metrics_path).filter(self._partition_filter(months)),
+            ["year", "month", "canal_normalizado"]
+        )
+        self.write_incremental(monthly_metrics, monthly_path, ["year", "month"])
     
     def update_data_catalog(self, database_name: str, table_name: str, 
                           s3_path: str, partition_cols: list = None) -> None:
@@ -420,56 +1454,128 @@ def main():
     job = Job(glue_context)
     job.init(args['JOB_NAME'], args)
     
+    # Precisión opcional de los sketches HLL
+    hll_lg_config_k = DEFAULT_LG_CONFIG_K
+    if '--HLL_LG_CONFIG_K' in sys.argv:
+        hll_lg_config_k = int(
+            getResolvedOptions(sys.argv, ['HLL_LG_CONFIG_K'])['HLL_LG_CONFIG_K']
+        )
+    
+    # Modo incremental: deduplicar contra lo ya procesado y reescribir sólo
+    # las particiones afectadas
+    incremental = False
+    if '--INCREMENTAL' in sys.argv:
+        incremental = getResolvedOptions(
+            sys.argv, ['INCREMENTAL']
+        )['INCREMENTAL'].lower() == 'true'
+    
+    # Histogramas de filas por partición en cada etapa (diagnóstico: una
+    # acción adicional por etapa)
+    log_partition_stats = False
+    if '--LOG_PARTITION_STATS' in sys.argv:
+        log_partition_stats = getResolvedOptions(
+            sys.argv, ['LOG_PARTITION_STATS']
+        )['LOG_PARTITION_STATS'].lower() == 'true'
+    
+    # Tabla de mapeos categóricos (por defecto la versionada junto al job)
+    mappings_path = DEFAULT_MAPPINGS_PATH
+    if '--MAPPINGS_PATH' in sys.argv:
+        mappings_path = getResolvedOptions(sys.argv, ['MAPPINGS_PATH'])['MAPPINGS_PATH']
+    
+    # Léxicos de sentimiento (por defecto los versionados en analytics)
+    lexicon_path = DEFAULT_LEXICON_PATH
+    if '--LEXICON_PATH' in sys.argv:
+        lexicon_path = getResolvedOptions(sys.argv, ['LEXICON_PATH'])['LEXICON_PATH']
+    
     # Crear procesador
-    processor = CustomerSatisfactionProcessor(glue_context, args['JOB_NAME'])
+    processor = CustomerSatisfactionProcessor(
+        glue_context, args['JOB_NAME'], hll_lg_config_k,
+        log_partition_stats=log_partition_stats,
+        mappings_path=mappings_path, lexicon_path=lexicon_path
+    )
     
     try:
         # Variables de configuración
         database_name = args.get('DATABASE_NAME', 'customer_satisfaction_db')
         source_bucket = args['SOURCE_BUCKET']
         target_bucket = args['TARGET_BUCKET']
+        base_path = f"s3://{target_bucket}/processed-data"
+        processed_paths = {
+            'customer_tickets': f"{base_path}/customer_tickets_processed/",
+            'nps_surveys': f"{base_path}/nps_surveys_processed/",
+            'customer_reviews': f"{base_path}/customer_reviews_processed/"
+        }
         
-        # Leer datos crudos
-        tickets_df = processor.read_raw_data(database_name, 'customer_tickets')
-        nps_df = processor.read_raw_data(database_name, 'nps_surveys')
-        reviews_df = processor.read_raw_data(database_name, 'customer_reviews')
+        # Leer y deduplicar datos crudos
+        raw_data = {}
+        for dataset in processed_paths:
+            raw_df = processor.read_raw_data(database_name, dataset)
+            raw_data[dataset] = processor.deduplicate(
+                raw_df, dataset,
+                processed_paths[dataset] if incremental else None
+            )
         
         # Procesar datos
-        tickets_clean = processor.clean_customer_tickets(tickets_df)
-        nps_clean = processor.clean_nps_surveys(nps_df)
-        reviews_clean = processor.clean_customer_reviews(reviews_df)
-        
-        # Calcular métricas
-        satisfaction_metrics = processor.calculate_satisfaction_metrics(
-            tickets_clean, nps_clean
-        )
+        tickets_clean = processor.clean_customer_tickets(raw_data['customer_tickets'])
+        nps_clean = processor.clean_nps_surveys(raw_data['nps_surveys'])
+        reviews_clean = processor.clean_customer_reviews(raw_data['customer_reviews'])
         
         # Escribir datos procesados
-        base_path = f"s3://{target_bucket}/processed-data"
+        partition_cols = ["year", "month", "day"]
+        outputs = [
+            ('customer_tickets', tickets_clean, ["canal_normalizado", "agente_id"]),
+            ('nps_surveys', nps_clean, None),
+            ('customer_reviews', reviews_clean, None)
+        ]
+        metrics_path = f"{base_path}/satisfaction_metrics/"
+        monthly_path = f"{base_path}/satisfaction_metrics_monthly/"
         
-        processor.write_processed_data(
-            tickets_clean,
-            f"{base_path}/customer_tickets_processed/",
-            ["year", "month", "day"]
-        )
-        
-        processor.write_processed_data(
-            nps_clean,
-            f"{base_path}/nps_surveys_processed/",
-            ["year", "month", "day"]
-        )
+        if incremental:
+            written = {}
+            for dataset, clean_df, sort_cols in outputs:
+                key_col, _ = processor.DEDUP_KEYS[dataset]
+                written[dataset] = processor.write_incremental(
+                    clean_df, processed_paths[dataset], partition_cols,
+                    key_cols=[key_col],
+                    extra_partitions=processor.superseded_partitions.get(dataset),
+                    sort_cols=sort_cols
+                )
+            
+            # Métricas recalculadas sólo para los días con datos nuevos
+            processor.refresh_satisfaction_metrics(
+                processed_paths['customer_tickets'], processed_paths['nps_surveys'],
+                metrics_path, monthly_path,
+                written['customer_tickets'] + written['nps_surveys']
+            )
+        else:
+            for dataset, clean_df, sort_cols in outputs:
+                processor.write_processed_data(
+                    clean_df, processed_paths[dataset], partition_cols, sort_cols=sort_cols
+                )
+            
+            satisfaction_metrics = processor.calculate_satisfaction_metrics(
+                tickets_clean, nps_clean
+            )
+            monthly_metrics = processor.rollup_satisfaction_metrics(
+                satisfaction_metrics, ["year", "month", "canal_normalizado"]
+            )
+            processor.write_processed_data(
+                satisfaction_metrics, metrics_path, partition_cols,
+                sort_cols=["canal_normalizado"]
+            )
+            processor.write_processed_data(
+                monthly_metrics, monthly_path, ["year", "month"]
+            )
         
-        processor.write_processed_data(
-            reviews_clean,
-            f"{base_path}/customer_reviews_processed/",
-            ["year", "month", "day"]
-        )
+        # Registrar claves procesadas para la próxima ejecución incremental
+        for dataset, clean_df, _ in outputs:
+            processor.update_processed_keys(clean_df, dataset, processed_paths[dataset])
+            processor.release_dedup_cache(dataset)
         
-        processor.write_processed_data(
-            satisfaction_metrics,
-            f"{base_path}/satisfaction_metrics/",
-            ["year", "month", "day"]
-        )
+        for dataset, metrics in processor.dedup_metrics.items():
+            processor.logger.info(
+                f"Tasa de duplicados {dataset}: {metrics['tasa_duplicados']:.2%}"
+            )
         
         # Actualizar Data Catalog
         processor.update_data_catalog(
@@ -486,6 +1592,16 @@ def main():
             ["year", "month", "day"]
         )
         
+        processor.update_data_catalog(
+            database_name,
+            'satisfaction_metrics_monthly',
+            f"{base_path}/satisfaction_metrics_monthly/",
+            ["year", "month"]
+        )
+        
+        for decision in processor.join_decisions:
+            processor.logger.info(f"Decisión de join: {decision}")
+        
         processor.logger.info("Job completado exitosamente")
         
     except Exception as e:
@@ -0,0 +1,223 @@
+"""
+Sketches HyperLogLog para conteos aproximados de valores distintos.
+
+Este módulo proporciona:
+- Construcción de sketches HLL en Spark (compatibles con Apache DataSketches)
+- Combinación de sketches en Spark para roll-ups entre días y canales
+- Combinación de sketches en pandas (p. ej. desde el dashboard de Streamlit)
+- Cota de error relativo para cada estimación
+
+Los sketches se guardan como columnas binarias junto a las métricas
+agregadas, por lo que un conteo de clientes únicos a nivel semanal o
+mensual se obtiene uniendo sketches diarios sin volver a leer los tickets.
+"""
+
+import math
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+try:
+    import datasketches
+    DATASKETCHES_AVAILABLE = True
+except ImportError:
+    DATASKETCHES_AVAILABLE = False
+
+
+# Precisión por defecto: 2^12 registros, error estándar relativo ~1.6%
+DEFAULT_LG_CONFIG_K = 12
+
+# Rango soportado por hll_sketch_agg en Spark
+MIN_LG_CONFIG_K = 4
+MAX_LG_CONFIG_K = 21
+
+# Número de desviaciones estándar usadas para las cotas (~95%)
+DEFAULT_NUM_STD_DEV = 2
+
+
+def validate_lg_config_k(lg_config_k: int) -> int:
+    """
+    Validar la precisión configurada para los sketches.
+
+    Args:
+        lg_config_k: Logaritmo base 2 del número de registros del sketch
+
+    Returns:
+        Precisión validada
+    """
+    if not MIN_LG_CONFIG_K <= lg_config_k <= MAX_LG_CONFIG_K:
+        raise ValueError(
+            f"lg_config_k debe estar entre {MIN_LG_CONFIG_K} y {MAX_LG_CONFIG_K}, "
+            f"recibido: {lg_config_k}"
+        )
+    return lg_config_k
+
+
+def relative_standard_error(lg_config_k: int = DEFAULT_LG_CONFIG_K) -> float:
+    """
+    Error estándar relativo teórico de un sketch HLL.
+
+    Args:
+        lg_config_k: Precisión del sketch
+
+    Returns:
+        Error estándar relativo (1.04 / sqrt(2^k))
+    """
+    validate_lg_config_k(lg_config_k)
+    return 1.04 / math.sqrt(2 ** lg_config_k)
+
+
+def error_bound(lg_config_k: int = DEFAULT_LG_CONFIG_K,
+                num_std_dev: int = DEFAULT_NUM_STD_DEV) -> float:
+    """
+    Cota de error relativo para un número de desviaciones estándar.
+
+    Args:
+        lg_config_k: Precisión del sketch
+        num_std_dev: Desviaciones estándar (1, 2 o 3)
+
+    Returns:
+        Error relativo máximo esperado
+    """
+    return num_std_dev * relative_standard_error(lg_config_k)
+
+
+# ===== Spark =====
+
+def sketch_agg(column: str, lg_config_k: int = DEFAULT_LG_CONFIG_K):
+    """
+    Expresión de agregación que construye un sketch HLL por grupo.
+
+    Args:
+        column: Columna con los valores a contar
+        lg_config_k: Precisión del sketch
+
+    Returns:
+        Columna Spark con el sketch serializado (binary)
+    """
+    from pyspark.sql import functions as F
+
+    return F.hll_sketch_agg(F.col(column), validate_lg_config_k(lg_config_k))
+
+
+def sketch_estimate(sketch_column: str):
+    """
+    Expresión que estima la cardinalidad de un sketch HLL.
+
+    Args:
+        sketch_column: Columna con sketches serializados
+
+    Returns:
+        Columna Spark con la estimación (long)
+    """
+    from pyspark.sql import functions as F
+
+    return F.hll_sketch_estimate(F.col(sketch_column))
+
+
+def merge_sketches_spark(df, group_cols: List[str], sketch_column: str,
+                         estimate_column: str,
+                         lg_config_k: int = DEFAULT_LG_CONFIG_K):
+    """
+    Combinar sketches de un DataFrame Spark a un nivel de agregación superior.
+
+    Args:
+        df: DataFrame Spark con una columna de sketches
+        group_cols: Columnas del nuevo nivel de agregación
+        sketch_column: Columna con sketches serializados
+        estimate_column: Nombre de la columna con la estimación resultante
+        lg_config_k: Precisión usada al construir los sketches
+
+    Returns:
+        DataFrame con el sketch combinado, la estimación y su cota de error
+    """
+    from pyspark.sql import functions as F
+
+    merged = df.groupBy(*group_cols).agg(
+        F.hll_union_agg(F.col(sketch_column), True).alias(sketch_column)
+    )
+
+    return merged.withColumn(
+        estimate_column, sketch_estimate(sketch_column)
+    ).withColumn(
+        f"{estimate_column}_error_relativo", F.lit(error_bound(lg_config_k))
+    )
+
+
+# ===== pandas =====
+
+def _require_datasketches() -> None:
+    """Verificar que la librería datasketches está instalada."""
+    if not DATASKETCHES_AVAILABLE:
+        raise ImportError(
+            "datasketches es necesario para combinar sketches en pandas. "
+            "Instalar con: pip install datasketches"
+        )
+
+
+def _union_sketches(sketches, lg_config_k: int):
+    """Unir una secuencia de sketches serializados en un único sketch."""
+    union = datasketches.hll_union(lg_config_k)
+    for sketch_bytes in sketches:
+        if sketch_bytes is None or (isinstance(sketch_bytes, float) and pd.isna(sketch_bytes)):
+            continue
+        union.update(datasketches.hll_sketch.deserialize(bytes(sketch_bytes)))
+    return union.get_result()
+
+
+def estimate_sketch(sketch_bytes: bytes,
+                    num_std_dev: int = DEFAULT_NUM_STD_DEV) -> Dict:
+    """
+    Estimar la cardinalidad de un sketch serializado.
+
+    Args:
+        sketch_bytes: Sketch HLL serializado (p. ej. leído de Parquet)
+        num_std_dev: Desviaciones estándar para las cotas
+
+    Returns:
+        Diccionario con estimación, cotas inferior/superior y error relativo
+    """
+    _require_datasketches()
+    sketch = datasketches.hll_sketch.deserialize(bytes(sketch_bytes))
+    return {
+        'estimate': sketch.get_estimate(),
+        'lower_bound': sketch.get_lower_bound(num_std_dev),
+        'upper_bound': sketch.get_upper_bound(num_std_dev),
+        'error_relativo': error_bound(sketch.lg_config_k, num_std_dev)
+    }
+
+
+def merge_sketches_pandas(df: pd.DataFrame, group_cols: Optional[List[str]],
+                          sketch_column: str, estimate_column: str,
+                          lg_config_k: int = DEFAULT_LG_CONFIG_K,
+                          num_std_dev: int = DEFAULT_NUM_STD_DEV) -> pd.DataFrame:
+    """
+    Combinar sketches de un DataFrame pandas a un nivel de agregación superior.
+
+    Args:
+        df: DataFrame con una columna de sketches serializados
+        group_cols: Columnas del nuevo nivel (None o [] para un total global)
+        sketch_column: Columna con sketches serializados
+        estimate_column: Nombre de la columna con la estimación resultante
+        lg_config_k: Precisión máxima de la unión
+        num_std_dev: Desviaciones estándar para las cotas
+
+    Returns:
+        DataFrame con estimación, cotas y error relativo por grupo
+    """
+    _require_datasketches()
+    validate_lg_config_k(lg_config_k)
+
+    def summarize(sketches: pd.Series) -> pd.Series:
+        sketch = _union_sketches(sketches, lg_config_k)
+        return pd.Series({
+            estimate_column: sketch.get_estimate(),
+            f'{estimate_column}_lower': sketch.get_lower_bound(num_std_dev),
+            f'{estimate_column}_upper': sketch.get_upper_bound(num_std_dev),
+            f'{estimate_column}_error_relativo': error_bound(sketch.lg_config_k, num_std_dev)
+        })
+
+    if not group_cols:
+        return summarize(df[sketch_column]).to_frame().T
+
+    return df.groupby(group_cols)[sketch_column].apply(summarize).unstack().reset_index()
@@ -0,0 +1,148 @@
+"""
+Filtro de Bloom vectorizado para claves de negocio ya procesadas.
+
+Se usa como pre-chequeo en la deduplicación incremental: una clave que el
+filtro no contiene es nueva con certeza, así que sólo las candidatas
+(duplicados reales más falsos positivos) necesitan compararse contra el
+histórico procesado.
+
+El filtro se serializa a bytes para guardarlo junto a los datos procesados
+y hacer broadcast a los ejecutores de Spark.
+"""
+
+import math
+import struct
+
+import numpy as np
+import pandas as pd
+
+
+# Semillas (16 caracteres) para el doble hashing de pandas
+_HASH_KEY_1 = "cs-analytics-h01"
+_HASH_KEY_2 = "cs-analytics-h02"
+
+# Cabecera: magic, versión, número de bits, número de hashes, elementos agregados
+_HEADER = struct.Struct("<4sBQIQ")
+_MAGIC = b"CSBF"
+_VERSION = 1
+
+
+class KeyBloomFilter:
+    """Filtro de Bloom sobre claves de texto con operaciones vectorizadas."""
+
+    def __init__(self, num_bits: int, num_hashes: int, bits: np.ndarray = None,
+                 count: int = 0):
+        """
+        Inicializar el filtro.
+
+        Args:
+            num_bits: Tamaño del arreglo de bits
+            num_hashes: Número de funciones hash
+            bits: Arreglo de bytes existente (opcional)
+            count: Elementos agregados hasta ahora
+        """
+        self.num_bits = int(num_bits)
+        self.num_hashes = int(num_hashes)
+        self.bits = bits if bits is not None else np.zeros((self.num_bits + 7) // 8, dtype=np.uint8)
+        self.count = count
+
+    @classmethod
+    def for_capacity(cls, expected_items: int, fpp: float = 0.01) -> 'KeyBloomFilter':
+        """
+        Crear un filtro dimensionado para una capacidad y tasa de falsos positivos.
+
+        Args:
+            expected_items: Número esperado de claves
+            fpp: Probabilidad de falso positivo objetivo
+
+        Returns:
+            Filtro vacío
+        """
+        expected_items = max(int(expected_items), 1)
+        num_bits = math.ceil(-expected_items * math.log(fpp) / (math.log(2) ** 2))
+        num_hashes = max(1, round(num_bits / expected_items * math.log(2)))
+        return cls(num_bits, num_hashes)
+
+    def _positions(self, keys: pd.Series) -> np.ndarray:
+        """Calcular las posiciones de bits (n_claves x num_hashes)."""
+        values = keys.astype(str).to_numpy(dtype=object)
+        h1 = pd.util.hash_array(values, hash_key=_HASH_KEY_1)
+        h2 = pd.util.hash_array(values, hash_key=_HASH_KEY_2) | np.uint64(1)
+        steps = np.arange(self.num_hashes, dtype=np.uint64)
+        return (h1[:, None] + steps[None, :] * h2[:, None]) % np.uint64(self.num_bits)
+
+    def add(self, keys: pd.Series) -> None:
+        """
+        Agregar claves al filtro.
+
+        Args:
+            keys: Serie con claves de negocio
+        """
+        if len(keys) == 0:
+            return
+        positions = self._positions(keys).ravel()
+        np.bitwise_or.at(
+            self.bits,
+            (positions >> np.uint64(3)).astype(np.int64),
+            (np.uint8(1) << (positions & np.uint64(7)).astype(np.uint8))
+        )
+        self.count += len(keys)
+
+    def might_contain(self, keys: pd.Series) -> np.ndarray:
+        """
+        Comprobar pertenencia (sin falsos negativos).
+
+        Args:
+            keys: Serie con claves de negocio
+
+        Returns:
+            Arreglo booleano: True si la clave pudo haberse agregado
+        """
+        if len(keys) == 0:
+            return np.zeros(0, dtype=bool)
+        positions = self._positions(keys)
+        bytes_ = self.bits[(positions >> np.uint64(3)).astype(np.int64)]
+        masks = np.uint8(1) << (positions & np.uint64(7)).astype(np.uint8)
+        return np.all((bytes_ & masks) != 0, axis=1)
+
+    def merge(self, other: 'KeyBloomFilter') -> 'KeyBloomFilter':
+        """
+        Unir otro filtro con la misma configuración.
+
+        Args:
+            other: Filtro a unir
+
+        Returns:
+            Este filtro, actualizado
+        """
+        if (self.num_bits, self.num_hashes) != (other.num_bits, other.num_hashes):
+            raise ValueError("Sólo se pueden unir filtros con la misma configuración")
+        np.bitwise_or(self.bits, other.bits, out=self.bits)
+        self.count += other.count
+        return self
+
+    def estimated_fpp(self) -> float:
+        """Probabilidad de falso positivo estimada con los elementos actuales."""
+        return (1 - math.exp(-self.num_hashes * self.count / self.num_bits)) ** self.num_hashes
+
+    def to_bytes(self) -> bytes:
+        """Serializar el filtro."""
+        header = _HEADER.pack(_MAGIC, _VERSION, self.num_bits, self.num_hashes, self.count)
+        return header + self.bits.tobytes()
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> 'KeyBloomFilter':
+        """
+        Deserializar un filtro.
+
+        Args:
+            data: Bytes producidos por to_bytes
+
+        Returns:
+            Filtro reconstruido
+        """
+        magic, version, num_bits, num_hashes, count = _HEADER.unpack_from(data)
+        if magic != _MAGIC or version != _VERSION:
+            raise ValueError("Formato de filtro de Bloom no reconocido")
+        bits = np.frombuffer(data, dtype=np.uint8, offset=_HEADER.size).copy()
+        return cls(num_bits, num_hashes, bits, count)
@@ -0,0 +1,67 @@
+"""
+Configuración compartida de los tests de modelos de satisfacción.
+
+Reúne lo que repetían los tests de analytics/ml_models:
+- Rutas de importación de los módulos del predictor
+- Dependencias opcionales requeridas (require_ml_stack)
+- Generador de tickets sintéticos, también usado por los benchmarks
+- Fixture con los datos preparados por SatisfactionPredictor
+"""
+
+import os
+import sys
+from typing import Tuple
+
+import numpy as np
+import pandas as pd
+import pytest
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(ROOT_DIR, 'analytics', 'ml_models'))
+
+ML_MODULES = ('sklearn', 'xgboost', 'lightgbm', 'optuna', 'matplotlib', 'seaborn')
+
+
+def require_ml_stack(*extra: str) -> None:
+    """
+    Omitir el módulo de tests si falta alguna dependencia del predictor.
+
+    Args:
+        *extra: Módulos adicionales que requiere el módulo de tests
+    """
+    for module in ML_MODULES + extra:
+        pytest.importorskip(module)
+
+
+def generate_tickets(n: int, seed: int = 42) -> pd.DataFrame:
+    """Tickets sintéticos con la misma forma que la demo de satisfaction_predictor."""
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        'ticket_id': [f'TKT-{i:06d}' for i in range(n)],
+        'fecha_creacion': pd.date_range('2024-01-01', periods=n, freq='4h'),
+        'canal': rng.choice(['telefono', 'chat', 'email', 'presencial'], n),
+        'departamento': rng.choice(['soporte', 'ventas', 'tecnico'], n),
+        'tipo_consulta': rng.choice(['consulta', 'reclamo', 'solicitud'], n),
+        'duracion_minutos': rng.lognormal(2, 1, n),
+        'resolucion': rng.choice(['resuelto', 'escalado', 'pendiente'], n),
+        'prioridad': rng.choice(['baja', 'media', 'alta'], n),
+        'cliente_vip': rng.choice([True, False], n, p=[0.1, 0.9]),
+        'agente_id': [f'AGT-{i:03d}' for i in rng.integers(1, 20, n)]
+    })
+    score = (3.5
+             + df['canal'].map({'presencial': 0.5, 'chat': 0.3, 'email': -0.2, 'telefono': 0.0})
+             + np.where(df['duracion_minutos'] > 30, -0.8, np.where(df['duracion_minutos'] < 5, 0.3, 0))
+             + df['resolucion'].map({'resuelto': 0.7, 'escalado': -0.5, 'pendiente': 0.0})
+             + rng.normal(0, 0.5, n))
+    df['satisfaccion_score'] = score.clip(1, 5)
+    return df
+
+
+@pytest.fixture(scope='module')
+def data() -> Tuple:
+    """Predictor de clasificación con 300 tickets preparados (uno por módulo)."""
+    from satisfaction_predictor import SatisfactionPredictor
+
+    predictor = SatisfactionPredictor(task_type='classification')
+    X, y = predictor.prepare_data(generate_tickets(300))
+    return predictor, X, y
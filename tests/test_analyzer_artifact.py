@@ -0,0 +1,107 @@
+"""
+Tests de los artefactos versionados de SentimentAnalyzer.
+"""
+
+import os
+import sys
+import json
+
+import pytest
+
+sys.path.append(os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    'analytics', 'nlp_models'
+))
+
+from sentiment_analyzer import SentimentAnalyzer
+
+
+def test_round_trip_pins_configuration(tmp_path):
+    analyzer = SentimentAnalyzer(analyzers=['vader'])
+    analyzer.banking_positive_words = {'excelente': 1.0, 'sin problemas': 2.0}
+    analyzer.category_thresholds['vader'] = (0.2, -0.2)
+    version = analyzer.save_model(str(tmp_path / 'artefacto'))
+
+    loaded = SentimentAnalyzer.load_model(str(tmp_path / 'artefacto'))
+    assert loaded.artifact_version == version
+    assert loaded.analyzers == ['vader']
+    assert loaded.lexicon_matchers[0].terms == {'excelente': 1.0, 'sin problemas': 2.0}
+    assert loaded.category_thresholds['vader'] == (0.2, -0.2)
+    assert loaded.worker_config()['artifact_version'] == version
+
+    # Guardar de nuevo sin cambios produce la misma versión
+    assert loaded.save_model(str(tmp_path / 'copia')) == version
+
+
+def test_version_is_the_cache_key(tmp_path):
+    analyzer = SentimentAnalyzer(analyzers=['vader'])
+    analyzer.save_model(str(tmp_path / 'v1'))
+    analyzer.category_thresholds['vader'] = (0.1, -0.1)
+    analyzer.save_model(str(tmp_path / 'v2'))
+
+    first = SentimentAnalyzer.load_model(str(tmp_path / 'v1'))
+    second = SentimentAnalyzer.load_model(str(tmp_path / 'v2'))
+
+    assert first.artifact_version != second.artifact_version
+    assert first._analyzer_fingerprint('vader') != second._analyzer_fingerprint('vader')
+
+
+def test_fingerprint_is_reused_until_configuration_changes():
+    analyzer = SentimentAnalyzer(analyzers=['vader'])
+    first = analyzer._analyzer_fingerprint('vader')
+    assert analyzer._analyzer_fingerprint('vader') is first
+
+    analyzer.cleaning_patterns['url'] = r'https?://\S+'
+    scope, namespace = analyzer._analyzer_fingerprint('vader')
+    assert scope == first[0]
+    assert namespace != first[1]
+
+
+def test_tampered_artifact_is_rejected(tmp_path):
+    path = tmp_path / 'artefacto'
+    SentimentAnalyzer().save_model(str(path))
+
+    lexicons = json.loads((path / 'lexicons.json').read_text(encoding='utf-8'))
+    lexicons['lexicons']['banking_negative']['excelente'] = 5.0
+    (path / 'lexicons.json').write_text(json.dumps(lexicons), encoding='utf-8')
+
+    with pytest.raises(ValueError):
+        SentimentAnalyzer.load_model(str(path))
+
+
+def test_local_model_files_are_referenced(tmp_path):
+    model_dir = tmp_path / 'modelo'
+    model_dir.mkdir()
+    (model_dir / 'config.json').write_text('{}')
+    (model_dir / 'model.safetensors').write_bytes(b'pesos')
+
+    analyzer = SentimentAnalyzer(transformer_model=str(model_dir))
+    analyzer.save_model(str(tmp_path / 'artefacto'))
+    loaded = SentimentAnalyzer.load_model(str(tmp_path / 'artefacto'), verify_models=True)
+    assert loaded.transformer_sentiment_model == str(model_dir)
+
+    (model_dir / 'model.safetensors').write_bytes(b'otros pesos')
+    with pytest.raises(ValueError):
+        SentimentAnalyzer.load_model(str(tmp_path / 'artefacto'))
+
+
+def test_model_paths_are_relative_to_the_models_root(tmp_path):
+    models_root = tmp_path / 'origen' / 'modelos'
+    model_dir = models_root / 'sentimiento'
+    model_dir.mkdir(parents=True)
+    (model_dir / 'config.json').write_text('{}')
+
+    analyzer = SentimentAnalyzer(transformer_model=str(model_dir))
+    version = analyzer.save_model(str(tmp_path / 'origen' / 'artefacto'), models_root=str(models_root))
+    manifest = json.loads((tmp_path / 'origen' / 'artefacto' / 'manifest.json').read_text(encoding='utf-8'))
+    assert manifest['models']['transformer_sentiment']['path'] == 'sentimiento'
+    assert manifest['transformer']['sentiment_model'] == 'sentimiento'
+
+    # El artefacto y los modelos se copian a otra ubicación
+    os.rename(tmp_path / 'origen', tmp_path / 'destino')
+    loaded = SentimentAnalyzer.load_model(
+        str(tmp_path / 'destino' / 'artefacto'),
+        models_root=str(tmp_path / 'destino' / 'modelos'), verify_models=True
+    )
+    assert loaded.artifact_version == version
+    assert loaded.transformer_sentiment_model == str(tmp_path / 'destino' / 'modelos' / 'sentimiento')
@@ -0,0 +1,45 @@
+"""
+Tests de las codificaciones de características de SatisfactionPredictor.
+"""
+
+import numpy as np
+
+from conftest import require_ml_stack
+
+require_ml_stack()
+
+from scipy import sparse
+
+
+def test_sparse_encoding_matches_dense(data):
+    predictor, X, _ = data
+    dense = predictor.create_preprocessor(X, 'dense').fit_transform(X)
+    csr = predictor.create_preprocessor(X, 'sparse').fit_transform(X)
+
+    assert sparse.isspmatrix_csr(csr) and csr.dtype == np.float32
+    np.testing.assert_allclose(csr.toarray(), dense, rtol=1e-5, atol=1e-5)
+
+
+def test_native_encoding_uses_one_code_per_category(data):
+    predictor, X, _ = data
+    numeric, categorical = predictor._feature_types(X)
+    preprocessor = predictor.create_preprocessor(X, 'native').fit(X)
+
+    new = X.iloc[:3].copy()
+    new.loc[new.index[0], 'canal'] = 'whatsapp'
+    matrix = preprocessor.transform(new)
+
+    assert matrix.dtype == np.float32
+    assert matrix.shape[1] == len(numeric) + len(categorical)
+    assert np.isnan(matrix[0, len(numeric) + categorical.index('canal')])
+
+
+def test_auto_encoding_trains_all_families(data):
+    predictor, X, y = data
+    results = predictor.train_models(X, y, cv_folds=2, encoding='auto', n_jobs=2)
+
+    assert set(results['models']) == set(predictor.models)
+    booster = results['models']['xgboost']['pipeline'].named_steps['model']
+    assert booster.enable_categorical
+    # Las predicciones desde el DataFrame original pasan por el preprocesador nativo
+    assert len(predictor.predict(X.iloc[:5], model_name='lightgbm')) == 5
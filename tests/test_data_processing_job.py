@@ -0,0 +1,200 @@
+"""
+Tests en modo local de CustomerSatisfactionProcessor.
+
+Usan una sesión de Spark local en lugar del contexto de Glue. Requieren
+PySpark, las librerías de AWS Glue (imagen local de Glue) y una JVM; sin
+ellas se omiten.
+"""
+
+import os
+import sys
+import shutil
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.append(os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    'processing', 'pyspark_jobs'
+))
+
+pytest.importorskip('pyspark')
+pytest.importorskip('awsglue')
+pytest.importorskip('datasketches')
+
+if shutil.which('java') is None and not os.environ.get('JAVA_HOME'):
+    pytest.skip('Spark en modo local requiere una JVM', allow_module_level=True)
+
+from pyspark.sql import SparkSession
+from pyspark.sql.functions import input_file_name
+
+from data_processing_job import CustomerSatisfactionProcessor
+
+PARTITION_COLS = ['year', 'month', 'day']
+
+
+@pytest.fixture(scope='module')
+def spark():
+    session = SparkSession.builder \
+        .master('local[2]') \
+        .appName('test_data_processing_job') \
+        .config('spark.sql.shuffle.partitions', '4') \
+        .config('spark.ui.enabled', 'false') \
+        .getOrCreate()
+    yield session
+    session.stop()
+
+
+@pytest.fixture
+def processor(spark):
+    return CustomerSatisfactionProcessor(SimpleNamespace(spark_session=spark), 'test_job')
+
+
+def _tickets(spark, rows):
+    columns = ['ticket_id', 'fecha_creacion', 'year', 'month', 'day', 'satisfaccion_score']
+    return spark.createDataFrame(rows, columns)
+
+
+def test_normalize_categoricals_maps_and_counts_unmapped(spark, processor):
+    df = spark.createDataFrame(
+        [('T1', 'Phone '), ('T2', 'chat'), ('T3', 'fax'), ('T4', None)],
+        ['ticket_id', 'canal']
+    )
+
+    result = processor.normalize_categoricals(df, 'tickets')
+
+    normalized = {row['ticket_id']: row['canal_normalizado'] for row in result.collect()}
+    assert normalized == {'T1': 'telefono', 'T2': 'chat', 'T3': 'otros', 'T4': 'otros'}
+    metrics = processor.mapping_metrics['tickets']
+    assert metrics['version'] == processor.categorical_mappings['version']
+    # Los nulos reciben el valor por defecto pero no cuentan como sin mapeo
+    assert metrics['sin_mapear'] == {'canal': 1}
+    assert metrics['valores'] == {'canal': {'fax': 1}}
+    assert result.is_cached
+    result.unpersist()
+
+
+def test_daily_metrics_roll_up_by_month(spark, processor):
+    tickets = spark.createDataFrame([
+        (2024, 1, 1, 'chat', 'c1', 5.0, 10.0, 'muy_satisfecho', 'resuelto'),
+        (2024, 1, 1, 'chat', 'c1', 3.0, 20.0, 'neutral', 'escalado'),
+        (2024, 1, 1, 'chat', 'c2', 4.0, 30.0, 'satisfecho', 'resuelto'),
+        (2024, 1, 1, 'email', 'c4', 1.0, 40.0, 'muy_insatisfecho', 'pendiente'),
+        (2024, 1, 2, 'chat', 'c2', 2.0, 50.0, 'insatisfecho', 'resuelto'),
+        (2024, 1, 2, 'chat', 'c3', 5.0, 60.0, 'muy_satisfecho', 'resuelto'),
+    ], ['year', 'month', 'day', 'canal_normalizado', 'cliente_id', 'satisfaccion_score',
+        'duracion_minutos', 'categoria_satisfaccion', 'resolucion_normalizada'])
+    nps = spark.createDataFrame([
+        (2024, 1, 1, 'promotor', 10), (2024, 1, 1, 'detractor', 3),
+        (2024, 1, 1, 'pasivo', 8), (2024, 1, 2, 'promotor', 9),
+    ], ['year', 'month', 'day', 'categoria_nps_corregida', 'nps_score'])
+
+    daily = processor.calculate_satisfaction_metrics(tickets, nps)
+
+    chat_day1 = daily.filter("day = 1 AND canal_normalizado = 'chat'").first()
+    assert chat_day1['total_tickets'] == 3
+    assert chat_day1['tickets_satisfactorios'] == 2
+    assert chat_day1['tasa_resolucion'] == pytest.approx(2 / 3)
+    assert chat_day1['clientes_unicos'] == pytest.approx(2, rel=0.01)
+    assert chat_day1['total_encuestas'] == 3
+    assert chat_day1['nps_score_calculado'] == pytest.approx(0.0)
+
+    monthly = processor.rollup_satisfaction_metrics(daily, ['year', 'month']).collect()
+    assert len(monthly) == 1
+    month = monthly[0]
+    assert month['total_tickets'] == 6
+    assert month['satisfaccion_promedio'] == pytest.approx(20.0 / 6)
+    assert month['duracion_promedio'] == pytest.approx(35.0)
+    assert month['tickets_resueltos'] == 4
+    # Los sketches se unen: c2 aparece ambos días y cuenta una vez
+    assert month['clientes_unicos'] == pytest.approx(4, rel=0.01)
+    # NPS una vez por día aunque se repita en cada canal
+    assert month['total_encuestas'] == 4
+    assert month['nps_score_calculado'] == pytest.approx(25.0)
+
+
+def test_rollup_rejects_exact_distinct_metrics(spark, processor):
+    tickets = spark.createDataFrame(
+        [(2024, 1, 1, 'chat', 'c1', 5.0, 10.0, 'satisfecho', 'resuelto')],
+        ['year', 'month', 'day', 'canal_normalizado', 'cliente_id', 'satisfaccion_score',
+         'duracion_minutos', 'categoria_satisfaccion', 'resolucion_normalizada']
+    )
+    nps = spark.createDataFrame([(2024, 1, 1, 'promotor', 10)],
+                                ['year', 'month', 'day', 'categoria_nps_corregida', 'nps_score'])
+    daily = processor.calculate_satisfaction_metrics(tickets, nps, exact_distinct=True)
+
+    assert daily.first()['clientes_unicos'] == 1
+    with pytest.raises(ValueError):
+        processor.rollup_satisfaction_metrics(daily, ['year', 'month'])
+
+
+def test_write_follows_file_plan(spark, processor, tmp_path):
+    df = spark.createDataFrame(
+        [(f'T{i:04d}', 2024, 1 + i % 2, float(i % 5)) for i in range(120)],
+        ['ticket_id', 'year', 'month', 'satisfaccion_score']
+    )
+    # Filas "grandes" para que el plan reparta la salida en varios archivos
+    processor.PARQUET_COMPRESSION_RATIO = 4000
+    plan = processor._plan_output_files(df, target_file_size_mb=1)
+    assert plan['rows'] == 120
+    assert plan['num_files'] > 2
+    assert plan['rows_per_file'] < 120
+
+    output_path = str(tmp_path / 'tickets')
+    report = processor.write_processed_data(df, output_path, ['year', 'month'],
+                                            target_file_size_mb=1)
+
+    assert set(report) == {'year=2024/month=1', 'year=2024/month=2'}
+    written = spark.read.parquet(output_path)
+    assert written.count() == 120
+    rows_per_file = written.groupBy(input_file_name().alias('archivo')).count().collect()
+    assert sum(entry['files'] for entry in report.values()) == len(rows_per_file)
+    assert max(row['count'] for row in rows_per_file) <= plan['rows_per_file']
+    assert not df.is_cached
+
+
+def test_incremental_batches_update_history_and_release_caches(spark, processor, tmp_path):
+    output_path = str(tmp_path / 'customer_tickets')
+    first = _tickets(spark, [
+        ('T1', '2024-01-01 10:00:00', 2024, 1, 1, 3.0),
+        ('T1', '2024-01-01 12:00:00', 2024, 1, 1, 4.0),
+        ('T2', '2024-01-01 09:00:00', 2024, 1, 1, 2.0),
+    ])
+
+    latest = processor.deduplicate(first, 'customer_tickets', output_path)
+    assert processor.dedup_metrics['customer_tickets']['duplicados_lote'] == 1
+    assert processor.write_incremental(latest, output_path, PARTITION_COLS,
+                                       key_cols=['ticket_id']) == [
+        {'year': 2024, 'month': 1, 'day': 1}
+    ]
+    processor.update_processed_keys(latest, 'customer_tickets', output_path)
+    processor.release_dedup_cache('customer_tickets')
+    assert not latest.is_cached
+    assert 'customer_tickets' not in processor.dedup_cached
+
+    second = _tickets(spark, [
+        # Actualización de T1 con evento en otro día
+        ('T1', '2024-01-02 08:00:00', 2024, 1, 2, 5.0),
+        # Versión de T2 más antigua que la ya procesada
+        ('T2', '2023-12-31 09:00:00', 2024, 1, 2, 1.5),
+        ('T3', '2024-01-02 09:00:00', 2024, 1, 2, 1.0),
+    ])
+    latest = processor.deduplicate(second, 'customer_tickets', output_path)
+    metrics = processor.dedup_metrics['customer_tickets']
+    assert metrics['actualizaciones_historico'] == 1
+    assert metrics['duplicados_historico'] == 1
+    assert metrics['registros_salida'] == 2
+    superseded = processor.superseded_partitions['customer_tickets']
+    assert superseded == [{'year': 2024, 'month': 1, 'day': 1}]
+
+    rewritten = processor.write_incremental(latest, output_path, PARTITION_COLS,
+                                            key_cols=['ticket_id'], extra_partitions=superseded)
+    assert rewritten == [{'year': 2024, 'month': 1, 'day': 1},
+                         {'year': 2024, 'month': 1, 'day': 2}]
+    cached = list(processor.dedup_cached['customer_tickets'])
+    processor.release_dedup_cache('customer_tickets')
+    assert not any(df.is_cached for df in cached)
+
+    result = {row['ticket_id']: (row['day'], row['satisfaccion_score'])
+              for row in spark.read.parquet(output_path).collect()}
+    assert result == {'T1': (2, 5.0), 'T2': (1, 2.0), 'T3': (2, 1.0)}
@@ -0,0 +1,57 @@
+"""
+Tests de los sketches HLL usados para contar clientes únicos.
+"""
+
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+sys.path.append(os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    'processing', 'pyspark_jobs'
+))
+
+from distinct_sketches import (
+    error_bound, relative_standard_error, validate_lg_config_k,
+    merge_sketches_pandas
+)
+
+datasketches = pytest.importorskip("datasketches")
+
+
+def _sketch(values, lg_config_k=12):
+    sketch = datasketches.hll_sketch(lg_config_k, datasketches.tgt_hll_type.HLL_8)
+    for value in values:
+        sketch.update(value)
+    return sketch.serialize_compact()
+
+
+def test_error_bound_shrinks_with_precision():
+    assert error_bound(14) < error_bound(12) < error_bound(10)
+    assert error_bound(12, 2) == pytest.approx(2 * relative_standard_error(12))
+
+
+def test_invalid_precision_rejected():
+    with pytest.raises(ValueError):
+        validate_lg_config_k(3)
+
+
+def test_merge_sketches_pandas_rolls_up_overlapping_days():
+    # Mismos clientes repetidos entre días: el roll-up no debe sumarlos
+    df = pd.DataFrame([
+        {'day': day, 'canal': canal,
+         'clientes_sketch': _sketch(f'{canal}-{i}' for i in range(day * 100, day * 100 + 500))}
+        for day in range(3) for canal in ['chat', 'email']
+    ])
+
+    merged = merge_sketches_pandas(df, ['canal'], 'clientes_sketch', 'clientes_unicos')
+
+    assert list(merged['canal']) == ['chat', 'email']
+    for _, row in merged.iterrows():
+        assert row['clientes_unicos'] == pytest.approx(700, rel=row['clientes_unicos_error_relativo'])
+        assert row['clientes_unicos_lower'] <= row['clientes_unicos'] <= row['clientes_unicos_upper']
+
+    total = merge_sketches_pandas(df, None, 'clientes_sketch', 'clientes_unicos')
+    assert total['clientes_unicos'].iloc[0] == pytest.approx(1400, rel=error_bound(12))
@@ -0,0 +1,86 @@
+"""
+Tests del transformador de características de SatisfactionPredictor.
+"""
+
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.append(os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    'analytics', 'ml_models'
+))
+
+from feature_pipeline import TicketFeatureTransformer
+
+
+def tickets(n=200, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'fecha_creacion': pd.date_range('2024-01-01', periods=n, freq='4h'),
+        'canal': rng.choice(['telefono', 'chat', 'email'], n),
+        'agente_id': [f'AGT-{i:03d}' for i in rng.integers(1, 8, n)],
+        'duracion_minutos': rng.lognormal(2, 1, n),
+        'resolucion': rng.choice(['resuelto', 'escalado', 'pendiente'], n),
+        'prioridad': rng.choice(['baja', 'media', 'alta'], n),
+        'cliente_vip': rng.choice([True, False], n),
+        'satisfaccion_score': rng.uniform(1, 5, n)
+    })
+
+
+def test_target_encoding_is_out_of_fold():
+    df = tickets(60)
+    # Un fold por fila: la media del agente excluye la propia fila
+    features = TicketFeatureTransformer(n_folds=len(df)).fit_transform(df)
+
+    row = 10
+    same_agent = df['agente_id'] == df.loc[row, 'agente_id']
+    others = df.loc[same_agent & (df.index != row), 'satisfaccion_score']
+    assert features.loc[row, 'agente_satisfaccion_promedio'] == pytest.approx(others.mean())
+    assert features.loc[row, 'agente_satisfaccion_std'] == pytest.approx(others.std())
+    # El conteo no depende del target y usa todos los datos
+    assert features.loc[row, 'agente_total_tickets'] == same_agent.sum()
+
+
+def test_scoring_uses_stored_statistics():
+    df = tickets()
+    transformer = TicketFeatureTransformer().fit(df)
+    agent_means = df.groupby('agente_id')['satisfaccion_score'].mean()
+
+    new = tickets(30, seed=1).drop(columns=['satisfaccion_score'])
+    new.loc[0, 'agente_id'] = 'AGT-NUEVO'
+    batch = transformer.transform(new)
+    single = transformer.transform(new.iloc[[5]])
+
+    # Un lote de una fila produce las mismas características que el lote completo
+    pd.testing.assert_frame_equal(single, batch.iloc[[5]])
+    assert batch.loc[5, 'agente_satisfaccion_promedio'] == \
+        pytest.approx(agent_means[new.loc[5, 'agente_id']])
+    # Agentes no vistos reciben la media global
+    assert batch.loc[0, 'agente_satisfaccion_promedio'] == \
+        pytest.approx(df['satisfaccion_score'].mean())
+    assert batch.loc[0, 'agente_total_tickets'] == 0
+    assert 'duracion_minutos_es_outlier' in batch.columns
+
+
+def test_state_round_trip():
+    df = tickets()
+    transformer = TicketFeatureTransformer().fit(df)
+    restored = TicketFeatureTransformer.from_dict(transformer.to_dict())
+
+    pd.testing.assert_frame_equal(transformer.transform(df), restored.transform(df))
+
+
+def test_partial_fit_matches_fit():
+    df = tickets(300)
+    full = TicketFeatureTransformer().fit(df)
+    streamed = TicketFeatureTransformer()
+    for start in range(0, len(df), 70):
+        streamed.partial_fit(df.iloc[start:start + 70])
+    streamed.outlier_bounds = full.outlier_bounds
+
+    new = tickets(40, seed=2).drop(columns=['satisfaccion_score'])
+    pd.testing.assert_frame_equal(full.transform(new), streamed.transform(new))
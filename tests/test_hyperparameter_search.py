@@ -0,0 +1,62 @@
+"""
+Tests de la búsqueda de hiperparámetros con poda y estudio reanudable.
+"""
+
+import pytest
+
+from conftest import require_ml_stack
+
+require_ml_stack('sqlalchemy')
+
+from optuna.trial import TrialState
+
+from hyperparameter_search import CrossValidationObjective, base_estimator
+
+
+def test_lightgbm_search_reports_folds_and_early_stopping(data):
+    predictor, X, y = data
+    result = predictor.optimize_hyperparameters(X, y, model_name='lightgbm', n_trials=4,
+                                                early_stopping_rounds=10, n_jobs=1)
+
+    completed = result['study'].get_trials(states=(TrialState.COMPLETE,))
+    assert completed
+    assert all(sorted(trial.intermediate_values) == [0, 1, 2] for trial in completed)
+    assert result['best_iteration'] >= 1
+    # Los parámetros fijos del espacio de búsqueda también se devuelven
+    assert result['best_params']['subsample_freq'] == 1
+
+
+def test_study_resumes_from_storage(data, tmp_path):
+    predictor, X, y = data
+    storage = f"sqlite:///{tmp_path / 'optuna.db'}"
+    kwargs = dict(model_name='random_forest', storage=storage, study_name='rf', n_jobs=1)
+
+    predictor.optimize_hyperparameters(X, y, n_trials=3, **kwargs)
+    result = predictor.optimize_hyperparameters(X, y, n_trials=5, **kwargs)
+
+    finished = result['study'].get_trials(states=(TrialState.COMPLETE, TrialState.PRUNED))
+    assert len(finished) == 5
+
+
+def test_parallel_trials_require_storage(data):
+    predictor, X, y = data
+    with pytest.raises(ValueError):
+        predictor.optimize_hyperparameters(X, y, model_name='xgboost', n_trials=2, n_workers=2)
+
+
+def test_early_stopping_does_not_use_the_scored_fold():
+    import numpy as np
+
+    class RecordingModel(type(base_estimator('lightgbm', 'classification'))):
+        def fit(self, X, y, eval_set=None, **kwargs):
+            self.recorded = (len(X), len(eval_set[0][0]))
+            return super().fit(X, y, eval_set=eval_set, **kwargs)
+
+    rng = np.random.default_rng(0)
+    X_fit, y_fit = rng.normal(size=(200, 4)), np.arange(200) % 3
+    objective = CrossValidationObjective('lightgbm', None, None, y_fit, 'accuracy',
+                                         early_stopping_rounds=5)
+    model = RecordingModel(n_estimators=20, verbose=-1)
+
+    assert objective._fit(model, X_fit, y_fit) >= 1
+    assert model.recorded == (180, 20)
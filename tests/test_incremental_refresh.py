@@ -0,0 +1,97 @@
+"""
+Tests de la actualización incremental con chequeos de deriva.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import generate_tickets, require_ml_stack
+
+require_ml_stack('pyarrow')
+
+from drift import TIME_FEATURES, drift_by_feature, feature_profile
+from model_artifact import load_metrics
+from satisfaction_predictor import SatisfactionPredictor
+
+
+@pytest.fixture(scope='module')
+def artifact(tmp_path_factory):
+    directory = tmp_path_factory.mktemp('refresh')
+    parquet_path = str(directory / 'tickets.parquet')
+    generate_tickets(2000).to_parquet(parquet_path)
+
+    predictor = SatisfactionPredictor(task_type='classification')
+    results = predictor.train_from_parquet(parquet_path, method='lightgbm', num_boost_round=30)
+    model_path = str(directory / 'model')
+    predictor.save_model(results, model_path)
+    return model_path
+
+
+def test_profile_has_no_drift_on_training_distribution():
+    predictor = SatisfactionPredictor(task_type='classification')
+    X, _ = predictor.prepare_data(generate_tickets(1000))
+    psi = drift_by_feature(feature_profile(X), X)
+
+    assert set(psi) == set(X.columns) - set(TIME_FEATURES)
+    assert max(psi.values()) < 0.01
+
+
+def test_refresh_continues_boosting_and_updates_statistics(artifact):
+    predictor = SatisfactionPredictor.load_model(artifact)
+    booster = predictor.trained_models['lightgbm']['pipeline'].named_steps['model'].booster_
+    rounds_before = booster.current_iteration()
+    tickets_before = predictor.feature_transformer.global_sums['target_count']
+
+    new = generate_tickets(300, seed=7)
+    report = predictor.refresh(new, n_rounds=10, max_score_drop=1.0)
+
+    assert report['action'] == 'incremental'
+    updated = predictor.trained_models['lightgbm']['pipeline'].named_steps['model'].booster_
+    assert updated.current_iteration() == rounds_before + 10
+    assert predictor.feature_transformer.global_sums['target_count'] == tickets_before + len(new)
+    assert set(predictor.predict(predictor.transform_features(new))) <= {0, 1, 2}
+
+
+def test_refreshed_model_is_saved(artifact, tmp_path):
+    predictor = SatisfactionPredictor.load_model(artifact)
+    new = generate_tickets(300, seed=7)
+    report = predictor.refresh(new, n_rounds=10, max_score_drop=1.0)
+    assert report['action'] == 'incremental'
+
+    path = str(tmp_path / 'refreshed')
+    predictor.save_model(None, path)
+    reloaded = SatisfactionPredictor.load_model(path)
+
+    booster = predictor.trained_models['lightgbm']['pipeline'].named_steps['model'].booster_
+    reloaded_booster = reloaded.trained_models['lightgbm']['pipeline'].named_steps['model'].booster_
+    assert reloaded_booster.current_iteration() == booster.current_iteration()
+    assert reloaded.feature_transformer.to_dict() == predictor.feature_transformer.to_dict()
+    assert reloaded.reference_score == report['validation_after']
+    assert load_metrics(path)['models']['lightgbm']['refreshed_rows'] == len(new)
+
+
+def test_daily_batch_from_same_distribution_is_incremental(artifact):
+    predictor = SatisfactionPredictor.load_model(artifact)
+    new = generate_tickets(600, seed=11)
+    new['fecha_creacion'] = pd.Timestamp('2025-03-04') + pd.to_timedelta(
+        np.linspace(0, 86_399, len(new)), unit='s'
+    )
+
+    report = predictor.refresh(new, n_rounds=5)
+
+    assert report['action'] == 'incremental', report['reasons']
+    assert not set(report['psi']) & set(TIME_FEATURES)
+
+
+def test_drift_requires_full_retrain(artifact):
+    predictor = SatisfactionPredictor.load_model(artifact)
+    new = generate_tickets(300, seed=7)
+    new['duracion_minutos'] *= 20
+    retrained = []
+
+    report = predictor.refresh(new, full_retrain=lambda: retrained.append(True) or {})
+
+    assert report['action'] == 'full_retrain'
+    assert 'duracion_minutos' in report['reasons'][0]
+    assert retrained
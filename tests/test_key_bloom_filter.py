@@ -0,0 +1,52 @@
+"""
+Tests del filtro de Bloom de claves procesadas usado en la deduplicación.
+"""
+
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.append(os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    'processing', 'pyspark_jobs'
+))
+
+from key_bloom_filter import KeyBloomFilter
+
+
+@pytest.fixture
+def processed_keys():
+    return pd.Series([f'TKT-{i:06d}' for i in range(20000)])
+
+
+def test_no_false_negatives(processed_keys):
+    bloom = KeyBloomFilter.for_capacity(len(processed_keys), fpp=0.01)
+    bloom.add(processed_keys)
+
+    assert bloom.might_contain(processed_keys).all()
+
+
+def test_false_positive_rate_near_target(processed_keys):
+    bloom = KeyBloomFilter.for_capacity(len(processed_keys), fpp=0.01)
+    bloom.add(processed_keys)
+
+    new_keys = pd.Series([f'TKT-{i:06d}' for i in range(20000, 40000)])
+    assert bloom.might_contain(new_keys).mean() < 0.02
+
+
+def test_roundtrip_and_merge(processed_keys):
+    first = KeyBloomFilter.for_capacity(len(processed_keys), fpp=0.01)
+    second = KeyBloomFilter.for_capacity(len(processed_keys), fpp=0.01)
+    first.add(processed_keys[:10000])
+    second.add(processed_keys[10000:])
+
+    restored = KeyBloomFilter.from_bytes(first.to_bytes())
+    assert np.array_equal(restored.bits, first.bits)
+    assert restored.count == 10000
+
+    restored.merge(second)
+    assert restored.might_contain(processed_keys).all()
+    assert restored.count == len(processed_keys)
@@ -0,0 +1,68 @@
+"""
+Tests de la carga diferida de backends de SentimentAnalyzer.
+
+Cada caso corre en un intérprete nuevo para inspeccionar sys.modules sin
+lo que hayan importado otros tests.
+"""
+
+import os
+import sys
+import json
+import subprocess
+import textwrap
+
+import pytest
+
+NLP_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    'analytics', 'nlp_models'
+)
+
+pytest.importorskip('vaderSentiment')
+pytest.importorskip('textblob')
+
+BACKEND_MODULES = ('vaderSentiment', 'textblob', 'nltk', 'transformers', 'torch')
+
+
+def loaded_modules(code: str) -> set:
+    """Módulos de backend importados tras ejecutar code en un proceso nuevo."""
+    script = textwrap.dedent(f"""
+        import sys, json
+        sys.path.append({NLP_DIR!r})
+        from sentiment_analyzer import SentimentAnalyzer
+    """) + textwrap.dedent(code) + textwrap.dedent(f"""
+        print(json.dumps([name for name in {BACKEND_MODULES!r} if name in sys.modules]))
+    """)
+    output = subprocess.run([sys.executable, '-c', script], capture_output=True,
+                            text=True, check=True).stdout
+    return set(json.loads(output.strip().splitlines()[-1]))
+
+
+def test_import_and_construction_load_no_backend():
+    assert loaded_modules("""
+        analyzer = SentimentAnalyzer()
+        assert analyzer.loaded_backends() == []
+    """) == set()
+
+
+def test_preload_loads_only_requested_backend():
+    assert loaded_modules("""
+        analyzer = SentimentAnalyzer()
+        assert analyzer.preload(['vader']) == ['vader']
+    """) == {'vaderSentiment'}
+
+
+def test_selected_analyzers_load_only_their_backends():
+    assert loaded_modules("""
+        analyzer = SentimentAnalyzer(analyzers=['vader'], cache_memory_items=0)
+        analyzer.analyze_text('Excelente servicio')
+        assert analyzer.loaded_backends() == ['vader']
+    """) == {'vaderSentiment'}
+
+    # TextBlob depende de NLTK, pero no carga VADER ni transformers
+    loaded = loaded_modules("""
+        analyzer = SentimentAnalyzer(analyzers=['textblob'])
+        assert analyzer.preload() == ['textblob']
+    """)
+    assert 'textblob' in loaded
+    assert not loaded & {'vaderSentiment', 'transformers', 'torch'}
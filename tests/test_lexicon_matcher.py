@@ -0,0 +1,34 @@
+"""
+Tests del buscador de léxicos de dominio.
+"""
+
+import os
+import sys
+
+sys.path.append(os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    'analytics', 'nlp_models'
+))
+
+from lexicon_matcher import LexiconMatcher, load_lexicons
+
+
+def test_matches_whole_words_only():
+    matcher = LexiconMatcher(['error', 'malo'])
+    assert matcher.find("El terror no es un error, es malísimo") == [('error', 1.0)]
+
+
+def test_longest_phrase_wins_and_weights_are_summed():
+    matcher = LexiconMatcher({'problemas': 1.0, 'sin problemas': 0.0, 'no funciona': 2.0})
+    assert matcher.find("Todo sin problemas") == [('sin problemas', 0.0)]
+    assert matcher.score("Problemas: la app NO FUNCIONA, problemas otra vez") == 4.0
+
+
+def test_accents_are_folded():
+    matcher = LexiconMatcher({'pésimo': -1.0})
+    assert matcher.score_many(["Pesimo", "PÉSIMO servicio", None]).tolist() == [-1.0, -1.0, 0.0]
+
+
+def test_default_lexicons_load():
+    lexicons = load_lexicons()
+    assert {'banking_positive', 'banking_negative', 'nps_sentiment'} <= set(lexicons['lexicons'])
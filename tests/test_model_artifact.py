@@ -0,0 +1,60 @@
+"""
+Tests del artefacto compacto de SatisfactionPredictor.
+"""
+
+import os
+import json
+
+import numpy as np
+import pytest
+
+from conftest import generate_tickets, require_ml_stack
+
+require_ml_stack('pyarrow')
+
+from model_artifact import MANIFEST_FILE, load_metrics
+from satisfaction_predictor import SatisfactionPredictor
+
+
+@pytest.fixture(scope='module')
+def trained():
+    predictor = SatisfactionPredictor(task_type='classification')
+    X, y = predictor.prepare_data(generate_tickets(400))
+    new = generate_tickets(50, seed=3).drop(columns=['satisfaccion_score'])
+    return predictor, X, y, new
+
+
+@pytest.mark.parametrize('model_name', ['lightgbm', 'xgboost', 'logistic_regression'])
+def test_round_trip_predicts_like_joblib(trained, tmp_path, model_name):
+    predictor, X, y, new = trained
+    predictor.models = {model_name: SatisfactionPredictor().models[model_name]}
+    results = predictor.train_models(X, y, cv_folds=2, encoding='auto')
+
+    predictor.save_model(results, str(tmp_path / 'model.joblib'), artifact_format='joblib')
+    predictor.save_model(results, str(tmp_path / 'compact'))
+    legacy = SatisfactionPredictor.load_model(str(tmp_path / 'model.joblib'))
+    compact = SatisfactionPredictor.load_model(str(tmp_path / 'compact'), verify=True)
+
+    expected = legacy.predict(legacy.transform_features(new))
+    np.testing.assert_array_equal(compact.predict(compact.transform_features(new)), expected)
+    assert compact.artifact_version == predictor.artifact_version
+    assert compact.feature_transformer.to_dict() == legacy.feature_transformer.to_dict()
+    assert load_metrics(str(tmp_path / 'compact'))['best_model'] == model_name
+
+
+def test_tampered_manifest_is_rejected(trained, tmp_path):
+    predictor, X, y, _ = trained
+    predictor.models = {'logistic_regression': SatisfactionPredictor().models['logistic_regression']}
+    results = predictor.train_models(X, y, cv_folds=2)
+    path = str(tmp_path / 'compact')
+    predictor.save_model(results, path)
+
+    manifest_path = os.path.join(path, MANIFEST_FILE)
+    with open(manifest_path, encoding='utf-8') as f:
+        manifest = json.load(f)
+    manifest['schema']['feature_names'].reverse()
+    with open(manifest_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f)
+
+    with pytest.raises(ValueError):
+        SatisfactionPredictor.load_model(path)
@@ -0,0 +1,95 @@
+"""
+Tests del entrenamiento fuera de memoria sobre Parquet particionado.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import generate_tickets, require_ml_stack
+
+require_ml_stack('pyarrow')
+
+from out_of_core import StratifiedReservoir, satisfaction_strata
+from satisfaction_predictor import SatisfactionPredictor
+
+
+@pytest.fixture(scope='module')
+def dataset(tmp_path_factory):
+    df = generate_tickets(3000)
+    df['mes_particion'] = df['fecha_creacion'].dt.strftime('%Y-%m')
+    path = str(tmp_path_factory.mktemp('tickets'))
+    df.to_parquet(path, partition_cols=['mes_particion'], row_group_size=500)
+    return df, path
+
+
+@pytest.mark.parametrize('method', ['lightgbm', 'sgd', 'sample'])
+def test_methods_train_and_report_memory(dataset, method):
+    df, path = dataset
+    predictor = SatisfactionPredictor(task_type='classification')
+    results = predictor.train_from_parquet(path, method=method, batch_size=400,
+                                           memory_budget_mb=1, num_boost_round=30)
+
+    assert results['rows'] == len(df)
+    assert results['sample_rows'] < len(df)
+    stages = [entry['stage'] for entry in results['memory_report']]
+    assert stages[0] == 'estadisticas' and stages[-1] == 'evaluacion'
+    assert all(entry['peak_rss_mb'] > 0 for entry in results['memory_report'])
+
+    model = results['best_model']
+    assert 0 <= results['models'][model]['metrics']['accuracy'] <= 1
+    new = df.drop(columns=['satisfaccion_score', 'mes_particion']).iloc[:20]
+    predictions = predictor.predict(predictor.transform_features(new))
+    assert set(predictions) <= {0, 1, 2}
+
+
+def test_reservoir_keeps_uniform_capped_strata():
+    y = np.array([1.0, 3.0, 4.5, np.nan, 0.0] * 200)
+    strata = satisfaction_strata(y)
+    assert sorted(set(strata)) == [-1, 0, 1, 2]
+
+    reservoir = StratifiedReservoir(capacity_per_stratum=50)
+    for start in range(0, len(y), 130):
+        reservoir.update(pd.DataFrame({'y': y[start:start + 130]}), strata[start:start + 130])
+    sample, weights = reservoir.sample()
+
+    assert len(sample) == 150
+    assert weights.sum() == pytest.approx(600)
+
+
+def test_lightgbm_early_stops_on_rows_it_does_not_score(dataset, monkeypatch):
+    from out_of_core import OutOfCoreTrainer
+
+    _, path = dataset
+    seen = {}
+    fit_lightgbm, evaluate = OutOfCoreTrainer._fit_lightgbm, OutOfCoreTrainer._evaluate
+
+    def record_fit(self, path, X_sample, X_stop, *args, **kwargs):
+        seen['stop'] = set(X_stop.index)
+        return fit_lightgbm(self, path, X_sample, X_stop, *args, **kwargs)
+
+    def record_evaluate(self, pipeline, X_holdout, y_holdout):
+        seen['scored'] = set(X_holdout.index)
+        return evaluate(self, pipeline, X_holdout, y_holdout)
+
+    monkeypatch.setattr(OutOfCoreTrainer, '_fit_lightgbm', record_fit)
+    monkeypatch.setattr(OutOfCoreTrainer, '_evaluate', record_evaluate)
+    SatisfactionPredictor(task_type='classification').train_from_parquet(
+        path, method='lightgbm', batch_size=400, num_boost_round=30
+    )
+
+    assert seen['stop'] and seen['scored']
+    assert not seen['stop'] & seen['scored']
+
+
+def test_memory_budget_counts_transformed_width(dataset):
+    from feature_pipeline import TicketFeatureTransformer
+    from out_of_core import OutOfCoreTrainer
+
+    df, _ = dataset
+    batch = df.drop(columns=['mes_particion']).iloc[:400]
+    transformer = TicketFeatureTransformer().partial_fit(batch)
+    trainer = OutOfCoreTrainer(SatisfactionPredictor(task_type='classification'))
+
+    raw_bytes = batch.memory_usage(deep=True).sum() / len(batch)
+    assert trainer._reservoir_row_bytes(batch, transformer) > raw_bytes
@@ -0,0 +1,102 @@
+"""
+Tests del análisis de sentimientos multiproceso.
+"""
+
+import os
+import sys
+from multiprocessing import shared_memory
+
+import pandas as pd
+import pytest
+
+sys.path.append(os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    'analytics', 'nlp_models'
+))
+
+pytest.importorskip('vaderSentiment')
+pytest.importorskip('textblob')
+pytest.importorskip('pyarrow')
+
+import parallel_scoring
+from parallel_scoring import ParallelScorer, analyze_parallel
+from sentiment_analyzer import SentimentAnalyzer
+
+ANALYZERS = ['vader', 'textblob']
+
+
+@pytest.fixture
+def reviews():
+    texts = ['Excelente atención', 'Muy lento el proceso', None, 'Servicio normal',
+             'Terrible app, no funciona', '', 'Rápido y amable']
+    return pd.DataFrame(
+        {'texto': [texts[i % len(texts)] for i in range(23)], 'orden': range(23)},
+        index=[f'fila-{i}' for i in range(23)]
+    )
+
+
+@pytest.fixture
+def published(monkeypatch):
+    names = []
+    original = parallel_scoring._publish_texts
+
+    def tracking_publish(texts):
+        shm, size = original(texts)
+        names.append(shm.name)
+        return shm, size
+
+    monkeypatch.setattr(parallel_scoring, '_publish_texts', tracking_publish)
+    return names
+
+
+def _analysis(df):
+    return df.drop(columns=['sentiment_analysis_timestamp']).reset_index()
+
+
+def test_pool_matches_single_process(reviews):
+    analyzer = SentimentAnalyzer(analyzers=ANALYZERS, cache_memory_items=0)
+    expected = analyzer.analyze_dataframe(reviews, 'texto', batch_size=4)
+
+    result = analyze_parallel(analyzer, reviews, 'texto', n_workers=2, chunk_size=5,
+                              batch_size=4)
+
+    pd.testing.assert_frame_equal(_analysis(result), _analysis(expected))
+
+
+def test_chunks_come_back_in_order_across_calls(reviews):
+    analyzer = SentimentAnalyzer(analyzers=['vader'], cache_memory_items=0)
+    shuffled = reviews.sample(frac=1, random_state=3)
+
+    with ParallelScorer(analyzer, 2, chunk_size=3, analyzers=['vader']) as scorer:
+        first = scorer.score(reviews, 'texto')
+        second = scorer.score(shuffled, 'texto')
+
+    for source, result in ((reviews, first), (shuffled, second)):
+        assert list(result.index) == list(source.index)
+        assert result['orden'].tolist() == source['orden'].tolist()
+        expected = analyzer.analyze_dataframe(source, 'texto')
+        pd.testing.assert_series_equal(result['sentiment_vader_compound'],
+                                       expected['sentiment_vader_compound'])
+
+
+def test_shared_memory_is_released(reviews, published):
+    analyzer = SentimentAnalyzer(analyzers=['vader'], cache_memory_items=0)
+    with ParallelScorer(analyzer, 2, chunk_size=5, analyzers=['vader']) as scorer:
+        scorer.score(reviews, 'texto')
+        scorer.score(reviews.iloc[:4], 'texto')
+
+    assert len(published) == 2
+    for name in published:
+        with pytest.raises(FileNotFoundError):
+            shared_memory.SharedMemory(name=name)
+
+
+def test_failed_task_releases_shared_memory(reviews, published):
+    analyzer = SentimentAnalyzer(analyzers=['vader'], cache_memory_items=0)
+    with pytest.raises(TypeError):
+        analyze_parallel(analyzer, reviews, 'texto', n_workers=2, chunk_size=5,
+                         unknown_option=True)
+
+    assert len(published) == 1
+    with pytest.raises(FileNotFoundError):
+        shared_memory.SharedMemory(name=published[0])
@@ -0,0 +1,68 @@
+"""
+Tests de los backends de inferencia transformer cuantizados.
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.append(os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    'analytics', 'nlp_models'
+))
+
+from quantized_inference import OptimizedSequenceClassifier, label_agreement, model_revision
+
+
+def test_label_agreement():
+    reference = [{'label': 'a'}, {'label': 'b'}, {'label': 'c'}, {'label': 'a'}]
+    candidate = [{'label': 'a'}, {'label': 'b'}, {'label': 'a'}, {'label': 'a'}]
+    assert label_agreement(reference, candidate) == 0.75
+    with pytest.raises(ValueError):
+        label_agreement(reference, candidate[:2])
+
+
+def test_model_revision_changes_with_weights(tmp_path):
+    weights = tmp_path / 'model.safetensors'
+    weights.write_bytes(b'v1')
+    first = model_revision(str(tmp_path))
+    assert model_revision(str(tmp_path)) == first
+
+    weights.write_bytes(b'pesos v2')
+    assert model_revision(str(tmp_path)) != first
+    assert model_revision('org/modelo') != model_revision('org/otro')
+
+
+@pytest.fixture(scope='module')
+def tiny_model(tmp_path_factory):
+    transformers = pytest.importorskip('transformers')
+    torch = pytest.importorskip('torch')
+    torch.manual_seed(0)
+
+    model_dir = str(tmp_path_factory.mktemp('tiny_bert'))
+    vocab = ['[PAD]', '[UNK]', '[CLS]', '[SEP]', '[MASK]'] + list('abcdefghijklmnopqrstuvwxyz')
+    with open(os.path.join(model_dir, 'vocab.txt'), 'w') as f:
+        f.write('\n'.join(vocab))
+    transformers.BertTokenizerFast(os.path.join(model_dir, 'vocab.txt')).save_pretrained(model_dir)
+
+    config = transformers.BertConfig(
+        vocab_size=len(vocab), hidden_size=32, num_hidden_layers=1, num_attention_heads=2,
+        intermediate_size=64, num_labels=3, id2label={0: 'neg', 1: 'neu', 2: 'pos'},
+        label2id={'neg': 0, 'neu': 1, 'pos': 2}
+    )
+    transformers.BertForSequenceClassification(config).save_pretrained(model_dir)
+    return model_dir
+
+
+def test_torch_int8_truncates_by_tokens_and_keeps_order(tiny_model):
+    classifier = OptimizedSequenceClassifier(tiny_model, backend='torch_int8', max_length=16)
+    texts = ['hola ' * 500, 'ok', 'excelente servicio']
+
+    results = classifier(texts, batch_size=2)
+    assert len(results) == 3
+    assert all(result['label'] in {'neg', 'neu', 'pos'} for result in results)
+    # La cuantización dinámica depende del lote, por eso se compara con tolerancia
+    single = classifier(texts[1])[0]
+    assert single['label'] == results[1]['label']
+    assert single['score'] == pytest.approx(results[1]['score'], abs=0.05)
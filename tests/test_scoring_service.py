@@ -0,0 +1,71 @@
+"""
+Tests del servicio de scoring de SatisfactionPredictor.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import generate_tickets, require_ml_stack
+
+require_ml_stack()
+
+from satisfaction_predictor import SatisfactionPredictor
+from scoring_service import ScoringService
+
+
+@pytest.fixture(scope='module')
+def model_path(tmp_path_factory):
+    predictor = SatisfactionPredictor(task_type='classification')
+    predictor.models = {'logistic_regression': predictor.models['logistic_regression']}
+    X, y = predictor.prepare_data(generate_tickets(400))
+    results = predictor.train_models(X, y, cv_folds=2)
+    path = str(tmp_path_factory.mktemp('model') / 'artefacto')
+    predictor.save_model(results, path)
+    return path
+
+
+def test_compiled_path_matches_pipeline(model_path):
+    service = ScoringService.from_artifact(model_path)
+    assert service.compiled is not None
+
+    new = generate_tickets(50, seed=3).drop(columns=['satisfaccion_score'])
+    new.loc[0, 'canal'] = 'whatsapp'
+    new.loc[1, 'duracion_minutos'] = np.nan
+    features = service.predictor.transform_features(new)
+
+    preprocessor = service.pipeline.named_steps['preprocessor']
+    np.testing.assert_allclose(service.compiled.transform(features), preprocessor.transform(features))
+    assert service.score(new)['predictions'] == service.pipeline.predict(features).tolist()
+
+
+def test_accepts_records_and_reports_latency(model_path):
+    service = ScoringService.from_artifact(model_path)
+    new = generate_tickets(10, seed=4).drop(columns=['satisfaccion_score'])
+    records = new.astype({'fecha_creacion': str}).to_dict(orient='records')
+
+    batch = service.score(records)
+    single = service.score(records[2])
+    assert single['predictions'] == batch['predictions'][2:3]
+    assert set(batch['labels']) <= {'bajo', 'medio', 'alto'}
+
+    metrics = service.metrics()
+    assert (metrics['requests'], metrics['records']) == (2, 11)
+    assert 0 < metrics['p50_ms'] <= metrics['p99_ms']
+
+
+def test_record_fast_path_matches_dataframe_path(model_path):
+    service = ScoringService.from_artifact(model_path)
+    new = generate_tickets(30, seed=5).drop(columns=['satisfaccion_score'])
+    new.loc[0, 'canal'] = None
+    new.loc[1, 'duracion_minutos'] = np.nan
+    new.loc[2, 'agente_id'] = 'AGT-999'
+    new.loc[3, 'prioridad'] = 'urgente'
+    new.loc[4, 'fecha_creacion'] = pd.NaT
+    records = new.astype({'fecha_creacion': object}).to_dict(orient='records')
+
+    transformer = service.predictor.feature_transformer
+    fast = service.compiled.transform_records([transformer.record_features(r) for r in records])
+    expected = service.compiled.transform(service.predictor.transform_features(new))
+    np.testing.assert_allclose(fast, expected)
+    assert service.score(records)['predictions'] == service.score(new)['predictions']
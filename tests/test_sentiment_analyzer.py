@@ -0,0 +1,49 @@
+"""
+Tests del análisis por lotes de SentimentAnalyzer.
+"""
+
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.append(os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    'analytics', 'nlp_models'
+))
+
+pytest.importorskip('vaderSentiment')
+pytest.importorskip('textblob')
+
+from sentiment_analyzer import SentimentAnalyzer
+
+ANALYZERS = ['vader', 'textblob']
+
+
+def test_batch_matches_single_text_analysis_with_missing_texts():
+    texts = ['Excelente servicio, muy rápido!', None, 'Muy lento el proceso', '',
+             float('nan'), '   ', 'Terrible app, no funciona']
+    df = pd.DataFrame({'texto': texts})
+    analyzer = SentimentAnalyzer(analyzers=ANALYZERS, cache_memory_items=0)
+
+    result = analyzer.analyze_dataframe(df, 'texto', batch_size=3)
+
+    assert list(result.index) == list(df.index)
+    columns = [name for analyzer_name in ANALYZERS
+               for name in SentimentAnalyzer.ANALYZER_COLUMNS[analyzer_name]]
+    for position, text in enumerate(texts):
+        row = result.iloc[position]
+        expected = analyzer.analyze_text(text) if isinstance(text, str) else {}
+        if not expected:
+            assert row[[f'sentiment_{name}' for name in columns]].isna().all()
+            assert pd.isna(row['sentiment_consensus_sentiment'])
+            continue
+        for name in columns:
+            value = row[f'sentiment_{name}']
+            if isinstance(expected[name], str):
+                assert value == expected[name], name
+            else:
+                assert np.isclose(value, expected[name]), name
+        assert row['sentiment_consensus_sentiment'] == expected['consensus_sentiment']
@@ -0,0 +1,91 @@
+"""
+Tests de la caché de resultados del análisis de sentimientos.
+"""
+
+import os
+import sys
+
+sys.path.append(os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    'analytics', 'nlp_models'
+))
+
+from sentiment_cache import SentimentResultCache, config_fingerprint
+
+
+def test_disk_tier_survives_between_runs(tmp_path):
+    path = str(tmp_path / 'cache.sqlite')
+    namespace = config_fingerprint({'analyzer': 'vader', 'version': '3.3.2'})
+
+    cache = SentimentResultCache(path)
+    assert cache.get_many('vader', namespace, ['excelente atención']) == {}
+    cache.put_many('vader', namespace, {'excelente atención': {'vader_compound': 0.57}})
+    cache.close()
+
+    cache = SentimentResultCache(path)
+    found = cache.get_many('vader', namespace, ['excelente atención', 'muy lento'])
+    assert found == {'excelente atención': {'vader_compound': 0.57}}
+    assert cache.stats()['hits_disco'] == 1
+    assert cache.stats()['misses'] == 1
+
+    # La segunda consulta se resuelve en memoria
+    cache.get_many('vader', namespace, ['excelente atención'])
+    assert cache.stats()['hits_memoria'] == 1
+
+
+def test_version_change_invalidates_entries(tmp_path):
+    path = str(tmp_path / 'cache.sqlite')
+    old = config_fingerprint({'analyzer': 'vader', 'version': '3.3.1'})
+    new = config_fingerprint({'analyzer': 'vader', 'version': '3.3.2'})
+
+    cache = SentimentResultCache(path)
+    cache.put_many('vader', old, {'hola': {'vader_compound': 0.0}})
+    cache.put_many('textblob', old, {'hola': {'textblob_polarity': 0.0}})
+    cache.close()
+
+    cache = SentimentResultCache(path)
+    assert cache.get_many('vader', new, ['hola']) == {}
+    assert cache.get_many('vader', old, ['hola']) == {}
+    # Otros analizadores conservan sus entradas
+    assert cache.get_many('textblob', old, ['hola']) == {'hola': {'textblob_polarity': 0.0}}
+
+
+def test_lru_evicts_least_recently_used():
+    cache = SentimentResultCache(max_memory_items=2)
+    cache.put_many('vader', 'ns', {'a': {'v': 1}, 'b': {'v': 2}})
+    cache.get_many('vader', 'ns', ['a'])
+    cache.put_many('vader', 'ns', {'c': {'v': 3}})
+    assert set(cache.get_many('vader', 'ns', ['a', 'b', 'c'])) == {'a', 'c'}
+
+
+def test_scopes_sharing_a_file_keep_their_entries(tmp_path):
+    path = str(tmp_path / 'cache.sqlite')
+
+    spanish = SentimentResultCache(path)
+    spanish.put_many('vader', 'es-v1', {'hola': {'v': 1}}, scope='es')
+    english = SentimentResultCache(path)
+    english.put_many('vader', 'en-v1', {'hello': {'v': 2}}, scope='en')
+    assert spanish.get_many('vader', 'es-v1', ['hola'], scope='es') == {'hola': {'v': 1}}
+    spanish.close()
+    english.close()
+
+    # Una nueva versión del ámbito 'es' sólo invalida sus propias entradas
+    cache = SentimentResultCache(path)
+    assert cache.get_many('vader', 'es-v2', ['hola'], scope='es') == {}
+    assert cache.get_many('vader', 'es-v1', ['hola'], scope='es') == {}
+    assert cache.get_many('vader', 'en-v1', ['hello'], scope='en') == {'hello': {'v': 2}}
+
+
+def test_deferred_writes_reach_disk_in_batches(tmp_path):
+    path = str(tmp_path / 'cache.sqlite')
+    cache = SentimentResultCache(path, write_batch_size=3)
+    for text in ['a', 'b']:
+        cache.put_many('vader', 'ns', {text: {'v': 1}}, deferred=True)
+    assert SentimentResultCache(path).get_many('vader', 'ns', ['a', 'b']) == {}
+
+    cache.put_many('vader', 'ns', {'c': {'v': 1}}, deferred=True)
+    cache.put_many('vader', 'ns', {'d': {'v': 1}}, deferred=True)
+    assert set(SentimentResultCache(path).get_many('vader', 'ns', ['a', 'b', 'c', 'd'])) == {'a', 'b', 'c'}
+
+    cache.close()
+    assert set(SentimentResultCache(path).get_many('vader', 'ns', ['a', 'b', 'c', 'd'])) == {'a', 'b', 'c', 'd'}
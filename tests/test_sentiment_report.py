@@ -0,0 +1,77 @@
+"""
+Tests del estado agregado combinable de los reportes de sentimientos.
+"""
+
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.append(os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    'analytics', 'nlp_models'
+))
+
+from sentiment_report import SentimentReportState
+
+
+def analyzed_frame(n, seed):
+    rng = np.random.default_rng(seed)
+    compound = rng.uniform(-1, 1, n)
+    compound[::7] = np.nan
+    return pd.DataFrame({
+        'sentiment_consensus_sentiment': rng.choice(['positivo', 'negativo', 'neutro', None], n),
+        'sentiment_vader_compound': compound,
+        'sentiment_length': rng.integers(5, 300, n).astype(float),
+        'sentiment_word_count': rng.integers(1, 50, n).astype(float),
+        'sentiment_sentence_count': rng.integers(1, 5, n).astype(float)
+    })
+
+
+def legacy_report(df):
+    counts = df['sentiment_consensus_sentiment'].value_counts()
+    return {
+        'sentiment_distribution': counts.to_dict(),
+        'sentiment_percentages': (counts / len(df) * 100).to_dict(),
+        'vader_stats': {
+            'mean': df['sentiment_vader_compound'].mean(),
+            'std': df['sentiment_vader_compound'].std(),
+            'min': df['sentiment_vader_compound'].min(),
+            'max': df['sentiment_vader_compound'].max()
+        },
+        'avg_length': df['sentiment_length'].mean()
+    }
+
+
+def test_single_pass_matches_pandas_report():
+    df = analyzed_frame(1000, seed=0)
+    report = SentimentReportState.from_dataframe(df).report()
+    expected = legacy_report(df)
+
+    assert report['total_texts'] == 1000
+    assert report['sentiment_distribution'] == expected['sentiment_distribution']
+    assert report['sentiment_percentages'] == pytest.approx(expected['sentiment_percentages'])
+    assert report['vader_stats'] == pytest.approx(expected['vader_stats'])
+    assert report['text_stats']['avg_length'] == pytest.approx(expected['avg_length'])
+    assert sum(report['score_histograms']['vader_compound']['counts']) == \
+        df['sentiment_vader_compound'].notna().sum()
+    assert 'textblob_stats' not in report
+
+
+def test_merged_shards_roll_up_like_one_pass(tmp_path):
+    days = [analyzed_frame(n, seed) for seed, n in enumerate([300, 1, 700, 0])]
+
+    # Los estados diarios se guardan y se combinan sin los textos
+    for i, day in enumerate(days):
+        SentimentReportState.from_dataframe(day).save(str(tmp_path / f'dia_{i}.json'))
+    monthly = SentimentReportState.merge_all(
+        SentimentReportState.load(str(tmp_path / f'dia_{i}.json')) for i in range(len(days))
+    ).report()
+
+    full = SentimentReportState.from_dataframe(pd.concat(days)).report()
+    assert monthly['total_texts'] == full['total_texts'] == 1001
+    assert monthly['sentiment_distribution'] == full['sentiment_distribution']
+    assert monthly['vader_stats'] == pytest.approx(full['vader_stats'])
+    assert monthly['score_histograms'] == full['score_histograms']
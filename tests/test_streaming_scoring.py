@@ -0,0 +1,193 @@
+"""
+Tests del análisis de sentimientos en streaming de archivo a archivo.
+"""
+
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+sys.path.append(os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    'analytics', 'nlp_models'
+))
+
+pytest.importorskip('vaderSentiment')
+pytest.importorskip('pyarrow')
+
+from sentiment_analyzer import SentimentAnalyzer
+
+
+@pytest.fixture
+def reviews(tmp_path):
+    texts = ['Excelente atención', 'Muy lento el proceso', '', 'Servicio normal', 'Terrible app']
+    df = pd.DataFrame({
+        'review_id': [f'REV-{i:06d}' for i in range(50)],
+        'texto_review': [texts[i % len(texts)] for i in range(50)],
+        'calificacion': [i % 5 + 1 for i in range(50)]
+    })
+    path = tmp_path / 'reviews.csv'
+    df.to_csv(path, index=False)
+    return df, str(path)
+
+
+def test_output_has_only_ids_and_scores(reviews, tmp_path):
+    df, path = reviews
+    analyzer = SentimentAnalyzer(analyzers=['vader'], cache_memory_items=0)
+    summary = analyzer.analyze_file(path, str(tmp_path / 'out'), 'texto_review',
+                                    id_columns=['review_id'], batch_size=8, rows_per_part=20)
+
+    assert (summary['rows'], summary['parts'], summary['resumed_rows']) == (50, 3, 0)
+    result = pd.read_parquet(tmp_path / 'out')
+    assert 'texto_review' not in result.columns
+    assert 'calificacion' not in result.columns
+    assert result['review_id'].tolist() == df['review_id'].tolist()
+
+    expected = analyzer.analyze_dataframe(df, 'texto_review')
+    assert result['sentiment_vader_compound'].fillna(-9).tolist() == \
+        expected['sentiment_vader_compound'].fillna(-9).tolist()
+
+
+def test_resume_after_crash_matches_full_run(reviews, tmp_path, monkeypatch):
+    df, path = reviews
+    ndjson_path = str(tmp_path / 'reviews.ndjson')
+    df.to_json(ndjson_path, orient='records', lines=True, force_ascii=False)
+    output_dir = str(tmp_path / 'out')
+
+    analyzer = SentimentAnalyzer(analyzers=['vader'], cache_memory_items=0)
+    original = analyzer.analyze_dataframe
+    calls = {'n': 0}
+
+    def crash_on_fifth_batch(*args, **kwargs):
+        calls['n'] += 1
+        if calls['n'] == 5:
+            raise RuntimeError('worker caído')
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(analyzer, 'analyze_dataframe', crash_on_fifth_batch)
+    with pytest.raises(RuntimeError):
+        analyzer.analyze_file(ndjson_path, output_dir, 'texto_review',
+                              id_columns=['review_id'], batch_size=8, rows_per_part=16)
+    monkeypatch.undo()
+
+    summary = analyzer.analyze_file(ndjson_path, output_dir, 'texto_review',
+                                    id_columns=['review_id'], batch_size=8, rows_per_part=16)
+    assert summary['resumed_rows'] == 32
+    assert summary['rows'] == 50
+
+    result = pd.read_parquet(output_dir)
+    assert result['review_id'].tolist() == df['review_id'].tolist()
+    # El reporte acumulado cubre también las partes de la ejecución interrumpida
+    expected = analyzer.generate_sentiment_report(result)
+    assert summary['report']['sentiment_distribution'] == expected['sentiment_distribution']
+    assert summary['report']['vader_stats'] == pytest.approx(expected['vader_stats'])
+
+
+def test_checkpoint_from_other_configuration_is_rejected(reviews, tmp_path):
+    _, path = reviews
+    output_dir = str(tmp_path / 'out')
+    SentimentAnalyzer(analyzers=['vader']).analyze_file(path, output_dir, 'texto_review')
+
+    with pytest.raises(ValueError):
+        SentimentAnalyzer(analyzers=['vader']).analyze_file(
+            path, output_dir, 'texto_review', id_columns=['review_id']
+        )
+
+
+@pytest.mark.parametrize('extension', ['parquet', 'csv', 'ndjson'])
+def test_skip_rows_matches_reading_everything(reviews, tmp_path, extension):
+    df, _ = reviews
+    from streaming_scoring import iter_record_batches
+
+    path = str(tmp_path / f'reviews.{extension}')
+    if extension == 'parquet':
+        df.to_parquet(path, row_group_size=7)
+    elif extension == 'csv':
+        df.to_csv(path, index=False)
+    else:
+        df.to_json(path, orient='records', lines=True, force_ascii=False)
+
+    for skip in (0, 13, 14, 49, 60):
+        batches = list(iter_record_batches(path, ['review_id'], 8, skip_rows=skip))
+        read = pd.concat(batches)['review_id'].tolist() if batches else []
+        assert read == df['review_id'].tolist()[skip:]
+        assert all(len(batch) <= 8 for batch in batches)
+
+
+def test_workers_are_reused_across_batches(reviews, tmp_path, monkeypatch):
+    df, path = reviews
+    import parallel_scoring
+
+    created = []
+    original_init = parallel_scoring.ParallelScorer.__init__
+
+    def tracking_init(self, *args, **kwargs):
+        created.append(True)
+        original_init(self, *args, **kwargs)
+
+    monkeypatch.setattr(parallel_scoring.ParallelScorer, '__init__', tracking_init)
+    analyzer = SentimentAnalyzer(analyzers=['vader'], cache_memory_items=0)
+    summary = analyzer.analyze_file(path, str(tmp_path / 'out'), 'texto_review',
+                                    id_columns=['review_id'], batch_size=8, rows_per_part=20,
+                                    n_workers=2, chunk_size=4)
+
+    assert summary['rows'] == 50
+    assert len(created) == 1
+    result = pd.read_parquet(tmp_path / 'out')
+    expected = analyzer.analyze_dataframe(df, 'texto_review')
+    assert result['sentiment_vader_compound'].fillna(-9).tolist() == \
+        expected['sentiment_vader_compound'].fillna(-9).tolist()
+
+
+def test_token_frequencies_survive_resume(reviews, tmp_path, monkeypatch):
+    df, path = reviews
+    from token_frequencies import TokenFrequencies
+
+    output_dir = str(tmp_path / 'out')
+    analyzer = SentimentAnalyzer(analyzers=['vader'], cache_memory_items=0)
+    expected = TokenFrequencies(stopwords={'el'})
+    analyzer.analyze_dataframe(df, 'texto_review', token_frequencies=expected)
+
+    original = analyzer.analyze_dataframe
+    calls = {'n': 0}
+
+    def crash_on_fourth_batch(*args, **kwargs):
+        calls['n'] += 1
+        if calls['n'] == 4:
+            raise RuntimeError('worker caído')
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(analyzer, 'analyze_dataframe', crash_on_fourth_batch)
+    interrupted = TokenFrequencies(stopwords={'el'})
+    with pytest.raises(RuntimeError):
+        analyzer.analyze_file(path, output_dir, 'texto_review', id_columns=['review_id'],
+                              batch_size=8, rows_per_part=16, token_frequencies=interrupted)
+    monkeypatch.undo()
+    # Sólo la primera parte quedó confirmada; el lote en curso no se cuenta
+    assert sum(interrupted.frequencies().values()) < sum(expected.frequencies().values())
+
+    resumed = TokenFrequencies(stopwords={'el'})
+    summary = analyzer.analyze_file(path, output_dir, 'texto_review', id_columns=['review_id'],
+                                    batch_size=8, rows_per_part=16, token_frequencies=resumed)
+    assert summary['resumed_rows'] == 16
+    assert resumed.to_dict() == expected.to_dict()
+
+    completed = TokenFrequencies(stopwords={'el'})
+    analyzer.analyze_file(path, output_dir, 'texto_review', id_columns=['review_id'],
+                          batch_size=8, rows_per_part=16, token_frequencies=completed)
+    assert completed.to_dict() == expected.to_dict()
+
+
+def test_worker_token_counts_match_serial(reviews):
+    df, _ = reviews
+    from token_frequencies import TokenFrequencies
+
+    analyzer = SentimentAnalyzer(analyzers=['vader'], cache_memory_items=0)
+    serial = TokenFrequencies(vocabulary={'excelente', 'lento', 'terrible', 'app'})
+    analyzer.analyze_dataframe(df, 'texto_review', token_frequencies=serial)
+
+    parallel = TokenFrequencies(vocabulary={'excelente', 'lento', 'terrible', 'app'})
+    analyzer.analyze_dataframe(df, 'texto_review', n_workers=2, chunk_size=7,
+                               token_frequencies=parallel)
+    assert parallel.to_dict() == serial.to_dict()
@@ -0,0 +1,52 @@
+"""
+Tests del limpiador de textos compilado.
+"""
+
+import os
+import re
+import sys
+import random
+
+import pandas as pd
+
+sys.path.append(os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    'analytics', 'nlp_models'
+))
+
+from text_cleaning import DEFAULT_CLEANING_PATTERNS, TextCleaner
+
+
+def legacy_clean(text):
+    text = text.lower()
+    for pattern_name, pattern in DEFAULT_CLEANING_PATTERNS.items():
+        text = re.sub(pattern, ' ' if pattern_name == 'multiple_spaces' else '', text)
+    return text.strip()
+
+
+def random_texts(n, seed=0):
+    alphabet = list("abcxyzhtpw.:/@#_-!?1209 ÁñüÉç\t\n\xa0 \x1cİß日") + ['http', 'www', '  ']
+    rng = random.Random(seed)
+    return [''.join(rng.choice(alphabet) for _ in range(rng.randint(0, 25))) for _ in range(n)]
+
+
+def test_fused_passes_match_original_cleaning():
+    texts = random_texts(20000) + [
+        "Escribir a soporte@banco.com o visitar https://banco.com #ayuda @agente_1",
+        "@http://banco.com", "  Excelente   atención!!  ",
+    ]
+    cleaner = TextCleaner()
+    expected = [legacy_clean(text) for text in texts]
+
+    assert [cleaner.clean(text) for text in texts] == expected
+    assert cleaner.clean_series(pd.Series(texts)).tolist() == expected
+
+
+def test_custom_patterns_are_applied_in_sequence():
+    patterns = {'numbers': r'\d+', 'multiple_spaces': r'\s+'}
+    cleaner = TextCleaner(patterns)
+
+    assert not cleaner.fused
+    assert cleaner.clean("Ticket  123 ok ") == "ticket ok"
+    assert cleaner.clean(None) == ""
+    assert cleaner.clean_series(pd.Series(["A 1", "b"])).tolist() == ["a", "b"]
@@ -0,0 +1,50 @@
+"""
+Tests de las frecuencias de tokens para nubes de palabras.
+"""
+
+import os
+import sys
+from collections import Counter
+
+import pandas as pd
+
+sys.path.append(os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    'analytics', 'nlp_models'
+))
+
+from token_frequencies import TokenFrequencies
+
+TEXTS = pd.Series([
+    'excelente atención, muy rápido',
+    'la app es lenta y la atención pésima',
+    'excelente servicio excelente',
+    None,
+    ''
+])
+LABELS = pd.Series(['positivo', 'negativo', 'positivo', None, 'neutro'])
+
+
+def test_counts_by_sentiment_without_stopwords():
+    frequencies = TokenFrequencies(stopwords={'la', 'es', 'muy'}).update(TEXTS, LABELS)
+
+    assert frequencies.frequencies('positivo') == {
+        'excelente': 3, 'atención': 1, 'rápido': 1, 'servicio': 1
+    }
+    assert frequencies.frequencies('negativo')['atención'] == 1
+    assert 'la' not in frequencies.frequencies()
+    assert frequencies.frequencies('all', max_words=1) == {'excelente': 3}
+    assert frequencies.frequencies('neutro') == {}
+
+
+def test_batches_merge_like_one_pass():
+    vocabulary = {'excelente', 'lenta', 'pésima', 'rápido'}
+    full = TokenFrequencies(vocabulary=vocabulary).update(TEXTS, LABELS)
+
+    first = TokenFrequencies(vocabulary=vocabulary).update(TEXTS[:2], LABELS[:2])
+    second = TokenFrequencies(vocabulary=vocabulary).update(TEXTS[2:], LABELS[2:])
+    merged = first.merge(TokenFrequencies.from_dict(second.to_dict()))
+
+    assert merged.to_dict() == full.to_dict()
+    assert set(full.frequencies()) == vocabulary
+    assert Counter(full.frequencies()) == Counter(excelente=3, lenta=1, pésima=1, rápido=1)
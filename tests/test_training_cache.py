@@ -0,0 +1,49 @@
+"""
+Tests del preprocesamiento compartido por folds y el entrenamiento paralelo.
+"""
+
+import numpy as np
+
+from conftest import require_ml_stack
+
+require_ml_stack()
+
+from sklearn.base import clone
+from sklearn.ensemble import RandomForestClassifier
+
+from training_cache import FoldMatrixCache, fit_models_on_cache, split_budget
+
+
+def test_fold_matrices_match_per_fold_preprocessing(data):
+    predictor, X, y = data
+    preprocessor = predictor.create_preprocessor(X)
+    cache = FoldMatrixCache.build(preprocessor, X, y, cv=3, n_jobs=2)
+
+    assert len(cache.folds) == 3
+    for fold in cache.folds:
+        assert fold['X_train'].dtype == np.float32
+        reference = clone(preprocessor).fit(X.iloc[fold['train_index']])
+        np.testing.assert_allclose(fold['X_val'], reference.transform(X.iloc[fold['val_index']]),
+                                   rtol=1e-5, atol=1e-5)
+
+
+def test_cv_scores_match_cross_val_score(data):
+    predictor, X, y = data
+    forest = RandomForestClassifier(n_estimators=20, random_state=0, n_jobs=-1)
+    cache = FoldMatrixCache.build(predictor.create_preprocessor(X), X, y, cv=3)
+    fitted = fit_models_on_cache({'random_forest': forest}, cache, y, 'accuracy', n_jobs=2)
+
+    predictor.models = {'random_forest': forest}
+    legacy = predictor.train_models(X, y, test_size=0.2, cv_folds=3, shared_preprocessing=False)
+    shared = predictor.train_models(X, y, test_size=0.2, cv_folds=3, n_jobs=2)
+
+    assert fitted['random_forest']['model'].n_jobs == 1
+    np.testing.assert_allclose(legacy['models']['random_forest']['cv_scores'],
+                               shared['models']['random_forest']['cv_scores'])
+    assert legacy['best_model'] == shared['best_model'] == 'random_forest'
+
+
+def test_budget_does_not_oversubscribe():
+    assert split_budget(8, 24) == (8, 1)
+    assert split_budget(8, 2) == (2, 4)
+    assert split_budget(1, 10) == (1, 1)
@@ -0,0 +1,76 @@
+"""
+Tests del análisis de sentimientos por turno en transcripciones.
+"""
+
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.append(os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    'analytics', 'nlp_models'
+))
+
+from transcript_analysis import aggregate_turn_scores, explode_turns, split_turns
+
+TRANSCRIPT = "\n".join([
+    "Cliente: Tengo un cargo que no reconozco",
+    "Agente: Entiendo su preocupación.",
+    "Cliente: No, definitivamente no hice esa",
+    "transacción",
+    "Agente: Procederé a generar el reclamo",
+    "Cliente: Gracias, excelente atención"
+])
+
+
+def test_split_turns_by_speaker():
+    turns = split_turns(TRANSCRIPT)
+    assert [speaker for speaker, _ in turns] == ['cliente', 'agente', 'cliente', 'agente', 'cliente']
+    # Las líneas sin prefijo pertenecen al turno anterior
+    assert turns[2][1] == 'No, definitivamente no hice esa transacción'
+    # Un texto sin prefijos (o con dos puntos en otra palabra) es un solo turno
+    assert split_turns('Excelente: rápido y amable') == [('', 'Excelente: rápido y amable')]
+    assert split_turns('') == []
+
+
+def test_explode_keeps_only_selected_speakers():
+    segments = explode_turns(pd.Series([TRANSCRIPT, 'Muy buena app']))
+    assert segments['transcript_pos'].tolist() == [0, 0, 0, 1]
+    assert segments['turn_index'].tolist() == [0, 2, 4, 0]
+
+    all_turns = explode_turns(pd.Series([TRANSCRIPT]), speakers=None)
+    assert len(all_turns) == 5
+
+
+def test_aggregate_turn_scores():
+    segments = pd.DataFrame({
+        'transcript_pos': [0, 0, 0, 2],
+        'turn_index': [0, 2, 4, 0],
+    })
+    summary = aggregate_turn_scores(segments, np.array([-0.5, -0.8, 0.6, 0.3]), 3)
+
+    assert summary['turn_count'].tolist() == [3.0, 0.0, 1.0]
+    assert summary.loc[0, 'turn_first'] == -0.5
+    assert summary.loc[0, 'turn_final'] == 0.6
+    assert summary.loc[0, 'turn_worst'] == -0.8
+    assert summary.loc[0, 'turn_worst_index'] == 2
+    assert summary.loc[0, 'turn_trend'] == pytest.approx(np.polyfit([0, 1, 2], [-0.5, -0.8, 0.6], 1)[0])
+    assert np.isnan(summary.loc[1, 'turn_mean'])
+    assert np.isnan(summary.loc[2, 'turn_trend'])
+
+
+def test_repeated_turns_are_scored_once():
+    pytest.importorskip('vaderSentiment')
+    from sentiment_analyzer import SentimentAnalyzer
+
+    analyzer = SentimentAnalyzer(analyzers=['vader'])
+    df = pd.DataFrame({'transcript_texto': [TRANSCRIPT] * 20})
+    result = analyzer.analyze_transcripts(df, 'transcript_texto', batch_size=10)
+
+    assert result['sentiment_turn_count'].tolist() == [3.0] * 20
+    assert result['sentiment_final_consensus'].notna().all()
+    # 3 turnos únicos del cliente: sólo la primera aparición es un fallo de caché
+    assert analyzer.result_cache.stats()['misses'] == 3